@@ -0,0 +1,104 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# This file is part of the SPORCO package. Details of the copyright
+# and user license can be found in the 'LICENSE.txt' file distributed
+# with the package.
+
+"""
+Parallel Solver Backends
+========================
+
+This example compares the run times of :class:`.parcbpdn.ParConvBPDN` and :class:`.prlcnscdl.ConvBPDNDictLearn_Consensus` with three different parallel backends: a pool of worker processes constructed for each call of the ``solve`` method (the default), a persistent pool of worker processes, :class:`.shmpool.SharedMemoryPool`, and a persistent pool of worker threads, :class:`.shmpool.ThreadPool`. Each solver is run for a sequence of short solves, as in a dictionary learning loop or a service processing a stream of images, so that the pool startup cost is a substantial part of the total run time of the default backend.
+"""
+
+
+from __future__ import print_function
+from builtins import input
+from builtins import range
+
+import pyfftw   # See https://github.com/pyFFTW/pyFFTW/issues/40
+import multiprocessing as mp
+import numpy as np
+
+from sporco.admm import parcbpdn
+from sporco.dictlrn import prlcnscdl
+from sporco import shmpool
+from sporco import util
+from sporco import plot
+
+
+"""
+Load example images and highpass filter them.
+"""
+
+exim = util.ExampleImages(scaled=True, zoom=0.25, gray=True)
+S1 = exim.image('barbara.png', idxexp=np.s_[10:522, 100:612])
+S2 = exim.image('kodim23.png', idxexp=np.s_[:, 60:572])
+S3 = exim.image('monarch.png', idxexp=np.s_[:, 160:672])
+S4 = exim.image('sail.png', idxexp=np.s_[:, 210:722])
+S5 = exim.image('tulips.png', idxexp=np.s_[:, 30:542])
+S = np.dstack((S1, S2, S3, S4, S5))
+sl, sh = util.tikhonov_filter(S, 5, 16)
+
+
+"""
+Construct dictionary and set solver options. Each call of ``solve`` performs a small number of iterations.
+"""
+
+np.random.seed(12345)
+D0 = np.random.randn(8, 8, 32)
+lmbda = 0.2
+nsolve = 10
+optc = parcbpdn.ParConvBPDN.Options({'Verbose': False, 'MaxMainIter': 5,
+                                     'AutoRho': {'Enabled': False}})
+optd = prlcnscdl.ConvBPDNDictLearn_Consensus.Options(
+    {'Verbose': False, 'MaxMainIter': 2,
+     'CBPDN': {'rho': 50.0*lmbda + 0.5}, 'CCMOD': {'rho': 1.0}})
+
+
+"""
+Define a function that computes the total wall clock time of a sequence of calls of the ``solve`` method of both solvers, constructing a new solver for each image for :class:`.parcbpdn.ParConvBPDN`, and using the specified pool (``None`` for the default backend).
+"""
+
+def run(nproc, pool):
+    t = util.Timer()
+    t.start()
+    for k in range(nsolve):
+        b = parcbpdn.ParConvBPDN(D0, sh[..., k % S.shape[-1]], lmbda,
+                                 opt=optc, nproc=nproc, pool=pool)
+        b.solve()
+    d = prlcnscdl.ConvBPDNDictLearn_Consensus(D0, sh, lmbda, opt=optd,
+                                              nproc=nproc, pool=pool)
+    for k in range(nsolve):
+        d.solve()
+    t.stop()
+    return t.elapsed()
+
+
+"""
+Run the solvers for each backend with an increasing number of workers.
+"""
+
+nprocs = [n for n in (1, 2, 4, 8, 16, 32, 64) if n <= mp.cpu_count()]
+tdef, tshm, tthr = [], [], []
+for n in nprocs:
+    tdef.append(run(n, None))
+    with shmpool.SharedMemoryPool(n) as pool:
+        tshm.append(run(n, pool))
+    with shmpool.ThreadPool(n) as pool:
+        tthr.append(run(n, pool))
+    print('%3d workers  per-solve processes: %6.2fs  persistent processes: '
+          '%6.2fs  threads: %6.2fs' % (n, tdef[-1], tshm[-1], tthr[-1]))
+
+
+"""
+Plot the run times against the number of workers.
+"""
+
+plot.plot(np.stack((tdef, tshm, tthr)).T, nprocs, ptyp='semilogx',
+          xlbl='Number of workers', ylbl='Run time (s)',
+          lgnd=('Per-solve processes', 'Persistent processes', 'Threads'))
+
+
+# Wait for enter on keyboard
+input()
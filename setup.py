@@ -53,8 +53,6 @@ on_rtd = os.environ.get('READTHEDOCS') == 'True'
 if on_rtd:
     print("Building on ReadTheDocs")
     install_requires.append('ipython')
-else:
-    install_requires.append('pyfftw')
 
 tests_require = ['pytest', 'pytest-runner']
 
@@ -88,7 +86,7 @@ setup(
                  'sphinx_tabs', 'sphinx_fontawesome', 'jonga',
                  'ipython >=6.3.1', 'jupyter', 'py2jn', 'pypandoc'],
         'gpu': ['cupy', 'gputil', 'wurlitzer'],
-        'optional': ['numexpr', 'mpldatacursor']},
+        'optional': ['pyfftw', 'numexpr', 'mpldatacursor']},
     classifiers = [
     'License :: OSI Approved :: BSD License',
     'Development Status :: 4 - Beta',
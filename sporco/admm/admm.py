@@ -19,6 +19,7 @@ from sporco import cdict
 from sporco import util
 from sporco.util import u
 from sporco import common
+import sporco.linalg as sl
 
 
 __author__ = """Brendt Wohlberg <brendt@ieee.org>"""
@@ -143,6 +144,62 @@ class ADMM(common.IterativeSolver):
             ``StdResiduals`` : Flag determining whether standard residual
             definitions are used instead of normalised residuals (see
             Sec. IV.B in :cite:`wohlberg-2015-adaptive`).
+
+            ``Spectral`` : Flag determining whether the spectral penalty
+            parameter selection method of :cite:`xu-2017-adaptive` is
+            used instead of residual balancing. In this case ``Period``
+            is the number of iterations between successive curvature
+            estimates, and therefore the minimum number of iterations
+            between changes of rho (:math:`T_f` in
+            :cite:`xu-2017-adaptive`), and options ``Scaling``,
+            ``RsdlRatio``, ``RsdlTarget``, ``AutoScaling``, and
+            ``StdResiduals`` have no effect on the rho update.
+
+            ``SpectralCorr`` : Correlation threshold below which a
+            spectral curvature estimate is considered unreliable and is
+            not used (:math:`\epsilon^{\mathrm{cor}}` in
+            :cite:`xu-2017-adaptive`).
+
+            ``SpectralBound`` : Safeguard constant (:math:`C_{\mathrm{cg}}`
+            in :cite:`xu-2017-adaptive`) bounding the multiplier applied
+            to rho at iteration :math:`k` to
+            :math:`[1 / (1 + C/k^2), 1 + C/k^2]`.
+
+            ``SpectralTol`` : Relative change in rho below which rho is
+            not updated, avoiding the cost of a call of
+            :meth:`rhochange` for an insignificant change.
+
+          ``Acceleration`` : Options for acceleration of the iterations
+          by extrapolation of the working variables Y and U, which are
+          the only variables carried from one iteration to the next.
+          The acceleration state is reset at the start of each call of
+          :meth:`solve` and whenever rho is changed by the ``AutoRho``
+          mechanism. No extrapolation is applied after the final
+          iteration of a call of :meth:`solve`, so that the final Y is
+          always the result of a Y step (e.g. a projection onto a
+          constraint set).
+
+            ``Type`` : Acceleration method, one of ``None`` (no
+            acceleration), ``'Nesterov'`` (fast ADMM with restart, see
+            Alg. 8 in :cite:`goldstein-2014-fast`), or ``'Anderson'``
+            (Anderson acceleration :cite:`walker-2011-anderson` of the
+            mapping from the values of Y and U at the start of an
+            iteration to their values at the end of it, with a
+            safeguard similar to that of :cite:`zhang-2019-accelerating`).
+
+            ``Memory`` : Number of previous iterates used in the
+            computation of the Anderson acceleration extrapolation.
+
+            ``Eta`` : Restart threshold (:math:`\eta` in
+            :cite:`goldstein-2014-fast`). If the combined residual, the
+            norm of the change in Y and U over an iteration, does not
+            decrease by at least this factor, the current iterate is not
+            extrapolated and the momentum or Anderson history is reset.
+
+            ``Regularisation`` : Tikhonov regularisation parameter,
+            relative to the squared Frobenius norm of the residual
+            differences, of the least squares problem solved to obtain
+            the Anderson acceleration coefficients.
         """
 
         defaults = {'FastSolve': False, 'Verbose': False,
@@ -155,7 +212,14 @@ class ADMM(common.IterativeSolver):
                         'Enabled': False, 'Period': 10,
                         'Scaling': 2.0, 'RsdlRatio': 10.0,
                         'RsdlTarget': None, 'AutoScaling': False,
-                        'StdResiduals': False
+                        'StdResiduals': False, 'Spectral': False,
+                        'SpectralCorr': 0.2, 'SpectralBound': 1e10,
+                        'SpectralTol': 0.1
+                    },
+                    'Acceleration':
+                    {
+                        'Type': None, 'Memory': 5, 'Eta': 0.999,
+                        'Regularisation': 1e-10
                     },
                     'Y0': None, 'U0': None, 'Callback': None
                    }
@@ -252,6 +316,11 @@ class ADMM(common.IterativeSolver):
                       dtype=self.dtype)
         self.set_attr('rlx', opt['RelaxParam'], dval=1.0, dtype=self.dtype)
 
+        if opt['Acceleration', 'Type'] not in (None, 'Nesterov',
+                                               'Anderson'):
+            raise ValueError('Invalid value %s for option '
+                             'Acceleration.Type' %
+                             opt['Acceleration', 'Type'])
 
         # Initialise working variable X
         if not hasattr(self, 'X'):
@@ -270,6 +339,9 @@ class ADMM(common.IterativeSolver):
         else:
             self.U = self.opt['U0'].astype(self.dtype, copy=True)
 
+        # Initialise state of spectral rho selection method
+        self.spcstate = None
+
         self.itstat = []
         self.k = 0
 
@@ -326,11 +398,16 @@ class ADMM(common.IterativeSolver):
         # Start solve timer
         self.timer.start(['solve', 'solve_wo_func', 'solve_wo_rsdl'])
 
+        # Working variables may have been modified since the previous
+        # call, so acceleration is not continued across calls
+        self.reset_acceleration()
+
         # Main optimisation iterations
-        for self.k in range(self.k, self.k + self.opt['MaxMainIter']):
+        kend = self.k + self.opt['MaxMainIter']
+        for self.k in range(self.k, kend):
 
             # Update record of Y from previous iteration
-            self.Yprev = self.Y.copy()
+            self.update_yprev()
 
             # X update
             self.xstep()
@@ -375,6 +452,11 @@ class ADMM(common.IterativeSolver):
                 if r < epri and s < edua:
                     break
 
+            # Extrapolate Y and U if acceleration enabled, except after
+            # the final iteration
+            if self.opt['Acceleration', 'Type'] is not None and \
+               self.k < kend - 1:
+                self.accelerate()
 
         # Increment iteration count
         self.k += 1
@@ -410,6 +492,13 @@ class ADMM(common.IterativeSolver):
 
 
 
+    def update_yprev(self):
+        """Update record of Y from previous iteration."""
+
+        self.Yprev = self.Y.copy()
+
+
+
     def xstep(self):
         r"""Minimise Augmented Lagrangian with respect to :math:`\mathbf{x}`.
 
@@ -437,6 +526,108 @@ class ADMM(common.IterativeSolver):
 
 
 
+    def reset_acceleration(self):
+        """Reset the state of the acceleration method selected by option
+        ``Acceleration``.
+        """
+
+        self.acc_alpha = 1.0
+        self.acc_c = None
+        self.acc_rho = None
+        self.acc_zin = None
+        self.acc_zprv = None
+        self.acc_fprv = None
+        self.acc_dF = []
+        self.acc_dG = []
+        self.acc_FTF = np.zeros((0, 0))
+
+
+
+    def accelerate(self):
+        """Extrapolate working variables Y and U, as selected by option
+        ``Acceleration``, from their values at the end of the current
+        iteration. The extrapolated values are the starting point of the
+        next iteration.
+        """
+
+        # Working variables Y and U as a single vector
+        z = np.concatenate((self.Y.ravel(), self.U.ravel()))
+
+        # U is scaled by 1/rho, so the acceleration state is reset if
+        # rho has been changed since the previous iteration
+        if self.acc_rho is not None and np.any(self.acc_rho != self.rho):
+            self.reset_acceleration()
+        self.acc_rho = np.copy(self.rho)
+
+        if self.acc_zin is None:
+            # Not enough history to compute combined residual
+            self.acc_zin = z
+            self.acc_zprv = z
+            return
+
+        # Combined residual of current iteration
+        f = z - self.acc_zin
+        c = np.real(np.vdot(f, f))
+        eta = self.opt['Acceleration', 'Eta']
+
+        if self.acc_c is not None and c >= eta * self.acc_c:
+            # Insufficient decrease of combined residual: reset
+            # momentum and Anderson history
+            self.acc_alpha = 1.0
+            self.acc_c /= eta
+            self.acc_fprv = None
+            self.acc_dF = []
+            self.acc_dG = []
+            self.acc_FTF = np.zeros((0, 0))
+            znxt = z
+        else:
+            self.acc_c = c
+            if self.opt['Acceleration', 'Type'] == 'Nesterov':
+                alpha = (1.0 + np.sqrt(1.0 + 4.0*self.acc_alpha**2)) / 2.0
+                gamma = (self.acc_alpha - 1.0) / alpha
+                self.acc_alpha = alpha
+                znxt = z + gamma * (z - self.acc_zprv)
+            else:
+                if self.acc_fprv is not None:
+                    # Update residual differences and their Gram matrix
+                    df = f - self.acc_fprv
+                    self.acc_dF.append(df)
+                    self.acc_dG.append(z - self.acc_zprv)
+                    gcol = np.array([np.real(np.vdot(v, df))
+                                     for v in self.acc_dF])
+                    FTF = np.zeros((gcol.size, gcol.size))
+                    FTF[0:-1, 0:-1] = self.acc_FTF
+                    FTF[-1] = gcol
+                    FTF[:, -1] = gcol
+                    if len(self.acc_dF) > self.opt['Acceleration', 'Memory']:
+                        self.acc_dF.pop(0)
+                        self.acc_dG.pop(0)
+                        FTF = FTF[1:, 1:]
+                    self.acc_FTF = FTF
+                self.acc_fprv = f
+                znxt = z
+                if self.acc_dF:
+                    FTF = self.acc_FTF + \
+                        self.opt['Acceleration', 'Regularisation'] * \
+                        np.trace(self.acc_FTF) * np.identity(len(self.acc_dF))
+                    FTf = np.array([np.real(np.vdot(v, f))
+                                    for v in self.acc_dF])
+                    try:
+                        gamma = np.linalg.solve(FTF, FTf)
+                    except np.linalg.LinAlgError:
+                        gamma = None
+                    if gamma is not None and np.all(np.isfinite(gamma)):
+                        znxt = z.copy()
+                        for gm, dg in zip(gamma, self.acc_dG):
+                            znxt -= self.dtype.type(gm) * dg
+
+        self.acc_zprv = z
+        self.acc_zin = znxt
+        self.Y[:] = np.reshape(znxt[0:self.Y.size], self.Y.shape)
+        self.U[:] = np.reshape(znxt[self.Y.size:], self.U.shape)
+
+
+
     def relax_AX(self):
         """Implement relaxation if option ``RelaxParam`` != 1.0."""
 
@@ -462,8 +653,8 @@ class ADMM(common.IterativeSolver):
         """Compute residuals and stopping thresholds."""
 
         if self.opt['AutoRho', 'StdResiduals']:
-            r = np.linalg.norm(self.rsdl_r(self.AXnr, self.Y))
-            s = np.linalg.norm(self.rsdl_s(self.Yprev, self.Y))
+            r = sl.l2norm(self.rsdl_r(self.AXnr, self.Y))
+            s = sl.l2norm(self.rsdl_s(self.Yprev, self.Y))
             epri = np.sqrt(self.Nc) * self.opt['AbsStopTol'] + \
                 self.rsdl_rn(self.AXnr, self.Y) * self.opt['RelStopTol']
             edua = np.sqrt(self.Nx) * self.opt['AbsStopTol'] + \
@@ -475,8 +666,8 @@ class ADMM(common.IterativeSolver):
             sn = self.rsdl_sn(self.U)
             if sn == 0.0:
                 sn = 1.0
-            r = np.linalg.norm(self.rsdl_r(self.AXnr, self.Y)) / rn
-            s = np.linalg.norm(self.rsdl_s(self.Yprev, self.Y)) / sn
+            r = sl.l2norm(self.rsdl_r(self.AXnr, self.Y)) / rn
+            s = sl.l2norm(self.rsdl_s(self.Yprev, self.Y)) / sn
             epri = np.sqrt(self.Nc) * self.opt['AbsStopTol'] / rn + \
                 self.opt['RelStopTol']
             edua = np.sqrt(self.Nx) * self.opt['AbsStopTol'] / sn + \
@@ -548,7 +739,13 @@ class ADMM(common.IterativeSolver):
     def update_rho(self, k, r, s):
         """Automatic rho adjustment."""
 
-        if self.opt['AutoRho', 'Enabled']:
+        if self.opt['AutoRho', 'Enabled'] and self.opt['AutoRho', 'Spectral']:
+            rsf = self.spectral_rho_factor(k)
+            if rsf != 1.0:
+                self.rho *= self.dtype.type(rsf)
+                self.U /= rsf
+                self.rhochange()
+        elif self.opt['AutoRho', 'Enabled']:
             tau = self.rho_tau
             mu = self.rho_mu
             xi = self.rho_xi
@@ -575,6 +772,64 @@ class ADMM(common.IterativeSolver):
 
 
 
+    def spectral_rho_factor(self, k):
+        r"""Compute the multiplier for rho selected by the spectral
+        penalty parameter selection method of :cite:`xu-2017-adaptive`.
+        The dual variables in the notation of :cite:`xu-2017-adaptive`
+        are the negatives of the unscaled dual variables :math:`\rho
+        \mathbf{u}` of the scaled ADMM form used here. The constraint
+        terms :math:`B \mathbf{y}` are only required as differences, which
+        are computed as differences of primal residuals so that
+        :meth:`cnst_B` and :meth:`cnst_c` are not required. The state
+        required for the next estimate is recorded on the first call
+        after initialisation (or after the recorded state has been
+        discarded), and on each call at which rho is updated.
+        """
+
+        # Avoid any computation on iterations at which rho is not
+        # updated and no state needs to be recorded
+        update = k > 0 and np.mod(k + 1, self.opt['AutoRho', 'Period']) == 0
+        if self.spcstate is not None and not update:
+            return 1.0
+
+        # Unscaled dual variable and intermediate dual variable
+        # corresponding to the X step of the current iteration
+        lmbda = -self.rho * self.U
+        lmbdah = -self.rho * (self.U - self.rsdl_r(self.AX, self.Y) +
+                              self.rsdl_r(self.AXnr, self.Yprev))
+        AX = self.AXnr.copy()
+        Y = self.Y.copy()
+
+        if self.spcstate is None:
+            self.spcstate = (AX, Y, lmbda, lmbdah)
+            return 1.0
+
+        AX0, Y0, lmbda0, lmbdah0 = self.spcstate
+        self.spcstate = (AX, Y, lmbda, lmbdah)
+        # Curvature estimates for the f and g components of the
+        # objective function
+        ah, acor = _spectral_stepsize(AX - AX0, lmbdah - lmbdah0)
+        bh, bcor = _spectral_stepsize(self.rsdl_r(AX, Y) -
+                                      self.rsdl_r(AX, Y0), lmbda - lmbda0)
+        eps = self.opt['AutoRho', 'SpectralCorr']
+        if acor > eps and bcor > eps:
+            rhon = np.sqrt(ah * bh)
+        elif acor > eps:
+            rhon = ah
+        elif bcor > eps:
+            rhon = bh
+        else:
+            return 1.0
+
+        # Safeguarded multiplier
+        bnd = 1.0 + self.opt['AutoRho', 'SpectralBound'] / (k + 1)**2
+        rsf = min(max(float(rhon / self.rho), 1.0 / bnd), bnd)
+        if abs(rsf - 1.0) < self.opt['AutoRho', 'SpectralTol']:
+            rsf = 1.0
+        return rsf
+
+
+
     def display_start(self):
         """Set up status display if option selected. NB: this method
         assumes that the first entry is the iteration count and the last
@@ -757,8 +1012,8 @@ class ADMM(common.IterativeSolver):
         # Avoid computing the norm of the value returned by cnst_c()
         # more than once
         if not hasattr(self, '_nrm_cnst_c'):
-            self._nrm_cnst_c = np.linalg.norm(self.cnst_c())
-        return max((np.linalg.norm(AX), np.linalg.norm(self.cnst_B(Y)),
+            self._nrm_cnst_c = sl.l2norm(self.cnst_c())
+        return max((sl.l2norm(AX), sl.l2norm(self.cnst_B(Y)),
                     self._nrm_cnst_c))
 
 
@@ -771,7 +1026,7 @@ class ADMM(common.IterativeSolver):
         overridden.
         """
 
-        return self.rho * np.linalg.norm(self.cnst_AT(U))
+        return self.rho * sl.l2norm(self.cnst_AT(U))
 
 
 
@@ -972,14 +1227,14 @@ class ADMMEqual(ADMM):
     def rsdl_rn(self, AX, Y):
         """Compute primal residual normalisation term."""
 
-        return max((np.linalg.norm(AX), np.linalg.norm(Y)))
+        return max((sl.l2norm(AX), sl.l2norm(Y)))
 
 
 
     def rsdl_sn(self, U):
         """Compute dual residual normalisation term."""
 
-        return self.rho * np.linalg.norm(U)
+        return self.rho * sl.l2norm(U)
 
 
 
@@ -1420,9 +1675,9 @@ class ADMMTwoBlockCnstrnt(ADMM):
         """
 
         if not hasattr(self, '_cnst_nrm_c'):
-            self._cnst_nrm_c = np.sqrt(np.linalg.norm(self.cnst_c0())**2 +
-                                       np.linalg.norm(self.cnst_c1())**2)
-        return max((np.linalg.norm(AX), np.linalg.norm(Y), self._cnst_nrm_c))
+            self._cnst_nrm_c = np.sqrt(sl.l2norm(self.cnst_c0())**2 +
+                                       sl.l2norm(self.cnst_c1())**2)
+        return max((sl.l2norm(AX), sl.l2norm(Y), self._cnst_nrm_c))
 
 
 
@@ -1434,7 +1689,7 @@ class ADMMTwoBlockCnstrnt(ADMM):
         overridden.
         """
 
-        return self.rho * np.linalg.norm(self.cnst_AT(U))
+        return self.rho * sl.l2norm(self.cnst_AT(U))
 
 
 
@@ -1693,11 +1948,32 @@ class ADMMConsensus(ADMM):
         # max( ||A x^(k)||_2, ||B y^(k)||_2 ) and B = -(I I I ...)^T.
         # The scaling by sqrt(Nb) of the l2 norm of Y accounts for the
         # block replication introduced by multiplication by B
-        return max((np.linalg.norm(AX), np.sqrt(self.Nb) * np.linalg.norm(Y)))
+        return max((sl.l2norm(AX), np.sqrt(self.Nb) * sl.l2norm(Y)))
 
 
 
     def rsdl_sn(self, U):
         """Compute dual residual normalisation term."""
 
-        return self.rho * np.linalg.norm(U)
+        return self.rho * sl.l2norm(U)
+
+
+
+
+def _spectral_stepsize(dH, dl):
+    """Compute the hybrid steepest descent/minimum gradient spectral
+    stepsize estimate, and the corresponding correlation, used by the
+    spectral penalty parameter selection method of
+    :cite:`xu-2017-adaptive`. The estimate is ``None`` if it is not
+    defined, in which case the correlation is zero.
+    """
+
+    hl = np.real(np.vdot(dH, dl))
+    hh = np.real(np.vdot(dH, dH))
+    ll = np.real(np.vdot(dl, dl))
+    if hl <= 0.0 or hh == 0.0 or ll == 0.0:
+        return None, 0.0
+    sd = ll / hl
+    mg = hl / hh
+    est = mg if 2.0 * mg > sd else sd - mg / 2.0
+    return est, hl / np.sqrt(hh * ll)
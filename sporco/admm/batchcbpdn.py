@@ -0,0 +1,559 @@
+# -*- coding: utf-8 -*-
+# Copyright (C) 2019 by Brendt Wohlberg <brendt@ieee.org>
+# All rights reserved. BSD 3-clause License.
+# This file is part of the SPORCO package. Details of the copyright
+# and user license can be found in the 'LICENSE.txt' file distributed
+# with the package.
+
+"""Batched ADMM algorithm for multiple independent Convolutional BPDN
+problems"""
+
+from __future__ import division
+from __future__ import absolute_import
+from __future__ import print_function
+from builtins import range
+
+import copy
+import numpy as np
+
+from sporco.admm import admm
+import sporco.cnvrep as cr
+import sporco.linalg as sl
+import sporco.prox as sp
+from sporco.util import u
+
+
+__author__ = """Brendt Wohlberg <brendt@ieee.org>"""
+
+
+__all__ = ['BatchConvBPDN']
+
+
+
+class BatchConvBPDN(admm.ADMMEqual):
+    r"""
+    ADMM algorithm for solving a batch of independent Convolutional
+    BPDN problems with a common dictionary in a single vectorised
+    iteration loop.
+
+    |
+
+    .. inheritance-diagram:: BatchConvBPDN
+       :parts: 2
+
+    |
+
+    Solve the set of independent optimisation problems
+
+    .. math::
+       \mathrm{argmin}_{\mathbf{x}_p} \;
+       (1/2) \left\| \sum_m \mathbf{d}_m * \mathbf{x}_{p,m} -
+       \mathbf{s}_p \right\|_2^2 + \lambda_p \sum_m
+       \| \mathbf{x}_{p,m} \|_1 \quad p = 0, 1, \ldots, P-1
+
+    for input images :math:`\mathbf{s}_p`, dictionary filters
+    :math:`\mathbf{d}_m`, and coefficient maps :math:`\mathbf{x}_{p,m}`.
+    The problems are stacked on the multiple signal index axis of the
+    standard layout constructed by :class:`.cnvrep.CSC_ConvRepIndexing`,
+    and are solved by the same ADMM iterations as
+    :class:`.admm.cbpdn.ConvBPDN`, except that each problem has its
+    own regularisation parameter :math:`\lambda_p`, penalty parameter
+    :math:`\rho_p` (with independent ``AutoRho`` adaptation), and
+    residual-based convergence test. When a problem satisfies its
+    stopping criterion it is removed from the active set, and the
+    working variables of the remaining problems are compacted so
+    that subsequent iterations only involve the active problems. The
+    per-iteration Python overhead of the ADMM algorithm is therefore
+    shared across the batch, which is considerably more efficient than
+    constructing and solving a separate :class:`.admm.cbpdn.ConvBPDN`
+    object for each of a large number of small problems.
+
+    Only single-channel dictionaries are supported, since the X step
+    is solved via the Sherman-Morrison formula with a separate
+    penalty parameter for each problem. Multi-channel signals with
+    a single-channel dictionary are supported, the channels being
+    treated as in :class:`.admm.cbpdn.ConvBPDN`.
+
+    While :meth:`solve` is running, the working variables `X`, `Y`,
+    and `U`, and the per-problem parameter arrays `lmbda`, `rho`,
+    and `rho_xi`, only contain entries for the problems in the active
+    set (i.e. they are indexed by :attr:`idx`). The full batch arrays
+    are restored on termination of :meth:`solve`.
+
+    After termination of the :meth:`solve` method, attribute
+    :attr:`itstat` is a list of tuples representing statistics of each
+    iteration, and attribute :attr:`niter` is an array containing the
+    number of iterations performed for each problem. The fields of the
+    named tuple ``IterationStats`` are:
+
+       ``Iter`` : Iteration number
+
+       ``ObjFun`` : Sum over the batch of the objective function values
+
+       ``DFid`` : Sum over the batch of the data fidelity term values
+
+       ``RegL1`` : Sum over the batch of the regularisation term values
+
+       ``PrimalRsdl`` : Maximum over the active problems of the norm
+       of the primal residual
+
+       ``DualRsdl`` : Maximum over the active problems of the norm of
+       the dual residual
+
+       ``EpsPrimal`` : Minimum over the active problems of the primal
+       residual stopping tolerance :math:`\epsilon_{\mathrm{pri}}`
+
+       ``EpsDual`` : Minimum over the active problems of the dual
+       residual stopping tolerance :math:`\epsilon_{\mathrm{dua}}`
+
+       ``Rho`` : Mean over the active problems of the penalty parameter
+
+       ``NumActive`` : Number of problems in the active set at the
+       start of the iteration
+
+       ``Time`` : Cumulative run time
+    """
+
+
+    class Options(admm.ADMMEqual.Options):
+        r"""BatchConvBPDN algorithm options
+
+        Options include all of those defined in
+        :class:`.admm.ADMMEqual.Options`, with the defaults of options
+        ``fEvalX``, ``gEvalY``, ``ReturnX``, ``RelaxParam``, and
+        ``AutoRho`` matching those of :class:`.admm.cbpdn.ConvBPDN`.
+        Option ``rho`` may be a scalar or an array with an entry for
+        each problem in the batch, and options ``Y0`` and ``U0``, if
+        specified, should have the shape of the full batch of
+        coefficient maps.
+        """
+
+        defaults = copy.deepcopy(admm.ADMMEqual.Options.defaults)
+        defaults.update({'fEvalX': True, 'gEvalY': False,
+                         'ReturnX': False, 'RelaxParam': 1.8})
+        defaults['AutoRho'].update({'Enabled': True, 'Period': 1,
+                                    'AutoScaling': True, 'Scaling': 1000.0,
+                                    'RsdlRatio': 1.2})
+
+
+        def __init__(self, opt=None):
+            """
+            Parameters
+            ----------
+            opt : dict or None, optional (default None)
+              BatchConvBPDN algorithm options
+            """
+
+            if opt is None:
+                opt = {}
+            admm.ADMMEqual.Options.__init__(self, opt)
+
+
+
+    itstat_fields_objfn = ('ObjFun', 'DFid', 'RegL1')
+    itstat_fields_extra = ('NumActive',)
+    hdrtxt_objfn = ('Fnc', 'DFid', u('Regℓ1'))
+    hdrval_objfun = {'Fnc': 'ObjFun', 'DFid': 'DFid', u('Regℓ1'): 'RegL1'}
+
+
+
+    def __init__(self, D, S, lmbda=None, opt=None, dimN=2):
+        """
+        The input dictionary `D` is `dimN` + 1 dimensional, and the
+        input signal array `S` is either `dimN` + 1 dimensional (single
+        channel signals) or `dimN` + 2 dimensional (multi-channel
+        signals), with the final axis indexing the problems in the
+        batch.
+
+        Parameters
+        ----------
+        D : array_like
+          Dictionary array
+        S : array_like
+          Signal array with the batch index on the final axis
+        lmbda : float or array_like or None, optional (default None)
+          Regularisation parameter, either a scalar that is common to
+          all problems, or an array with an entry for each problem. If
+          ``None``, a default value is computed for each problem as
+          for :class:`.admm.cbpdn.ConvBPDN`.
+        opt : :class:`BatchConvBPDN.Options` object
+          Algorithm options
+        dimN : int, optional (default 2)
+          Number of spatial/temporal dimensions
+        """
+
+        if opt is None:
+            opt = BatchConvBPDN.Options()
+
+        if S.ndim < dimN + 1:
+            raise ValueError('Signal array S must have a batch axis '
+                             'following the spatial axes')
+        self.cri = cr.CSC_ConvRepIndexing(D, S, dimK=1, dimN=dimN)
+        if self.cri.Cd > 1:
+            raise ValueError('BatchConvBPDN does not support multi-channel '
+                             'dictionaries')
+
+        # Call parent class __init__
+        super(BatchConvBPDN, self).__init__(self.cri.shpX, S.dtype, opt)
+
+        # Reshape D and S to standard layout
+        self.D = np.asarray(D.reshape(self.cri.shpD), dtype=self.dtype)
+        self.S = np.asarray(S.reshape(self.cri.shpS), dtype=self.dtype)
+
+        # Shape of per-problem parameter arrays and axes over which
+        # per-problem reductions are computed
+        self.P = self.cri.K
+        self.bshape = (1,) * self.cri.axisK + (self.P, 1)
+        self.rdax = tuple(i for i in range(self.cri.dimN + 3)
+                          if i != self.cri.axisK)
+        # Number of entries in the coefficient maps of each problem
+        self.Nxp = self.Nx // self.P
+
+        # Compute dictionary and signal in DFT domain
+        self.Df = sl.rfftn(self.D, self.cri.Nv, self.cri.axisN)
+        self.DDf = np.sum(np.abs(self.Df)**2, axis=self.cri.axisM,
+                          keepdims=True).astype(self.dtype)
+        self.Sf = sl.rfftn(self.S, None, self.cri.axisN)
+        self.DSf = np.conj(self.Df) * self.Sf
+
+        # Set per-problem l1 term scaling, with default values computed
+        # as for ConvBPDN
+        if lmbda is None:
+            lmbda = 0.1 * np.amax(np.abs(self.DSf), axis=self.rdax)
+        self.lmbda = self.batch_param(lmbda)
+
+        # Set per-problem penalty parameter
+        if opt['rho'] is None:
+            self.rho = 50.0 * self.lmbda + self.dtype.type(1.0)
+        else:
+            self.rho = self.batch_param(opt['rho'])
+
+        # Set per-problem rho_xi (see Sec. VI.C of wohlberg-2015-adaptive)
+        if opt['AutoRho', 'RsdlTarget'] is None:
+            with np.errstate(divide='ignore'):
+                rho_xi = 1.0 + 18.3**(np.log10(self.lmbda) + 1.0)
+            self.rho_xi = np.where(self.lmbda != 0.0, rho_xi,
+                                   1.0).astype(self.dtype)
+        else:
+            self.rho_xi = self.batch_param(opt['AutoRho', 'RsdlTarget'])
+
+        # Initialise working variable X
+        self.X = np.zeros(self.cri.shpX, dtype=self.dtype)
+
+        # Initialise active set and per-problem iteration counts and
+        # objective function components
+        self.active = np.ones(self.P, dtype=bool)
+        self.idx = np.arange(self.P)
+        self.niter = np.zeros(self.P, dtype=int)
+        self.dfd = np.zeros(self.P)
+        self.rl1 = np.zeros(self.P)
+        self.reg = np.zeros(self.P)
+
+
+
+    def batch_param(self, val):
+        """Construct an array of per-problem parameter values from a
+        scalar or an array with an entry for each problem in the batch.
+
+        Parameters
+        ----------
+        val : float or array_like
+          Parameter value(s)
+
+        Returns
+        -------
+        prm : ndarray
+          Parameter array with shape broadcastable against the
+          coefficient map array
+        """
+
+        val = np.asarray(val, dtype=self.dtype)
+        return np.broadcast_to(val.ravel(), (self.P,)).reshape(
+            self.bshape).copy()
+
+
+
+    def batch_vars(self):
+        """Get the names of the attributes with an entry for each
+        problem in the batch on the multiple signal index axis, which
+        are compacted as problems are removed from the active set.
+        """
+
+        return ('X', 'Y', 'U', 'Sf', 'DSf', 'lmbda', 'rho', 'rho_xi')
+
+
+
+    def compact(self, keep):
+        """Remove problems from the arrays representing the active set.
+
+        Parameters
+        ----------
+        keep : ndarray of bools
+          Mask, with an entry for each currently active problem,
+          indicating which problems remain active
+        """
+
+        for name in self.batch_vars():
+            setattr(self, name, np.compress(keep, getattr(self, name),
+                                            axis=self.cri.axisK))
+        self.idx = self.idx[keep]
+
+
+
+    def store(self, full, sel):
+        """Copy the state of selected active problems into the full
+        batch arrays.
+
+        Parameters
+        ----------
+        full : dict
+          Dict mapping the names in :meth:`batch_vars` to the full
+          batch arrays
+        sel : ndarray of bools
+          Mask, with an entry for each currently active problem,
+          indicating which problems should be copied
+        """
+
+        kidx = (slice(None),) * self.cri.axisK + (self.idx[sel],)
+        for name in self.batch_vars():
+            full[name][kidx] = np.compress(sel, getattr(self, name),
+                                           axis=self.cri.axisK)
+
+
+
+    def solve(self):
+        """Start (or re-start) optimisation of the problems that have
+        not yet converged. The structure of the iterations is the same
+        as in :meth:`.admm.ADMM.solve`, except that the stopping test
+        is applied independently to each problem, and problems that
+        satisfy it are removed from the active set.
+        """
+
+        # Open status display
+        fmtstr, nsep = self.display_start()
+
+        # Start solve timer
+        self.timer.start(['solve', 'solve_wo_func', 'solve_wo_rsdl'])
+
+        # Record full batch arrays and restrict working variables to
+        # the active problems
+        full = {name: getattr(self, name) for name in self.batch_vars()}
+        self.idx = np.flatnonzero(self.active)
+        if self.idx.size < self.P:
+            self.compact(self.active)
+            self.idx = np.flatnonzero(self.active)
+
+        rsdl = self.opt['AutoRho', 'Enabled'] or not self.opt['FastSolve']
+
+        # Main optimisation iterations
+        for self.k in range(self.k, self.k + self.opt['MaxMainIter']):
+
+            # Terminate when all problems have converged
+            if self.idx.size == 0:
+                break
+            self.niter[self.idx] += 1
+
+            # Update record of Y from previous iteration
+            self.update_yprev()
+
+            # X update
+            self.xstep()
+
+            # Implement relaxation if RelaxParam != 1.0
+            self.relax_AX()
+
+            # Y update
+            self.ystep()
+
+            # U update
+            self.ustep()
+
+            # Compute residuals and stopping thresholds
+            self.timer.stop('solve_wo_rsdl')
+            if rsdl:
+                r, s, epri, edua = self.compute_residuals()
+            self.timer.start('solve_wo_rsdl')
+
+            # Compute and record other iteration statistics and
+            # display iteration stats if Verbose option enabled
+            self.timer.stop(['solve_wo_func', 'solve_wo_rsdl'])
+            if not self.opt['FastSolve']:
+                itst = self.iteration_stats(self.k, r, s, epri, edua)
+                self.itstat.append(itst)
+                self.display_status(fmtstr, itst)
+            self.timer.start(['solve_wo_func', 'solve_wo_rsdl'])
+
+            # Automatic rho adjustment
+            self.timer.stop('solve_wo_rsdl')
+            if rsdl:
+                self.update_rho(self.k, r, s)
+            self.timer.start('solve_wo_rsdl')
+
+            # Call callback function if defined
+            if self.opt['Callback'] is not None:
+                if self.opt['Callback'](self):
+                    break
+
+            # Remove problems satisfying the residual-based stopping
+            # tolerances from the active set
+            if rsdl:
+                cvg = np.logical_and(r < epri, s < edua)
+                if np.any(cvg):
+                    self.store(full, cvg)
+                    self.active[self.idx[cvg]] = False
+                    self.compact(~cvg)
+
+        # Increment iteration count
+        self.k += 1
+
+        # Restore full batch arrays
+        self.store(full, np.ones(self.idx.shape, dtype=bool))
+        for name in self.batch_vars():
+            setattr(self, name, full[name])
+        self.Yprev = self.Y.copy()
+
+        # Record solve time
+        self.timer.stop(['solve', 'solve_wo_func', 'solve_wo_rsdl'])
+
+        # Print final separator string if Verbose option enabled
+        self.display_end(nsep)
+
+        return self.getmin()
+
+
+
+    def xstep(self):
+        r"""Minimise Augmented Lagrangian with respect to
+        :math:`\mathbf{x}`, via the Sherman-Morrison formula with a
+        separate penalty parameter for each problem."""
+
+        b = self.DSf + self.rho * sl.rfftn(self.Y - self.U, None,
+                                           self.cri.axisN)
+        c = sl.inner(self.Df, b, axis=self.cri.axisM) / (self.DDf + self.rho)
+        Xf = (b - np.conj(self.Df) * c) / self.rho
+        self.X = sl.irfftn(Xf, self.cri.Nv, self.cri.axisN)
+
+
+
+    def ystep(self):
+        r"""Minimise Augmented Lagrangian with respect to
+        :math:`\mathbf{y}`."""
+
+        self.Y = sp.prox_l1(self.AX + self.U, self.lmbda / self.rho)
+
+
+
+    def update_yprev(self):
+        """Update record of Y from previous iteration. No copy is
+        required since :meth:`ystep` constructs a new array.
+        """
+
+        self.Yprev = self.Y
+
+
+
+    def pnorm(self, x):
+        r"""Compute the :math:`\ell_2` norm of each problem's entries in
+        array `x`, with accumulation in double precision.
+
+        Parameters
+        ----------
+        x : ndarray
+          Array with the active problems on the multiple signal index
+          axis
+
+        Returns
+        -------
+        nrm : ndarray
+          Array of norms, with an entry for each active problem
+        """
+
+        return np.sqrt(np.sum(np.abs(x)**2, axis=self.rdax,
+                              dtype=np.float64))
+
+
+
+    def compute_residuals(self):
+        """Compute residuals and stopping thresholds for each active
+        problem."""
+
+        rho = self.rho.ravel()
+        r = self.pnorm(self.rsdl_r(self.AXnr, self.Y))
+        s = rho * self.pnorm(self.Yprev - self.Y)
+        rn = np.maximum(self.pnorm(self.AXnr), self.pnorm(self.Y))
+        sn = rho * self.pnorm(self.U)
+        if self.opt['AutoRho', 'StdResiduals']:
+            epri = np.sqrt(self.Nxp) * self.opt['AbsStopTol'] + \
+                rn * self.opt['RelStopTol']
+            edua = np.sqrt(self.Nxp) * self.opt['AbsStopTol'] + \
+                sn * self.opt['RelStopTol']
+        else:
+            rn[rn == 0.0] = 1.0
+            sn[sn == 0.0] = 1.0
+            r /= rn
+            s /= sn
+            epri = np.sqrt(self.Nxp) * self.opt['AbsStopTol'] / rn + \
+                self.opt['RelStopTol']
+            edua = np.sqrt(self.Nxp) * self.opt['AbsStopTol'] / sn + \
+                self.opt['RelStopTol']
+
+        return r, s, epri, edua
+
+
+
+    def update_rho(self, k, r, s):
+        """Automatic rho adjustment, applied independently to each
+        active problem."""
+
+        if self.opt['AutoRho', 'Enabled']:
+            tau = self.rho_tau
+            mu = self.rho_mu
+            xi = self.rho_xi.ravel()
+            if k != 0 and np.mod(k + 1, self.opt['AutoRho', 'Period']) == 0:
+                if self.opt['AutoRho', 'AutoScaling']:
+                    with np.errstate(divide='ignore', invalid='ignore'):
+                        rhomlt = np.sqrt(np.where(r > s * xi, r / (s * xi),
+                                                  (s * xi) / r))
+                    rhomlt = np.where(np.logical_or(s == 0.0, r == 0.0),
+                                      tau, np.minimum(rhomlt, tau))
+                else:
+                    rhomlt = np.full(r.shape, tau)
+                rsf = np.where(r > xi * mu * s, rhomlt,
+                               np.where(s > (mu / xi) * r, 1.0 / rhomlt,
+                                        1.0))
+                rsf = rsf.astype(self.dtype).reshape(self.rho.shape)
+                self.rho *= rsf
+                self.U /= rsf
+
+
+
+    def iteration_stats(self, k, r, s, epri, edua):
+        """Construct iteration stats record tuple, with residual
+        statistics aggregated over the active problems."""
+
+        tk = self.timer.elapsed(self.opt['IterTimer'])
+        tpl = (k,) + self.eval_objfn() + \
+            (np.amax(r), np.amax(s), np.amin(epri), np.amin(edua),
+             np.mean(self.rho), self.idx.size) + (tk,)
+        return type(self).IterationStats(*tpl)
+
+
+
+    def eval_objfn(self):
+        """Compute components of the objective function, summed over
+        all problems in the batch. The values for problems that are
+        no longer active are those at the iteration at which they
+        were removed from the active set.
+        """
+
+        Xf = sl.rfftn(self.obfn_fvar(), None, self.cri.axisN)
+        Ef = sl.inner(self.Df, Xf, axis=self.cri.axisM) - self.Sf
+        E = sl.irfftn(Ef, self.cri.Nv, self.cri.axisN)
+        self.dfd[self.idx] = 0.5 * self.pnorm(E)**2
+        self.rl1[self.idx] = np.sum(np.abs(self.obfn_gvar()),
+                                    axis=self.rdax, dtype=np.float64)
+        self.reg[self.idx] = self.lmbda.ravel() * self.rl1[self.idx]
+        dfd = np.sum(self.dfd)
+        rl1 = np.sum(self.rl1)
+        obj = dfd + np.sum(self.reg)
+        return (obj, dfd, rl1)
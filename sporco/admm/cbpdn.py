@@ -113,6 +113,27 @@ class GenericConvBPDN(admm.ADMMEqual):
           ``NoBndryCross`` : Flag indicating whether all solution
           coefficients corresponding to filters crossing the image
           boundary should be forced to zero.
+
+          ``MemMap`` : Options for storing the working variables with
+          the same size as the coefficient maps in memory-mapped
+          temporary files (see :func:`.linalg.memmap_zeros`), with the
+          iterations computed in chunks of the independent signals,
+          so that problems with a very large number of signals may be
+          solved with bounded memory use. This option is not
+          supported by derived classes that override the :meth:`xstep`
+          method, or in combination with option ``Acceleration``,
+          the extrapolation of which requires in-memory copies of
+          the working variables.
+
+            ``Enabled`` : Flag determining whether memory-mapped
+            working variables are used.
+
+            ``Dir`` : Directory in which the temporary files are
+            created (if ``None``, the default temporary directory is
+            used).
+
+            ``ChunkSize`` : Number of signals (index :math:`k`)
+            processed in each chunk.
         """
 
         defaults = copy.deepcopy(admm.ADMMEqual.Options.defaults)
@@ -127,7 +148,9 @@ class GenericConvBPDN(admm.ADMMEqual):
                          'gEvalY': False, 'ReturnX': False,
                          'HighMemSolve': False, 'LinSolveCheck': False,
                          'RelaxParam': 1.8, 'NonNegCoef': False,
-                         'NoBndryCross': False})
+                         'NoBndryCross': False,
+                         'MemMap': {'Enabled': False, 'Dir': None,
+                                    'ChunkSize': 1}})
         defaults['AutoRho'].update({'Enabled': True, 'Period': 1,
                                     'AutoScaling': True, 'Scaling': 1000.0,
                                     'RsdlRatio': 1.2})
@@ -217,16 +240,87 @@ class GenericConvBPDN(admm.ADMMEqual):
         self.D = np.asarray(D.reshape(self.cri.shpD), dtype=self.dtype)
         self.S = np.asarray(S.reshape(self.cri.shpS), dtype=self.dtype)
 
-        # Compute signal in DFT domain
-        self.Sf = sl.rfftn(self.S, None, self.cri.axisN)
+        if self.opt['MemMap', 'Enabled']:
+            self.memmap_init()
+        else:
+            # Compute signal in DFT domain
+            self.Sf = sl.rfftn(self.S, None, self.cri.axisN)
 
-        # Initialise byte-aligned arrays for pyfftw
-        self.YU = sl.pyfftw_empty_aligned(self.Y.shape, dtype=self.dtype)
-        self.Xf = sl.pyfftw_rfftn_empty_aligned(self.Y.shape, self.cri.axisN,
-                                                self.dtype)
+            # Initialise byte-aligned arrays for pyfftw
+            self.Xf = sl.pyfftw_rfftn_empty_aligned(self.Y.shape,
+                                                    self.cri.axisN,
+                                                    self.dtype)
+
+            # Construct DFT plan for repeated transforms of arrays of the
+            # same shape as X
+            self.dftp = sl.RFFTPlan(self.cri.shpX, self.cri.axisN,
+                                    self.dtype)
 
         self.setdict()
 
+        # Record initial penalty parameter value for use by reset
+        self.rho0 = self.rho
+
+
+
+    def memmap_init(self):
+        """Allocate the working variables with the same size as the
+        coefficient maps as memory-mapped arrays (see option
+        ``MemMap``).
+        """
+
+        if type(self).xstep is not GenericConvBPDN.xstep:
+            raise ValueError('Option MemMap is not supported by class %s' %
+                             type(self).__name__)
+        if self.opt['Acceleration', 'Type'] is not None:
+            raise ValueError('Option MemMap is not supported in combination '
+                             'with option Acceleration')
+
+        for name in ('Y', 'Yprev', 'U'):
+            var = self.mmzeros(self.cri.shpX)
+            var[:] = getattr(self, name)
+            setattr(self, name, var)
+        self.X = self.mmzeros(self.cri.shpX)
+
+        cdtype = sl.complex_dtype(self.dtype)
+        ax = self.cri.axisN[-1]
+        shpXf = self.cri.shpX[0:ax] + (self.cri.shpX[ax] // 2 + 1,) + \
+            self.cri.shpX[ax+1:]
+        self.Xf = self.mmzeros(shpXf, cdtype)
+        self.DSf = self.mmzeros(shpXf, cdtype)
+        shpSf = shpXf[0:self.cri.axisC] + self.cri.shpS[self.cri.axisC:]
+        self.Sf = self.mmzeros(shpSf, cdtype)
+        for slc in self.chunks():
+            self.Sf[slc] = sl.rfftn(self.S[slc], None, self.cri.axisN)
+
+
+
+    def mmzeros(self, shape, dtype=None):
+        """Construct a zero-initialised memory-mapped array in the
+        directory specified by option ``MemMap``.
+        """
+
+        if dtype is None:
+            dtype = self.dtype
+        return sl.memmap_zeros(shape, dtype, self.opt['MemMap', 'Dir'])
+
+
+
+    def chunks(self):
+        """Construct a list of index tuples selecting chunks of the
+        working variables on the axis indexing the independent signals.
+        If option ``MemMap`` is not enabled, the list has a single
+        entry selecting the full arrays.
+        """
+
+        K = self.cri.K
+        if self.opt['MemMap', 'Enabled']:
+            csz = max(1, self.opt['MemMap', 'ChunkSize'])
+        else:
+            csz = K
+        return [(slice(None),) * self.cri.axisK + (slice(k, min(k + csz, K)),)
+                for k in range(0, K, csz)]
+
 
 
     def setdict(self, D=None):
@@ -235,15 +329,125 @@ class GenericConvBPDN(admm.ADMMEqual):
         if D is not None:
             self.D = np.asarray(D, dtype=self.dtype)
         self.Df = sl.rfftn(self.D, self.cri.Nv, self.cri.axisN)
-        # Compute D^H S
-        self.DSf = np.conj(self.Df) * self.Sf
-        if self.cri.Cd > 1:
-            self.DSf = np.sum(self.DSf, axis=self.cri.axisC, keepdims=True)
-        if self.opt['HighMemSolve'] and self.cri.Cd == 1:
-            self.c = sl.solvedbi_sm_c(self.Df, np.conj(self.Df), self.rho,
-                                      self.cri.axisM)
+        self.setdsf()
+        if self.cri.Cd == 1:
+            self.xslv = sl.SMSolver(self.Df, self.rho, self.cri.axisM,
+                                    cache=self.opt['HighMemSolve'])
         else:
-            self.c = None
+            self.xslv = sl.MDBISolver(self.Df, self.rho, self.cri.axisM,
+                                      self.cri.axisC)
+
+
+
+    def setdsf(self):
+        """Compute :math:`D^H S` in the DFT domain from the current
+        dictionary and signal."""
+
+        if self.opt['MemMap', 'Enabled']:
+            for slc in self.chunks():
+                DSf = np.conj(self.Df) * self.Sf[slc]
+                if self.cri.Cd > 1:
+                    DSf = np.sum(DSf, axis=self.cri.axisC, keepdims=True)
+                self.DSf[slc] = DSf
+        else:
+            self.DSf = np.conj(self.Df) * self.Sf
+            if self.cri.Cd > 1:
+                self.DSf = np.sum(self.DSf, axis=self.cri.axisC,
+                                  keepdims=True)
+
+
+
+    def setsignal(self, S, warmstart=False):
+        """Set signal array, retaining all cached values that depend
+        only on the dictionary, so that a solver object can be reused
+        for a sequence of signals of the same shape.
+
+        Parameters
+        ----------
+        S : array_like
+          Signal array, with the same shape as the signal array passed
+          to :meth:`__init__`
+        warmstart : bool, optional (default False)
+          Flag indicating whether the current values of the working
+          variables should be used as the initial values for the next
+          call to :meth:`solve`. If ``False``, they are reset to zero.
+        """
+
+        S = np.asarray(S, dtype=self.dtype)
+        if S.size != self.S.size:
+            raise ValueError('Signal array S must have the same shape as '
+                             'the current signal array')
+        self.S = S.reshape(self.cri.shpS)
+        if self.opt['MemMap', 'Enabled']:
+            for slc in self.chunks():
+                self.Sf[slc] = sl.rfftn(self.S[slc], None, self.cri.axisN)
+        else:
+            self.Sf = sl.rfftn(self.S, None, self.cri.axisN)
+        self.setdsf()
+
+        if warmstart:
+            self.rescale_dual()
+            self.reset(self.Y, self.U)
+        else:
+            self.reset()
+
+
+
+    def rescale_dual(self):
+        """Rescale the scaled dual variable U, in place, to be consistent
+        with the initial penalty parameter, to which the penalty
+        parameter is restored by :meth:`reset`. This method should be
+        called before a call to :meth:`reset` for a warm start from the
+        current working variables. When option ``MemMap`` is enabled,
+        the rescaling is applied in chunks of the independent signals.
+        """
+
+        scl = self.rho / self.rho0
+        if scl != 1:
+            for slc in self.chunks():
+                self.U[slc] *= scl
+
+
+
+    def reset(self, Y0=None, U0=None):
+        """Reset the penalty parameter, iteration count, iteration
+        statistics, and working variables, so that the next call to
+        :meth:`solve` starts a new optimisation.
+
+        Parameters
+        ----------
+        Y0 : array_like or None, optional (default None)
+          Initial value for working variable Y. If ``None``, a zero
+          initial value is used.
+        U0 : array_like or None, optional (default None)
+          Initial value for working variable U. If ``None``, a zero
+          initial value is used.
+        """
+
+        if self.rho != self.rho0:
+            self.rho = self.rho0
+            self.rhochange()
+
+        if self.opt['MemMap', 'Enabled']:
+            for slc in self.chunks():
+                self.Y[slc] = 0.0 if Y0 is None else Y0[slc]
+                self.U[slc] = 0.0 if U0 is None else U0[slc]
+                self.Yprev[slc] = self.Y[slc]
+        else:
+            if Y0 is None:
+                self.Y = self.yinit(self.cri.shpX)
+            else:
+                self.Y = np.asarray(Y0).astype(self.dtype, copy=True)
+            if U0 is None:
+                self.U = np.zeros(self.cri.shpX, dtype=self.dtype)
+            else:
+                self.U = np.asarray(U0).astype(self.dtype, copy=True)
+            self.Yprev = self.Y.copy()
+
+        self.itstat = []
+        self.k = 0
+        # Discard the state of the spectral penalty parameter selection
+        self.spcstate = None
 
 
 
@@ -258,19 +462,25 @@ class GenericConvBPDN(admm.ADMMEqual):
         r"""Minimise Augmented Lagrangian with respect to
         :math:`\mathbf{x}`."""
 
-        self.YU[:] = self.Y - self.U
+        if self.opt['MemMap', 'Enabled']:
+            self.xstep_chunked()
+            return
 
-        b = self.DSf + self.rho * sl.rfftn(self.YU, None, self.cri.axisN)
-        if self.cri.Cd == 1:
-            self.Xf[:] = sl.solvedbi_sm(self.Df, self.rho, b, self.c,
-                                        self.cri.axisM)
-        else:
-            self.Xf[:] = sl.solvemdbi_ism(self.Df, self.rho, b, self.cri.axisM,
-                                          self.cri.axisC)
+        # The right hand side b is constructed in place in the DFT plan
+        # arrays, which are overwritten by the inverse DFT below
+        np.subtract(self.Y, self.U, out=self.dftp.a)
+        b = self.dftp.rfftn()
+        b *= self.rho
+        b += self.DSf
+        self.xslv.solve(b, out=self.Xf)
 
-        self.X = sl.irfftn(self.Xf, self.cri.Nv, self.cri.axisN)
+        if self.X is None:
+            self.X = sl.pyfftw_empty_aligned(self.cri.shpX, dtype=self.dtype)
+        self.dftp.irfftn(self.Xf, out=self.X)
 
         if self.opt['LinSolveCheck']:
+            b = self.DSf + self.rho * sl.rfftn(self.Y - self.U, None,
+                                              self.cri.axisN)
             Dop = lambda x: sl.inner(self.Df, x, axis=self.cri.axisM)
             if self.cri.Cd == 1:
                 DHop = lambda x: np.conj(self.Df) * x
@@ -284,6 +494,121 @@ class GenericConvBPDN(admm.ADMMEqual):
 
 
 
+    def xstep_chunked(self):
+        r"""Minimise Augmented Lagrangian with respect to
+        :math:`\mathbf{x}`, computing the solution in chunks of the
+        independent signals (see option ``MemMap``).
+        """
+
+        nrmr = 0.0
+        nrmb = 0.0
+        for slc in self.chunks():
+            b = self.DSf[slc] + self.rho * sl.rfftn(self.Y[slc] -
+                                                    self.U[slc], None,
+                                                    self.cri.axisN)
+            Xf = self.xslv.solve(b)
+            self.Xf[slc] = Xf
+            self.X[slc] = sl.irfftn(Xf, self.cri.Nv, self.cri.axisN)
+
+            if self.opt['LinSolveCheck']:
+                ax = sl.inner(self.Df, Xf, axis=self.cri.axisM)
+                if self.cri.Cd == 1:
+                    ax = np.conj(self.Df) * ax
+                else:
+                    ax = sl.inner(np.conj(self.Df), ax, axis=self.cri.axisC)
+                ax += self.rho * Xf
+                nrmr += sl.l2norm(ax - b)**2
+                nrmb += sl.l2norm(b)**2
+
+        if self.opt['LinSolveCheck']:
+            self.xrrs = 1.0 if nrmb == 0.0 else np.sqrt(nrmr / nrmb)
+        else:
+            self.xrrs = None
+
+
+
+    def relax_AX(self):
+        """Implement relaxation if option ``RelaxParam`` != 1.0."""
+
+        if not self.opt['MemMap', 'Enabled'] or self.rlx == 1.0:
+            super(GenericConvBPDN, self).relax_AX()
+            return
+
+        self.AXnr = self.X
+        if not hasattr(self, 'AX') or self.AX is self.X:
+            self.AX = self.mmzeros(self.cri.shpX)
+        alpha = self.rlx
+        for slc in self.chunks():
+            self.AX[slc] = alpha*self.X[slc] + (1 - alpha)*self.Y[slc]
+
+
+
+    def ustep(self):
+        """Dual variable update."""
+
+        if not self.opt['MemMap', 'Enabled']:
+            super(GenericConvBPDN, self).ustep()
+            return
+
+        for slc in self.chunks():
+            self.U[slc] += self.AX[slc] - self.Y[slc]
+
+
+
+    def update_yprev(self):
+        """Update record of Y from previous iteration."""
+
+        if not self.opt['MemMap', 'Enabled']:
+            super(GenericConvBPDN, self).update_yprev()
+            return
+
+        for slc in self.chunks():
+            self.Yprev[slc] = self.Y[slc]
+
+
+
+    def compute_residuals(self):
+        """Compute residuals and stopping thresholds."""
+
+        if not self.opt['MemMap', 'Enabled']:
+            return super(GenericConvBPDN, self).compute_residuals()
+
+        # Accumulate the squared norms required for the residuals and
+        # their normalisation over chunks of the working variables
+        nrm = np.zeros(5)
+        for slc in self.chunks():
+            Y = self.Y[slc]
+            nrm += [sl.l2norm(self.AXnr[slc] - Y)**2,
+                    sl.l2norm(self.Yprev[slc] - Y)**2,
+                    sl.l2norm(self.AXnr[slc])**2, sl.l2norm(Y)**2,
+                    sl.l2norm(self.U[slc])**2]
+        nrm = np.sqrt(nrm)
+        r = nrm[0]
+        s = self.rho * nrm[1]
+        rn = max(nrm[2], nrm[3])
+        sn = self.rho * nrm[4]
+
+        if self.opt['AutoRho', 'StdResiduals']:
+            epri = np.sqrt(self.Nc) * self.opt['AbsStopTol'] + \
+                rn * self.opt['RelStopTol']
+            edua = np.sqrt(self.Nx) * self.opt['AbsStopTol'] + \
+                sn * self.opt['RelStopTol']
+        else:
+            if rn == 0.0:
+                rn = 1.0
+            if sn == 0.0:
+                sn = 1.0
+            r /= rn
+            s /= sn
+            epri = np.sqrt(self.Nc) * self.opt['AbsStopTol'] / rn + \
+                self.opt['RelStopTol']
+            edua = np.sqrt(self.Nx) * self.opt['AbsStopTol'] / sn + \
+                self.opt['RelStopTol']
+
+        return r, s, epri, edua
+
+
+
     def ystep(self):
         r"""Minimise Augmented Lagrangian with respect to :math:`\mathbf{y}`.
         If this method is not overridden, the problem is solved without
@@ -294,7 +619,9 @@ class GenericConvBPDN(admm.ADMMEqual):
         """
 
         if self.opt['NonNegCoef']:
-            self.Y[self.Y < 0.0] = 0.0
+            for slc in self.chunks():
+                Y = self.Y[slc]
+                Y[Y < 0.0] = 0.0
         if self.opt['NoBndryCross']:
             for n in range(0, self.cri.dimN):
                 self.Y[(slice(None),) * n +
@@ -329,6 +656,18 @@ class GenericConvBPDN(admm.ADMMEqual):
         \mathbf{x}_m - \mathbf{s} \|_2^2`.
         """
 
+        if self.opt['MemMap', 'Enabled']:
+            dfd = 0.0
+            for slc in self.chunks():
+                if self.opt['fEvalX']:
+                    Xf = self.Xf[slc]
+                else:
+                    Xf = sl.rfftn(self.Y[slc], None, self.cri.axisN)
+                Ef = sl.inner(self.Df, Xf, axis=self.cri.axisM) - \
+                    self.Sf[slc]
+                dfd += sl.rfl2norm2(Ef, self.S.shape, axis=self.cri.axisN)
+            return dfd / 2.0
+
         Ef = sl.inner(self.Df, self.obfn_fvarf(), axis=self.cri.axisM) - \
             self.Sf
         return sl.rfl2norm2(Ef, self.S.shape, axis=self.cri.axisN) / 2.0
@@ -352,11 +691,9 @@ class GenericConvBPDN(admm.ADMMEqual):
 
 
     def rhochange(self):
-        """Updated cached c array when rho changes."""
+        """Updated cached solver when rho changes."""
 
-        if self.opt['HighMemSolve'] and self.cri.Cd == 1:
-            self.c = sl.solvedbi_sm_c(self.Df, np.conj(self.Df), self.rho,
-                                      self.cri.axisM)
+        self.xslv.setrho(self.rho)
 
 
 
@@ -365,6 +702,14 @@ class GenericConvBPDN(admm.ADMMEqual):
 
         if X is None:
             X = self.Y
+        if self.opt['MemMap', 'Enabled']:
+            shpS = self.cri.shpS[0:self.cri.axisM]
+            Sr = np.zeros(shpS, dtype=self.dtype)
+            for slc in self.chunks():
+                Xf = sl.rfftn(X[slc], None, self.cri.axisN)
+                Sf = np.sum(self.Df * Xf, axis=self.cri.axisM)
+                Sr[slc] = sl.irfftn(Sf, self.cri.Nv, self.cri.axisN)
+            return Sr
         Xf = sl.rfftn(X, None, self.cri.axisN)
         Sf = np.sum(self.Df * Xf, axis=self.cri.axisM)
         return sl.irfftn(Sf, self.cri.Nv, self.cri.axisN)
@@ -605,22 +950,185 @@ class ConvBPDN(GenericConvBPDN):
         r"""Minimise Augmented Lagrangian with respect to
         :math:`\mathbf{y}`."""
 
-        self.Y = sp.prox_l1(self.AX + self.U,
-                            (self.lmbda / self.rho) * self.wl1)
+        if self.opt['MemMap', 'Enabled']:
+            for slc in self.chunks():
+                self.Y[slc] = sp.prox_l1(self.AX[slc] + self.U[slc],
+                                         (self.lmbda / self.rho) *
+                                         self.wl1chunk(slc))
+        else:
+            self.Y = sp.prox_l1(self.AX + self.U,
+                                (self.lmbda / self.rho) * self.wl1)
         super(ConvBPDN, self).ystep()
 
 
 
+    def wl1chunk(self, slc):
+        """Get the chunk of the :math:`\ell_1` weight array corresponding
+        to a chunk of the working variables (see option ``MemMap``).
+        """
+
+        if self.wl1.ndim > self.cri.axisK and \
+           self.wl1.shape[self.cri.axisK] > 1:
+            return self.wl1[slc]
+        else:
+            return self.wl1
+
+
+
     def obfn_reg(self):
         """Compute regularisation term and contribution to objective
         function.
         """
 
-        rl1 = np.linalg.norm((self.wl1 * self.obfn_gvar()).ravel(), 1)
+        if self.opt['MemMap', 'Enabled']:
+            gvar = self.obfn_gvar()
+            rl1 = 0.0
+            for slc in self.chunks():
+                rl1 += sl.l1norm(self.wl1chunk(slc) * gvar[slc])
+        else:
+            rl1 = sl.l1norm(self.wl1 * self.obfn_gvar())
         return (self.lmbda*rl1, rl1)
 
 
 
+    def lambda_max(self):
+        r"""Compute the smallest value of the regularisation parameter
+        :math:`\lambda` for which the solution is zero. Since the
+        :math:`\ell_1` term is separable, the solution is zero if and
+        only if :math:`\lambda \geq \max_m \| \mathbf{w}_m^{-1} \odot
+        (\mathbf{d}_m^T \mathbf{s}) \|_{\infty}`, where
+        :math:`\mathbf{d}_m^T \mathbf{s}` is computed from the cached
+        value of :math:`D^H S` in the DFT domain. Coefficients with a zero
+        :math:`\ell_1` weight are excluded.
+
+        Returns
+        -------
+        lmax : float
+          Smallest regularisation parameter giving a zero solution
+        """
+
+        lmax = 0.0
+        for slc in self.chunks():
+            DS = np.abs(sl.irfftn(self.DSf[slc], self.cri.Nv,
+                                  self.cri.axisN))
+            wl1 = np.broadcast_to(self.wl1chunk(slc), DS.shape)
+            nz = wl1 > 0
+            if np.any(nz):
+                lmax = max(lmax, float(np.max(DS[nz] / wl1[nz])))
+        return lmax
+
+
+
+    def setlmbda(self, lmbda):
+        r"""Set the regularisation parameter :math:`\lambda`, retaining
+        the current values of the working variables so that the next
+        call to :meth:`solve` is warm-started from the solution for the
+        previous value. The scaled dual variable is rescaled in
+        proportion to :math:`\lambda` since, at a solution, it is an
+        element of :math:`(\lambda / \rho) \partial \| \cdot \|_1`
+        evaluated at :math:`\mathbf{y}`. If option ``rho`` is ``None``,
+        the penalty parameter is also set to its default value for the
+        new :math:`\lambda`.
+
+        Parameters
+        ----------
+        lmbda : float
+          Regularisation parameter
+        """
+
+        lmbda = self.dtype.type(lmbda)
+        scl = lmbda / self.lmbda if self.lmbda != 0.0 else 1.0
+        self.lmbda = lmbda
+        if self.opt['rho'] is None:
+            # The default penalty parameter depends on lambda
+            rho = self.dtype.type(50.0 * self.lmbda + 1.0)
+            scl *= self.rho / rho
+            self.rho = rho
+            self.rho0 = rho
+            self.rhochange()
+        for slc in self.chunks():
+            self.U[slc] *= scl
+        # The state of the spectral penalty parameter selection is not
+        # valid for the new lambda
+        self.spcstate = None
+        if self.opt['AutoRho', 'RsdlTarget'] is None:
+            if self.lmbda != 0.0:
+                self.rho_xi = self.dtype.type(
+                    1.0 + (18.3)**(np.log10(self.lmbda) + 1.0))
+            else:
+                self.rho_xi = self.dtype.type(1.0)
+
+
+
+    def solve_path(self, lmbda=None, nlmbda=10, lmin=1e-2):
+        r"""Solve for a decreasing sequence of values of the
+        regularisation parameter :math:`\lambda`, using this solver
+        object for all of them, and warm-starting the solution for each
+        value from the solution for the previous one (see
+        :meth:`setlmbda`). Each value is solved for at most
+        ``MaxMainIter`` iterations, except for values not less than
+        that computed by :meth:`lambda_max`, for which the zero
+        solution is set without iterating. Since the solutions for successive
+        values are close, the total computational cost is usually
+        comparable to that of a single cold-started solve.
+
+        Parameters
+        ----------
+        lmbda : array_like or None, optional (default None)
+          Sequence of regularisation parameter values. If ``None``,
+          `nlmbda` logarithmically spaced values are used, starting at
+          the value computed by :meth:`lambda_max`, for which the
+          solution is zero, and ending at `lmin` times that value.
+        nlmbda : int, optional (default 10)
+          Number of regularisation parameter values if `lmbda` is
+          ``None``
+        lmin : float, optional (default 1e-2)
+          Ratio of smallest to largest regularisation parameter value if
+          `lmbda` is ``None``
+
+        Returns
+        -------
+        lmbda : ndarray
+          Regularisation parameter values
+        X : ndarray
+          Coefficient maps for each regularisation parameter value,
+          stacked on a new initial axis
+        niter : ndarray
+          Number of iterations for each regularisation parameter value
+        """
+
+        if lmbda is None:
+            lmbda = self.lambda_max() * np.logspace(0, np.log10(lmin),
+                                                    nlmbda)
+        lmbda = np.asarray(lmbda, dtype=self.dtype).ravel()
+
+        lmax = self.lambda_max()
+        X = np.zeros((lmbda.size,) + self.cri.shpX, dtype=self.dtype)
+        niter = np.zeros(lmbda.size, dtype=np.int64)
+        for n in range(lmbda.size):
+            self.setlmbda(lmbda[n])
+            if lmbda[n] >= lmax:
+                # The solution is known to be zero, so there is no need
+                # to iterate, and the working variables are zeroed so
+                # that the next value starts from the zero solution
+                if self.X is None:
+                    self.X = sl.pyfftw_empty_aligned(self.cri.shpX,
+                                                     dtype=self.dtype)
+                for slc in self.chunks():
+                    self.X[slc] = 0.0
+                    self.Y[slc] = 0.0
+                    self.Yprev[slc] = 0.0
+                    self.U[slc] = 0.0
+                continue
+            k0 = self.k
+            self.solve()
+            niter[n] = self.k - k0
+            X[n] = self.getcoef()
+
+        return lmbda, X, niter
+
+
+
 
 
 class ConvBPDNJoint(ConvBPDN):
@@ -791,7 +1299,7 @@ class ConvBPDNJoint(ConvBPDN):
         :math:`\| Y \|_{2,1}`.
         """
 
-        rl1 = np.linalg.norm((self.wl1 * self.obfn_gvar()).ravel(), 1)
+        rl1 = sl.l1norm(self.wl1 * self.obfn_gvar())
         rl21 = np.sum(self.wl21 * np.sqrt(np.sum(self.obfn_gvar()**2,
                                                  axis=self.cri.axisC)))
         return (self.lmbda*rl1 + self.mu*rl21, rl1, rl21)
@@ -923,15 +1431,14 @@ class ConvElasticNet(ConvBPDN):
         if D is not None:
             self.D = np.asarray(D, dtype=self.dtype)
         self.Df = sl.rfftn(self.D, self.cri.Nv, self.cri.axisN)
-        # Compute D^H S
-        self.DSf = np.conj(self.Df) * self.Sf
-        if self.cri.Cd > 1:
-            self.DSf = np.sum(self.DSf, axis=self.cri.axisC, keepdims=True)
-        if self.opt['HighMemSolve'] and self.cri.Cd == 1:
-            self.c = sl.solvedbi_sm_c(self.Df, np.conj(self.Df),
-                                      self.mu + self.rho, self.cri.axisM)
+        self.setdsf()
+        if self.cri.Cd == 1:
+            self.xslv = sl.SMSolver(self.Df, self.mu + self.rho,
+                                    self.cri.axisM,
+                                    cache=self.opt['HighMemSolve'])
         else:
-            self.c = None
+            self.xslv = sl.MDBISolver(self.Df, self.mu + self.rho,
+                                      self.cri.axisM, self.cri.axisC)
 
 
 
@@ -940,19 +1447,19 @@ class ConvElasticNet(ConvBPDN):
         :math:`\mathbf{x}`.
         """
 
-        self.YU[:] = self.Y - self.U
-
-        b = self.DSf + self.rho*sl.rfftn(self.YU, None, self.cri.axisN)
-        if self.cri.Cd == 1:
-            self.Xf[:] = sl.solvedbi_sm(self.Df, self.mu + self.rho,
-                                        b, self.c, self.cri.axisM)
-        else:
-            self.Xf[:] = sl.solvemdbi_ism(self.Df, self.mu + self.rho, b,
-                                          self.cri.axisM, self.cri.axisC)
+        np.subtract(self.Y, self.U, out=self.dftp.a)
+        b = self.dftp.rfftn()
+        b *= self.rho
+        b += self.DSf
+        self.xslv.solve(b, out=self.Xf)
 
-        self.X = sl.irfftn(self.Xf, self.cri.Nv, self.cri.axisN)
+        if self.X is None:
+            self.X = sl.pyfftw_empty_aligned(self.cri.shpX, dtype=self.dtype)
+        self.dftp.irfftn(self.Xf, out=self.X)
 
         if self.opt['LinSolveCheck']:
+            b = self.DSf + self.rho * sl.rfftn(self.Y - self.U, None,
+                                              self.cri.axisN)
             Dop = lambda x: sl.inner(self.Df, x, axis=self.cri.axisM)
             if self.cri.Cd == 1:
                 DHop = lambda x: np.conj(self.Df) * x
@@ -966,13 +1473,20 @@ class ConvElasticNet(ConvBPDN):
 
 
 
+    def rhochange(self):
+        """Updated cached solver when rho changes."""
+
+        self.xslv.setrho(self.mu + self.rho)
+
+
+
     def obfn_reg(self):
         """Compute regularisation term and contribution to objective
         function.
         """
 
-        rl1 = np.linalg.norm((self.wl1 * self.obfn_gvar()).ravel(), 1)
-        rl2 = 0.5*np.linalg.norm(self.obfn_gvar())**2
+        rl1 = sl.l1norm(self.wl1 * self.obfn_gvar())
+        rl2 = 0.5*sl.l2norm(self.obfn_gvar())**2
         return (self.lmbda*rl1 + self.mu*rl2, rl1, rl2)
 
 
@@ -1147,10 +1661,7 @@ class ConvBPDNGradReg(ConvBPDN):
         if D is not None:
             self.D = np.asarray(D, dtype=self.dtype)
         self.Df = sl.rfftn(self.D, self.cri.Nv, self.cri.axisN)
-        # Compute D^H S
-        self.DSf = np.conj(self.Df) * self.Sf
-        if self.cri.Cd > 1:
-            self.DSf = np.sum(self.DSf, axis=self.cri.axisC, keepdims=True)
+        self.setdsf()
         if self.opt['HighMemSolve'] and self.cri.Cd == 1:
             self.c = sl.solvedbd_sm_c(
                 self.Df, np.conj(self.Df), self.mu*self.GHGf + self.rho,
@@ -1160,23 +1671,34 @@ class ConvBPDNGradReg(ConvBPDN):
 
 
 
+    def rhochange(self):
+        """Updated cached c array when rho changes."""
+
+        if self.opt['HighMemSolve'] and self.cri.Cd == 1:
+            self.c = sl.solvedbd_sm_c(
+                self.Df, np.conj(self.Df), self.mu*self.GHGf + self.rho,
+                self.cri.axisM)
+
+
+
     def xstep(self):
         r"""Minimise Augmented Lagrangian with respect to
         :math:`\mathbf{x}`.
         """
 
-        self.YU[:] = self.Y - self.U
-
-        b = self.DSf + self.rho*sl.rfftn(self.YU, None, self.cri.axisN)
+        np.subtract(self.Y, self.U, out=self.dftp.a)
+        b = self.DSf + self.rho*self.dftp.rfftn()
         if self.cri.Cd == 1:
             self.Xf[:] = sl.solvedbd_sm(self.Df, self.mu*self.GHGf + self.rho,
                                         b, self.c, self.cri.axisM)
         else:
-            self.Xf[:] = sl.solvemdbi_ism(self.Df, self.mu*self.GHGf +
-                                          self.rho, b, self.cri.axisM,
-                                          self.cri.axisC)
+            self.Xf[:] = sl.solvemdbi_gram(self.Df, self.mu*self.GHGf +
+                                           self.rho, b, self.cri.axisM,
+                                           self.cri.axisC)
 
-        self.X = sl.irfftn(self.Xf, self.cri.Nv, self.cri.axisN)
+        if self.X is None:
+            self.X = sl.pyfftw_empty_aligned(self.cri.shpX, dtype=self.dtype)
+        self.dftp.irfftn(self.Xf, out=self.X)
 
         if self.opt['LinSolveCheck']:
             Dop = lambda x: sl.inner(self.Df, x, axis=self.cri.axisM)
@@ -1198,7 +1720,7 @@ class ConvBPDNGradReg(ConvBPDN):
         """
 
         fvf = self.obfn_fvarf()
-        rl1 = np.linalg.norm((self.wl1 * self.obfn_gvar()).ravel(), 1)
+        rl1 = sl.l1norm(self.wl1 * self.obfn_gvar())
         rgr = sl.rfl2norm2(np.sqrt(self.GHGf*np.conj(fvf)*fvf), self.cri.Nv,
                            self.cri.axisN)/2.0
         return (self.lmbda*rl1 + self.mu*rgr, rl1, rgr)
@@ -1381,7 +1903,7 @@ class ConvBPDNProjL1(GenericConvBPDN):
         prj = sp.proj_l1(self.obfn_gvar(), self.gamma,
                          axis=self.cri.axisN + (self.cri.axisC,
                                                 self.cri.axisM))
-        cns = np.linalg.norm(prj - self.obfn_gvar())
+        cns = sl.l2norm(prj - self.obfn_gvar())
         return (dfd, cns)
 
 
@@ -1563,6 +2085,10 @@ class ConvTwoBlockCnstrnt(admm.ADMMTwoBlockCnstrnt):
         self.Xf = sl.pyfftw_rfftn_empty_aligned(self.cri.shpX, self.cri.axisN,
                                                 self.dtype)
 
+        # Construct DFT plan for repeated transforms of arrays of the
+        # same shape as X
+        self.dftp = sl.RFFTPlan(self.cri.shpX, self.cri.axisN, self.dtype)
+
         self.setdict()
 
 
@@ -1573,11 +2099,12 @@ class ConvTwoBlockCnstrnt(admm.ADMMTwoBlockCnstrnt):
         if D is not None:
             self.D = np.asarray(D, dtype=self.dtype)
         self.Df = sl.rfftn(self.D, self.cri.Nv, self.cri.axisN)
-        if self.opt['HighMemSolve'] and self.cri.Cd == 1:
-            self.c = sl.solvedbi_sm_c(self.Df, np.conj(self.Df), 1.0,
-                                      self.cri.axisM)
+        if self.cri.Cd == 1:
+            self.xslv = sl.SMSolver(self.Df, 1.0, self.cri.axisM,
+                                    cache=self.opt['HighMemSolve'])
         else:
-            self.c = None
+            self.xslv = sl.MDBISolver(self.Df, 1.0, self.cri.axisM,
+                                      self.cri.axisC)
 
 
 
@@ -1602,14 +2129,11 @@ class ConvTwoBlockCnstrnt(admm.ADMMTwoBlockCnstrnt):
             b = sl.inner(np.conj(self.Df), self.block_sep0(YUf),
                          axis=self.cri.axisC) + self.block_sep1(YUf)
 
-        if self.cri.Cd == 1:
-            self.Xf[:] = sl.solvedbi_sm(self.Df, 1.0, b, self.c,
-                                        self.cri.axisM)
-        else:
-            self.Xf[:] = sl.solvemdbi_ism(self.Df, 1.0, b, self.cri.axisM,
-                                          self.cri.axisC)
+        self.xslv.solve(b, out=self.Xf)
 
-        self.X = sl.irfftn(self.Xf, self.cri.Nv, self.cri.axisN)
+        if self.X is None:
+            self.X = sl.pyfftw_empty_aligned(self.cri.shpX, dtype=self.dtype)
+        self.dftp.irfftn(self.Xf, out=self.X)
 
         if self.opt['LinSolveCheck']:
             Dop = lambda x: sl.inner(self.Df, x, axis=self.cri.axisM)
@@ -1802,7 +2326,7 @@ class ConvTwoBlockCnstrnt(admm.ADMMTwoBlockCnstrnt):
     def rsdl_sn(self, U):
         """Compute dual residual normalisation term."""
 
-        return self.rho * np.linalg.norm(U)
+        return self.rho * sl.l2norm(U)
 
 
 
@@ -2017,8 +2541,8 @@ class ConvMinL1InL2Ball(ConvTwoBlockCnstrnt):
         function.
         """
 
-        return np.linalg.norm(sp.proj_l2(Y0, self.epsilon,
-                                         axis=self.cri.axisN) - Y0)
+        return sl.l2norm(sp.proj_l2(Y0, self.epsilon,
+                                    axis=self.cri.axisN) - Y0)
 
 
 
@@ -2027,7 +2551,7 @@ class ConvMinL1InL2Ball(ConvTwoBlockCnstrnt):
         function.
         """
 
-        return np.linalg.norm((self.wl1 * Y1).ravel(), 1)
+        return sl.l1norm(self.wl1 * Y1)
 
 
 
@@ -2247,7 +2771,7 @@ class ConvBPDNMaskDcpl(ConvTwoBlockCnstrnt):
         function.
         """
 
-        return (np.linalg.norm(self.W * Y0)**2) / 2.0
+        return (sl.l2norm(self.W * Y0)**2) / 2.0
 
 
 
@@ -2256,7 +2780,7 @@ class ConvBPDNMaskDcpl(ConvTwoBlockCnstrnt):
         function.
         """
 
-        return np.linalg.norm((self.wl1 * Y1).ravel(), 1)
+        return sl.l1norm(self.wl1 * Y1)
 
 
 
@@ -2670,7 +3194,7 @@ class ConvL1L1Grd(ConvBPDNMaskDcpl):
                 self.Df, (self.mu / self.rho) * self.GHGf + 1.0, b,
                 self.c, self.cri.axisM)
         else:
-            self.Xf[:] = sl.solvemdbi_ism(
+            self.Xf[:] = sl.solvemdbi_gram(
                 self.Df, (self.mu / self.rho) * self.GHGf + 1.0, b,
                 self.cri.axisM, self.cri.axisC)
 
@@ -2738,7 +3262,7 @@ class ConvL1L1Grd(ConvBPDNMaskDcpl):
     def rsdl_sn(self, U):
         """Compute dual residual normalisation term."""
 
-        return self.rho * np.linalg.norm(self.cnst_AT(U))
+        return self.rho * sl.l2norm(self.cnst_AT(U))
 
 
 
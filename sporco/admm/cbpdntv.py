@@ -253,22 +253,20 @@ class ConvBPDNScalarTV(admm.ADMM):
         self.DSf = np.conj(self.Df) * self.Sf
         if self.cri.Cd > 1:
             self.DSf = np.sum(self.DSf, axis=self.cri.axisC, keepdims=True)
-        if self.opt['HighMemSolve'] and self.cri.Cd == 1:
-            self.c = sl.solvedbi_sm_c(
-                self.Df, np.conj(self.Df), self.rho*self.GHGf + self.rho,
-                self.cri.axisM)
+        if self.cri.Cd == 1:
+            self.xslv = sl.SMSolver(self.Df, self.rho*self.GHGf + self.rho,
+                                    self.cri.axisM,
+                                    cache=self.opt['HighMemSolve'])
         else:
-            self.c = None
+            self.xslv = sl.MDBISolver(self.Df, self.rho*self.GHGf + self.rho,
+                                      self.cri.axisM, self.cri.axisC)
 
 
 
     def rhochange(self):
-        """Updated cached c array when rho changes."""
+        """Updated cached solver when rho changes."""
 
-        if self.opt['HighMemSolve'] and self.cri.Cd == 1:
-            self.c = sl.solvedbi_sm_c(
-                self.Df, np.conj(self.Df), self.rho*self.GHGf + self.rho,
-                self.cri.axisM)
+        self.xslv.setrho(self.rho*self.GHGf + self.rho)
 
 
 
@@ -284,14 +282,7 @@ class ConvBPDNScalarTV(admm.ADMM):
         b = self.DSf + self.rho*(YUf[..., -1] + self.Wtv * np.sum(
             np.conj(self.Gf) * YUf[..., 0:-1], axis=-1))
 
-        if self.cri.Cd == 1:
-            self.Xf[:] = sl.solvedbi_sm(
-                self.Df, self.rho*self.GHGf + self.rho, b, self.c,
-                self.cri.axisM)
-        else:
-            self.Xf[:] = sl.solvemdbi_ism(
-                self.Df, self.rho*self.GHGf + self.rho, b, self.cri.axisM,
-                self.cri.axisC)
+        self.xslv.solve(b, out=self.Xf)
 
         self.X = sl.irfftn(self.Xf, self.cri.Nv, self.cri.axisN)
 
@@ -439,7 +430,7 @@ class ConvBPDNScalarTV(admm.ADMM):
         function.
         """
 
-        rl1 = np.linalg.norm((self.Wl1 * self.obfn_g1var()).ravel(), 1)
+        rl1 = sl.l1norm(self.Wl1 * self.obfn_g1var())
         rtv = np.sum(np.sqrt(np.sum(self.obfn_g0var()**2, axis=-1)))
         return (self.lmbda*rl1 + self.mu*rtv, rl1, rtv)
 
@@ -719,7 +710,7 @@ class ConvBPDNVectorTV(ConvBPDNScalarTV):
         function.
         """
 
-        rl1 = np.linalg.norm((self.Wl1 * self.obfn_g1var()).ravel(), 1)
+        rl1 = sl.l1norm(self.Wl1 * self.obfn_g1var())
         rtv = np.sum(np.sqrt(np.sum(self.obfn_g0var()**2,
                                     axis=(self.cri.axisM, -1))))
         return (self.lmbda*rl1 + self.mu*rtv, rl1, rtv)
@@ -1035,11 +1026,11 @@ class ConvBPDNRecTV(admm.ADMM):
 
         # Concatenate multiple GDf components on axisC. For
         # single-channel signals, and multi-channel signals with a
-        # single-channel dictionary, we end up with sl.solvemdbi_ism
+        # single-channel dictionary, we end up with sl.solvemdbi_gram
         # solving a linear system of rank dimN+1 (corresponding to the
         # dictionary and a gradient operator per spatial dimension) plus
         # an identity. For multi-channel signals with a multi-channel
-        # dictionary, we end up with sl.solvemdbi_ism solving a linear
+        # dictionary, we end up with sl.solvemdbi_gram solving a linear
         # system of rank C.d (dimN+1) (corresponding to the dictionary
         # and a gradient operator per spatial dimension for each
         # channel) plus an identity.
@@ -1052,18 +1043,19 @@ class ConvBPDNRecTV(admm.ADMM):
             # Concatenate multiple GDf components on the final axis
             # of GDf (that indexes the number of gradient operators). For
             # multi-channel signals with a single-channel dictionary,
-            # sl.solvemdbi_ism has to solve a linear system of rank dimN+1
+            # sl.solvemdbi_gram has to solve a linear system of rank dimN+1
             # (corresponding to the dictionary and a gradient operator per
             # spatial dimension)
             DfGDf = np.concatenate(
                 [self.Df[..., np.newaxis],] +
                 [np.sqrt(self.rho)*self.GDf[..., k, np.newaxis] for k
                  in range(self.GDf.shape[-1])], axis=-1)
-            self.Xf[:] = sl.solvemdbi_ism(DfGDf, self.rho, b[..., np.newaxis],
-                                          self.cri.axisM, -1)[..., 0]
+            self.Xf[:] = sl.solvemdbi_gram(DfGDf, self.rho,
+                                           b[..., np.newaxis],
+                                           self.cri.axisM, -1)[..., 0]
         else:
             # Concatenate multiple GDf components on axisC. For multi-channel
-            # signals with a multi-channel dictionary, sl.solvemdbi_ism has
+            # signals with a multi-channel dictionary, sl.solvemdbi_gram has
             # to solve a linear system of rank C.d (dimN+1) (corresponding to
             # the dictionary and a gradient operator per spatial dimension
             # for each channel) plus an identity.
@@ -1071,8 +1063,8 @@ class ConvBPDNRecTV(admm.ADMM):
                 [self.Df,] + [np.sqrt(self.rho)*self.GDf[..., k] for k
                               in range(self.GDf.shape[-1])],
                 axis=self.cri.axisC)
-            self.Xf[:] = sl.solvemdbi_ism(DfGDf, self.rho, b, self.cri.axisM,
-                                          self.cri.axisC)
+            self.Xf[:] = sl.solvemdbi_gram(DfGDf, self.rho, b,
+                                           self.cri.axisM, self.cri.axisC)
 
         self.X = sl.irfftn(self.Xf, self.cri.Nv, self.cri.axisN)
 
@@ -1224,7 +1216,7 @@ class ConvBPDNRecTV(admm.ADMM):
         function.
         """
 
-        rl1 = np.linalg.norm((self.Wl1 * self.obfn_g0var()).ravel(), 1)
+        rl1 = sl.l1norm(self.Wl1 * self.obfn_g0var())
         rtv = np.sum(np.sqrt(np.sum(self.obfn_g1var()**2,
                                     axis=(self.cri.axisC, -1))))
         return (self.lmbda*rl1 + self.mu*rtv, rl1, rtv)
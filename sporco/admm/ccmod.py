@@ -124,6 +124,25 @@ class ConvCnstrMODBase(admm.ADMMEqual):
           ``ZeroMean`` : Flag indicating whether the solution
           dictionary :math:`\{\mathbf{d}_m\}` should have zero-mean
           components.
+
+          ``MemMap`` : Options for storing the DFTs of the coefficient
+          maps and signal in memory-mapped temporary files (see
+          :func:`.linalg.memmap_zeros`), with the computations
+          involving them performed in chunks of the independent
+          signals, so that problems with a very large number of
+          signals may be solved with bounded memory use. This option
+          is supported by :class:`ConvCnstrMOD_IterSM`, but not by
+          :class:`ConvCnstrMOD_CG`.
+
+            ``Enabled`` : Flag determining whether memory-mapped
+            arrays are used.
+
+            ``Dir`` : Directory in which the temporary files are
+            created (if ``None``, the default temporary directory is
+            used).
+
+            ``ChunkSize`` : Number of signals (index :math:`k`)
+            processed in each chunk.
         """
 
         defaults = copy.deepcopy(admm.ADMMEqual.Options.defaults)
@@ -137,7 +156,9 @@ class ConvCnstrMODBase(admm.ADMMEqual):
         defaults.update({'AuxVarObj': False, 'fEvalX': True,
                          'gEvalY': False, 'ReturnX': False,
                          'RelaxParam': 1.8, 'ZeroMean': False,
-                         'LinSolveCheck': False})
+                         'LinSolveCheck': False,
+                         'MemMap': {'Enabled': False, 'Dir': None,
+                                    'ChunkSize': 1}})
         defaults['AutoRho'].update({'Enabled': True, 'Period': 1,
                                     'AutoScaling': True, 'Scaling': 1000,
                                     'RsdlRatio': 1.2})
@@ -269,17 +290,25 @@ class ConvCnstrMODBase(admm.ADMMEqual):
         self.S = np.asarray(self.S, dtype=self.dtype)
 
         # Compute signal S in DFT domain
-        self.Sf = sl.rfftn(self.S, None, self.cri.axisN)
+        if self.opt['MemMap', 'Enabled']:
+            self.Sf = self.mmzeros(self.rfftn_shape(self.S.shape))
+            for slc in self.chunks():
+                self.Sf[slc] = sl.rfftn(self.S[slc], None, self.cri.axisN)
+        else:
+            self.Sf = sl.rfftn(self.S, None, self.cri.axisN)
 
         # Create constraint set projection function
         self.Pcn = cr.getPcn(dsz, self.cri.Nv, self.cri.dimN, self.cri.dimCd,
                              zm=opt['ZeroMean'])
 
         # Create byte aligned arrays for FFT calls
-        self.YU = sl.pyfftw_empty_aligned(self.Y.shape, dtype=self.dtype)
         self.Xf = sl.pyfftw_rfftn_empty_aligned(self.Y.shape, self.cri.axisN,
                                                 self.dtype)
 
+        # Construct DFT plan for repeated transforms of arrays of the
+        # same shape as X
+        self.dftp = sl.RFFTPlan(self.Y.shape, self.cri.axisN, self.dtype)
+
         if Z is not None:
             self.setcoef(Z)
 
@@ -298,6 +327,43 @@ class ConvCnstrMODBase(admm.ADMMEqual):
 
 
 
+    def rfftn_shape(self, shape):
+        """Compute the shape of the real DFT on the spatial axes of an
+        array of the specified shape."""
+
+        ax = self.cri.axisN[-1]
+        return tuple(shape[0:ax]) + (shape[ax] // 2 + 1,) + \
+            tuple(shape[ax+1:])
+
+
+
+    def mmzeros(self, shape):
+        """Construct a zero-initialised complex memory-mapped array in
+        the directory specified by option ``MemMap``.
+        """
+
+        return sl.memmap_zeros(shape, sl.complex_dtype(self.dtype),
+                               self.opt['MemMap', 'Dir'])
+
+
+
+    def chunks(self):
+        """Construct a list of index tuples selecting chunks of the
+        coefficient map and signal arrays on the axis indexing the
+        independent signals. If option ``MemMap`` is not enabled, the
+        list has a single entry selecting the full arrays.
+        """
+
+        K = self.S.shape[self.cri.axisK]
+        if self.opt['MemMap', 'Enabled']:
+            csz = max(1, self.opt['MemMap', 'ChunkSize'])
+        else:
+            csz = K
+        return [(slice(None),) * self.cri.axisK + (slice(k, min(k + csz, K)),)
+                for k in range(0, K, csz)]
+
+
+
     def setcoef(self, Z):
         """Set coefficient array."""
 
@@ -312,9 +378,21 @@ class ConvCnstrMODBase(admm.ADMMEqual):
                           (self.cri.M,))
         self.Z = np.asarray(Z, dtype=self.dtype)
 
-        self.Zf = sl.rfftn(self.Z, self.cri.Nv, self.cri.axisN)
-        # Compute X^H S
-        self.ZSf = sl.inner(np.conj(self.Zf), self.Sf, self.cri.axisK)
+        if self.opt['MemMap', 'Enabled']:
+            shpZf = self.rfftn_shape(self.Z.shape)
+            if not hasattr(self, 'Zf') or self.Zf.shape != shpZf:
+                self.Zf = self.mmzeros(shpZf)
+            self.ZSf = 0
+            for slc in self.chunks():
+                Zf = sl.rfftn(self.Z[slc], self.cri.Nv, self.cri.axisN)
+                self.Zf[slc] = Zf
+                # Accumulate X^H S
+                self.ZSf += sl.inner(np.conj(Zf), self.Sf[slc],
+                                     self.cri.axisK)
+        else:
+            self.Zf = sl.rfftn(self.Z, self.cri.Nv, self.cri.axisN)
+            # Compute X^H S
+            self.ZSf = sl.inner(np.conj(self.Zf), self.Sf, self.cri.axisK)
 
 
 
@@ -338,10 +416,11 @@ class ConvCnstrMODBase(admm.ADMMEqual):
         """
 
         if self.opt['LinSolveCheck']:
-            Zop = lambda x: sl.inner(self.Zf, x, axis=self.cri.axisM)
-            ZHop = lambda x: sl.inner(np.conj(self.Zf), x,
-                                      axis=self.cri.axisK)
-            ax = ZHop(Zop(self.Xf)) + self.rho*self.Xf
+            ax = self.rho*self.Xf
+            for slc in self.chunks():
+                Zf = self.Zf[slc]
+                ax = ax + sl.inner(np.conj(Zf), sl.inner(
+                    Zf, self.Xf, axis=self.cri.axisM), axis=self.cri.axisK)
             self.xrrs = sl.rrs(ax, b)
         else:
             self.xrrs = None
@@ -383,9 +462,13 @@ class ConvCnstrMODBase(admm.ADMMEqual):
         \mathbf{x}_m - \mathbf{s} \|_2^2`.
         """
 
-        Ef = sl.inner(self.Zf, self.obfn_fvarf(), axis=self.cri.axisM) - \
-          self.Sf
-        return sl.rfl2norm2(Ef, self.S.shape, axis=self.cri.axisN) / 2.0
+        Xf = self.obfn_fvarf()
+        dfd = 0.0
+        for slc in self.chunks():
+            Ef = sl.inner(self.Zf[slc], Xf, axis=self.cri.axisM) - \
+              self.Sf[slc]
+            dfd += sl.rfl2norm2(Ef, self.S.shape, axis=self.cri.axisN)
+        return dfd / 2.0
 
 
 
@@ -394,7 +477,7 @@ class ConvCnstrMODBase(admm.ADMMEqual):
         \mathbf{y}\|_2`.
         """
 
-        return np.linalg.norm((self.Pcn(self.obfn_gvar()) - self.obfn_gvar()))
+        return sl.l2norm((self.Pcn(self.obfn_gvar()) - self.obfn_gvar()))
 
 
 
@@ -413,6 +496,12 @@ class ConvCnstrMODBase(admm.ADMMEqual):
         else:
             Df = sl.rfftn(D, None, self.cri.axisN)
 
+        if self.opt['MemMap', 'Enabled']:
+            Sr = np.zeros(self.S.shape[0:self.cri.axisM], dtype=self.dtype)
+            for slc in self.chunks():
+                Sf = np.sum(self.Zf[slc] * Df, axis=self.cri.axisM)
+                Sr[slc] = sl.irfftn(Sf, self.cri.Nv, self.cri.axisN)
+            return Sr
         Sf = np.sum(self.Zf * Df, axis=self.cri.axisM)
         return sl.irfftn(Sf, self.cri.Nv, self.cri.axisN)
 
@@ -423,8 +512,9 @@ class ConvCnstrMODBase(admm.ADMMEqual):
 class ConvCnstrMOD_IterSM(ConvCnstrMODBase):
     r"""
     ADMM algorithm for Convolutional Constrained MOD problem with the
-    :math:`\mathbf{x}` step solved via iterated application of the
-    Sherman-Morrison equation :cite:`wohlberg-2016-efficient`.
+    :math:`\mathbf{x}` step solved via a cached factorisation (see
+    :class:`.linalg.MDBISolver`) that replaces the iterated application
+    of the Sherman-Morrison equation :cite:`wohlberg-2016-efficient`.
 
     |
 
@@ -483,15 +573,38 @@ class ConvCnstrMOD_IterSM(ConvCnstrMODBase):
 
 
 
+    def setcoef(self, Z):
+        """Set coefficient array."""
+
+        super(ConvCnstrMOD_IterSM, self).setcoef(Z)
+        # When the DFT of the coefficient maps is memory-mapped, the
+        # Gram matrices are accumulated over chunks of the signal index
+        if self.opt['MemMap', 'Enabled']:
+            chunk = max(1, self.opt['MemMap', 'ChunkSize'])
+        else:
+            chunk = None
+        self.xslv = sl.MDBISolver(self.Zf, self.rho, self.cri.axisM,
+                                  self.cri.axisK, chunk=chunk)
+
+
+
+    def rhochange(self):
+        """Updated cached solver when rho changes."""
+
+        self.xslv.setrho(self.rho)
+
+
+
     def xstep(self):
         r"""Minimise Augmented Lagrangian with respect to :math:`\mathbf{x}`.
         """
 
-        self.YU[:] = self.Y - self.U
-        b = self.ZSf + self.rho*sl.rfftn(self.YU, None, self.cri.axisN)
-        self.Xf[:] = sl.solvemdbi_ism(self.Zf, self.rho, b, self.cri.axisM,
-                                      self.cri.axisK)
-        self.X = sl.irfftn(self.Xf, self.cri.Nv, self.cri.axisN)
+        np.subtract(self.Y, self.U, out=self.dftp.a)
+        b = self.ZSf + self.rho*self.dftp.rfftn()
+        self.xslv.solve(b, out=self.Xf)
+        if self.X is None:
+            self.X = sl.pyfftw_empty_aligned(self.Y.shape, dtype=self.dtype)
+        self.dftp.irfftn(self.Xf, out=self.X)
         self.xstep_check(b)
 
 
@@ -521,14 +634,18 @@ class ConvCnstrMOD_CG(ConvCnstrMODBase):
         """ConvCnstrMOD_CG algorithm options
 
         Options include all of those defined in
-        :class:`.ConvCnstrMODBase.Options`, together with
-        additional options:
+        :class:`.ConvCnstrMODBase.Options`, with the exception of
+        ``MemMap``, which is not supported since the batched CG solver
+        constructs working arrays of the same size as the DFT of the
+        coefficient maps, together with additional options:
 
           ``CG`` : CG solver options
 
             ``MaxIter`` : Maximum CG iterations.
 
-            ``StopTol`` : CG stopping tolerance.
+            ``StopTol`` : CG stopping tolerance, applied to the relative
+            residual of each of the independent frequency-domain
+            linear systems (see :func:`.linalg.solvemdbi_bcg`).
         """
 
         defaults = copy.deepcopy(ConvCnstrMODBase.Options.defaults)
@@ -568,6 +685,9 @@ class ConvCnstrMOD_CG(ConvCnstrMODBase):
         # Set default options if none specified
         if opt is None:
             opt = ConvCnstrMOD_CG.Options()
+        if opt['MemMap', 'Enabled']:
+            raise ValueError('Option MemMap is not supported by class %s' %
+                             type(self).__name__)
 
         super(ConvCnstrMOD_CG, self).__init__(Z, S, dsz, opt, dimK, dimN)
         self.Xf[:] = 0.0
@@ -579,14 +699,17 @@ class ConvCnstrMOD_CG(ConvCnstrMODBase):
         """
 
         self.cgit = None
-        self.YU[:] = self.Y - self.U
-        b = self.ZSf + self.rho*sl.rfftn(self.YU, None, self.cri.axisN)
-        self.Xf[:], cgit = sl.solvemdbi_cg(self.Zf, self.rho, b,
-                                           self.cri.axisM, self.cri.axisK,
-                                           self.opt['CG', 'StopTol'],
-                                           self.opt['CG', 'MaxIter'], self.Xf)
-        self.cgit = cgit
-        self.X = sl.irfftn(self.Xf, self.cri.Nv, self.cri.axisN)
+        np.subtract(self.Y, self.U, out=self.dftp.a)
+        b = self.ZSf + self.rho*self.dftp.rfftn()
+        self.Xf[:], cgit = sl.solvemdbi_bcg(self.Zf, self.rho, b,
+                                            self.cri.axisM, self.cri.axisK,
+                                            self.opt['CG', 'StopTol'],
+                                            self.opt['CG', 'MaxIter'],
+                                            self.Xf)
+        self.cgit = np.max(cgit)
+        if self.X is None:
+            self.X = sl.pyfftw_empty_aligned(self.Y.shape, dtype=self.dtype)
+        self.dftp.irfftn(self.Xf, out=self.X)
         self.xstep_check(b)
 
 
@@ -748,6 +871,18 @@ class ConvCnstrMOD_Consensus(admm.ADMMConsensus):
         self.Zf = sl.rfftn(self.Z, self.cri.Nv, self.cri.axisN)
         # Compute X^H S
         self.ZSf = np.conj(self.Zf) * self.Sf
+        # Construct a linear system solver for each block
+        self.xslv = [sl.SMSolver(np.take(self.Zf, [i], axis=self.cri.axisK),
+                                 self.rho, self.cri.axisM)
+                     for i in range(self.Nb)]
+
+
+
+    def rhochange(self):
+        """Updated cached solvers when rho changes."""
+
+        for slv in self.xslv:
+            slv.setrho(self.rho)
 
 
 
@@ -782,9 +917,7 @@ class ConvCnstrMOD_Consensus(admm.ADMMConsensus):
             b = np.swapaxes(self.ZSf[..., np.newaxis], self.cri.axisK, -1) \
                 + self.rho*sl.rfftn(self.YU, None, self.cri.axisN)
             for i in range(self.Nb):
-                self.Xf[..., i] = sl.solvedbi_sm(
-                    self.Zf[..., [i], :], self.rho, b[..., i],
-                    axis=self.cri.axisM)
+                self.xslv[i].solve(b[..., i], out=self.Xf[..., i])
             self.X = sl.irfftn(self.Xf, self.cri.Nv, self.cri.axisN)
 
 
@@ -812,9 +945,7 @@ class ConvCnstrMOD_Consensus(admm.ADMMConsensus):
         b = np.take(self.ZSf, [i], axis=self.cri.axisK) + \
             self.rho*sl.rfftn(self.YU, None, self.cri.axisN)
 
-        self.Xf[..., i] = sl.solvedbi_sm(np.take(
-            self.Zf, [i], axis=self.cri.axisK),
-                                         self.rho, b, axis=self.cri.axisM)
+        self.xslv[i].solve(b, out=self.Xf[..., i])
         self.X[..., i] = sl.irfftn(self.Xf[..., i], self.cri.Nv,
                                    self.cri.axisN)
 
@@ -879,7 +1010,7 @@ class ConvCnstrMOD_Consensus(admm.ADMMConsensus):
         """
 
         Y = self.obfn_gvar()
-        return np.linalg.norm((self.Pcn(Y) - Y))
+        return sl.l2norm((self.Pcn(Y) - Y))
 
 
 
@@ -299,6 +299,10 @@ class ConvCnstrMODMaskDcplBase(admm.ADMMTwoBlockCnstrnt):
         self.Xf = sl.pyfftw_rfftn_empty_aligned(xfshp, self.cri.axisN,
                                                 self.dtype)
 
+        # Construct DFT plan for repeated transforms of arrays of the
+        # same shape as X
+        self.dftp = sl.RFFTPlan(self.cri.shpD, self.cri.axisN, self.dtype)
+
         if Z is not None:
             self.setcoef(Z)
 
@@ -517,7 +521,7 @@ class ConvCnstrMODMaskDcplBase(admm.ADMMTwoBlockCnstrnt):
         function.
         """
 
-        return (np.linalg.norm(self.W * Y0)**2) / 2.0
+        return (sl.l2norm(self.W * Y0)**2) / 2.0
 
 
 
@@ -526,7 +530,7 @@ class ConvCnstrMODMaskDcplBase(admm.ADMMTwoBlockCnstrnt):
         function.
         """
 
-        return np.linalg.norm((self.Pcn(Y1) - Y1))
+        return sl.l2norm((self.Pcn(Y1) - Y1))
 
 
 
@@ -553,14 +557,14 @@ class ConvCnstrMODMaskDcplBase(admm.ADMMTwoBlockCnstrnt):
     def rsdl_s(self, Yprev, Y):
         """Compute dual residual vector."""
 
-        return self.rho*np.linalg.norm(self.cnst_AT(self.U))
+        return self.rho*sl.l2norm(self.cnst_AT(self.U))
 
 
 
     def rsdl_sn(self, U):
         """Compute dual residual normalisation term."""
 
-        return self.rho*np.linalg.norm(U)
+        return self.rho*sl.l2norm(U)
 
 
 
@@ -570,7 +574,8 @@ class ConvCnstrMODMaskDcpl_IterSM(ConvCnstrMODMaskDcplBase):
     r"""
     ADMM algorithm for Convolutional Constrained MOD with Mask Decoupling
     :cite:`heide-2015-fast` with the :math:`\mathbf{x}` step solved via
-    iterated application of the Sherman-Morrison equation
+    a cached factorisation (see :class:`.linalg.MDBISolver`) that
+    replaces the iterated application of the Sherman-Morrison equation
     :cite:`wohlberg-2016-efficient`.
 
     |
@@ -631,6 +636,15 @@ class ConvCnstrMODMaskDcpl_IterSM(ConvCnstrMODMaskDcplBase):
 
 
 
+    def setcoef(self, Z):
+        """Set coefficient array."""
+
+        super(ConvCnstrMODMaskDcpl_IterSM, self).setcoef(Z)
+        self.xslv = sl.MDBISolver(self.Zf, 1.0, self.cri.axisM,
+                                  self.cri.axisK)
+
+
+
     def xstep(self):
         r"""Minimise Augmented Lagrangian with respect to
         :math:`\mathbf{x}`.
@@ -642,9 +656,10 @@ class ConvCnstrMODMaskDcpl_IterSM(ConvCnstrMODMaskDcplBase):
         b = sl.inner(np.conj(self.Zf), self.block_sep0(YUf),
                      axis=self.cri.axisK) + self.block_sep1(YUf)
 
-        self.Xf[:] = sl.solvemdbi_ism(self.Zf, 1.0, b, self.cri.axisM,
-                                      self.cri.axisK)
-        self.X = sl.irfftn(self.Xf, self.cri.Nv, self.cri.axisN)
+        self.xslv.solve(b, out=self.Xf)
+        if self.X is None:
+            self.X = sl.pyfftw_empty_aligned(self.cri.shpD, dtype=self.dtype)
+        self.dftp.irfftn(self.Xf, out=self.X)
         self.xstep_check(b)
 
 
@@ -681,7 +696,9 @@ class ConvCnstrMODMaskDcpl_CG(ConvCnstrMODMaskDcplBase):
 
             ``MaxIter`` : Maximum CG iterations.
 
-            ``StopTol`` : CG stopping tolerance.
+            ``StopTol`` : CG stopping tolerance, applied to the relative
+            residual of each of the independent frequency-domain
+            linear systems (see :func:`.linalg.solvemdbi_bcg`).
         """
 
         defaults = copy.deepcopy(ConvCnstrMODMaskDcplBase.Options.defaults)
@@ -741,11 +758,13 @@ class ConvCnstrMODMaskDcpl_CG(ConvCnstrMODMaskDcplBase):
         b = sl.inner(np.conj(self.Zf), self.block_sep0(YUf),
                      axis=self.cri.axisK) + self.block_sep1(YUf)
 
-        self.Xf[:], cgit = sl.solvemdbi_cg(
+        self.Xf[:], cgit = sl.solvemdbi_bcg(
             self.Zf, 1.0, b, self.cri.axisM, self.cri.axisK,
             self.opt['CG', 'StopTol'], self.opt['CG', 'MaxIter'], self.Xf)
-        self.cgit = cgit
-        self.X = sl.irfftn(self.Xf, self.cri.Nv, self.cri.axisN)
+        self.cgit = np.max(cgit)
+        if self.X is None:
+            self.X = sl.pyfftw_empty_aligned(self.cri.shpD, dtype=self.dtype)
+        self.dftp.irfftn(self.Xf, out=self.X)
         self.xstep_check(b)
 
 
@@ -884,6 +903,21 @@ class ConvCnstrMODMaskDcpl_Consensus(ccmod.ConvCnstrMOD_Consensus):
                           (self.cri.M,))
         self.Z = np.asarray(Z, dtype=self.dtype)
         self.Zf = sl.rfftn(self.Z, self.cri.Nv, self.cri.axisN)
+        # The penalty parameter is set to unity for the duration of the
+        # x step (see the xstep method)
+        self.xslv = [sl.SMSolver(np.take(self.Zf, [i], axis=self.cri.axisK),
+                                 1.0, self.cri.axisM)
+                     for i in range(self.Nb)]
+
+
+
+    def rhochange(self):
+        """The linear system solved in the x step does not depend on the
+        penalty parameter, so the inherited method that updates the
+        cached solvers is overridden.
+        """
+
+        pass
 
 
 
@@ -970,8 +1004,8 @@ class ConvCnstrMODMaskDcpl_Consensus(ccmod.ConvCnstrMOD_Consensus):
 
         Ef = sl.inner(self.Zf, self.obfn_fvarf(), axis=self.cri.axisM) \
           - self.Sf
-        return (np.linalg.norm(self.W * sl.irfftn(Ef, self.cri.Nv,
-                                                  self.cri.axisN))**2) / 2.0
+        return (sl.l2norm(self.W * sl.irfftn(Ef, self.cri.Nv,
+                                             self.cri.axisN))**2) / 2.0
 
 
 
@@ -994,20 +1028,20 @@ class ConvCnstrMODMaskDcpl_Consensus(ccmod.ConvCnstrMOD_Consensus):
         ATU = self.swapaxes(self.U) + sl.irfftn(
             np.conj(self.Zf) * sl.rfftn(self.U1, self.cri.Nv, self.cri.axisN),
             self.cri.Nv, self.cri.axisN)
-        s = self.rho * np.linalg.norm(ATU)
+        s = self.rho * sl.l2norm(ATU)
 
         # The normalisation factor for the full primal residual is also not
         # straightforward
-        nAX = np.sqrt(np.linalg.norm(self.AXnr)**2 +
-                      np.linalg.norm(self.AX1nr)**2)
-        nY = np.sqrt(np.linalg.norm(self.Y)**2 +
-                     np.linalg.norm(self.Y1)**2)
-        rn = max(nAX, nY, np.linalg.norm(self.S))
+        nAX = np.sqrt(sl.l2norm(self.AXnr)**2 +
+                      sl.l2norm(self.AX1nr)**2)
+        nY = np.sqrt(sl.l2norm(self.Y)**2 +
+                     sl.l2norm(self.Y1)**2)
+        rn = max(nAX, nY, sl.l2norm(self.S))
 
         # The normalisation factor for the full dual residual is
         # straightforward to compute
-        sn = self.rho * np.sqrt(np.linalg.norm(self.U)**2 +
-                                np.linalg.norm(self.U1)**2)
+        sn = self.rho * np.sqrt(sl.l2norm(self.U)**2 +
+                                sl.l2norm(self.U1)**2)
 
         # Final residual values and stopping tolerances depend on
         # whether standard or normalised residuals are specified via the
@@ -25,6 +25,7 @@ import sporco.prox as sp
 from sporco.util import u
 from sporco.admm.cbpdn import GenericConvBPDN
 import sporco.cnvrep as cr
+from sporco import shmpool
 # Required due to pyFFTW bug #135 - see "Notes" section of SPORCO docs.
 sl.pyfftw_threads = 1
 
@@ -33,7 +34,10 @@ sl.pyfftw_threads = 1
 __all__ = ['ParConvBPDN']
 
 
-# Initialise global variables required and used my multiprocessing
+# Global variables used by the functions evaluated in the worker
+# processes. They are set from the :class:`.shmpool.SharedNamespace` of
+# a ParConvBPDN object, in both the calling and the worker processes,
+# before these functions are evaluated.
 
 # Conv Rep Indexing and parameter values for multiprocessing
 mp_nproc = None  # Number of processes
@@ -66,6 +70,8 @@ mp_U0 = None  # Lagrange multiplier of DX=Y0
 mp_U1 = None  # Lagrange multiplier of X=Y1
 mp_DX = None  # DX in spatial domain
 mp_DXnr = None  # DX in spatial domain
+mp_Y0old = None  # Value of Y0 in previous iteration
+mp_Y1old = None  # Value of Y1 in previous iteration
 
 # Variables used to solve the optimization efficiently
 mp_inv_off_diag = None  # The off diagonal element of inverse matrix off
@@ -86,48 +92,6 @@ mp_nrmBy = None  # Components of norm of BY for computing epsilon primal
 mp_nrmu = None  # Components of norm of U for computing epsilon dual
 
 
-def mpraw_as_np(shape, dtype):
-    """Construct a numpy array of the specified shape and dtype for
-    which the underlying storage is a multiprocessing RawArray in shared
-    memory.
-
-    Parameters
-    ----------
-    shape : tuple
-      Shape of numpy array
-    dtype : data-type
-      Data type of array
-
-    Returns
-    -------
-    arr : ndarray
-      Numpy array
-    """
-
-    sz = int(np.product(shape))
-    csz = sz * np.dtype(dtype).itemsize
-    raw = mp.RawArray('c', csz)
-    return np.frombuffer(raw, dtype=dtype, count=sz).reshape(shape)
-
-
-
-def init_mpraw(mpv, npv):
-    """Set a global variable as a multiprocessing RawArray in shared
-    memory with a numpy array wrapper and initialise its value.
-
-    Parameters
-    ----------
-    mpv : string
-      Name of global variable to set
-    npv : ndarray
-      Numpy array to use as initialiser for global variable value
-    """
-
-    globals()[mpv] = mpraw_as_np(npv.shape, npv.dtype)
-    globals()[mpv][:] = npv
-
-
-
 def par_xstep(i):
     r"""Minimise Augmented Lagrangian with respect to
     :math:`\mathbf{x}_{G_i}`, one of the disjoint problems of optimizing
@@ -505,7 +469,7 @@ class ParConvBPDN(GenericConvBPDN):
 
 
     def __init__(self, D, S, lmbda=None, W=None, opt=None, nproc=None,
-                 ngrp=None, dimK=None, dimN=2):
+                 ngrp=None, dimK=None, dimN=2, pool=None):
         """
         Parameters
         ----------
@@ -530,9 +494,16 @@ class ParConvBPDN(GenericConvBPDN):
           independent signals
         dimN : int, optional (default 2)
           Number of spatial dimensions
+        pool : SharedMemoryPool or ThreadPool or None, optional (default None)
+          Persistent pool of worker processes
+          (:class:`.shmpool.SharedMemoryPool`) or threads
+          (:class:`.shmpool.ThreadPool`). If ``None``, a pool of worker
+          processes is constructed at the start of each call to
+          :meth:`solve`, and shut down at the end of it.
         """
 
-        self.pool = None
+        self.pool = pool
+        self.extpool = pool
 
         # Set default options if none specified
         if opt is None:
@@ -569,6 +540,8 @@ class ParConvBPDN(GenericConvBPDN):
         # Call parent class __init__
         super(ParConvBPDN, self).__init__(D, S, opt, dimK, dimN)
 
+        if nproc is None and pool is not None:
+            nproc = min(pool.nproc, self.cri.M)
         if nproc is None:
             if ngrp is None:
                 self.nproc = min(mp.cpu_count(), self.cri.M)
@@ -593,134 +566,81 @@ class ParConvBPDN(GenericConvBPDN):
 
         self.xrrs = None
 
-        # Initialise global variables
+        # Initialise the namespace of global variables used by the
+        # functions that are evaluated in the worker processes
+        self.mpns = shmpool.SharedNamespace(
+            __name__, shared=(pool is None or pool.shared))
+        ns = self.mpns
+
         # Conv Rep Indexing and parameter values for multiprocessing
-        global mp_nproc
-        mp_nproc = self.nproc
-        global mp_ngrp
-        mp_ngrp = self.ngrp
-        global mp_Nv
-        mp_Nv = self.cri.Nv
-        global mp_axisN
-        mp_axisN = tuple(i+1 for i in self.cri.axisN)
-        global mp_C
-        mp_C = self.cri.C
-        global mp_Cd
-        mp_Cd = self.cri.Cd
-        global mp_axisC
-        mp_axisC = self.cri.axisC+1
-        global mp_axisM
-        mp_axisM = 0
-        global mp_NonNegCoef
-        mp_NonNegCoef = self.opt['NonNegCoef']
-        global mp_NoBndryCross
-        mp_NoBndryCross = self.opt['NoBndryCross']
-        global mp_Dshp
-        mp_Dshp = self.D.shape
+        ns['mp_nproc'] = self.nproc
+        ns['mp_ngrp'] = self.ngrp
+        ns['mp_Nv'] = self.cri.Nv
+        ns['mp_axisN'] = tuple(i+1 for i in self.cri.axisN)
+        ns['mp_C'] = self.cri.C
+        ns['mp_Cd'] = self.cri.Cd
+        ns['mp_axisC'] = self.cri.axisC+1
+        ns['mp_axisM'] = 0
+        ns['mp_NonNegCoef'] = self.opt['NonNegCoef']
+        ns['mp_NoBndryCross'] = self.opt['NoBndryCross']
+        ns['mp_Dshp'] = self.D.shape
 
         # Parameters for optimization
-        global mp_lmbda
-        mp_lmbda = self.lmbda
-        global mp_rho
-        mp_rho = self.rho
-        global mp_alpha
-        mp_alpha = self.alpha
-        global mp_rlx
-        mp_rlx = self.rlx
-        global mp_wl1
-        init_mpraw('mp_wl1', np.moveaxis(self.wl1, self.cri.axisM, mp_axisM))
+        ns['mp_lmbda'] = self.lmbda
+        ns['mp_rho'] = self.rho
+        ns['mp_alpha'] = self.alpha
+        ns['mp_rlx'] = self.rlx
+        ns.array('mp_wl1', np.moveaxis(self.wl1, self.cri.axisM, 0))
 
         # Matrices used in optimization
-        global mp_S
-        init_mpraw('mp_S', np.moveaxis(self.S*self.W**2, self.cri.axisM,
-                                       mp_axisM))
-        global mp_Df
-        init_mpraw('mp_Df', np.moveaxis(self.Df, self.cri.axisM, mp_axisM))
-        global mp_X
-        init_mpraw('mp_X', np.moveaxis(self.Y, self.cri.axisM, mp_axisM))
-        shp_X = list(mp_X.shape)
-        global mp_Xnr
-        mp_Xnr = mpraw_as_np(mp_X.shape, mp_X.dtype)
-        global mp_Y0
+        ns.array('mp_S', np.moveaxis(self.S*self.W**2, self.cri.axisM, 0))
+        Df = ns.array('mp_Df', np.moveaxis(self.Df, self.cri.axisM, 0))
+        X = ns.array('mp_X', np.moveaxis(self.Y, self.cri.axisM, 0))
+        shp_X = list(X.shape)
+        ns.empty('mp_Xnr', shp_X, X.dtype)
         shp_Y0 = shp_X[:]
         shp_Y0[0] = self.ngrp
-        shp_Y0[mp_axisC] = mp_C
-        if self.opt['Y0'] is not None:
-            init_mpraw('Y0', np.moveaxis(
-                self.opt['Y0'].astype(self.dtype, copy=True),
-                self.cri.axisM, mp_axisM))
-        else:
-            mp_Y0 = mpraw_as_np(shp_Y0, mp_X.dtype)
-        global mp_Y0old
-        mp_Y0old = mpraw_as_np(shp_Y0, mp_X.dtype)
-        global mp_Y1
-        if self.opt['Y1'] is not None:
-            init_mpraw('Y1', np.moveaxis(
-                self.opt['Y1'].astype(self.dtype, copy=True),
-                self.cri.axisM, mp_axisM))
-        else:
-            mp_Y1 = mpraw_as_np(shp_X, mp_X.dtype)
-        global mp_Y1old
-        mp_Y1old = mpraw_as_np(shp_X, mp_X.dtype)
-        global mp_U0
-        if self.opt['U0'] is not None:
-            init_mpraw('U0', np.moveaxis(
-                self.opt['U0'].astype(self.dtype, copy=True),
-                self.cri.axisM, mp_axisM))
-        else:
-            mp_U0 = mpraw_as_np(shp_Y0, mp_X.dtype)
-        global mp_U1
-        if self.opt['U1'] is not None:
-            init_mpraw('U1', np.moveaxis(
-                self.opt['U1'].astype(self.dtype, copy=True),
-                self.cri.axisM, mp_axisM))
-        else:
-            mp_U1 = mpraw_as_np(shp_X, mp_X.dtype)
-        global mp_DX
-        mp_DX = mpraw_as_np(shp_Y0, mp_X.dtype)
-        global mp_DXnr
-        mp_DXnr = mpraw_as_np(shp_Y0, mp_X.dtype)
+        shp_Y0[self.cri.axisC+1] = self.cri.C
+        for name, shp in (('Y0', shp_Y0), ('Y1', shp_X), ('U0', shp_Y0),
+                          ('U1', shp_X)):
+            if self.opt[name] is not None:
+                ns.array('mp_' + name, np.moveaxis(
+                    self.opt[name].astype(self.dtype, copy=True),
+                    self.cri.axisM, 0))
+            else:
+                ns.empty('mp_' + name, shp, X.dtype)
+        ns.empty('mp_Y0old', shp_Y0, X.dtype)
+        ns.empty('mp_Y1old', shp_X, X.dtype)
+        ns.empty('mp_DX', shp_Y0, X.dtype)
+        ns.empty('mp_DXnr', shp_Y0, X.dtype)
 
         # Variables used to solve the optimization efficiently
-        global mp_inv_off_diag
         if self.W.ndim is self.cri.axisM+1:
-            init_mpraw('mp_inv_off_diag', np.moveaxis(
-                -self.W**2/(mp_rho*(mp_rho+self.W**2*mp_ngrp)),
-                self.cri.axisM, mp_axisM))
+            ns.array('mp_inv_off_diag', np.moveaxis(
+                -self.W**2/(self.rho*(self.rho+self.W**2*self.ngrp)),
+                self.cri.axisM, 0))
         else:
-            init_mpraw('mp_inv_off_diag',
-                       -self.W**2/(mp_rho*(mp_rho+self.W**2*mp_ngrp)))
-        global mp_grp
-        mp_grp = [np.min(i) for i in
-                  np.array_split(np.array(range(self.cri.M)),
-                                 mp_ngrp)] + [self.cri.M, ]
-        global mp_cache
+            ns.array('mp_inv_off_diag',
+                     -self.W**2/(self.rho*(self.rho+self.W**2*self.ngrp)))
+        grp = [np.min(i) for i in
+               np.array_split(np.array(range(self.cri.M)),
+                              self.ngrp)] + [self.cri.M, ]
+        ns['mp_grp'] = grp
         if self.opt['HighMemSolve'] and self.cri.Cd == 1:
-            mp_cache = [sl.solvedbi_sm_c(mp_Df[k], np.conj(mp_Df[k]),
-                                         mp_alpha**2, mp_axisM) for k in
-                        np.array_split(np.array(range(self.cri.M)), self.ngrp)]
+            ns.array('mp_cache', [
+                sl.solvedbi_sm_c(Df[k], np.conj(Df[k]), self.alpha**2, 0)
+                for k in np.array_split(np.array(range(self.cri.M)),
+                                        self.ngrp)])
         else:
-            mp_cache = [None for k in mp_grp]
-        global mp_b
+            ns['mp_cache'] = [None for k in grp]
         shp_b = shp_Y0[:]
         shp_b[0] = 1
-        mp_b = mpraw_as_np(shp_b, mp_X.dtype)
+        ns.empty('mp_b', shp_b, X.dtype)
 
         # Residual and stopping criteria variables
-        global mp_ry0
-        mp_ry0 = mpraw_as_np((self.ngrp,), mp_X.dtype)
-        global mp_ry1
-        mp_ry1 = mpraw_as_np((self.ngrp,), mp_X.dtype)
-        global mp_sy0
-        mp_sy0 = mpraw_as_np((self.ngrp,), mp_X.dtype)
-        global mp_sy1
-        mp_sy1 = mpraw_as_np((self.ngrp,), mp_X.dtype)
-        global mp_nrmAx
-        mp_nrmAx = mpraw_as_np((self.ngrp,), mp_X.dtype)
-        global mp_nrmBy
-        mp_nrmBy = mpraw_as_np((self.ngrp,), mp_X.dtype)
-        global mp_nrmu
-        mp_nrmu = mpraw_as_np((self.ngrp,), mp_X.dtype)
+        for name in ('mp_ry0', 'mp_ry1', 'mp_sy0', 'mp_sy1', 'mp_nrmAx',
+                     'mp_nrmBy', 'mp_nrmu'):
+            ns.empty(name, (self.ngrp,), X.dtype)
 
 
 
@@ -752,9 +672,7 @@ class ParConvBPDN(GenericConvBPDN):
           to compute residuals and implemented ``AutoRho`` mechanism
         """
 
-        global mp_Y0old
-        global mp_Y1old
-
+        self.mpns.activate()
         self.init_pool()
 
         fmtstr, nsep = self.display_start()
@@ -839,13 +757,8 @@ class ParConvBPDN(GenericConvBPDN):
         """Initialize multiprocessing pool if necessary."""
 
         # initialize the pool if needed
-        if self.pool is None:
-            if self.nproc > 1:
-                self.pool = mp.Pool(processes=self.nproc)
-            else:
-                self.pool = None
-        else:
-            print('pool already initialized?')
+        if self.pool is None and self.nproc > 1:
+            self.pool = shmpool.SharedMemoryPool(self.nproc)
 
 
 
@@ -864,17 +777,16 @@ class ParConvBPDN(GenericConvBPDN):
         if self.pool is None:
             return [f(i) for i in range(n)]
         else:
-            return self.pool.map(f, range(n))
+            return self.pool.map(f, range(n), self.mpns)
 
 
 
     def terminate_pool(self):
-        """Terminate and close the multiprocessing pool if necessary."""
+        """Terminate and close the multiprocessing pool if it was
+        constructed by :meth:`init_pool`."""
 
-        if self.pool is not None:
-            self.pool.terminate()
-            self.pool.join()
-            del(self.pool)
+        if self.pool is not None and self.pool is not self.extpool:
+            self.pool.close()
             self.pool = None
 
 
@@ -116,9 +116,7 @@ class ConvProdDictBPDN(cbpdn.ConvBPDN):
 
         if D is not None or not hasattr(self, 'Df'):
             self.Df = sl.rfftn(self.D, self.cri.Nv, self.cri.axisN)
-            self.DSf = np.conj(self.Df) * self.Sf
-            self.DSfBQ = sl.dot(self.B.dot(self.Q).T, self.DSf,
-                                axis=self.cri.axisC)
+            self.setdsf()
 
         # Fold square root of Gamma into the dictionary array to enable
         # use of the solvedbi_sm solver
@@ -127,11 +125,18 @@ class ConvProdDictBPDN(cbpdn.ConvBPDN):
         Gamma2 = np.sqrt(self.Gamma).reshape(shpg)
         self.gDf = Gamma2 * self.Df
 
-        if self.opt['HighMemSolve']:
-            self.c = sl.solvedbi_sm_c(self.gDf, np.conj(self.gDf), self.rho,
-                                      self.cri.axisM)
-        else:
-            self.c = None
+        self.xslv = sl.SMSolver(self.gDf, self.rho, self.cri.axisM,
+                                cache=self.opt['HighMemSolve'])
+
+
+
+    def setdsf(self):
+        """Compute :math:`D^H S` in the DFT domain from the current
+        dictionary and signal."""
+
+        self.DSf = np.conj(self.Df) * self.Sf
+        self.DSfBQ = sl.dot(self.B.dot(self.Q).T, self.DSf,
+                            axis=self.cri.axisC)
 
 
 
@@ -139,13 +144,12 @@ class ConvProdDictBPDN(cbpdn.ConvBPDN):
         r"""Minimise Augmented Lagrangian with respect to
         :math:`\mathbf{x}`."""
 
-        self.YU[:] = self.Y - self.U
-        Zf = sl.rfftn(self.YU, None, self.cri.axisN)
+        np.subtract(self.Y, self.U, out=self.dftp.a)
+        Zf = self.dftp.rfftn()
         ZfQ = sl.dot(self.Q.T, Zf, axis=self.cri.axisC)
         b = self.DSfBQ + self.rho * ZfQ
 
-        Xh = sl.solvedbi_sm(self.gDf, self.rho, b, self.c,
-                            axis=self.cri.axisM)
+        Xh = self.xslv.solve(b, out=b)
         self.Xf[:] = sl.dot(self.Q, Xh, axis=self.cri.axisC)
         self.X = sl.irfftn(self.Xf, self.cri.Nv, self.cri.axisN)
 
@@ -175,11 +179,9 @@ class ConvProdDictBPDN(cbpdn.ConvBPDN):
 
 
     def rhochange(self):
-        """Updated cached c array when rho changes."""
+        """Updated cached solver when rho changes."""
 
-        if self.opt['HighMemSolve']:
-            self.c = sl.solvedbi_sm_c(self.gDf, np.conj(self.gDf), self.rho,
-                                      self.cri.axisM)
+        self.xslv.setrho(self.rho)
 
 
 
@@ -283,7 +285,7 @@ class ConvProdDictBPDNJoint(ConvProdDictBPDN):
         :math:`\| Y \|_{2,1}`.
         """
 
-        rl1 = np.linalg.norm((self.wl1 * self.obfn_gvar()).ravel(), 1)
+        rl1 = sl.l1norm(self.wl1 * self.obfn_gvar())
         rl21 = np.sum(np.sqrt(np.sum(self.obfn_gvar()**2,
                                      axis=self.cri.axisC)))
         return (self.lmbda*rl1 + self.mu*rl21, rl1, rl21)
@@ -577,7 +579,7 @@ class ConvProdDictL1L1Grd(cbpdn.ConvL1L1Grd):
     def rsdl_sn(self, U):
         """Compute dual residual normalisation term."""
 
-        return self.rho * np.linalg.norm(U)
+        return self.rho * sl.l2norm(U)
 
 
 
@@ -0,0 +1,391 @@
+# -*- coding: utf-8 -*-
+# Copyright (C) 2019 by Brendt Wohlberg <brendt@ieee.org>
+# All rights reserved. BSD 3-clause License.
+# This file is part of the SPORCO package. Details of the copyright
+# and user license can be found in the 'LICENSE.txt' file distributed
+# with the package.
+
+"""Tiled (overlap-save) driver for Convolutional BPDN of large signals"""
+
+from __future__ import division
+from __future__ import absolute_import
+from builtins import range
+from builtins import object
+
+import copy
+import itertools
+import platform
+import multiprocessing as mp
+import numpy as np
+
+from sporco import cdict
+import sporco.cnvrep as cr
+import sporco.linalg as sl
+from sporco.admm import cbpdn
+
+
+__author__ = """Brendt Wohlberg <brendt@ieee.org>"""
+
+
+__all__ = ['TiledConvBPDN']
+
+
+# Global variables used by the tile solver when tiles are solved by a
+# pool of worker processes. They are set before the pool is created so
+# that (potentially very large) signal arrays are inherited by the
+# worker processes rather than being pickled and sent to them.
+mp_D = None  # Dictionary
+mp_S = None  # Signal
+mp_lmbda = None  # Regularisation parameter
+mp_opt = None  # ConvBPDN options
+mp_dimK = None  # Number of signal dimensions in S
+mp_dimN = None  # Number of spatial dimensions
+mp_margin = None  # Tile margin on each spatial axis
+
+
+
+def tile_index(Nv, tilesz, margin, tile):
+    """Construct the index arrays for extraction of an extended tile.
+
+    Construct index arrays selecting the region of a signal with
+    spatial shape `Nv` that consists of a tile core, specified by
+    its start and stop indices on each spatial axis, extended by
+    `margin` samples on either side. Indices outside of the signal
+    are wrapped around, consistent with the periodic boundary
+    conditions of the DFT-domain solution of the problem on the full
+    signal.
+
+    Parameters
+    ----------
+    Nv : tuple of ints
+      Spatial shape of the full signal
+    tilesz : tuple of ints
+      Spatial shape of the tile core
+    margin : tuple of ints
+      Margin on each side of the tile core, for each spatial axis
+    tile : tuple of ints
+      Start indices of the tile core for each spatial axis
+
+    Returns
+    -------
+    idx : tuple of ndarrays
+      Broadcastable index arrays for the leading spatial axes of the
+      signal
+    """
+
+    dimN = len(Nv)
+    idx = []
+    for n in range(dimN):
+        i = np.mod(np.arange(tile[n] - margin[n],
+                             tile[n] + tilesz[n] + margin[n]), Nv[n])
+        idx.append(i.reshape((1,) * n + (-1,) + (1,) * (dimN - n - 1)))
+    return tuple(idx)
+
+
+
+def tile_solve(tile):
+    """Solve the CBPDN problem for a single tile, using the signal and
+    parameters in the module global variables.
+
+    Parameters
+    ----------
+    tile : tuple of tuples of ints
+      Start and stop indices of the tile core for each spatial axis
+
+    Returns
+    -------
+    X : ndarray
+      Coefficient maps for the tile core
+    itstat : dict or None
+      Final iteration statistics of the tile solver
+    """
+
+    start = tuple(t[0] for t in tile)
+    tilesz = tuple(t[1] - t[0] for t in tile)
+    idx = tile_index(mp_S.shape[0:mp_dimN], tilesz, mp_margin, start)
+    Stl = np.asarray(mp_S[idx])
+    b = cbpdn.ConvBPDN(mp_D, Stl, mp_lmbda, opt=mp_opt, dimK=mp_dimK,
+                       dimN=mp_dimN)
+    X = b.solve()
+    core = tuple(slice(m, m + n) for m, n in zip(mp_margin, tilesz))
+    return X[core], b.itstat[-1]._asdict() if b.itstat else None
+
+
+
+def init_pool(wisdom):
+    """Initialise a tile solver worker process.
+
+    Parameters
+    ----------
+    wisdom : tuple or None
+      FFTW wisdom exported by the parent process
+    """
+
+    # Required due to pyFFTW bug #135 - see "Notes" section of SPORCO docs.
+    sl.pyfftw_threads = 1
+    sl.import_fftw_wisdom(wisdom)
+
+
+
+
+
+class TiledConvBPDN(object):
+    r"""
+    Tiled solver for the Convolutional BPDN problem on signals that
+    are too large to be solved by :class:`.admm.cbpdn.ConvBPDN` in a
+    single piece.
+
+    The problem
+
+    .. math::
+       \mathrm{argmin}_\mathbf{x} \;
+       (1/2) \left\| \sum_m \mathbf{d}_m * \mathbf{x}_m -
+       \mathbf{s} \right\|_2^2 + \lambda \sum_m \| \mathbf{x}_m \|_1
+
+    is approximately solved by partitioning the spatial domain of the
+    coefficient maps into non-overlapping tile cores, and solving, for
+    each tile, a :class:`.admm.cbpdn.ConvBPDN` problem on the region
+    of the signal consisting of the tile core extended by a margin on
+    all sides (overlap-save). Only the coefficient maps of the tile
+    core are retained, so that the boundary artifacts due to the
+    periodic boundary conditions of the tile problem are discarded.
+    The extended tiles are extracted from the signal with periodic
+    extension at the signal boundary, so that the solution
+    approximates that of :class:`.admm.cbpdn.ConvBPDN` on the full
+    signal, with an accuracy that improves with the margin size.
+
+    The memory required by each tile solver is determined by the
+    extended tile size rather than the signal size. The signal and
+    the coefficient map output array may be :class:`numpy.memmap`
+    arrays, in which case the full problem need not fit in memory.
+    Tiles may be solved in parallel by a pool of worker processes
+    (not supported under Windows).
+    """
+
+
+    class Options(cdict.ConstrainedDict):
+        """Tiled ConvBPDN algorithm options.
+
+        Options:
+
+          ``TileSize`` : Size of tile core on each spatial axis. If an
+          int, the same value is used on all spatial axes.
+
+          ``Margin`` : Size of the margin by which each tile core is
+          extended on each side on each spatial axis. If an int, the
+          same value is used on all spatial axes. If ``None``, twice
+          the dictionary filter size is used.
+
+          ``NumProcesses`` : Number of worker processes used to solve
+          the tile problems. If ``None``, the number of CPUs is used.
+          If 1, the tiles are solved in the calling process.
+
+          ``CBPDN`` : Options :class:`.admm.cbpdn.ConvBPDN.Options`
+          for the tile solvers.
+        """
+
+        defaults = {'TileSize': 256, 'Margin': None, 'NumProcesses': 1,
+                    'CBPDN': copy.deepcopy(cbpdn.ConvBPDN.Options.defaults)}
+
+
+        def __init__(self, opt=None):
+            """
+            Parameters
+            ----------
+            opt : dict or None, optional (default None)
+              TiledConvBPDN algorithm options
+            """
+
+            cdict.ConstrainedDict.__init__(self, {
+                'CBPDN': cbpdn.ConvBPDN.Options()})
+            if opt is None:
+                opt = {}
+            self.update(opt)
+
+
+
+    def __init__(self, D, S, lmbda, opt=None, dimK=None, dimN=2):
+        """
+        Parameters
+        ----------
+        D : array_like
+          Dictionary array
+        S : array_like
+          Signal array, which may be a :class:`numpy.memmap`
+        lmbda : float
+          Regularisation parameter. (Unlike
+          :class:`.admm.cbpdn.ConvBPDN`, no default value is computed
+          since this would require the DFT of the full signal.)
+        opt : :class:`TiledConvBPDN.Options` object
+          Algorithm options
+        dimK : 0, 1, or None, optional (default None)
+          Number of dimensions in input signal corresponding to multiple
+          independent signals
+        dimN : int, optional (default 2)
+          Number of spatial dimensions
+        """
+
+        if opt is None:
+            opt = TiledConvBPDN.Options()
+        self.opt = opt
+
+        self.cri = cr.CSC_ConvRepIndexing(D, S, dimK=dimK, dimN=dimN)
+        self.D = D
+        self.S = S
+        self.lmbda = lmbda
+        self.dimK = dimK
+        self.dimN = dimN
+        if opt['CBPDN', 'DataType'] is None:
+            self.dtype = S.dtype
+        else:
+            self.dtype = np.dtype(opt['CBPDN', 'DataType'])
+
+        self.tilesz = self._axis_tuple(opt['TileSize'])
+        if opt['Margin'] is None:
+            self.margin = tuple(2 * D.shape[n] for n in range(dimN))
+        else:
+            self.margin = self._axis_tuple(opt['Margin'])
+        self.tiles = self.tile_list()
+        self.itstat = []
+        self.X = None
+
+
+
+    def _axis_tuple(self, val):
+        """Convert an int or sequence of ints to a tuple with one entry
+        per spatial axis."""
+
+        if isinstance(val, int):
+            return (val,) * self.dimN
+        else:
+            return tuple(val)
+
+
+
+    def tile_list(self):
+        """Construct the list of tile cores partitioning the spatial
+        domain of the signal.
+
+        Returns
+        -------
+        tiles : list of tuples of tuples of ints
+          List of tiles, each represented by a tuple of (start, stop)
+          index pairs for each spatial axis
+        """
+
+        axtl = [[(k, min(k + t, n)) for k in range(0, n, t)]
+                for n, t in zip(self.cri.Nv, self.tilesz)]
+        return list(itertools.product(*axtl))
+
+
+
+    def solve(self, out=None):
+        """Solve the tile problems and stitch the tile core coefficient
+        maps into the full coefficient map array.
+
+        Parameters
+        ----------
+        out : ndarray or None, optional (default None)
+          Array into which the coefficient maps are written. It should
+          have shape ``self.cri.shpX``, and may be a
+          :class:`numpy.memmap`. If ``None``, a new array is allocated.
+
+        Returns
+        -------
+        X : ndarray
+          Coefficient maps
+        """
+
+        if out is None:
+            out = np.zeros(self.cri.shpX, dtype=self.dtype)
+
+        global mp_D, mp_S, mp_lmbda, mp_opt, mp_dimK, mp_dimN, mp_margin
+        mp_D = self.D
+        mp_S = self.S
+        mp_lmbda = self.lmbda
+        mp_opt = self.opt['CBPDN']
+        mp_dimK = self.dimK
+        mp_dimN = self.dimN
+        mp_margin = self.margin
+
+        nproc = self.opt['NumProcesses']
+        if nproc is None:
+            nproc = mp.cpu_count()
+        nproc = min(nproc, len(self.tiles))
+
+        self.itstat = []
+        if platform.system() == 'Windows' or nproc == 1:
+            results = map(tile_solve, self.tiles)
+            pool = None
+        else:
+            pool = mp.Pool(processes=nproc, initializer=init_pool,
+                           initargs=(sl.export_fftw_wisdom(),))
+            results = pool.imap(tile_solve, self.tiles)
+        try:
+            for tile, (Xtl, itst) in zip(self.tiles, results):
+                core = tuple(slice(t[0], t[1]) for t in tile)
+                out[core] = Xtl
+                self.itstat.append(itst)
+        finally:
+            if pool is not None:
+                pool.close()
+                pool.join()
+            mp_S = None
+
+        self.X = out
+        return self.X
+
+
+
+    def reconstruct(self, X=None, out=None):
+        """Reconstruct the representation, computed tile by tile.
+
+        Parameters
+        ----------
+        X : ndarray or None, optional (default None)
+          Coefficient maps. If ``None``, the coefficient maps computed
+          by :meth:`solve` are used.
+        out : ndarray or None, optional (default None)
+          Array into which the reconstruction is written. It should
+          have shape ``self.cri.shpS``, and may be a
+          :class:`numpy.memmap`. If ``None``, a new array is allocated.
+
+        Returns
+        -------
+        Sr : ndarray
+          Reconstructed signal
+        """
+
+        if X is None:
+            X = self.X
+        if out is None:
+            out = np.zeros(self.cri.shpS, dtype=self.dtype)
+        else:
+            out[:] = 0
+
+        dimN = self.dimN
+        Nv = self.cri.Nv
+        D = self.D.reshape(self.cri.shpD)
+        # Each tile core contributes to the reconstruction on the core
+        # extended by the filter support, with periodic wrap-around at
+        # the signal boundary, as in the DFT-domain reconstruction of
+        # the full signal
+        ext = tuple(D.shape[n] - 1 for n in range(dimN))
+        for tile in self.tiles:
+            start = tuple(t[0] for t in tile)
+            tilesz = tuple(t[1] - t[0] for t in tile)
+            core = tuple(slice(t[0], t[1]) for t in tile)
+            shp = tuple(n + e for n, e in zip(tilesz, ext))
+            Df = sl.rfftn(D, shp, self.cri.axisN)
+            Xf = sl.rfftn(np.asarray(X[core]), shp, self.cri.axisN)
+            DXtl = sl.irfftn(sl.inner(Df, Xf, axis=self.cri.axisM), shp,
+                             self.cri.axisN)
+            idx = tile_index(Nv, shp, (0,) * dimN, start)
+            if all(s <= n for s, n in zip(shp, Nv)):
+                out[idx] += DXtl
+            else:
+                # Indices repeat when the extended tile is larger than
+                # the signal, so unbuffered addition is required
+                np.add.at(out, idx, DXtl)
+
+        return out.reshape(self.S.shape)
@@ -234,6 +234,40 @@ def _pyfftw_rfftn_empty_aligned(shape, axes, dtype, order='C', n=None):
     return cp.empty(ashp, cdtype, order)
 
 
+class _RFFTPlan(object):
+    """Patched version of :class:`sporco.linalg.RFFTPlan`."""
+
+    def __init__(self, shape, axes, dtype):
+        self.shape = tuple(shape)
+        self.axes = tuple(axes)
+        self.dtype = cp.dtype(dtype)
+        self.a = cp.zeros(self.shape, self.dtype)
+        self.af = _pyfftw_rfftn_empty_aligned(self.shape, self.axes,
+                                              self.dtype)
+        self.af[:] = 0
+
+    def rfftn(self, a=None, out=None):
+        if a is not None and a is not self.a:
+            self.a[:] = a
+        self.af[:] = cp.fft.rfftn(self.a, None, self.axes)
+        if out is None:
+            return self.af
+        else:
+            out[:] = self.af
+            return out
+
+    def irfftn(self, af=None, out=None):
+        if af is not None and af is not self.af:
+            self.af[:] = af
+        self.a[:] = cp.fft.irfftn(self.af, [self.shape[k] for k in
+                                            self.axes], self.axes)
+        if out is None:
+            return self.a
+        else:
+            out[:] = self.a
+            return out
+
+
 def _fftconv(a, b, axes=(0, 1)):
     """Patched version of :func:`sporco.linalg.fftconv`."""
 
@@ -335,7 +369,8 @@ linalg = sporco_cupy_patch_module(
      'pyfftw_byte_aligned': _pyfftw_byte_aligned,
      'pyfftw_empty_aligned': _pyfftw_empty_aligned,
      'pyfftw_rfftn_empty_aligned': _pyfftw_rfftn_empty_aligned,
-     'fftconv': _fftconv, 'inner': _inner, 'zdivide': _zdivide,
+     'RFFTPlan': _RFFTPlan, 'fftconv': _fftconv, 'inner': _inner,
+     'zdivide': _zdivide,
      'cho_factor': _linalg_cho_factor, 'cho_solve_ATAI': _cho_solve_ATAI,
      'cho_solve_AATI': _cho_solve_AATI})
 
@@ -26,14 +26,21 @@ admm = sporco_cupy_patch_module('sporco.admm')
 
 # Construct sporco.cupy.admm.admm
 admm.admm = sporco_cupy_patch_module('sporco.admm.admm',
-                                     {'util': util, 'common': common})
+                                     {'util': util, 'common': common,
+                                      'sl': linalg})
 
 
 def _update_rho(self, k, r, s):
     """
     Patched version of :func:`sporco.admm.admm.ADMM.update_rho`."""
 
-    if self.opt['AutoRho', 'Enabled']:
+    if self.opt['AutoRho', 'Enabled'] and self.opt['AutoRho', 'Spectral']:
+        rsf = self.spectral_rho_factor(k)
+        if rsf != 1.0:
+            self.rho *= float(rsf)
+            self.U /= rsf
+            self.rhochange()
+    elif self.opt['AutoRho', 'Enabled']:
         tau = self.rho_tau
         mu = self.rho_mu
         xi = self.rho_xi
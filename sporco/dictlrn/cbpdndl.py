@@ -338,6 +338,24 @@ class ConvBPDNDictLearn(dictlrn.DictLearn):
 
           ``DictSize`` : Dictionary size vector.
 
+          ``WarmStart`` : Initialisation of the sparse coding solver at
+          each outer iteration. Valid values are:
+
+            ``'Full'`` : All working variables, and the penalty (ADMM)
+            or step size (FISTA) parameter, are retained from the
+            previous outer iteration.
+
+            ``'ResetRho'`` : The working variables are retained, but the
+            ADMM penalty parameter is reset to its initial value, with
+            the scaled dual variable rescaled accordingly. (The FISTA
+            step size parameter is reset to its initial value.)
+
+            ``'Primal'`` : As for ``'ResetRho'``, except that the ADMM
+            dual variable is reset to zero.
+
+            ``None`` : The solver is initialised from zero at every
+            outer iteration.
+
           ``CBPDN`` : An options class appropriate for the selected
           sparse coding solver class
 
@@ -346,7 +364,8 @@ class ConvBPDNDictLearn(dictlrn.DictLearn):
         """
 
         defaults = copy.deepcopy(dictlrn.DictLearn.Options.defaults)
-        defaults.update({'DictSize': None, 'AccurateDFid': False})
+        defaults.update({'DictSize': None, 'AccurateDFid': False,
+                         'WarmStart': 'Full'})
 
 
         def __init__(self, opt=None, xmethod=None, dmethod=None):
@@ -433,6 +452,9 @@ class ConvBPDNDictLearn(dictlrn.DictLearn):
             raise ValueError('Parameters xmethod and dmethod must have the '
                              'same values used to initialise the Options '
                              'object')
+        if opt['WarmStart'] not in ('Full', 'ResetRho', 'Primal', None):
+            raise ValueError('Invalid value %s for option WarmStart' %
+                             opt['WarmStart'])
         self.opt = opt
         self.xmethod = xmethod
         self.dmethod = dmethod
@@ -477,6 +499,28 @@ class ConvBPDNDictLearn(dictlrn.DictLearn):
 
 
 
+    def pre_xstep(self):
+        """Initialise the X update object, at each outer iteration after
+        the first, as specified by option ``WarmStart``. This is not
+        done at the end of the previous outer iteration since the
+        iteration statistics of the X update object are required for
+        the iteration statistics of that outer iteration.
+        """
+
+        wstrt = self.opt['WarmStart']
+        if self.j == 0 or wstrt == 'Full':
+            return
+        if wstrt is None:
+            self.xstep.reset()
+        elif self.xmethod == 'fista':
+            self.xstep.reset(self.xstep.X)
+        elif wstrt == 'Primal':
+            self.xstep.reset(self.xstep.Y)
+        else:
+            self.xstep.rescale_dual()
+            self.xstep.reset(self.xstep.Y, self.xstep.U)
+
+
 
     def getdict(self, crop=True):
         """Get final dictionary. If ``crop`` is ``True``, apply
@@ -529,7 +529,7 @@ class ConvBPDNMaskDictLearn(dictlrn.DictLearn):
         if self.opt['AccurateDFid']:
             DX = self.reconstruct()
             S = self.xstep.S
-            dfd = (np.linalg.norm(self.xstep.W * (DX - S))**2) / 2.0
+            dfd = (sl.l2norm(self.xstep.W * (DX - S))**2) / 2.0
             if self.xmethod == 'fista':
                 X = self.xstep.getcoef()
             else:
@@ -131,6 +131,24 @@ class IterStatsConfig(object):
 
 
 
+    def append_fields(self, flds):
+        """Append fields to the IterationStats namedtuple. The values
+        of these fields are taken from the entries with the same
+        labels in the dict returned by :meth:`DictLearn.evaluate`.
+
+        Parameters
+        ----------
+        flds : tuple of strings
+          Field names to be appended
+        """
+
+        isfld = self.IterationStats._fields + tuple(flds)
+        self.IterationStats = collections.namedtuple('IterationStats', isfld)
+        self.evlmap = dict(self.evlmap)
+        self.evlmap.update({fnm: fnm for fnm in flds})
+
+
+
     def printheader(self):
         """Print status display header and separator strings."""
 
@@ -161,6 +179,150 @@ class IterStatsConfig(object):
 
 
 
+class InnerIterScheduler(object):
+    """Adaptive scheduler for the inner iterations of the X and D steps
+    of a dictionary learning algorithm (inexact alternation).
+
+    The iteration limit (option ``MaxMainIter``) and relative stopping
+    tolerance (option ``RelStopTol``) of the X and D step solvers are
+    set before each outer iteration of :meth:`DictLearn.solve`.
+    Initially, a small number of iterations and a loose tolerance are
+    used. When the relative change in the outer functional value
+    falls below a plateau threshold, the iteration limits are
+    increased and the tolerances are decreased by a constant factor,
+    until they reach the values specified in the options of the X and
+    D step solvers when the schedule started. The schedule used at
+    each outer iteration is recorded in :attr:`DictLearn.itstat` in
+    fields ``XMaxIter``, ``DMaxIter``, ``XRelStopTol``, and
+    ``DRelStopTol``. The X and D step solver options are restored to
+    their original values at the end of :meth:`DictLearn.solve`.
+    """
+
+    itstat_fields = ('XMaxIter', 'DMaxIter', 'XRelStopTol', 'DRelStopTol')
+    """Fields appended to the DictLearn IterationStats namedtuple"""
+
+
+    def __init__(self, xiter0=5, diter0=5, xtol0=1e-1, dtol0=1e-1,
+                 factor=2.0, plateau=1e-2):
+        """
+        Parameters
+        ----------
+        xiter0 : int, optional (default 5)
+          Initial X step iteration limit
+        diter0 : int, optional (default 5)
+          Initial D step iteration limit
+        xtol0 : float, optional (default 1e-1)
+          Initial X step relative stopping tolerance
+        dtol0 : float, optional (default 1e-1)
+          Initial D step relative stopping tolerance
+        factor : float, optional (default 2.0)
+          Factor by which iteration limits are increased, and stopping
+          tolerances are decreased, when the functional value plateaus
+        plateau : float, optional (default 1e-2)
+          Threshold for relative change in the functional value below
+          which it is considered to have reached a plateau
+        """
+
+        self.xiter0 = xiter0
+        self.diter0 = diter0
+        self.xtol0 = xtol0
+        self.dtol0 = dtol0
+        self.factor = factor
+        self.plateau = plateau
+        self.dl = None
+
+
+
+    def start(self, dl):
+        """Record the X and D step solver options at the start of
+        :meth:`DictLearn.solve`, initialising the schedule if it is
+        not already in progress for `dl`.
+
+        Parameters
+        ----------
+        dl : :class:`DictLearn` object
+          Dictionary learning object
+        """
+
+        self.xopt = (dl.xstep.opt['MaxMainIter'], dl.xstep.opt['RelStopTol'])
+        self.dopt = (dl.dstep.opt['MaxMainIter'], dl.dstep.opt['RelStopTol'])
+        if self.dl is not dl:
+            self.dl = dl
+            self.xiter = min(self.xiter0, self.xopt[0])
+            self.diter = min(self.diter0, self.dopt[0])
+            self.xtol = max(self.xtol0, self.xopt[1])
+            self.dtol = max(self.dtol0, self.dopt[1])
+            self.fprv = None
+
+
+
+    def apply(self, dl):
+        """Set the X and D step solver options for the next outer
+        iteration.
+
+        Parameters
+        ----------
+        dl : :class:`DictLearn` object
+          Dictionary learning object
+
+        Returns
+        -------
+        sched : dict
+          Dict mapping the fields in :attr:`itstat_fields` to the
+          values applied
+        """
+
+        dl.xstep.opt['MaxMainIter'] = self.xiter
+        dl.xstep.opt['RelStopTol'] = self.xtol
+        dl.dstep.opt['MaxMainIter'] = self.diter
+        dl.dstep.opt['RelStopTol'] = self.dtol
+        return dict(XMaxIter=self.xiter, DMaxIter=self.diter,
+                    XRelStopTol=self.xtol, DRelStopTol=self.dtol)
+
+
+
+    def update(self, fval):
+        """Update the schedule based on the functional value at the
+        end of an outer iteration.
+
+        Parameters
+        ----------
+        fval : float or None
+          Functional value. If ``None``, the schedule is not updated.
+        """
+
+        if fval is None:
+            return
+        if self.fprv is not None:
+            dlt = abs(self.fprv - fval) / max(abs(self.fprv), 1e-30)
+            if dlt < self.plateau:
+                self.xiter = min(int(round(self.factor * self.xiter)),
+                                 self.xopt[0])
+                self.diter = min(int(round(self.factor * self.diter)),
+                                 self.dopt[0])
+                self.xtol = max(self.xtol / self.factor, self.xopt[1])
+                self.dtol = max(self.dtol / self.factor, self.dopt[1])
+        self.fprv = fval
+
+
+
+    def finish(self, dl):
+        """Restore the X and D step solver options recorded by
+        :meth:`start`.
+
+        Parameters
+        ----------
+        dl : :class:`DictLearn` object
+          Dictionary learning object
+        """
+
+        dl.xstep.opt['MaxMainIter'], dl.xstep.opt['RelStopTol'] = self.xopt
+        dl.dstep.opt['MaxMainIter'], dl.dstep.opt['RelStopTol'] = self.dopt
+
+
+
+
+
 class _DictLearn_Meta(type):
     """Metaclass for DictLearn class that handles intialisation of the
     object initialisation timer and stopping this timer at the end of
@@ -209,11 +371,17 @@ class DictLearn(with_metaclass(_DictLearn_Meta, object)):
 
           ``Callback`` : Callback function to be called at the end of
           every iteration.
+
+          ``InnerSchedule`` : An :class:`InnerIterScheduler` object
+          determining the inner iteration limits and stopping
+          tolerances of the X and D steps at each outer iteration. If
+          ``None``, the options of the X and D step objects are used
+          without modification.
         """
 
         defaults = {'Verbose': False, 'StatusHeader': True,
                     'IterTimer': 'solve', 'MaxMainIter': 1000,
-                    'Callback': None}
+                    'Callback': None, 'InnerSchedule': None}
 
 
         def __init__(self, opt=None):
@@ -275,6 +443,8 @@ class DictLearn(with_metaclass(_DictLearn_Meta, object)):
                         'r_D': 'DPrRsdl', 's_D': 'DDlRsdl',
                         u('ρ_D'): 'DRho'}
             )
+        if self.opt['InnerSchedule'] is not None:
+            isc.append_fields(self.opt['InnerSchedule'].itstat_fields)
         self.isc = isc
 
         self.xstep = xstep
@@ -323,57 +493,101 @@ class DictLearn(with_metaclass(_DictLearn_Meta, object)):
         # Reset timer
         self.timer.start(['solve', 'solve_wo_eval'])
 
-        # Main optimisation iterations
-        for self.j in range(self.j, self.j + self.opt['MaxMainIter']):
-
-            # X update
-            self.xstep.solve()
-            self.post_xstep()
+        # Initialise inner iteration schedule
+        sched = self.opt['InnerSchedule']
+        if sched is not None:
+            sched.start(self)
+
+        # The X and D step options modified by the inner iteration
+        # schedule are restored even if an exception is raised
+        try:
+            # Main optimisation iterations
+            for self.j in range(self.j, self.j + self.opt['MaxMainIter']):
+
+                # Set inner iteration limits
+                if sched is not None:
+                    schd = sched.apply(self)
+
+                # X update
+                self.pre_xstep()
+                self.xstep.solve()
+                self.post_xstep()
+
+                # D update
+                self.dstep.solve()
+                self.post_dstep()
+
+                # Evaluate functional
+                self.timer.stop('solve_wo_eval')
+                evl = self.evaluate()
+                self.timer.start('solve_wo_eval')
+                if sched is not None:
+                    evl = dict(evl if evl is not None else {}, **schd)
+
+                # Record elapsed time
+                t = self.timer.elapsed(self.opt['IterTimer'])
+
+                # Extract and record iteration stats
+                xitstat = self.xstep.itstat[-1] if self.xstep.itstat else \
+                    self.xstep.IterationStats(
+                        *([0.0,] * len(self.xstep.IterationStats._fields)))
+                ditstat = self.dstep.itstat[-1] if self.dstep.itstat else \
+                    self.dstep.IterationStats(
+                        *([0.0,] * len(self.dstep.IterationStats._fields)))
+                itst = self.isc.iterstats(self.j, t, xitstat, ditstat, evl)
+                self.itstat.append(itst)
+
+                # Update inner iteration schedule
+                if sched is not None:
+                    sched.update(self.objfn(itst))
+
+                # Display iteration stats if Verbose option enabled
+                if self.opt['Verbose']:
+                    self.isc.printiterstats(itst)
+
+                # Call callback function if defined
+                if self.opt['Callback'] is not None:
+                    if self.opt['Callback'](self):
+                        break
+
+            # Increment iteration count
+            self.j += 1
+
+        finally:
+            # Restore X and D step options modified by inner iteration
+            # schedule
+            if sched is not None:
+                sched.finish(self)
 
-            # D update
-            self.dstep.solve()
-            self.post_dstep()
+        # Record solve time
+        self.timer.stop(['solve', 'solve_wo_eval'])
 
-            # Evaluate functional
-            self.timer.stop('solve_wo_eval')
-            evl = self.evaluate()
-            self.timer.start('solve_wo_eval')
+        # Print final separator string if Verbose option enabled
+        if self.opt['Verbose'] and self.opt['StatusHeader']:
+            self.isc.printseparator()
 
-            # Record elapsed time
-            t = self.timer.elapsed(self.opt['IterTimer'])
+        # Return final dictionary
+        return self.getdict()
 
-            # Extract and record iteration stats
-            xitstat = self.xstep.itstat[-1] if self.xstep.itstat else \
-                      self.xstep.IterationStats(
-                          *([0.0,] * len(self.xstep.IterationStats._fields)))
-            ditstat = self.dstep.itstat[-1] if self.dstep.itstat else \
-                      self.dstep.IterationStats(
-                          *([0.0,] * len(self.dstep.IterationStats._fields)))
-            itst = self.isc.iterstats(self.j, t, xitstat, ditstat, evl)
-            self.itstat.append(itst)
 
-            # Display iteration stats if Verbose option enabled
-            if self.opt['Verbose']:
-                self.isc.printiterstats(itst)
 
-            # Call callback function if defined
-            if self.opt['Callback'] is not None:
-                if self.opt['Callback'](self):
-                    break
+    def objfn(self, itst):
+        """Get the functional value used by the inner iteration
+        scheduler from an IterationStats namedtuple, or ``None`` if it
+        is not available.
+        """
 
+        for fnm in ('ObjFun', 'ObjFunX'):
+            if getattr(itst, fnm, None) is not None:
+                return getattr(itst, fnm)
+        return None
 
-        # Increment iteration count
-        self.j += 1
 
-        # Record solve time
-        self.timer.stop(['solve', 'solve_wo_eval'])
 
-        # Print final separator string if Verbose option enabled
-        if self.opt['Verbose'] and self.opt['StatusHeader']:
-            self.isc.printseparator()
+    def pre_xstep(self):
+        """Handle initialisation of xstep before it is solved"""
 
-        # Return final dictionary
-        return self.getdict()
+        pass
 
 
 
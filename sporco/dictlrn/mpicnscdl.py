@@ -0,0 +1,183 @@
+# -*- coding: utf-8 -*-
+# Copyright (C) 2019 by Brendt Wohlberg <brendt@ieee.org>
+# All rights reserved. BSD 3-clause License.
+# This file is part of the SPORCO package. Details of the copyright
+# and user license can be found in the 'LICENSE.txt' file distributed
+# with the package.
+
+"""MPI distributed consensus convolutional dictionary learning"""
+
+from __future__ import absolute_import
+from __future__ import division
+from builtins import range
+
+from mpi4py import MPI
+import numpy as np
+
+from sporco.dictlrn import prlcnscdl
+
+
+__author__ = """Brendt Wohlberg <brendt@ieee.org>"""
+
+
+__all__ = ['MPIConvBPDNDictLearn_Consensus']
+
+
+
+class MPIConvBPDNDictLearn_Consensus(prlcnscdl.ConvBPDNDictLearn_Consensus):
+    r"""
+    Dictionary learning based on Convolutional BPDN
+    :cite:`wohlberg-2014-efficient` and an ADMM Consensus solution of
+    the constrained dictionary update problem :cite:`sorel-2016-fast`,
+    distributed over the processes of an MPI communicator.
+
+    |
+
+    .. inheritance-diagram:: MPIConvBPDNDictLearn_Consensus
+       :parts: 2
+
+    |
+
+    The algorithm is the same as that of
+    :class:`.prlcnscdl.ConvBPDNDictLearn_Consensus`, but the training
+    images are partitioned into shards, each of which is held by a
+    single process (rank) of an MPI communicator, so that the training
+    set need not fit in the memory of a single host. The sparse coding
+    of each training image and the corresponding component of the
+    consensus dictionary update are computed by the rank holding the
+    image, and the consensus step, i.e. the computation of the mean of
+    the dictionary update components over all training images, is
+    computed via an ``Allreduce`` operation. The dictionary, which is
+    the same on all ranks, is available from :meth:`getdict`, while
+    :meth:`getcoef` returns the coefficient maps for the training
+    images of the local shard.
+
+    All ranks must construct an object of this class, with the same
+    initial dictionary and options, and call :meth:`solve` the same
+    number of times. The solver may be run, for example, via ::
+
+      mpirun -np 4 python script.py
+
+    Iteration statistics are computed for the full training set, and
+    are only displayed by rank 0 if option ``Verbose`` is ``True``.
+    The fields of the named tuple ``IterationStats`` are as in
+    :class:`.prlcnscdl.ConvBPDNDictLearn_Consensus`.
+    """
+
+
+    class Options(prlcnscdl.ConvBPDNDictLearn_Consensus.Options):
+        """MPIConvBPDNDictLearn_Consensus algorithm options
+
+        Options are the same as defined in
+        :class:`.cbpdndl.ConvBPDNDictLearn.Options`.
+        """
+
+        def __init__(self, opt=None):
+            """
+            Parameters
+            ----------
+            opt : dict or None, optional (default None)
+              MPIConvBPDNDictLearn_Consensus algorithm options
+            """
+
+            prlcnscdl.ConvBPDNDictLearn_Consensus.Options.__init__(
+                self, opt)
+
+
+
+    def __init__(self, D0, S, lmbda=None, opt=None, dimK=1, dimN=2,
+                 comm=None):
+        """
+        Parameters
+        ----------
+        D0 : array_like
+          Initial dictionary array
+        S : array_like
+          Signal array of the training images in the local shard
+        lmbda : float
+          Regularisation parameter. If ``None``, the default value of
+          :class:`.admm.cbpdn.ConvBPDN` is computed for the full
+          training set.
+        opt : :class:`MPIConvBPDNDictLearn_Consensus.Options` object
+          Algorithm options
+        dimK : int, optional (default 1)
+          Number of signal dimensions. If there is only a single input
+          signal in the local shard (e.g. if `S` is a 2D array
+          representing a single image) `dimK` must be set to 0.
+        dimN : int, optional (default 2)
+          Number of spatial/temporal dimensions
+        comm : MPI communicator object or None, optional (default None)
+          Communicator over which the training set is distributed. If
+          ``None``, ``MPI.COMM_WORLD`` is used.
+        """
+
+        if comm is None:
+            comm = MPI.COMM_WORLD
+        self.comm = comm
+        if opt is None:
+            opt = MPIConvBPDNDictLearn_Consensus.Options()
+        if comm.Get_rank() != 0:
+            opt['Verbose'] = False
+
+        # All ranks must start from the same dictionary
+        D0 = comm.bcast(D0, root=0)
+
+        # Computations on the local shard are performed serially
+        super(MPIConvBPDNDictLearn_Consensus, self).__init__(
+            D0, S, lmbda, opt=opt, nproc=0, dimK=dimK, dimN=dimN)
+
+        # The default lambda is the maximum over the training images of
+        # a quantity computed for each image, and must therefore be
+        # computed over all shards
+        if lmbda is None:
+            gl = comm.allreduce(float(self.xstep.lmbda), op=MPI.MAX)
+            if gl != self.xstep.lmbda:
+                super(MPIConvBPDNDictLearn_Consensus, self).__init__(
+                    D0, S, gl, opt=opt, nproc=0, dimK=dimK, dimN=dimN)
+
+        # Number of training images over all shards
+        self.Kg = comm.allreduce(self.xstep.cri.K, op=MPI.SUM)
+
+
+
+    def step(self):
+        """Do a single iteration over all cbpdn and ccmod steps. Those that
+        are not coupled on the K axis are performed for the local
+        training images, and the consensus step is computed over all
+        ranks."""
+
+        self.mpns.activate()
+        for k in range(self.xstep.cri.K):
+            prlcnscdl.step_group(k)
+
+        self.ccmod_ystep()
+        prlcnscdl.ccmod_ustep()
+        prlcnscdl.cbpdn_setdict()
+
+
+
+    def ccmod_ystep(self):
+        """Do the Y step of the ccmod stage, with the mean of the
+        dictionary update components computed over all ranks.
+        """
+
+        ns = self.mpns
+        AXU = np.sum(ns['mp_D_X'] + ns['mp_D_U'], axis=0)
+        sAXU = np.empty_like(AXU)
+        self.comm.Allreduce(AXU, sAXU, op=MPI.SUM)
+        ns['mp_D_Y'][:] = self.dstep.Pcn(sAXU / self.Kg)
+
+
+
+    def evaluate(self):
+        """Evaluate functional value of previous iteration over the full
+        training set."""
+
+        _, dfd, rl1 = super(MPIConvBPDNDictLearn_Consensus,
+                            self).evaluate()
+        lval = np.array([dfd, rl1], dtype=np.float64)
+        gval = np.empty_like(lval)
+        self.comm.Allreduce(lval, gval, op=MPI.SUM)
+        dfd, rl1 = gval
+        obj = dfd + self.xstep.lmbda*rl1
+        return (obj, dfd, rl1)
@@ -12,6 +12,7 @@ from __future__ import print_function
 from __future__ import absolute_import
 
 import copy
+import collections
 import numpy as np
 
 from sporco import util
@@ -73,6 +74,19 @@ class OnlineConvBPDNDictLearn(common.IterativeSolver):
           ``CUDA_CBPDN`` : Flag indicating whether to use CUDA solver
           for CBPDN problem (see :ref:`cuda_package`)
 
+          ``WarmStart`` : Options for initialisation of the sparse
+          coding solver from a cache of the solver working variables
+          for previously seen training samples, identified by the
+          `sid` parameter of :meth:`solve` (not supported by the CUDA
+          CBPDN solver).
+
+            ``Enabled`` : Flag determining whether the cache is used.
+
+            ``CacheSize`` : Maximum number of samples for which working
+            variables are cached, with the least recently used entry
+            discarded when this number is exceeded. If ``None``, the
+            cache size is not limited.
+
           ``CBPDN`` : Options :class:`.admm.cbpdn.ConvBPDN.Options`.
         """
 
@@ -80,6 +94,7 @@ class OnlineConvBPDNDictLearn(common.IterativeSolver):
                     'IterTimer': 'solve', 'DictSize': None,
                     'DataType': None, 'ZeroMean': False, 'eta_a': 10.0,
                     'eta_b': 5.0, 'CUDA_CBPDN' : False,
+                    'WarmStart': {'Enabled': False, 'CacheSize': None},
                     'CBPDN': copy.deepcopy(cbpdn.ConvBPDN.Options.defaults)}
 
 
@@ -197,6 +212,9 @@ class OnlineConvBPDNDictLearn(common.IterativeSolver):
         self.Pcn = cr.getPcn(self.dsz, (), dimN, dimCd, crp=True,
                              zm=opt['ZeroMean'])
 
+        # Initialise cache of sparse coding solver working variables
+        self.xcache = collections.OrderedDict()
+
         # Initalise iterations stats list and iteration index
         self.itstat = []
         self.j = 0
@@ -206,9 +224,12 @@ class OnlineConvBPDNDictLearn(common.IterativeSolver):
 
 
 
-    def solve(self, S, dimK=None):
+    def solve(self, S, dimK=None, sid=None):
         """Compute sparse coding and dictionary update for training
-        data `S`."""
+        data `S`. If option ``WarmStart`` is enabled, the sparse coding
+        solver working variables are initialised from those cached for
+        the previous call with the same hashable sample identifier
+        `sid`."""
 
         # Use dimK specified in __init__ as default
         if dimK is None and self.dimK is not None:
@@ -219,7 +240,7 @@ class OnlineConvBPDNDictLearn(common.IterativeSolver):
 
         # Solve CSC problem on S and do dictionary step
         self.init_vars(S, dimK)
-        self.xstep(S, self.lmbda, dimK)
+        self.xstep(S, self.lmbda, dimK, sid)
         self.dstep()
 
         # Stop solve timer
@@ -262,7 +283,7 @@ class OnlineConvBPDNDictLearn(common.IterativeSolver):
 
 
 
-    def xstep(self, S, lmbda, dimK):
+    def xstep(self, S, lmbda, dimK, sid=None):
         """Solve CSC problem for training data `S`."""
 
         if self.opt['CUDA_CBPDN']:
@@ -279,13 +300,52 @@ class OnlineConvBPDNDictLearn(common.IterativeSolver):
             xstep = cbpdn.ConvBPDN(self.D.squeeze(), S, lmbda,
                                    self.opt['CBPDN'], dimK=dimK,
                                    dimN=self.cri.dimN)
+            self.xstep_init(xstep, sid)
             xstep.solve()
+            self.xstep_store(xstep, sid)
             self.Sf = xstep.Sf
             self.setcoef(xstep.getcoef())
             self.xstep_itstat = xstep.itstat[-1] if xstep.itstat else None
 
 
 
+    def xstep_init(self, xstep, sid):
+        """Initialise the working variables of sparse coding solver
+        object `xstep` from the values cached for sample identifier
+        `sid` (see option ``WarmStart``)."""
+
+        if sid is None or not self.opt['WarmStart', 'Enabled'] or \
+           sid not in self.xcache:
+            return
+        Y, rhoU = self.xcache[sid]
+        if Y.shape == xstep.Y.shape:
+            xstep.Y = Y.astype(xstep.dtype, copy=True)
+            xstep.Yprev = xstep.Y.copy()
+            # The dual variable is cached in unscaled form, so that it
+            # can be rescaled for the penalty parameter of the new solver
+            xstep.U = np.asarray(rhoU / xstep.rho, dtype=xstep.dtype)
+
+
+
+    def xstep_store(self, xstep, sid):
+        """Cache the working variables of sparse coding solver object
+        `xstep` for sample identifier `sid` (see option
+        ``WarmStart``)."""
+
+        if sid is None or not self.opt['WarmStart', 'Enabled']:
+            return
+        self.xcache.pop(sid, None)
+        # Y is copied so that the cache does not alias a working array
+        # of the solver object, which is updated in place by any
+        # further use of that object (the scaled dual variable is
+        # already a new array)
+        self.xcache[sid] = (xstep.Y.copy(), xstep.rho * xstep.U)
+        csz = self.opt['WarmStart', 'CacheSize']
+        while csz is not None and len(self.xcache) > csz:
+            self.xcache.popitem(last=False)
+
+
+
     def setcoef(self, Z):
         """Set coefficient array."""
 
@@ -390,8 +450,8 @@ class OnlineConvBPDNDictLearn(common.IterativeSolver):
                     self.xstep_itstat.DualRsdl)
             rho = (self.xstep_itstat.Rho,)
 
-        cnstr = np.linalg.norm(cr.zpad(self.D, self.cri.Nv) - self.G)
-        dltd = np.linalg.norm(self.D - self.Dprv)
+        cnstr = sl.l2norm(cr.zpad(self.D, self.cri.Nv) - self.G)
+        dltd = sl.l2norm(self.D - self.Dprv)
 
         tpl = (self.j,) + objfn + rsdl + rho + (cnstr, dltd, self.eta) + \
               self.itstat_extra() + (tk,)
@@ -506,9 +566,12 @@ class OnlineConvBPDNMaskDictLearn(OnlineConvBPDNDictLearn):
 
 
 
-    def solve(self, S, W=None, dimK=None):
+    def solve(self, S, W=None, dimK=None, sid=None):
         """Compute sparse coding and dictionary update for training
-        data `S`."""
+        data `S`. If option ``WarmStart`` is enabled, the sparse coding
+        solver working variables are initialised from those cached for
+        the previous call with the same hashable sample identifier
+        `sid`."""
 
         # Use dimK specified in __init__ as default
         if dimK is None and self.dimK is not None:
@@ -523,7 +586,7 @@ class OnlineConvBPDNMaskDictLearn(OnlineConvBPDNDictLearn):
             W = np.array([1.0], dtype=self.dtype)
         W = np.asarray(W.reshape(cr.mskWshape(W, self.cri)),
                        dtype=self.dtype)
-        self.xstep(S, W, self.lmbda, dimK)
+        self.xstep(S, W, self.lmbda, dimK, sid)
         self.dstep(W)
 
         # Stop solve timer
@@ -543,7 +606,7 @@ class OnlineConvBPDNMaskDictLearn(OnlineConvBPDNDictLearn):
 
 
 
-    def xstep(self, S, W, lmbda, dimK):
+    def xstep(self, S, W, lmbda, dimK, sid=None):
         """Solve CSC problem for training data `S`."""
 
         if self.opt['CUDA_CBPDN']:
@@ -560,7 +623,9 @@ class OnlineConvBPDNMaskDictLearn(OnlineConvBPDNDictLearn):
             xstep = cbpdn.ConvBPDNMaskDcpl(self.D.squeeze(), S, lmbda, W,
                                            self.opt['CBPDN'], dimK=dimK,
                                            dimN=self.cri.dimN)
+            self.xstep_init(xstep, sid)
             xstep.solve()
+            self.xstep_store(xstep, sid)
             self.Sf = sl.rfftn(S.reshape(self.cri.shpS), self.cri.Nv,
                                self.cri.axisN)
             self.setcoef(xstep.getcoef())
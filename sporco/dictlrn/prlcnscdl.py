@@ -27,6 +27,7 @@ import sporco.cnvrep as cr
 from sporco.util import u
 from sporco import util
 from sporco import common
+from sporco import shmpool
 
 
 
@@ -34,7 +35,10 @@ __all__ = ['ConvBPDNDictLearn_Consensus',
            'ConvBPDNMaskDcplDictLearn_Consensus']
 
 
-# Initialise global variables required by multiprocessing mechanism
+# Global variables used by the functions evaluated in the worker
+# processes. They are set from the :class:`.shmpool.SharedNamespace` of
+# a consensus dictionary learning object, in both the calling and the
+# worker processes, before these functions are evaluated.
 mp_cri = None    # A cnvrep.CSC_ConvRepIndexing object describing problem
                  # dimensions
 mp_lmbda = None  # Regularisation parameter lambda
@@ -57,30 +61,6 @@ mp_D_U = None    # Lagrange multiplier of D update
 
 
 
-def mpraw_as_np(shape, dtype):
-    """Construct a numpy array of the specified shape and dtype for which the
-    underlying storage is a multiprocessing RawArray in shared memory.
-
-    Parameters
-    ----------
-    shape : tuple
-      Shape of numpy array
-    dtype : data-type
-      Data type of array
-
-    Returns
-    -------
-    arr : ndarray
-      Numpy array
-    """
-
-    sz = int(np.product(shape))
-    csz = sz * np.dtype(dtype).itemsize
-    raw = mp.RawArray('c', csz)
-    return np.frombuffer(raw, dtype=dtype, count=sz).reshape(shape)
-
-
-
 def swap_axis_to_0(x, axis):
     """Insert a new singleton axis at position 0 and swap it with the
     specified axis. The resulting array has an additional dimension,
@@ -105,25 +85,6 @@ def swap_axis_to_0(x, axis):
 
 
 
-def init_mpraw(mpv, npv):
-    """Set a global variable as a multiprocessing RawArray in shared
-    memory with a numpy array wrapper and initialise its value.
-
-    Parameters
-    ----------
-    mpv : string
-      Name of global variable to set
-    npv : ndarray
-      Numpy array to use as initialiser for global variable value
-    """
-
-    globals()[mpv] = mpraw_as_np(npv.shape, npv.dtype)
-    globals()[mpv][:] = npv
-
-
-
-
-
 def cbpdn_setdict():
     """Set the dictionary for the cbpdn stage. There are no parameters
     or return values because all inputs and outputs are from and to
@@ -153,7 +114,8 @@ def cbpdn_xstep(k):
     if mp_cri.Cd == 1:
         Xf = sl.solvedbi_sm(mp_Df, mp_xrho, b, axis=mp_cri.axisM)
     else:
-        Xf = sl.solvemdbi_ism(mp_Df, mp_xrho, b, mp_cri.axisM, mp_cri.axisC)
+        Xf = sl.solvemdbi_gram(mp_Df, mp_xrho, b, mp_cri.axisM,
+                               mp_cri.axisC)
     mp_Z_X[k] = sl.irfftn(Xf, mp_cri.Nv, mp_cri.axisN)
 
 
@@ -358,7 +320,7 @@ class ConvBPDNDictLearn_Consensus(cbpdndl.ConvBPDNDictLearn):
 
 
     def __init__(self, D0, S, lmbda=None, opt=None, nproc=None, dimK=1,
-                 dimN=2):
+                 dimN=2, pool=None):
         """
         Parameters
         ----------
@@ -378,14 +340,25 @@ class ConvBPDNDictLearn_Consensus(cbpdndl.ConvBPDNDictLearn):
           `dimK` must be set to 0.
         dimN : int, optional (default 2)
           Number of spatial/temporal dimensions
+        pool : SharedMemoryPool or ThreadPool or None, optional (default None)
+          Persistent pool of worker processes
+          (:class:`.shmpool.SharedMemoryPool`) or threads
+          (:class:`.shmpool.ThreadPool`). If ``None``, a pool of worker
+          processes is constructed at the start of each call to
+          :meth:`solve`, and shut down at the end of it.
         """
 
         if nproc is None:
-            # Number of processes to run is the smaller of the number of CPUs
-            # and K, the number of training signals
-            self.nproc = min(mp.cpu_count(), S.shape[-1])
+            if pool is None:
+                # Number of processes to run is the smaller of the number
+                # of CPUs and K, the number of training signals
+                self.nproc = min(mp.cpu_count(), S.shape[-1])
+            else:
+                self.nproc = pool.nproc
         else:
             self.nproc = nproc
+        self.pool = pool
+        self.extpool = pool
 
         # Call parent constructor
         super(ConvBPDNDictLearn_Consensus, self).__init__(
@@ -403,65 +376,34 @@ class ConvBPDNDictLearn_Consensus(cbpdndl.ConvBPDNDictLearn):
 
 
 
-        def init_mpraw_swap(mpv, npv):
-            """Set a global variable as a multiprocessing RawArray in shared
-            memory with a numpy array wrapper and initialise its value
-            to the specified array after swapping axisK of that array
-            to axis index 0.
-
-            Parameters
-            ----------
-            mpv : string
-              Name of global variable to set
-            npv : ndarray
-              Numpy array to use as initialiser for global variable value
-            """
-
-            v = swap_axis_to_0(npv, self.xstep.cri.axisK)
-            init_mpraw(mpv, v)
-
-
-
-        # Initialise global variables
-        global mp_cri
-        mp_cri = self.xstep.cri
-        global mp_lmbda
-        mp_lmbda = self.xstep.lmbda
-        global mp_xrho
-        mp_xrho = self.xstep.rho
-        global mp_drho
-        mp_drho = self.dstep.rho
-        global mp_xrlx
-        mp_xrlx = self.xstep.rlx
-        global mp_drlx
-        mp_drlx = self.dstep.rlx
-        global mp_dprox
-        mp_dprox = self.dstep.Pcn
-        global mp_Sf
-        init_mpraw_swap('mp_Sf', self.xstep.Sf)
-        global mp_Df
-        init_mpraw('mp_Df', self.xstep.Df)
-        global mp_Zf
-        shp = list(mp_Sf.shape)
+        # Initialise the namespace of global variables used by the
+        # functions that are evaluated in the worker processes
+        self.mpns = shmpool.SharedNamespace(
+            __name__, shared=(pool.shared if pool is not None
+                              else self.nproc > 0))
+        ns = self.mpns
+        axisK = self.xstep.cri.axisK
+        ns['mp_cri'] = self.xstep.cri
+        ns['mp_lmbda'] = self.xstep.lmbda
+        ns['mp_xrho'] = self.xstep.rho
+        ns['mp_drho'] = self.dstep.rho
+        ns['mp_xrlx'] = self.xstep.rlx
+        ns['mp_drlx'] = self.dstep.rlx
+        ns.setlocal('mp_dprox', self.dstep.Pcn)
+        Sf = ns.array('mp_Sf', swap_axis_to_0(self.xstep.Sf, axisK))
+        ns.array('mp_Df', self.xstep.Df)
+        shp = list(Sf.shape)
         shp[-1] = self.xstep.cri.M
-        mp_Zf = mpraw_as_np(shp, mp_Sf.dtype)
-        global mp_DSf
-        init_mpraw_swap('mp_DSf', self.xstep.DSf)
-        global mp_ZSf
-        mp_ZSf = mpraw_as_np(shp, mp_Sf.dtype)
-        global mp_Z_Y
-        init_mpraw_swap('mp_Z_Y', self.xstep.Y)
-        global mp_Z_X
-        mp_Z_X = mpraw_as_np(mp_Z_Y.shape, mp_Z_Y.dtype)
-        global mp_Z_U
-        init_mpraw_swap('mp_Z_U', self.xstep.U)
-        global mp_D_X
+        ns.empty('mp_Zf', shp, Sf.dtype)
+        ns.array('mp_DSf', swap_axis_to_0(self.xstep.DSf, axisK))
+        ns.empty('mp_ZSf', shp, Sf.dtype)
+        ZY = ns.array('mp_Z_Y', swap_axis_to_0(self.xstep.Y, axisK))
+        ns.empty('mp_Z_X', ZY.shape, ZY.dtype)
+        ns.array('mp_Z_U', swap_axis_to_0(self.xstep.U, axisK))
         dxshp = list((self.dstep.cri.K,) + self.dstep.cri.shpD)
-        mp_D_X = mpraw_as_np(dxshp, self.dstep.Y.dtype)
-        global mp_D_Y
-        init_mpraw('mp_D_Y', self.dstep.Y)
-        global mp_D_U
-        init_mpraw('mp_D_U', np.moveaxis(self.dstep.U, -1, 0))
+        ns.empty('mp_D_X', dxshp, self.dstep.Y.dtype)
+        ns.array('mp_D_Y', self.dstep.Y)
+        ns.array('mp_D_U', np.moveaxis(self.dstep.U, -1, 0))
 
 
 
@@ -470,15 +412,16 @@ class ConvBPDNDictLearn_Consensus(cbpdndl.ConvBPDNDictLearn):
         """Do a single iteration over all cbpdn and ccmod steps. Those that
         are not coupled on the K axis are performed in parallel."""
 
-        # If the nproc parameter of __init__ is zero, just iterate
+        # If the nproc parameter of __init__ is zero, and no pool is
+        # specified, just iterate
         # over the K consensus instances instead of using
         # multiprocessing to do the computations in parallel. This is
         # useful for debugging and timing comparisons.
-        if self.nproc == 0:
+        if self.pool is None:
             for k in range(self.xstep.cri.K):
                 step_group(k)
         else:
-            self.pool.map(step_group, range(self.xstep.cri.K))
+            self.pool.map(step_group, range(self.xstep.cri.K), self.mpns)
 
         ccmod_ystep()
         ccmod_ustep()
@@ -524,9 +467,10 @@ class ConvBPDNDictLearn_Consensus(cbpdndl.ConvBPDNDictLearn):
         # Reset timer
         self.timer.start(['solve', 'solve_wo_eval'])
 
-        # Create process pool
-        if self.nproc > 0:
-            self.pool = mp.Pool(processes=self.nproc)
+        # Set global variables and create process pool if necessary
+        self.mpns.activate()
+        if self.pool is None and self.nproc > 0:
+            self.pool = shmpool.SharedMemoryPool(self.nproc)
 
         for self.j in range(self.j, self.j + self.opt['MaxMainIter']):
 
@@ -552,10 +496,10 @@ class ConvBPDNDictLearn_Consensus(cbpdndl.ConvBPDNDictLearn):
                 if self.opt['Callback'](self):
                     break
 
-        # Clean up process pool
-        if self.nproc > 0:
+        # Clean up process pool if it was created by this method
+        if self.pool is not None and self.pool is not self.extpool:
             self.pool.close()
-            self.pool.join()
+            self.pool = None
 
         # Increment iteration count
         self.j += 1
@@ -577,8 +521,7 @@ class ConvBPDNDictLearn_Consensus(cbpdndl.ConvBPDNDictLearn):
         :func:`.cnvrep.bcrop` to returned array.
         """
 
-        global mp_D_Y
-        D = mp_D_Y
+        D = self.mpns['mp_D_Y']
         if crop:
             D = cr.bcrop(D, self.dstep.cri.dsz, self.dstep.cri.dimN)
         return D
@@ -588,18 +531,17 @@ class ConvBPDNDictLearn_Consensus(cbpdndl.ConvBPDNDictLearn):
     def getcoef(self):
         """Get final coefficient map array."""
 
-        global mp_Z_Y
-        return np.swapaxes(mp_Z_Y, 0, self.xstep.cri.axisK+1)[0]
+        return np.swapaxes(self.mpns['mp_Z_Y'], 0, self.xstep.cri.axisK+1)[0]
 
 
 
     def evaluate(self):
         """Evaluate functional value of previous iteration."""
 
-        X = mp_Z_Y
-        Xf = mp_Zf
-        Df = mp_Df
-        Sf = mp_Sf
+        X = self.mpns['mp_Z_Y']
+        Xf = self.mpns['mp_Zf']
+        Df = self.mpns['mp_Df']
+        Sf = self.mpns['mp_Sf']
         Ef = sl.inner(Df[np.newaxis, ...], Xf,
                        axis=self.xstep.cri.axisM+1) - Sf
         Ef = np.swapaxes(Ef, 0, self.xstep.cri.axisK+1)[0]
@@ -624,7 +566,7 @@ class ConvBPDNDictLearn_Consensus(cbpdndl.ConvBPDNDictLearn):
 
 
 
-# Initialise global variables required by multiprocessing mechanism
+# Additional global variables used by the mask decoupling variant
 mp_S = None       # Training data array
 mp_W = None       # Mask array
 mp_DX = None      # Product of D and X
@@ -667,7 +609,7 @@ def cbpdnmd_xstep(k):
         b = sl.inner(np.conj(mp_Df), sl.rfftn(YU0, None, mp_cri.axisN),
                       axis=mp_cri.axisC) + \
             sl.rfftn(YU1, None, mp_cri.axisN)
-        Xf = sl.solvemdbi_ism(mp_Df, 1.0, b, mp_cri.axisM, mp_cri.axisC)
+        Xf = sl.solvemdbi_gram(mp_Df, 1.0, b, mp_cri.axisM, mp_cri.axisC)
     mp_Z_X[k] = sl.irfftn(Xf, mp_cri.Nv, mp_cri.axisN)
     mp_DX[k] = sl.irfftn(sl.inner(mp_Df, Xf), mp_cri.Nv, mp_cri.axisN)
 
@@ -888,7 +830,7 @@ class ConvBPDNMaskDcplDictLearn_Consensus(cbpdndlmd.ConvBPDNMaskDictLearn):
 
 
     def __init__(self, D0, S, lmbda=None, W=None, opt=None, nproc=None,
-                 dimK=1, dimN=2):
+                 dimK=1, dimN=2, pool=None):
         """
         Parameters
         ----------
@@ -912,14 +854,25 @@ class ConvBPDNMaskDcplDictLearn_Consensus(cbpdndlmd.ConvBPDNMaskDictLearn):
           `dimK` must be set to 0.
         dimN : int, optional (default 2)
           Number of spatial/temporal dimensions
+        pool : SharedMemoryPool or ThreadPool or None, optional (default None)
+          Persistent pool of worker processes
+          (:class:`.shmpool.SharedMemoryPool`) or threads
+          (:class:`.shmpool.ThreadPool`). If ``None``, a pool of worker
+          processes is constructed at the start of each call to
+          :meth:`solve`, and shut down at the end of it.
         """
 
         if nproc is None:
-            # Number of processes to run is the smaller of the number of CPUs
-            # and K, the number of training signals
-            self.nproc = min(mp.cpu_count(), S.shape[-1])
+            if pool is None:
+                # Number of processes to run is the smaller of the number
+                # of CPUs and K, the number of training signals
+                self.nproc = min(mp.cpu_count(), S.shape[-1])
+            else:
+                self.nproc = pool.nproc
         else:
             self.nproc = nproc
+        self.pool = pool
+        self.extpool = pool
 
         # Call parent constructor
         super(ConvBPDNMaskDcplDictLearn_Consensus, self).__init__(
@@ -937,79 +890,47 @@ class ConvBPDNMaskDcplDictLearn_Consensus(cbpdndlmd.ConvBPDNMaskDictLearn):
 
 
 
-        def init_mpraw_swap(mpv, npv):
-            """Set a global variable as a multiprocessing RawArray in shared
-            memory with a numpy array wrapper and initialise its value
-            to the specified array after swapping axisK of that array
-            to axis index 0.
-
-            Parameters
-            ----------
-            mpv : string
-              Name of global variable to set
-            npv : ndarray
-              Numpy array to use as initialiser for global variable value
-            """
-
-            v = swap_axis_to_0(npv, self.xstep.cri.axisK)
-            init_mpraw(mpv, v)
-
-
-
-        # Initialise global variables
-        global mp_cri
-        mp_cri = self.xstep.cri
-        global mp_lmbda
-        mp_lmbda = self.xstep.lmbda
-        global mp_xrho
-        mp_xrho = self.xstep.rho
-        global mp_drho
-        mp_drho = self.dstep.rho
-        global mp_xrlx
-        mp_xrlx = self.xstep.rlx
-        global mp_drlx
-        mp_drlx = self.dstep.rlx
-        global mp_dprox
-        mp_dprox = self.dstep.Pcn
-        global mp_S
-        init_mpraw_swap('mp_S', self.xstep.S)
-        global mp_Df
-        init_mpraw('mp_Df', self.xstep.Df)
-        global mp_W
-        if self.dstep.W.ndim > self.xstep.cri.axisK:
-            init_mpraw_swap('mp_W', self.dstep.W)
+        # Initialise the namespace of global variables used by the
+        # functions that are evaluated in the worker processes
+        self.mpns = shmpool.SharedNamespace(
+            __name__, shared=(pool.shared if pool is not None
+                              else self.nproc > 0))
+        ns = self.mpns
+        axisK = self.xstep.cri.axisK
+        ns['mp_cri'] = self.xstep.cri
+        ns['mp_lmbda'] = self.xstep.lmbda
+        ns['mp_xrho'] = self.xstep.rho
+        ns['mp_drho'] = self.dstep.rho
+        ns['mp_xrlx'] = self.xstep.rlx
+        ns['mp_drlx'] = self.dstep.rlx
+        ns.setlocal('mp_dprox', self.dstep.Pcn)
+        ns.array('mp_S', swap_axis_to_0(self.xstep.S, axisK))
+        ns.array('mp_Df', self.xstep.Df)
+        if self.dstep.W.ndim > axisK:
+            ns.array('mp_W', swap_axis_to_0(self.dstep.W, axisK))
         else:
-            init_mpraw('mp_W', self.dstep.W)
-        global mp_Zf
+            ns.array('mp_W', self.dstep.W)
         shp = np.insert(np.roll(self.xstep.Xf.shape, 1), -1, 1)
         shp[[0, -1]] = shp[[-1, 0]]
-        mp_Zf = mpraw_as_np(shp, self.xstep.Xf.dtype)
-        global mp_Z_Y0
-        init_mpraw_swap('mp_Z_Y0', self.xstep.block_sep0(self.xstep.Y))
-        global mp_Z_Y1
-        init_mpraw_swap('mp_Z_Y1', self.xstep.block_sep1(self.xstep.Y))
-        global mp_Z_X
-        mp_Z_X = mpraw_as_np(mp_Z_Y1.shape, self.xstep.Y.dtype)
-        global mp_DX
-        mp_DX = mpraw_as_np(mp_Z_Y0.shape, self.xstep.Y.dtype)
-        mp_DX[:] = 0
-        global mp_Z_U0
-        init_mpraw_swap('mp_Z_U0', self.xstep.block_sep0(self.xstep.U))
-        global mp_Z_U1
-        init_mpraw_swap('mp_Z_U1', self.xstep.block_sep1(self.xstep.U))
-        global mp_D_X
+        ns.empty('mp_Zf', shp, self.xstep.Xf.dtype)
+        ZY0 = ns.array('mp_Z_Y0', swap_axis_to_0(
+            self.xstep.block_sep0(self.xstep.Y), axisK))
+        ZY1 = ns.array('mp_Z_Y1', swap_axis_to_0(
+            self.xstep.block_sep1(self.xstep.Y), axisK))
+        ns.empty('mp_Z_X', ZY1.shape, self.xstep.Y.dtype)
+        ns.empty('mp_DX', ZY0.shape, self.xstep.Y.dtype)[:] = 0
+        ns.array('mp_Z_U0', swap_axis_to_0(
+            self.xstep.block_sep0(self.xstep.U), axisK))
+        ns.array('mp_Z_U1', swap_axis_to_0(
+            self.xstep.block_sep1(self.xstep.U), axisK))
         dxshp = list((self.dstep.cri.K,) + self.dstep.cri.shpD)
-        mp_D_X = mpraw_as_np(dxshp, self.dstep.Y.dtype)
-        global mp_D_Y0
-        init_mpraw('mp_D_Y0', self.dstep.Y)
-        global mp_D_Y1
-        init_mpraw('mp_D_Y1',
-                   np.moveaxis(self.dstep.Y1, -2, 0)[..., np.newaxis])
-        global mp_D_U0
-        init_mpraw('mp_D_U0', np.moveaxis(self.dstep.U, -1, 0))
-        global mp_D_U1
-        init_mpraw('mp_D_U1',
-                   np.moveaxis(self.dstep.U1, -2, 0)[..., np.newaxis])
+        ns.empty('mp_D_X', dxshp, self.dstep.Y.dtype)
+        ns.array('mp_D_Y0', self.dstep.Y)
+        ns.array('mp_D_Y1',
+                 np.moveaxis(self.dstep.Y1, -2, 0)[..., np.newaxis])
+        ns.array('mp_D_U0', np.moveaxis(self.dstep.U, -1, 0))
+        ns.array('mp_D_U1',
+                 np.moveaxis(self.dstep.U1, -2, 0)[..., np.newaxis])
 
 
 
@@ -1018,15 +939,16 @@ class ConvBPDNMaskDcplDictLearn_Consensus(cbpdndlmd.ConvBPDNMaskDictLearn):
         """Do a single iteration over all cbpdn and ccmod steps. Those that
         are not coupled on the K axis are performed in parallel."""
 
-        # If the nproc parameter of __init__ is zero, just iterate
+        # If the nproc parameter of __init__ is zero, and no pool is
+        # specified, just iterate
         # over the K consensus instances instead of using
         # multiprocessing to do the computations in parallel. This is
         # useful for debugging and timing comparisons.
-        if self.nproc == 0:
+        if self.pool is None:
             for k in range(self.xstep.cri.K):
                 md_step_group(k)
         else:
-            self.pool.map(md_step_group, range(self.xstep.cri.K))
+            self.pool.map(md_step_group, range(self.xstep.cri.K), self.mpns)
 
         ccmodmd_ystep()
         ccmodmd_ustep()
@@ -1072,9 +994,10 @@ class ConvBPDNMaskDcplDictLearn_Consensus(cbpdndlmd.ConvBPDNMaskDictLearn):
         # Reset timer
         self.timer.start(['solve', 'solve_wo_eval'])
 
-        # Create process pool
-        if self.nproc > 0:
-            self.pool = mp.Pool(processes=self.nproc)
+        # Set global variables and create process pool if necessary
+        self.mpns.activate()
+        if self.pool is None and self.nproc > 0:
+            self.pool = shmpool.SharedMemoryPool(self.nproc)
 
         for self.j in range(self.j, self.j + self.opt['MaxMainIter']):
 
@@ -1100,10 +1023,10 @@ class ConvBPDNMaskDcplDictLearn_Consensus(cbpdndlmd.ConvBPDNMaskDictLearn):
                 if self.opt['Callback'](self):
                     break
 
-        # Clean up process pool
-        if self.nproc > 0:
+        # Clean up process pool if it was created by this method
+        if self.pool is not None and self.pool is not self.extpool:
             self.pool.close()
-            self.pool.join()
+            self.pool = None
 
         # Increment iteration count
         self.j += 1
@@ -1125,8 +1048,7 @@ class ConvBPDNMaskDcplDictLearn_Consensus(cbpdndlmd.ConvBPDNMaskDictLearn):
         :func:`.cnvrep.bcrop` to returned array.
         """
 
-        global mp_D_Y0
-        D = mp_D_Y0
+        D = self.mpns['mp_D_Y0']
         if crop:
             D = cr.bcrop(D, self.dstep.cri.dsz, self.dstep.cri.dimN)
         return D
@@ -1136,8 +1058,7 @@ class ConvBPDNMaskDcplDictLearn_Consensus(cbpdndlmd.ConvBPDNMaskDictLearn):
     def getcoef(self):
         """Get final coefficient map array."""
 
-        global mp_Z_Y1
-        return np.swapaxes(mp_Z_Y1, 0, self.xstep.cri.axisK+1)[0]
+        return np.swapaxes(self.mpns['mp_Z_Y1'], 0, self.xstep.cri.axisK+1)[0]
 
 
 
@@ -1149,16 +1070,16 @@ class ConvBPDNMaskDcplDictLearn_Consensus(cbpdndlmd.ConvBPDNMaskDictLearn):
             W = self.dstep.W
             S = self.dstep.S
         else:
-            W = mp_W
-            S = mp_S
-            Xf = mp_Zf
-            Df = mp_Df
+            W = self.mpns['mp_W']
+            S = self.mpns['mp_S']
+            Xf = self.mpns['mp_Zf']
+            Df = self.mpns['mp_Df']
             DX = sl.irfftn(sl.inner(
                 Df[np.newaxis, ...], Xf, axis=self.xstep.cri.axisM+1),
                             self.xstep.cri.Nv,
                             np.array(self.xstep.cri.axisN) + 1)
 
-        dfd = (np.linalg.norm(W * (DX - S))**2) / 2.0
+        dfd = (sl.l2norm(W * (DX - S))**2) / 2.0
         rl1 = np.sum(np.abs(self.getcoef()))
         obj = dfd + self.xstep.lmbda*rl1
 
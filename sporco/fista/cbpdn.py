@@ -110,11 +110,17 @@ class ConvBPDN(fista.FISTADFT):
           :math:`\mathbf{w}_m` denotes slices of the weighting array on
           the filter index axis.
 
+          ``AutoL`` : Flag indicating whether the inverse gradient step
+          parameter :math:`L` should be set to the Lipschitz constant of
+          the gradient of the data fidelity term (see
+          :meth:`ConvBPDN.lipschitz_constant`), computed each time the
+          dictionary is set, instead of the value of option ``L``.
+
         """
 
         defaults = copy.deepcopy(fista.FISTADFT.Options.defaults)
         defaults.update({'NonNegCoef': False, 'NoBndryCross': False})
-        defaults.update({'L1Weight': 1.0})
+        defaults.update({'L1Weight': 1.0, 'AutoL': False})
         defaults.update({'L': 500.0})
 
 
@@ -232,7 +238,7 @@ class ConvBPDN(fista.FISTADFT):
         # for FFT calls
         self.Vf = sl.pyfftw_rfftn_empty_aligned(self.X.shape, self.cri.axisN,
                                                 self.dtype)
-
+        self.setup_dft_plan()
 
         self.Xf = sl.rfftn(self.X, None, self.cri.axisN)
         self.Yf = self.Xf.copy()
@@ -244,6 +250,9 @@ class ConvBPDN(fista.FISTADFT):
         # Initialization needed for back tracking (if selected)
         self.postinitialization_backtracking_DFT()
 
+        # Record initial step size parameter value for use by reset
+        self.L0 = self.L
+
 
 
     def setdict(self, D=None):
@@ -252,6 +261,100 @@ class ConvBPDN(fista.FISTADFT):
         if D is not None:
             self.D = np.asarray(D, dtype=self.dtype)
         self.Df = sl.rfftn(self.D, self.cri.Nv, self.cri.axisN)
+        self.set_lipschitz()
+
+
+
+    def set_lipschitz(self):
+        """Set the step size parameter L to the Lipschitz constant if
+        option ``AutoL`` is selected, and set upper bound :attr:`Lmax`
+        for backtracking if option ``BackTrack`` is enabled.
+        """
+
+        if self.opt['AutoL'] or self.opt['BackTrack', 'Enabled']:
+            Lc = self.dtype.type(self.lipschitz_constant())
+            if self.opt['AutoL']:
+                self.L = Lc
+                self.L0 = self.L
+            if self.opt['BackTrack', 'Enabled']:
+                self.Lmax = Lc
+
+
+
+    def lipschitz_constant(self):
+        r"""Compute the Lipschitz constant of the gradient of the data
+        fidelity term, i.e. the maximum over all frequencies of the
+        largest eigenvalue of :math:`\hat{D}^H \hat{D}`, where
+        :math:`\hat{D}` is the matrix of dictionary filter DFT values,
+        with a row for each dictionary channel and a column for each
+        filter, at a single frequency.
+        """
+
+        return sl.mdb_opnorm2(self.Df, self.cri.axisM, self.cri.axisC)
+
+
+
+    def setsignal(self, S, warmstart=False):
+        """Set signal array, retaining all cached values that depend
+        only on the dictionary, so that a solver object can be reused
+        for a sequence of signals of the same shape.
+
+        Parameters
+        ----------
+        S : array_like
+          Signal array, with the same shape as the signal array passed
+          to :meth:`__init__`
+        warmstart : bool, optional (default False)
+          Flag indicating whether the current value of working variable
+          X should be used as the initial value for the next call to
+          :meth:`solve`. If ``False``, it is reset to zero.
+        """
+
+        S = np.asarray(S, dtype=self.dtype)
+        if S.size != self.S.size:
+            raise ValueError('Signal array S must have the same shape as '
+                             'the current signal array')
+        self.S = S.reshape(self.cri.shpS)
+        self.Sf = sl.rfftn(self.S, None, self.cri.axisN)
+
+        if warmstart:
+            self.reset(self.X)
+        else:
+            self.reset()
+
+
+
+    def reset(self, X0=None):
+        """Reset the step size parameter, iteration count, iteration
+        statistics, and working variables, so that the next call to
+        :meth:`solve` starts a new optimisation.
+
+        Parameters
+        ----------
+        X0 : array_like or None, optional (default None)
+          Initial value for working variable X. If ``None``, a zero
+          initial value is used.
+        """
+
+        self.L = self.L0
+        self.X[:] = 0.0 if X0 is None else X0
+        self.Y = self.X.copy()
+        self.Xf = sl.rfftn(self.X, None, self.cri.axisN)
+        self.Yf = self.Xf.copy()
+        self.store_prev()
+        self.Yfprv = self.Yf.copy() + 1e5
+
+        if self.opt['BackTrack', 'Enabled']:
+            self.F = 0.
+            self.Q = 0.
+            self.iterBTrack = 0
+            if self.opt['BackTrack', 'Robust']:
+                self.Tk = 0.
+                self.zzfinit()
+        self.reset_momentum()
+
+        self.itstat = []
+        self.k = 0
 
 
 
@@ -278,6 +381,34 @@ class ConvBPDN(fista.FISTADFT):
 
 
 
+    def eval_grad_fval(self):
+        """Compute gradient in Fourier domain and value of :math:`f`
+        (with the DFT scaling of :meth:`obfn_f`) from a single
+        evaluation of the residual."""
+
+        Ryf = self.eval_Rf(self.Yf)
+        gradf = np.conj(self.Df) * Ryf
+        if self.cri.Cd > 1:
+            gradf = np.sum(gradf, axis=self.cri.axisC, keepdims=True)
+
+        return gradf, 0.5 * sl.l2norm(Ryf)**2
+
+
+
+    def eval_fval_x(self, Dxy, flin):
+        r"""Compute value of :math:`f` at :math:`\mathbf{x}` (with the
+        DFT scaling of :meth:`obfn_f`) as required for backtracking.
+        Since :math:`f` is quadratic, this is the sum of its linear
+        approximation ``flin`` about :math:`\mathbf{y}` and the
+        squared norm of the product of the dictionary DFT and ``Dxy``,
+        the DFT of :math:`\mathbf{x} - \mathbf{y}`.
+        """
+
+        return flin + 0.5 * sl.l2norm(sl.inner(self.Df, Dxy,
+                                               axis=self.cri.axisM))**2
+
+
+
     def eval_Rf(self, Vf):
         """Evaluate smooth term in Vf."""
 
@@ -331,7 +462,7 @@ class ConvBPDN(fista.FISTADFT):
         function.
         """
 
-        rl1 = np.linalg.norm((self.wl1 * self.X).ravel(), 1)
+        rl1 = sl.l1norm(self.wl1 * self.X)
         return (self.lmbda * rl1, rl1)
 
 
@@ -348,7 +479,7 @@ class ConvBPDN(fista.FISTADFT):
             Xf = self.Xf
 
         Rf = self.eval_Rf(Xf)
-        return 0.5 * np.linalg.norm(Rf.flatten(), 2)**2
+        return 0.5 * sl.l2norm(Rf)**2
 
 
 
@@ -425,6 +556,10 @@ class ConvBPDNMask(ConvBPDN):
         self.W = np.asarray(W.reshape(cr.mskWshape(W, self.cri)),
                             dtype=self.dtype)
 
+        # The Lipschitz constant depends on the mask, which is not
+        # available when it is first computed by the parent class
+        self.set_lipschitz()
+
         # Create byte aligned arrays for FFT calls
         self.WRy = sl.pyfftw_empty_aligned(self.S.shape, dtype=self.dtype)
         self.Ryf = sl.pyfftw_rfftn_empty_aligned(self.S.shape, self.cri.axisN,
@@ -455,6 +590,41 @@ class ConvBPDNMask(ConvBPDN):
 
 
 
+    def eval_grad_fval(self):
+        """Compute gradient in Fourier domain and value of :math:`f`
+        (with the DFT scaling of :meth:`obfn_f`) from a single
+        evaluation of the residual."""
+
+        self.Ryf[:] = self.eval_Rf(self.Yf)
+        Ry = sl.irfftn(self.Ryf, self.cri.Nv, self.cri.axisN)
+        self.WRy[:] = self.W * Ry
+        fval = 0.5 * sl.l2norm(sl.rfftn(self.WRy, self.cri.Nv,
+                                        self.cri.axisN))**2
+        self.WRy *= self.W
+        WRyf = sl.rfftn(self.WRy, self.cri.Nv, self.cri.axisN)
+        gradf = np.conj(self.Df) * WRyf
+        if self.cri.Cd > 1:
+            gradf = np.sum(gradf, axis=self.cri.axisC, keepdims=True)
+
+        return gradf, fval
+
+
+
+    def lipschitz_constant(self):
+        r"""Compute an upper bound on the Lipschitz constant of the
+        gradient of the data fidelity term, i.e. the Lipschitz constant
+        of the unmasked data fidelity term (see
+        :meth:`ConvBPDN.lipschitz_constant`) scaled by the maximum of
+        the squared mask values.
+        """
+
+        L = super(ConvBPDNMask, self).lipschitz_constant()
+        if hasattr(self, 'W'):
+            L *= np.max(np.abs(self.W))**2
+        return L
+
+
+
     def obfn_dfd(self):
         r"""Compute data fidelity term :math:`(1/2) \| W (\sum_m
         \mathbf{d}_m * \mathbf{x}_{m} - \mathbf{s}) \|_2^2`
@@ -463,7 +633,18 @@ class ConvBPDNMask(ConvBPDN):
         Ef = self.eval_Rf(self.Xf)
         E = sl.irfftn(Ef, self.cri.Nv, self.cri.axisN)
 
-        return (np.linalg.norm(self.W * E)**2) / 2.0
+        return (sl.l2norm(self.W * E)**2) / 2.0
+
+
+
+    def eval_fval_x(self, Dxy, flin):
+        r"""Compute value of :math:`f` at :math:`\mathbf{x}` as
+        required for backtracking. The quadratic expansion used by
+        :meth:`ConvBPDN.eval_fval_x` does not apply in the DFT domain
+        when there is a spatial mask, so :meth:`obfn_f` is evaluated.
+        """
+
+        return self.obfn_f(self.Xf)
 
 
 
@@ -482,4 +663,4 @@ class ConvBPDNMask(ConvBPDN):
         R = sl.irfftn(Rf, self.cri.Nv, self.cri.axisN)
         WRf = sl.rfftn(self.W * R, self.cri.Nv, self.cri.axisN)
 
-        return 0.5 * np.linalg.norm(WRf.flatten(), 2)**2
+        return 0.5 * sl.l2norm(WRf)**2
@@ -103,10 +103,17 @@ class ConvCnstrMOD(fista.FISTADFT):
           ``ZeroMean`` : Flag indicating whether the solution
           dictionary :math:`\{\mathbf{d}_m\}` should have zero-mean
           components.
+
+          ``AutoL`` : Flag indicating whether the inverse gradient step
+          parameter :math:`L` should be set to the Lipschitz constant of
+          the gradient of the data fidelity term (see
+          :meth:`ConvCnstrMOD.lipschitz_constant`), computed each time
+          the coefficient maps are set, instead of the value of option
+          ``L``.
         """
 
         defaults = copy.deepcopy(fista.FISTADFT.Options.defaults)
-        defaults.update({'ZeroMean': False})
+        defaults.update({'ZeroMean': False, 'AutoL': False})
 
 
         def __init__(self, opt=None):
@@ -247,9 +254,10 @@ class ConvCnstrMOD(fista.FISTADFT):
         # for FFT calls
         self.Vf = sl.pyfftw_rfftn_empty_aligned(self.X.shape, self.cri.axisN,
                                                 self.dtype)
+        self.setup_dft_plan()
 
         self.Xf = sl.rfftn(self.X, None, self.cri.axisN)
-        self.Yf = self.Xf
+        self.Yf = self.Xf.copy()
         self.store_prev()
         self.Yfprv = self.Yf.copy() + 1e5
 
@@ -276,6 +284,25 @@ class ConvCnstrMOD(fista.FISTADFT):
         self.Z = np.asarray(Z, dtype=self.dtype)
 
         self.Zf = sl.rfftn(self.Z, self.cri.Nv, self.cri.axisN)
+        if self.opt['AutoL'] or self.opt['BackTrack', 'Enabled']:
+            Lc = self.dtype.type(self.lipschitz_constant())
+            if self.opt['AutoL']:
+                self.L = Lc
+            if self.opt['BackTrack', 'Enabled']:
+                self.Lmax = Lc
+
+
+
+    def lipschitz_constant(self):
+        r"""Compute the Lipschitz constant of the gradient of the data
+        fidelity term, i.e. the maximum over all frequencies of the
+        largest eigenvalue of :math:`\hat{Z}^H \hat{Z}`, where
+        :math:`\hat{Z}` is the matrix of coefficient map DFT values,
+        with a row for each training image and a column for each
+        filter, at a single frequency.
+        """
+
+        return sl.mdb_opnorm2(self.Zf, self.cri.axisM, self.cri.axisK)
 
 
 
@@ -307,6 +334,34 @@ class ConvCnstrMOD(fista.FISTADFT):
 
 
 
+    def eval_grad_fval(self):
+        """Compute gradient in Fourier domain and value of :math:`f`
+        (with the DFT scaling of :meth:`obfn_f`) from a single
+        evaluation of the residual."""
+
+        Ryf = self.eval_Rf(self.Yf)
+        gradf = sl.inner(np.conj(self.Zf), Ryf, axis=self.cri.axisK)
+        if self.cri.C > 1 and self.cri.Cd == 1:
+            gradf = np.sum(gradf, axis=self.cri.axisC, keepdims=True)
+
+        return gradf, 0.5 * sl.l2norm(Ryf)**2
+
+
+
+    def eval_fval_x(self, Dxy, flin):
+        r"""Compute value of :math:`f` at :math:`\mathbf{x}` (with the
+        DFT scaling of :meth:`obfn_f`) as required for backtracking.
+        Since :math:`f` is quadratic, this is the sum of its linear
+        approximation ``flin`` about :math:`\mathbf{y}` and the
+        squared norm of the product of the coefficient map DFT and
+        ``Dxy``, the DFT of :math:`\mathbf{x} - \mathbf{y}`.
+        """
+
+        return flin + 0.5 * sl.l2norm(sl.inner(self.Zf, Dxy,
+                                               axis=self.cri.axisM))**2
+
+
+
     def eval_Rf(self, Vf):
         """Evaluate smooth term in Vf."""
 
@@ -355,7 +410,7 @@ class ConvCnstrMOD(fista.FISTADFT):
         P(\mathbf{y}) - \mathbf{y}\|_2`.
         """
 
-        return np.linalg.norm((self.Pcn(self.X) - self.X))
+        return sl.l2norm((self.Pcn(self.X) - self.X))
 
 
 
@@ -370,7 +425,7 @@ class ConvCnstrMOD(fista.FISTADFT):
             Xf = self.Xf
 
         Rf = self.eval_Rf(Xf)
-        return 0.5 * np.linalg.norm(Rf.flatten(), 2)**2
+        return 0.5 * sl.l2norm(Rf)**2
 
 
 
@@ -555,6 +610,39 @@ class ConvCnstrMODMask(ConvCnstrMOD):
 
 
 
+    def eval_grad_fval(self):
+        """Compute gradient in Fourier domain and value of :math:`f`
+        (with the DFT scaling of :meth:`obfn_f`) from a single
+        evaluation of the residual."""
+
+        self.Ryf[:] = self.eval_Rf(self.Yf)
+        Ry = sl.irfftn(self.Ryf, self.cri.Nv, self.cri.axisN)
+        self.WRy[:] = self.W * Ry
+        fval = 0.5 * sl.l2norm(sl.rfftn(self.WRy, self.cri.Nv,
+                                        self.cri.axisN))**2
+        self.WRy *= self.W
+        WRyf = sl.rfftn(self.WRy, self.cri.Nv, self.cri.axisN)
+        gradf = sl.inner(np.conj(self.Zf), WRyf, axis=self.cri.axisK)
+        if self.cri.C > 1 and self.cri.Cd == 1:
+            gradf = np.sum(gradf, axis=self.cri.axisC, keepdims=True)
+
+        return gradf, fval
+
+
+
+    def lipschitz_constant(self):
+        r"""Compute an upper bound on the Lipschitz constant of the
+        gradient of the data fidelity term, i.e. the Lipschitz constant
+        of the unmasked data fidelity term (see
+        :meth:`ConvCnstrMOD.lipschitz_constant`) scaled by the maximum of
+        the squared mask values.
+        """
+
+        return np.max(np.abs(self.W))**2 * \
+            super(ConvCnstrMODMask, self).lipschitz_constant()
+
+
+
     def obfn_dfd(self):
         r"""Compute data fidelity term :math:`(1/2) \sum_k \| W (\sum_m
         \mathbf{d}_m * \mathbf{x}_{k,m} - \mathbf{s}_k) \|_2^2`
@@ -563,7 +651,19 @@ class ConvCnstrMODMask(ConvCnstrMOD):
         Ef = self.eval_Rf(self.Xf)
         E = sl.irfftn(Ef, self.cri.Nv, self.cri.axisN)
 
-        return (np.linalg.norm(self.W * E)**2) / 2.0
+        return (sl.l2norm(self.W * E)**2) / 2.0
+
+
+
+    def eval_fval_x(self, Dxy, flin):
+        r"""Compute value of :math:`f` at :math:`\mathbf{x}` as
+        required for backtracking. The quadratic expansion used by
+        :meth:`ConvCnstrMOD.eval_fval_x` does not apply in the DFT
+        domain when there is a spatial mask, so :meth:`obfn_f` is
+        evaluated.
+        """
+
+        return self.obfn_f(self.Xf)
 
 
 
@@ -582,4 +682,4 @@ class ConvCnstrMODMask(ConvCnstrMOD):
         R = sl.irfftn(Rf, self.cri.Nv, self.cri.axisN)
         WRf = sl.rfftn(self.W * R, self.cri.Nv, self.cri.axisN)
 
-        return 0.5 * np.linalg.norm(WRf.flatten(), 2)**2
+        return 0.5 * sl.l2norm(WRf)**2
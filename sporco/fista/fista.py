@@ -136,6 +136,39 @@ class FISTA(common.IterativeSolver):
 
             ``MaxIter`` : Maximum iterations of updating L when
             backtracking.
+
+          ``Momentum`` : Options for the momentum (extrapolation) term
+          of the auxiliary variable update. These options, and those
+          of ``Restart``, have no effect when robust backtracking is
+          used, since it has its own update of the auxiliary variable.
+
+            ``Type`` : Momentum scheme. Valid values are 'FISTA' for the
+            standard FISTA :math:`t_k` sequence :cite:`beck-2009-fast`,
+            'Lazy' for the momentum coefficient :math:`(k - 1) / (k + d)`,
+            where :math:`k` is the number of iterations since the start
+            or the most recent restart (a "lazy-start" FISTA variant with
+            slower momentum growth for large :math:`d`), and 'Greedy'
+            for a unit momentum coefficient, i.e. the most aggressive
+            extrapolation, which is always combined with adaptive
+            restart (using the gradient criterion if ``Restart`` is not
+            enabled).
+
+            ``LazyD`` : Parameter :math:`d` of the 'Lazy' momentum
+            scheme.
+
+          ``Restart`` : Options for adaptive restart of the momentum
+          :cite:`odonoghue-2015-adaptive`.
+
+            ``Enabled`` : Flag determining whether adaptive restart is
+            enabled.
+
+            ``Criterion`` : Restart criterion. Valid values are
+            'Gradient', for restart when the momentum direction is not a
+            descent direction, i.e. when :math:`\langle \mathbf{y}_{k}
+            - \mathbf{x}_{k+1}, \mathbf{x}_{k+1} - \mathbf{x}_k \rangle
+            > 0`, and 'Function', for restart when the objective
+            function increases, which requires an additional objective
+            function evaluation at every iteration.
         """
 
         defaults = {'FastSolve': False, 'Verbose': False,
@@ -146,7 +179,9 @@ class FISTA(common.IterativeSolver):
                     'BackTrack':
                     {'Enabled': False, 'Robust': False,
                      'gamma_d': 0.9, 'gamma_u': 1.2, 'MaxIter': 100},
-                    'AutoStop': {'Enabled': False, 'Tau0': 1e-2}}
+                    'AutoStop': {'Enabled': False, 'Tau0': 1e-2},
+                    'Momentum': {'Type': 'FISTA', 'LazyD': 10.0},
+                    'Restart': {'Enabled': False, 'Criterion': 'Gradient'}}
 
         def __init__(self, opt=None):
             """
@@ -243,6 +278,11 @@ class FISTA(common.IterativeSolver):
         else:
             self.X = self.opt['X0'].astype(self.dtype, copy=True)
 
+        # Upper bound on the Lipschitz constant of the gradient of f,
+        # used to limit the growth of L when backtracking. Derived
+        # classes that can compute such a bound should set it.
+        self.Lmax = None
+
         # Default values for variables created only if BackTrack is enabled
         if self.opt['BackTrack', 'Enabled']:
             self.F = 0.
@@ -254,13 +294,20 @@ class FISTA(common.IterativeSolver):
                 self.zzinit()
                 self.backtracking = self.robust_backtrack
             else:
-                self.t = 1.
                 self.backtracking = self.standard_backtrack
         else:
             self.F = None
             self.Q = None
             self.iterBTrack = None
-            self.t = 1
+
+        # Initialise momentum state
+        if self.opt['Momentum', 'Type'] not in ('FISTA', 'Lazy', 'Greedy'):
+            raise ValueError('Invalid value for option Momentum.Type: %s' %
+                             self.opt['Momentum', 'Type'])
+        if self.opt['Restart', 'Criterion'] not in ('Gradient', 'Function'):
+            raise ValueError('Invalid value for option Restart.Criterion: '
+                             '%s' % self.opt['Restart', 'Criterion'])
+        self.reset_momentum()
 
         self.Y = None
 
@@ -409,18 +456,76 @@ class FISTA(common.IterativeSolver):
 
 
     def combination_step(self):
-        """Build next update by a smart combination of previous updates.
-        (standard FISTA :cite:`beck-2009-fast`).
+        """Build next update by a smart combination of previous updates
+        (standard FISTA :cite:`beck-2009-fast`, or one of the variants
+        selected by options ``Momentum`` and ``Restart``).
         """
 
-        # Update t step
-        tprv = self.t
-        self.t = 0.5 * float(1. + np.sqrt(1. + 4. * tprv**2))
+        beta = self.momentum_coef()
 
         # Update Y
         if not self.opt['FastSolve']:
             self.Yprv = self.Y.copy()
-        self.Y = self.X + ((tprv - 1.) / self.t) * (self.X - self.Xprv)
+        self.Y = self.X + beta * (self.X - self.Xprv)
+
+
+
+    def reset_momentum(self):
+        """Reset the state of the momentum term, as at the start of
+        the iterations."""
+
+        self.t = 1.
+        self.kr = 0
+        self.Fprv = None
+
+
+
+    def momentum_coef(self):
+        """Compute the coefficient of the momentum term of the
+        auxiliary variable update, and update the momentum state. If
+        adaptive restart is selected and the restart criterion is
+        satisfied, the momentum state is reset and the coefficient is
+        zero.
+        """
+
+        if self.restart_criterion():
+            self.t = 1.
+            self.kr = 0
+            return 0.0
+
+        self.kr += 1
+        mtype = self.opt['Momentum', 'Type']
+        if mtype == 'Greedy':
+            return 1.0
+        elif mtype == 'Lazy':
+            return (self.kr - 1.) / (self.kr + self.opt['Momentum', 'LazyD'])
+        else:
+            tprv = self.t
+            self.t = 0.5 * float(1. + np.sqrt(1. + 4. * tprv**2))
+            return (tprv - 1.) / self.t
+
+
+
+    def restart_criterion(self):
+        """Determine whether the adaptive restart criterion selected by
+        option ``Restart`` is satisfied following the most recent
+        proximal step.
+        """
+
+        if not (self.opt['Restart', 'Enabled'] or
+                self.opt['Momentum', 'Type'] == 'Greedy'):
+            return False
+
+        if self.opt['Restart', 'Enabled'] and \
+           self.opt['Restart', 'Criterion'] == 'Function':
+            F = self.eval_objfn()[0]
+            rst = self.Fprv is not None and F > self.Fprv
+            self.Fprv = F
+            return rst
+        else:
+            return self.eval_linear_approx(
+                self.var_y() - self.var_x(),
+                self.var_x() - self.var_xprv()) > 0
 
 
 
@@ -431,7 +536,15 @@ class FISTA(common.IterativeSolver):
         This also updates variable Y.
         """
 
-        gradY = self.eval_grad()  # Given Y(f), this updates computes gradY(f)
+        # Given Y(f), compute gradY(f) and f(Y), neither of which
+        # depends on L
+        gradY, fY = self.eval_grad_fval()
+
+        # The step size accepted in the previous iteration is the
+        # initial value, which is not allowed to exceed the upper
+        # bound on the Lipschitz constant, when one is available
+        if self.Lmax is not None and self.L > self.Lmax:
+            self.L = self.Lmax
 
         maxiter = self.L_maxiter
 
@@ -441,16 +554,13 @@ class FISTA(common.IterativeSolver):
 
             self.proximal_step(gradY)  # Given gradY(f), L, this updates X(f)
 
-            f = self.obfn_f(self.var_x())
             Dxy = self.eval_Dxy()
-            Q = self.obfn_f(self.var_y()) + \
-                self.eval_linear_approx(Dxy, gradY) + \
-                (self.L / 2.) * np.linalg.norm(Dxy.flatten(), 2)**2
+            flin = fY + self.eval_linear_approx(Dxy, gradY)
+            f = self.eval_fval_x(Dxy, flin)
+            Q = flin + (self.L / 2.) * sl.l2norm(Dxy)**2
 
-            if f <= Q:
+            if f <= Q or not self.backtrack_increase_L():
                 linesearch = 0
-            else:
-                self.L *= self.L_gamma_u
 
             iterBTrack += 1
 
@@ -470,6 +580,8 @@ class FISTA(common.IterativeSolver):
         """
 
         self.L *= self.L_gamma_d
+        if self.Lmax is not None and self.L > self.Lmax:
+            self.L = self.Lmax
         maxiter = self.L_maxiter
 
         iterBTrack = 0
@@ -483,18 +595,16 @@ class FISTA(common.IterativeSolver):
             y = (self.Tk * self.var_xprv() + t * self.ZZ) / T
             self.update_var_y(y)
 
-            gradY = self.proximal_step()  # Given Y(f), L, this updates X(f)
+            gradY, fY = self.eval_grad_fval()
+            self.proximal_step(gradY)  # Given gradY(f), L, this updates X(f)
 
-            f = self.obfn_f(self.var_x())
             Dxy = self.eval_Dxy()
-            Q = self.obfn_f(self.var_y()) + \
-                self.eval_linear_approx(Dxy, gradY) + \
-                (self.L / 2.) * np.linalg.norm(Dxy.flatten(), 2)**2
+            flin = fY + self.eval_linear_approx(Dxy, gradY)
+            f = self.eval_fval_x(Dxy, flin)
+            Q = flin + (self.L / 2.) * sl.l2norm(Dxy)**2
 
-            if f <= Q:
+            if f <= Q or not self.backtrack_increase_L():
                 linesearch = 0
-            else:
-                self.L *= self.L_gamma_u
 
             iterBTrack += 1
 
@@ -507,6 +617,39 @@ class FISTA(common.IterativeSolver):
 
 
 
+    def backtrack_increase_L(self):
+        """Increase L by the backtracking factor ``gamma_u``, without
+        exceeding the upper bound :attr:`Lmax` on the Lipschitz
+        constant, if it is available. Return ``False`` if L is already
+        at this bound, in which case the sufficient decrease condition
+        is guaranteed to hold and backtracking can terminate.
+        """
+
+        if self.Lmax is not None and self.L >= self.Lmax:
+            return False
+        self.L *= self.L_gamma_u
+        if self.Lmax is not None and self.L > self.Lmax:
+            self.L = self.Lmax
+        return True
+
+
+
+    def eval_fval_x(self, Dxy, flin):
+        r"""Compute value of :math:`f` at :math:`\mathbf{x}`, as
+        required for backtracking.
+
+        Overriding this method is optional: derived classes for which
+        :math:`f` is quadratic may compute it more efficiently from
+        ``Dxy`` (:math:`\mathbf{x} - \mathbf{y}`, as computed by
+        :meth:`eval_Dxy`) and ``flin``, the value of the linear
+        approximation :math:`f(\mathbf{y}) + \langle \nabla
+        f(\mathbf{y}), \mathbf{x} - \mathbf{y} \rangle`.
+        """
+
+        return self.obfn_f(self.var_x())
+
+
+
     def eval_linear_approx(self, Dxy, gradY):
         r"""Compute term
         :math:`\langle \nabla f(\mathbf{y}), \mathbf{x} - \mathbf{y} \rangle`
@@ -528,6 +671,19 @@ class FISTA(common.IterativeSolver):
 
 
 
+    def eval_grad_fval(self):
+        r"""Compute gradient and value of :math:`f` at
+        :math:`\mathbf{y}`, as required for backtracking.
+
+        Overriding this method is optional: derived classes in which
+        the gradient and function value share intermediate results
+        should override it to avoid computing them twice.
+        """
+
+        return self.eval_grad(), self.obfn_f(self.var_y())
+
+
+
     def eval_proxop(self, V):
         """Compute proximal operator of :math:`g`.
 
@@ -816,6 +972,17 @@ class FISTADFT(FISTA):
 
 
 
+    def setup_dft_plan(self):
+        """Construct DFT plan used in :meth:`proximal_step` for repeated
+        transforms of arrays of the same shape as X. This method should
+        be called by derived classes once attribute :attr:`cri` has been
+        initialised.
+        """
+
+        self.dftp = sl.RFFTPlan(self.X.shape, self.cri.axisN, self.dtype)
+
+
+
     def postinitialization_backtracking_DFT(self):
         r"""
         Computes variables needed for backtracking when the updates
@@ -848,29 +1015,91 @@ class FISTADFT(FISTA):
             gradf = self.eval_grad()
 
         self.Vf[:] = self.Yf - (1. / self.L) * gradf
-        V = sl.irfftn(self.Vf, self.cri.Nv, self.cri.axisN)
+        V = self.dftp.irfftn(self.Vf)
 
         self.X[:] = self.eval_proxop(V)
-        self.Xf = sl.rfftn(self.X, None, self.cri.axisN)
+        self.dftp.rfftn(self.X, out=self.Xf)
 
         return gradf
 
 
 
+    def standard_backtrack(self):
+        """Estimate step size L by computing a linesearch that
+        guarantees that F <= Q according to the standard FISTA
+        backtracking strategy in :cite:`beck-2009-fast`.
+        This also updates variable Y.
+
+        The first try is a standard :meth:`proximal_step`. Since the
+        gradient step is affine in :math:`1/L`, the spatial domain
+        gradient step for each subsequent try is obtained by updating
+        that of the previous try with the spatial domain gradient,
+        which is computed only once, so that these tries require a
+        forward DFT, but no inverse DFT.
+        """
+
+        # Given Y(f), compute gradY(f) and f(Y), neither of which
+        # depends on L
+        gradY, fY = self.eval_grad_fval()
+
+        # The step size accepted in the previous iteration is the
+        # initial value, which is not allowed to exceed the upper
+        # bound on the Lipschitz constant, when one is available
+        if self.Lmax is not None and self.L > self.Lmax:
+            self.L = self.Lmax
+
+        maxiter = self.L_maxiter
+
+        iterBTrack = 0
+        linesearch = 1
+        V = None
+        G = None
+        while linesearch and iterBTrack < maxiter:
+
+            if V is None:
+                self.Vf[:] = self.Yf - (1. / self.L) * gradY
+                V = self.dftp.irfftn(self.Vf).copy()
+            else:
+                if G is None:
+                    self.Vf[:] = gradY
+                    G = self.dftp.irfftn(self.Vf).copy()
+                V += (1. / Lprv - 1. / self.L) * G
+            Lprv = self.L
+
+            self.X[:] = self.eval_proxop(V)
+            self.dftp.rfftn(self.X, out=self.Xf)
+
+            Dxy = self.eval_Dxy()
+            flin = fY + self.eval_linear_approx(Dxy, gradY)
+            f = self.eval_fval_x(Dxy, flin)
+            Q = flin + (self.L / 2.) * sl.l2norm(Dxy)**2
+
+            if f <= Q or not self.backtrack_increase_L():
+                linesearch = 0
+
+            iterBTrack += 1
+
+        self.F = f
+        self.Q = Q
+        self.iterBTrack = iterBTrack
+        # Update auxiliary sequence
+        self.combination_step()
+
+
+
     def combination_step(self):
         """Update auxiliary state by a smart combination of previous
         updates in the frequency domain (standard FISTA
-        :cite:`beck-2009-fast`).
+        :cite:`beck-2009-fast`, or one of the variants selected by
+        options ``Momentum`` and ``Restart``).
         """
 
-        # Update t step
-        tprv = self.t
-        self.t = 0.5 * float(1. + np.sqrt(1. + 4. * tprv**2))
+        beta = self.momentum_coef()
 
         # Update Y
         if not self.opt['FastSolve']:
             self.Yfprv = self.Yf.copy()
-        self.Yf = self.Xf + ((tprv - 1.) / self.t) * (self.Xf - self.Xfprv)
+        self.Yf = self.Xf + beta * (self.Xf - self.Xfprv)
 
 
 
@@ -9,14 +9,34 @@
 
 from __future__ import division
 from builtins import range
+from builtins import object
 
+import atexit
+import collections
+import contextlib
+import hashlib
 import multiprocessing
+import os
+import platform
+import tempfile
+import threading
 import numpy as np
 import scipy
 from scipy import linalg
 from scipy import fftpack
 from scipy.sparse.linalg import LinearOperator, cg
-import pyfftw
+try:
+    import pyfftw
+except ImportError:
+    have_pyfftw = False
+else:
+    have_pyfftw = True
+try:
+    import scipy.fft as spfft
+except ImportError:
+    have_scipy_fft = False
+else:
+    have_scipy_fft = True
 try:
     import numexpr as ne
 except ImportError:
@@ -29,23 +49,33 @@ __author__ = """Brendt Wohlberg <brendt@ieee.org>"""
 
 
 __all__ = ['complex_dtype', 'pyfftw_byte_aligned', 'pyfftw_empty_aligned',
-           'pyfftw_rfftn_empty_aligned', 'fftn', 'ifftn', 'rfftn', 'irfftn',
-           'dctii', 'idctii', 'fftconv', 'inner', 'dot', 'solvedbi_sm',
-           'solvedbi_sm_c', 'solvedbd_sm', 'solvedbd_sm_c', 'solvemdbi_ism',
-           'solvemdbi_rsm', 'solvemdbi_cg', 'lu_factor', 'lu_solve_ATAI',
-           'lu_solve_AATI', 'cho_factor', 'cho_solve_ATAI', 'cho_solve_AATI',
-           'zpad', 'Gax', 'GTax', 'GradientFilters', 'zdivide', 'proj_l2ball',
-           'promote16', 'atleast_nd', 'split', 'blockcirculant', 'fl2norm2',
-           'rfl2norm2', 'rrs']
-
-
-
-pyfftw.interfaces.cache.enable()
-pyfftw.interfaces.cache.set_keepalive_time(300)
+           'pyfftw_rfftn_empty_aligned', 'memmap_zeros',
+           'register_fft_backend',
+           'set_fft_backend', 'get_fft_backend', 'fft_backend', 'fftn',
+           'ifftn', 'rfftn', 'irfftn', 'RFFTPlan', 'fftw_wisdom_path',
+           'export_fftw_wisdom', 'import_fftw_wisdom', 'load_fftw_wisdom',
+           'save_fftw_wisdom', 'enable_fftw_wisdom_cache', 'dctii', 'idctii',
+           'fftconv', 'inner', 'dot', 'solvedbi_sm', 'solvedbi_sm_c',
+           'SMSolver', 'solvedbd_sm', 'solvedbd_sm_c',
+           'solvemdbi_ism', 'solvemdbi_gram', 'solvemdbi_gram_c',
+           'MDBISolver', 'solvemdbi_rsm', 'solvemdbi_cg', 'solvemdbi_bcg',
+           'mdb_opnorm2',
+           'lu_factor', 'lu_solve_ATAI', 'lu_solve_AATI', 'cho_factor',
+           'cho_solve_ATAI',
+           'cho_solve_AATI', 'zpad', 'Gax', 'GTax', 'GradientFilters',
+           'zdivide', 'proj_l2ball', 'promote16', 'atleast_nd', 'split',
+           'blockcirculant', 'l2norm', 'l1norm', 'fl2norm2', 'rfl2norm2',
+           'rrs']
+
+
+
+if have_pyfftw:
+    pyfftw.interfaces.cache.enable()
+    pyfftw.interfaces.cache.set_keepalive_time(300)
 
 pyfftw_threads = multiprocessing.cpu_count()
-"""Global variable setting the number of threads used in :mod:`pyfftw`
-computations"""
+"""Global variable setting the default number of threads used in FFT
+computations (see :func:`set_fft_backend`)"""
 
 
 def complex_dtype(dtype):
@@ -74,7 +104,9 @@ def pyfftw_byte_aligned(array, dtype=None, n=None):
     """Construct a byte-aligned array for FFTs.
 
     Construct a byte-aligned array for efficient use by :mod:`pyfftw`.
-    This function is a wrapper for :func:`pyfftw.byte_align`
+    This function is a wrapper for :func:`pyfftw.byte_align`, and
+    returns an array without any alignment guarantee if :mod:`pyfftw`
+    is not installed.
 
     Parameters
     ----------
@@ -91,7 +123,10 @@ def pyfftw_byte_aligned(array, dtype=None, n=None):
       Array with required byte-alignment
     """
 
-    return pyfftw.byte_align(array, n=n, dtype=dtype)
+    if have_pyfftw:
+        return pyfftw.byte_align(array, n=n, dtype=dtype)
+    else:
+        return np.asarray(array, dtype=dtype)
 
 
 
@@ -99,7 +134,9 @@ def pyfftw_empty_aligned(shape, dtype, order='C', n=None):
     """Construct an empty byte-aligned array for FFTs.
 
     Construct an empty byte-aligned array for efficient use by :mod:`pyfftw`.
-    This function is a wrapper for :func:`pyfftw.empty_aligned`
+    This function is a wrapper for :func:`pyfftw.empty_aligned`, and
+    returns an array without any alignment guarantee if :mod:`pyfftw`
+    is not installed.
 
     Parameters
     ----------
@@ -119,7 +156,10 @@ def pyfftw_empty_aligned(shape, dtype, order='C', n=None):
       Empty array with required byte-alignment
     """
 
-    return pyfftw.empty_aligned(shape, dtype, order, n)
+    if have_pyfftw:
+        return pyfftw.empty_aligned(shape, dtype, order, n)
+    else:
+        return np.empty(shape, dtype, order)
 
 
 
@@ -159,16 +199,387 @@ def pyfftw_rfftn_empty_aligned(shape, axes, dtype, order='C', n=None):
     raxis = axes[-1]
     ashp[raxis] = ashp[raxis] // 2 + 1
     cdtype = complex_dtype(dtype)
-    return pyfftw.empty_aligned(ashp, cdtype, order, n)
+    return pyfftw_empty_aligned(ashp, cdtype, order, n)
+
+
+
+def memmap_zeros(shape, dtype, dir=None):
+    """Construct a zero-initialised array backed by a temporary file.
+
+    Construct a :class:`numpy.memmap` array backed by an anonymous
+    temporary file, so that the array contents are paged to and from
+    disk by the operating system rather than being held in memory.
+    The file is unlinked on creation (on platforms that support this)
+    and its storage is released when the array is deleted. Since the
+    array is page-aligned, it is also suitable for efficient use by
+    :mod:`pyfftw` functions.
+
+    Parameters
+    ----------
+    shape : sequence of ints
+      Output array shape
+    dtype : dtype
+      Output array dtype
+    dir : string or None, optional (default None)
+      Directory in which the temporary file is created. If ``None``,
+      the default directory selected by :mod:`tempfile` is used.
+
+    Returns
+    -------
+    a :  numpy.memmap
+      Zero-initialised memory-mapped array
+    """
+
+    with tempfile.TemporaryFile(prefix='sporco_', dir=dir) as f:
+        return np.memmap(f, dtype=dtype, mode='w+', shape=tuple(shape))
+
+
+
+_pyfftw_local = threading.local()
+"""Thread-local storage for the :class:`pyfftw.FFTW` objects used by
+the 'pyfftw' backend in threads other than the main thread"""
+
+_pyfftw_local_size = 32
+"""Maximum number of :class:`pyfftw.FFTW` objects cached by each thread
+other than the main thread"""
+
+
+def _pyfftw_main_thread():
+    """Determine whether the calling thread is the main thread. The
+    :mod:`pyfftw.interfaces` cache shares a single :class:`pyfftw.FFTW`
+    object, the input and output arrays of which are updated on every
+    call, between all calls with the same array shape and dtype, and
+    can therefore only be used safely by a single thread.
+    """
+
+    return threading.current_thread() is threading.main_thread()
+
+
+def _pyfftw_local_xfftn(fn, a, s, axes, threads, effort):
+    """Compute a DFT using the :mod:`pyfftw.builders` function `fn`,
+    with the :class:`pyfftw.FFTW` objects cached separately for each
+    thread.
+    """
+
+    a = np.asarray(a)
+    if fn == 'irfftn':
+        # The input of a complex-to-real transform is destroyed
+        a = a.copy()
+    cache = getattr(_pyfftw_local, 'cache', None)
+    if cache is None:
+        cache = collections.OrderedDict()
+        _pyfftw_local.cache = cache
+    key = (fn, a.shape, a.dtype.str, None if s is None else tuple(s),
+           None if axes is None else tuple(axes), threads, effort)
+    fftw = cache.pop(key, None)
+    if fftw is None:
+        # Plan on a separate array since planning may overwrite it
+        fftw = getattr(pyfftw.builders, fn)(
+            pyfftw.empty_aligned(a.shape, a.dtype), s=s, axes=axes,
+            planner_effort=effort, threads=threads)
+        if len(cache) >= _pyfftw_local_size:
+            cache.popitem(last=False)
+    cache[key] = fftw
+    out = pyfftw.empty_aligned(fftw.output_array.shape,
+                               fftw.output_array.dtype,
+                               n=fftw.output_alignment)
+    fftw(input_array=a, output_array=out)
+    return out
+
+
+def _pyfftw_fftn(a, s, axes, threads, effort):
+    if not _pyfftw_main_thread():
+        return _pyfftw_local_xfftn('fftn', a, s, axes, threads, effort)
+    return pyfftw.interfaces.numpy_fft.fftn(
+        a, s=s, axes=axes, overwrite_input=False, planner_effort=effort,
+        threads=threads)
+
+
+def _pyfftw_ifftn(a, s, axes, threads, effort):
+    if not _pyfftw_main_thread():
+        return _pyfftw_local_xfftn('ifftn', a, s, axes, threads, effort)
+    return pyfftw.interfaces.numpy_fft.ifftn(
+        a, s=s, axes=axes, overwrite_input=False, planner_effort=effort,
+        threads=threads)
+
+
+def _pyfftw_rfftn(a, s, axes, threads, effort):
+    if not _pyfftw_main_thread():
+        return _pyfftw_local_xfftn('rfftn', a, s, axes, threads, effort)
+    return pyfftw.interfaces.numpy_fft.rfftn(
+        a, s=s, axes=axes, overwrite_input=False, planner_effort=effort,
+        threads=threads)
+
+
+def _pyfftw_irfftn(a, s, axes, threads, effort):
+    if not _pyfftw_main_thread():
+        return _pyfftw_local_xfftn('irfftn', a, s, axes, threads, effort)
+    return pyfftw.interfaces.numpy_fft.irfftn(
+        a, s=s, axes=axes, overwrite_input=False, planner_effort=effort,
+        threads=threads)
+
+
+def _pyfftw_dct(x, axis, threads, effort):
+    if not _pyfftw_main_thread():
+        return fftpack.dct(x, type=2, axis=axis, norm='ortho')
+    return pyfftw.interfaces.scipy_fftpack.dct(
+        x, type=2, axis=axis, norm='ortho', planner_effort=effort,
+        threads=threads)
+
+
+def _pyfftw_idct(x, axis, threads, effort):
+    if not _pyfftw_main_thread():
+        return fftpack.idct(x, type=2, axis=axis, norm='ortho')
+    return pyfftw.interfaces.scipy_fftpack.idct(
+        x, type=2, axis=axis, norm='ortho', planner_effort=effort,
+        threads=threads)
+
+
+def _scipy_fftn(a, s, axes, threads, effort):
+    return spfft.fftn(a, s=s, axes=axes, workers=threads)
+
+
+def _scipy_ifftn(a, s, axes, threads, effort):
+    return spfft.ifftn(a, s=s, axes=axes, workers=threads)
+
+
+def _scipy_rfftn(a, s, axes, threads, effort):
+    return spfft.rfftn(a, s=s, axes=axes, workers=threads)
+
+
+def _scipy_irfftn(a, s, axes, threads, effort):
+    return spfft.irfftn(a, s=s, axes=axes, workers=threads)
+
+
+def _scipy_dct(x, axis, threads, effort):
+    return spfft.dct(x, type=2, axis=axis, norm='ortho', workers=threads)
+
+
+def _scipy_idct(x, axis, threads, effort):
+    return spfft.idct(x, type=2, axis=axis, norm='ortho', workers=threads)
+
+
+# The numpy.fft functions always compute in double precision: the
+# results are cast to the precision of the input so that all backends
+# have the same dtype behaviour
+def _numpy_fftn(a, s, axes, threads, effort):
+    a = np.asarray(a)
+    return np.asarray(np.fft.fftn(a, s, axes),
+                      dtype=complex_dtype(a.real.dtype))
+
+
+def _numpy_ifftn(a, s, axes, threads, effort):
+    a = np.asarray(a)
+    return np.asarray(np.fft.ifftn(a, s, axes),
+                      dtype=complex_dtype(a.real.dtype))
+
+
+def _numpy_rfftn(a, s, axes, threads, effort):
+    a = np.asarray(a)
+    return np.asarray(np.fft.rfftn(a, s, axes), dtype=complex_dtype(a.dtype))
+
+
+def _numpy_irfftn(a, s, axes, threads, effort):
+    a = np.asarray(a)
+    return np.asarray(np.fft.irfftn(a, s, axes), dtype=a.real.dtype)
+
+
+def _numpy_dct(x, axis, threads, effort):
+    return fftpack.dct(x, type=2, axis=axis, norm='ortho')
+
+
+def _numpy_idct(x, axis, threads, effort):
+    return fftpack.idct(x, type=2, axis=axis, norm='ortho')
+
+
+
+_fft_backends = {}
+"""Registry of FFT backends (see :func:`register_fft_backend`)"""
+
+_fft_config = {'backend': None, 'threads': None, 'effort': 'FFTW_MEASURE'}
+"""Current FFT backend selection and options"""
+
+
+
+def register_fft_backend(name, fftn, ifftn, rfftn, irfftn, dct, idct):
+    """Register an FFT backend.
+
+    Register a set of functions implementing the transforms used by
+    :func:`fftn`, :func:`ifftn`, :func:`rfftn`, :func:`irfftn`,
+    :func:`dctii`, and :func:`idctii`. The DFT functions should have
+    signature ``(a, s, axes, threads, effort)`` and interface similar
+    to that of the corresponding :mod:`numpy.fft` functions, and the
+    DCT functions should have signature ``(x, axis, threads, effort)``
+    and compute the orthonormal one-dimensional DCT-II and its
+    inverse on the specified axis. Parameters `threads` and `effort`
+    are the number of threads and the planning effort (see
+    :func:`set_fft_backend`), which may be ignored if they are not
+    meaningful for the backend.
+
+    Parameters
+    ----------
+    name : string
+      Backend name
+    fftn : function
+      Multi-dimensional DFT
+    ifftn : function
+      Multi-dimensional inverse DFT
+    rfftn : function
+      Multi-dimensional DFT for real input
+    irfftn : function
+      Multi-dimensional inverse DFT for real input
+    dct : function
+      One-dimensional DCT-II
+    idct : function
+      One-dimensional inverse DCT-II
+    """
+
+    _fft_backends[name] = {'fftn': fftn, 'ifftn': ifftn, 'rfftn': rfftn,
+                           'irfftn': irfftn, 'dct': dct, 'idct': idct}
+
+
+
+if have_pyfftw:
+    register_fft_backend('pyfftw', _pyfftw_fftn, _pyfftw_ifftn,
+                         _pyfftw_rfftn, _pyfftw_irfftn, _pyfftw_dct,
+                         _pyfftw_idct)
+if have_scipy_fft:
+    register_fft_backend('scipy', _scipy_fftn, _scipy_ifftn, _scipy_rfftn,
+                         _scipy_irfftn, _scipy_dct, _scipy_idct)
+register_fft_backend('numpy', _numpy_fftn, _numpy_ifftn, _numpy_rfftn,
+                     _numpy_irfftn, _numpy_dct, _numpy_idct)
+
+if have_pyfftw:
+    _fft_config['backend'] = 'pyfftw'
+elif have_scipy_fft:
+    _fft_config['backend'] = 'scipy'
+else:
+    _fft_config['backend'] = 'numpy'
+
+
+
+def set_fft_backend(name=None, threads=None, effort=None):
+    """Select the FFT backend for the current process.
+
+    Select the backend used by :func:`fftn`, :func:`ifftn`,
+    :func:`rfftn`, :func:`irfftn`, :func:`dctii`, :func:`idctii`,
+    :func:`fftconv`, and :class:`RFFTPlan`. The backends available by
+    default are 'pyfftw' (the default, if :mod:`pyfftw` is installed),
+    'scipy' (:mod:`scipy.fft`, if available), and 'numpy'
+    (:mod:`numpy.fft`, with the DCT computed via :mod:`scipy.fftpack`).
+    Selecting a backend other than 'pyfftw', or setting `threads` to 1,
+    avoids the hang that may occur when multi-threaded :mod:`pyfftw`
+    is used within :mod:`multiprocessing` worker processes (see
+    :func:`.util.grid_search`). Parameters with value None leave the
+    corresponding setting unchanged.
+
+    The selection is stored in module-level state shared by all
+    threads of the process, so this function is not thread-safe: it
+    should not be called while other threads, e.g. the workers of a
+    :class:`.shmpool.ThreadPool`, are computing FFTs. The FFT functions
+    themselves may be called concurrently from multiple threads with
+    any of the default backends: since the :mod:`pyfftw.interfaces`
+    cache can not be shared between threads, the 'pyfftw' backend
+    uses separately cached :class:`pyfftw.FFTW` objects in each thread
+    other than the main thread (and computes the DCT via
+    :mod:`scipy.fftpack` in these threads). An :class:`RFFTPlan`
+    object should not, however, be used concurrently by multiple
+    threads.
+
+    Parameters
+    ----------
+    name : string or None, optional (default None)
+      Name of the backend (see :func:`register_fft_backend`)
+    threads : int or None, optional (default None)
+      Number of threads used by backends that support multi-threading.
+      If never set, the value of :data:`pyfftw_threads` is used.
+    effort : string or None, optional (default None)
+      Planning effort for the 'pyfftw' backend, one of
+      'FFTW_ESTIMATE', 'FFTW_MEASURE', 'FFTW_PATIENT', or
+      'FFTW_EXHAUSTIVE'. The initial value is 'FFTW_MEASURE'.
+    """
+
+    if name is not None:
+        if name not in _fft_backends:
+            raise ValueError('Unknown FFT backend %s' % name)
+        _fft_config['backend'] = name
+    if threads is not None:
+        _fft_config['threads'] = threads
+    if effort is not None:
+        _fft_config['effort'] = effort
+
+
+
+def get_fft_backend():
+    """Get the name of the currently selected FFT backend.
+
+    Returns
+    -------
+    name : string
+      Name of the current backend
+    """
+
+    return _fft_config['backend']
+
+
+
+@contextlib.contextmanager
+def fft_backend(name=None, threads=None, effort=None):
+    """Context manager for temporary selection of the FFT backend.
+
+    Select the FFT backend and options (see :func:`set_fft_backend`)
+    for the duration of a ``with`` block, e.g. ::
+
+      with sporco.linalg.fft_backend('scipy', threads=4):
+          b = cbpdn.ConvBPDN(D, S, lmbda)
+          b.solve()
+
+    The previous selection is restored on exit from the block. Note
+    that :class:`RFFTPlan` objects use the backend selected when they
+    are constructed. Since the selection is module-level state shared
+    by all threads of the process, this context manager is not
+    thread-safe: the selection also applies to FFTs computed by other
+    threads for the duration of the block, and nested use in
+    concurrent threads may not restore the original selection.
+
+    Parameters
+    ----------
+    name : string or None, optional (default None)
+      Name of the backend
+    threads : int or None, optional (default None)
+      Number of threads
+    effort : string or None, optional (default None)
+      Planning effort for the 'pyfftw' backend
+    """
+
+    prev = _fft_config.copy()
+    set_fft_backend(name, threads, effort)
+    try:
+        yield
+    finally:
+        _fft_config.update(prev)
+
+
+
+def _fft_fn(fn):
+    """Get the specified function of the current backend together
+    with the current number of threads and planning effort.
+    """
+
+    threads = _fft_config['threads']
+    if threads is None:
+        threads = pyfftw_threads
+    return (_fft_backends[_fft_config['backend']][fn], threads,
+            _fft_config['effort'])
 
 
 
 def fftn(a, s=None, axes=None):
     """Multi-dimensional discrete Fourier transform.
 
-    Compute the multi-dimensional discrete Fourier transform. This function
-    is a wrapper for :func:`pyfftw.interfaces.numpy_fft.fftn`,
-    with an interface similar to that of :func:`numpy.fft.fftn`.
+    Compute the multi-dimensional discrete Fourier transform using the
+    current FFT backend (see :func:`set_fft_backend`), with an
+    interface similar to that of :func:`numpy.fft.fftn`.
 
     Parameters
     ----------
@@ -186,18 +597,17 @@ def fftn(a, s=None, axes=None):
       DFT of input array
     """
 
-    return pyfftw.interfaces.numpy_fft.fftn(
-        a, s=s, axes=axes, overwrite_input=False,
-        planner_effort='FFTW_MEASURE', threads=pyfftw_threads)
+    fn, threads, effort = _fft_fn('fftn')
+    return fn(a, s, axes, threads, effort)
 
 
 
 def ifftn(a, s=None, axes=None):
     """Multi-dimensional inverse discrete Fourier transform.
 
-    Compute the multi-dimensional inverse discrete Fourier transform.
-    This function is a wrapper for :func:`pyfftw.interfaces.numpy_fft.ifftn`,
-    with an interface similar to that of :func:`numpy.fft.ifftn`.
+    Compute the multi-dimensional inverse discrete Fourier transform
+    using the current FFT backend (see :func:`set_fft_backend`), with
+    an interface similar to that of :func:`numpy.fft.ifftn`.
 
     Parameters
     ----------
@@ -215,17 +625,16 @@ def ifftn(a, s=None, axes=None):
       Inverse DFT of input array
     """
 
-    return pyfftw.interfaces.numpy_fft.ifftn(
-        a, s=s, axes=axes, overwrite_input=False,
-        planner_effort='FFTW_MEASURE', threads=pyfftw_threads)
+    fn, threads, effort = _fft_fn('ifftn')
+    return fn(a, s, axes, threads, effort)
 
 
 
 def rfftn(a, s=None, axes=None):
     """Multi-dimensional discrete Fourier transform for real input.
 
-    Compute the multi-dimensional discrete Fourier transform for real input.
-    This function is a wrapper for :func:`pyfftw.interfaces.numpy_fft.rfftn`,
+    Compute the multi-dimensional discrete Fourier transform for real
+    input using the current FFT backend (see :func:`set_fft_backend`),
     with an interface similar to that of :func:`numpy.fft.rfftn`.
 
     Parameters
@@ -244,9 +653,8 @@ def rfftn(a, s=None, axes=None):
       DFT of input array
     """
 
-    return pyfftw.interfaces.numpy_fft.rfftn(
-        a, s=s, axes=axes, overwrite_input=False,
-        planner_effort='FFTW_MEASURE', threads=pyfftw_threads)
+    fn, threads, effort = _fft_fn('rfftn')
+    return fn(a, s, axes, threads, effort)
 
 
 
@@ -254,9 +662,9 @@ def irfftn(a, s, axes=None):
     """Multi-dimensional inverse discrete Fourier transform for real input.
 
     Compute the inverse of the multi-dimensional discrete Fourier
-    transform for real input. This function is a wrapper for
-    :func:`pyfftw.interfaces.numpy_fft.irfftn`, with an interface similar
-    to that of :func:`numpy.fft.irfftn`.
+    transform for real input using the current FFT backend (see
+    :func:`set_fft_backend`), with an interface similar to that of
+    :func:`numpy.fft.irfftn`.
 
     Parameters
     ----------
@@ -276,9 +684,391 @@ def irfftn(a, s, axes=None):
       Inverse DFT of input array
     """
 
-    return pyfftw.interfaces.numpy_fft.irfftn(
-        a, s=s, axes=axes, overwrite_input=False,
-        planner_effort='FFTW_MEASURE', threads=pyfftw_threads)
+    fn, threads, effort = _fft_fn('irfftn')
+    return fn(a, s, axes, threads, effort)
+
+
+
+class RFFTPlan(object):
+    """Pre-planned multi-dimensional real DFT and inverse real DFT.
+
+    Construct and hold :class:`pyfftw.FFTW` plan objects for the
+    forward and inverse real DFT of arrays of a fixed shape and dtype,
+    together with the byte-aligned arrays on which they operate. This
+    avoids the plan cache lookup, input array copy, and output array
+    allocation incurred on each call to :func:`rfftn` and
+    :func:`irfftn`, and is intended for use within the iterations of
+    solvers in which these transforms are repeatedly computed for
+    arrays of the same shape. If the FFT backend selected (see
+    :func:`set_fft_backend`) at the time of construction is not
+    'pyfftw', the transforms are computed by the functions of that
+    backend, with the results written to the same arrays.
+
+    The same pair of arrays, :attr:`a` (real) and :attr:`af`
+    (complex), is used as the input and output of both transforms, so
+    that the array returned by :meth:`rfftn` is overwritten by a
+    subsequent call to :meth:`irfftn` and vice versa. Results that
+    are required to persist beyond the next call should be copied,
+    either explicitly or via the `out` parameter. The copy of the
+    input of the forward DFT can be avoided by writing it directly
+    into :attr:`a` and calling :meth:`rfftn` without an argument, and
+    the inverse DFT is computed directly into a byte-aligned `out`
+    array (see :func:`pyfftw_empty_aligned`).
+    """
+
+    def __init__(self, shape, axes, dtype):
+        """
+        Parameters
+        ----------
+        shape : sequence of ints
+          Shape of real array to be transformed
+        axes : sequence of ints
+          Axes over which to compute the DFT
+        dtype : dtype
+          Real dtype of the array to be transformed
+        """
+
+        self.shape = tuple(shape)
+        self.axes = tuple(axes)
+        self.dtype = np.dtype(dtype)
+        self.a = pyfftw_empty_aligned(self.shape, self.dtype)
+        self.af = pyfftw_rfftn_empty_aligned(self.shape, self.axes,
+                                             self.dtype)
+        self.backend = get_fft_backend()
+        if self.backend == 'pyfftw':
+            _, threads, effort = _fft_fn('rfftn')
+            # Planning overwrites the arrays, which are therefore only
+            # initialised after construction of the plans
+            self._fwd = pyfftw.FFTW(self.a, self.af, axes=self.axes,
+                                    direction='FFTW_FORWARD',
+                                    flags=(effort,), threads=threads)
+            self._inv = pyfftw.FFTW(self.af, self.a, axes=self.axes,
+                                    direction='FFTW_BACKWARD',
+                                    flags=(effort,), threads=threads)
+        else:
+            self._fwd = None
+            self._inv = None
+        self.a[:] = 0
+        self.af[:] = 0
+
+
+
+    def __getstate__(self):
+        """Support pickling by excluding the :class:`pyfftw.FFTW`
+        objects, which are reconstructed, using the FFT backend
+        selected at the time, on unpickling. The content of arrays
+        :attr:`a` and :attr:`af` is not preserved.
+        """
+
+        return {'shape': self.shape, 'axes': self.axes, 'dtype': self.dtype}
+
+
+
+    def __setstate__(self, state):
+        """Reconstruct plans and arrays on unpickling."""
+
+        self.__init__(state['shape'], state['axes'], state['dtype'])
+
+
+
+    def rfftn(self, a=None, out=None):
+        """Compute the DFT of a real array.
+
+        Parameters
+        ----------
+        a : array_like or None, optional (default None)
+          Input array of the shape specified on construction of the
+          plan. If None, the DFT of the current content of :attr:`a`
+          is computed.
+        out : ndarray or None, optional (default None)
+          Array into which the result should be copied
+
+        Returns
+        -------
+        af : complex ndarray
+          DFT of input array (either `out`, if specified, or
+          :attr:`af`)
+        """
+
+        if a is not None and a is not self.a:
+            self.a[:] = a
+        if self._fwd is None:
+            fn, threads, effort = _fft_fn('rfftn')
+            self.af[:] = fn(self.a, None, self.axes, threads, effort)
+        else:
+            self._fwd()
+        if out is None:
+            return self.af
+        else:
+            out[:] = self.af
+            return out
+
+
+
+    def irfftn(self, af=None, out=None):
+        """Compute the inverse DFT of the DFT of a real array.
+
+        Parameters
+        ----------
+        af : array_like or None, optional (default None)
+          Input array of the shape of :attr:`af`. If None, the inverse
+          DFT of the current content of :attr:`af` is computed. Note
+          that the content of :attr:`af` is destroyed by computation of
+          the inverse DFT.
+        out : ndarray or None, optional (default None)
+          Array into which the result should be written. If it has the
+          same shape, dtype, memory layout, and alignment as
+          :attr:`a`, the inverse DFT is computed directly into it,
+          in which case the content of :attr:`a` is not modified;
+          otherwise the result is copied into it.
+
+        Returns
+        -------
+        a : ndarray
+          Inverse DFT of input array (either `out`, if specified, or
+          :attr:`a`)
+        """
+
+        if af is not None and af is not self.af:
+            self.af[:] = af
+        if self._inv is None:
+            fn, threads, effort = _fft_fn('irfftn')
+            a = fn(self.af, [self.shape[k] for k in self.axes], self.axes,
+                   threads, effort)
+            if out is None:
+                self.a[:] = a
+                return self.a
+            else:
+                out[:] = a
+                return out
+        if out is None:
+            self._inv()
+            return self.a
+        if out.dtype == self.dtype and out.strides == self.a.strides and \
+           out.shape == self.shape and \
+           pyfftw.is_n_byte_aligned(out, self._inv.output_alignment):
+            try:
+                self._inv(output_array=out)
+            finally:
+                self._inv.update_arrays(self.af, self.a)
+        else:
+            self._inv()
+            out[:] = self.a
+        return out
+
+
+
+def _fftw_wisdom_key():
+    """Construct a string identifying the host and CPU features, used
+    to key the FFTW wisdom cache file.
+    """
+
+    flags = ''
+    try:
+        with open('/proc/cpuinfo') as f:
+            for line in f:
+                if line.startswith('flags') or line.startswith('Features'):
+                    flags = line.split(':', 1)[1].strip()
+                    break
+    except (IOError, OSError):
+        pass
+    ident = '|'.join([platform.node(), platform.machine(),
+                      platform.processor(), flags,
+                      str(multiprocessing.cpu_count()),
+                      pyfftw.__version__ if have_pyfftw else ''])
+    return hashlib.sha1(ident.encode('utf-8')).hexdigest()[0:16]
+
+
+
+def fftw_wisdom_path():
+    """Get the path of the FFTW wisdom cache file for this host.
+
+    The cache directory is taken from environment variable
+    ``SPORCO_CACHE_DIR`` if it is set, otherwise it is the ``sporco``
+    subdirectory of ``$XDG_CACHE_HOME`` (or ``~/.cache`` if that is
+    not set). The file name includes a hash of the host name,
+    architecture, CPU features, and :mod:`pyfftw` version, so that
+    wisdom accumulated on one machine is not applied on another
+    (e.g. on a different node type sharing the same home directory).
+
+    Returns
+    -------
+    path : string
+      Path of the wisdom cache file
+    """
+
+    cdir = os.environ.get('SPORCO_CACHE_DIR')
+    if cdir is None:
+        cdir = os.path.join(os.environ.get('XDG_CACHE_HOME',
+                            os.path.join(os.path.expanduser('~'), '.cache')),
+                            'sporco')
+    return os.path.join(cdir, 'fftw_wisdom_%s.npz' % _fftw_wisdom_key())
+
+
+
+def export_fftw_wisdom():
+    """Export the FFTW wisdom accumulated by the current process.
+
+    Returns
+    -------
+    wisdom : tuple or None
+      Wisdom as returned by :func:`pyfftw.export_wisdom`, or None if
+      :mod:`pyfftw` is not installed
+    """
+
+    if have_pyfftw:
+        return pyfftw.export_wisdom()
+    else:
+        return None
+
+
+
+def import_fftw_wisdom(wisdom):
+    """Import FFTW wisdom into the current process.
+
+    Import wisdom obtained from :func:`export_fftw_wisdom`, possibly
+    in another process. This function is suitable for use as the
+    `initializer` of a :class:`multiprocessing.Pool`, e.g. ::
+
+      pool = mp.Pool(processes=nproc,
+                     initializer=sporco.linalg.import_fftw_wisdom,
+                     initargs=(sporco.linalg.export_fftw_wisdom(),))
+
+    so that worker processes do not repeat planning for transform
+    shapes that have already been planned in the parent process.
+    This function has no effect if :mod:`pyfftw` is not installed or
+    `wisdom` is None.
+
+    Parameters
+    ----------
+    wisdom : tuple or None
+      Wisdom as returned by :func:`export_fftw_wisdom`
+    """
+
+    if have_pyfftw and wisdom is not None:
+        pyfftw.import_wisdom(wisdom)
+
+
+
+def load_fftw_wisdom(path=None):
+    """Load FFTW wisdom from the on-disk cache.
+
+    The wisdom is stored as a :func:`numpy.savez` file of byte arrays,
+    which is loaded with pickle support disabled, so that a modified
+    cache file cannot cause execution of arbitrary code. A file that
+    does not have the expected structure is ignored.
+
+    Parameters
+    ----------
+    path : string or None, optional (default None)
+      Path of the wisdom file. If None, the path returned by
+      :func:`fftw_wisdom_path` is used.
+
+    Returns
+    -------
+    loaded : bool
+      True if wisdom was loaded, False if :mod:`pyfftw` is not
+      installed or the file does not exist or could not be read
+    """
+
+    if not have_pyfftw:
+        return False
+    if path is None:
+        path = fftw_wisdom_path()
+    try:
+        with np.load(path, allow_pickle=False) as npz:
+            keys = sorted(npz.files)
+            if keys != ['wisdom%d' % n for n in range(len(keys))]:
+                return False
+            wisdom = []
+            for k in keys:
+                w = npz[k]
+                if w.dtype != np.uint8 or w.ndim != 1:
+                    return False
+                wisdom.append(w.tobytes())
+    except Exception:
+        return False
+    if any(w and not w.startswith(b'(fftw-') for w in wisdom):
+        return False
+    import_fftw_wisdom(tuple(wisdom))
+    return True
+
+
+
+def save_fftw_wisdom(path=None):
+    """Save FFTW wisdom to the on-disk cache.
+
+    The wisdom accumulated by the current process (including any
+    previously loaded wisdom) is written, as a :func:`numpy.savez`
+    file with one byte array for each floating point precision, to a
+    temporary file which is then renamed, so that concurrent writers
+    do not leave a partially written cache file.
+
+    Parameters
+    ----------
+    path : string or None, optional (default None)
+      Path of the wisdom file. If None, the path returned by
+      :func:`fftw_wisdom_path` is used.
+
+    Returns
+    -------
+    path : string or None
+      Path of the saved file, or None if :mod:`pyfftw` is not
+      installed
+    """
+
+    if not have_pyfftw:
+        return None
+    if path is None:
+        path = fftw_wisdom_path()
+    pdir = os.path.dirname(os.path.abspath(path))
+    if not os.path.isdir(pdir):
+        try:
+            os.makedirs(pdir)
+        except OSError:
+            if not os.path.isdir(pdir):
+                raise
+    wisdom = {'wisdom%d' % n: np.frombuffer(w, dtype=np.uint8)
+              for n, w in enumerate(export_fftw_wisdom())}
+    fd, tmp = tempfile.mkstemp(dir=pdir, suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            np.savez(f, **wisdom)
+        getattr(os, 'replace', os.rename)(tmp, path)
+    except Exception:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+        raise
+    return path
+
+
+
+def enable_fftw_wisdom_cache(path=None):
+    """Load FFTW wisdom from the on-disk cache, and save it on exit.
+
+    Load wisdom via :func:`load_fftw_wisdom` and register
+    :func:`save_fftw_wisdom` to be called at interpreter exit, so
+    that plans computed with ``FFTW_MEASURE`` (or a higher planning
+    effort) by one run are reused by subsequent runs on the same
+    host. Worker processes created by the parallel solvers inherit
+    this wisdom at pool initialisation.
+
+    Parameters
+    ----------
+    path : string or None, optional (default None)
+      Path of the wisdom file. If None, the path returned by
+      :func:`fftw_wisdom_path` is used.
+
+    Returns
+    -------
+    loaded : bool
+      True if wisdom was loaded from the cache
+    """
+
+    loaded = load_fftw_wisdom(path)
+    if have_pyfftw:
+        atexit.register(save_fftw_wisdom, path)
+    return loaded
 
 
 
@@ -286,9 +1076,9 @@ def dctii(x, axes=None):
     """Multi-dimensional DCT-II.
 
     Compute a multi-dimensional DCT-II over specified array axes. This
-    function is implemented by calling the one-dimensional DCT-II
-    :func:`scipy.fftpack.dct` with normalization mode 'ortho' for each
-    of the specified axes.
+    function is implemented by calling the one-dimensional DCT-II of
+    the current FFT backend (see :func:`set_fft_backend`), with
+    normalization mode 'ortho', for each of the specified axes.
 
     Parameters
     ----------
@@ -305,8 +1095,9 @@ def dctii(x, axes=None):
 
     if axes is None:
         axes = list(range(x.ndim))
+    fn, threads, effort = _fft_fn('dct')
     for ax in axes:
-        x = fftpack.dct(x, type=2, axis=ax, norm='ortho')
+        x = fn(x, ax, threads, effort)
     return x
 
 
@@ -316,8 +1107,8 @@ def idctii(x, axes=None):
 
     Compute a multi-dimensional inverse DCT-II over specified array axes.
     This function is implemented by calling the one-dimensional inverse
-    DCT-II :func:`scipy.fftpack.idct` with normalization mode 'ortho'
-    for each of the specified axes.
+    DCT-II of the current FFT backend (see :func:`set_fft_backend`),
+    with normalization mode 'ortho', for each of the specified axes.
 
     Parameters
     ----------
@@ -334,8 +1125,9 @@ def idctii(x, axes=None):
 
     if axes is None:
         axes = list(range(x.ndim))
+    fn, threads, effort = _fft_fn('idct')
     for ax in axes[::-1]:
-        x = fftpack.idct(x, type=2, axis=ax, norm='ortho')
+        x = fn(x, ax, threads, effort)
     return x
 
 
@@ -557,6 +1349,133 @@ def solvedbi_sm_c(ah, a, rho, axis=4):
 
 
 
+class SMSolver(object):
+    r"""Workspace for repeated solution of a diagonal block linear system
+    with a scaled identity term using the Sherman-Morrison equation.
+
+    Solve the linear systems solved by :func:`solvedbi_sm` for a
+    fixed :math:`\mathbf{a}` and :math:`\rho`, and a sequence of
+    different :math:`\mathbf{b}`. The arrays :math:`\mathbf{a}` and
+    :math:`\mathbf{a}^H \mathbf{a} + \rho`, which are computed on each
+    call to :func:`solvedbi_sm`, are cached, and the solution may be
+    written into a pre-allocated array. The cache is updated by
+    :meth:`setop` when :math:`\mathbf{a}` changes (e.g. when the
+    dictionary of a CSC solver is set) and by :meth:`setrho` when
+    :math:`\rho` changes.
+    """
+
+    def __init__(self, ah, rho, axis=4, cache=False):
+        r"""
+        Parameters
+        ----------
+        ah : array_like
+          Linear system component :math:`\mathbf{a}^H`
+        rho : float or array_like
+          Linear system parameter :math:`\rho`
+        axis : int, optional (default 4)
+          Axis along which to solve the linear system
+        cache : bool, optional (default False)
+          Flag indicating whether to also cache the solution component
+          :math:`\mathbf{c}` computed by :func:`solvedbi_sm_c`, which
+          is slightly faster, but requires an additional array of the
+          same size as :math:`\mathbf{a}`
+        """
+
+        self.axis = axis
+        self.cache = cache
+        self.rho = rho
+        self.setop(ah)
+
+
+
+    def setop(self, ah, rho=None):
+        r"""Set linear system component :math:`\mathbf{a}^H`, and
+        optionally also :math:`\rho`.
+
+        Parameters
+        ----------
+        ah : array_like
+          Linear system component :math:`\mathbf{a}^H`
+        rho : float or array_like or None, optional (default None)
+          Linear system parameter :math:`\rho`. If None, the current
+          value is retained.
+        """
+
+        self.ah = ah
+        self.a = np.conj(ah)
+        self.aha = inner(self.ah, self.a, axis=self.axis)
+        if rho is not None:
+            self.rho = rho
+        self._update()
+
+
+
+    def setrho(self, rho):
+        r"""Set linear system parameter :math:`\rho`.
+
+        Parameters
+        ----------
+        rho : float or array_like
+          Linear system parameter :math:`\rho`
+        """
+
+        self.rho = rho
+        self._update()
+
+
+
+    def _update(self):
+        r"""Update cached arrays that depend on :math:`\rho`."""
+
+        self.d = self.aha + self.rho
+        if self.cache:
+            self.c = self.ah / self.d
+        else:
+            self.c = None
+
+
+
+    def solve(self, b, out=None):
+        r"""Solve the linear system.
+
+        Parameters
+        ----------
+        b : array_like
+          Linear system component :math:`\mathbf{b}`
+        out : ndarray or None, optional (default None)
+          Array into which the solution should be written. It may be
+          the same array as `b`, in which case `b` is overwritten.
+
+        Returns
+        -------
+        x : ndarray
+          Linear system solution :math:`\mathbf{x}` (either `out`, if
+          specified, or a new array)
+        """
+
+        if self.c is None:
+            cb = inner(self.ah, b, axis=self.axis)
+            cb /= self.d
+        else:
+            cb = inner(self.c, b, axis=self.axis)
+        a = self.a
+        rho = self.rho
+        if have_numexpr:
+            return ne.evaluate('(b - (a * cb)) / rho', out=out,
+                               casting='same_kind')
+        elif out is None:
+            return (b - (a * cb)) / rho
+        else:
+            if out is b:
+                out -= a * cb
+            else:
+                np.multiply(a, cb, out=out)
+                np.subtract(b, out, out=out)
+            out /= rho
+            return out
+
+
+
 def solvedbd_sm(ah, d, b, c=None, axis=4):
     r"""Solve a diagonal block linear system with a diagonal term
     using the Sherman-Morrison equation.
@@ -704,6 +1623,267 @@ def solvemdbi_ism(ah, rho, b, axisM, axisK):
 
 
 
+def _mdbi_moveaxes(x, axisM, axisK):
+    """Move axes M and K of an array to the last two axes, in that order
+    reversed, i.e. so that the array has shape (..., K, M). Scalars are
+    returned unmodified.
+    """
+
+    if np.isscalar(x) or np.ndim(x) == 0:
+        return x
+    if axisM < 0:
+        axisM += x.ndim
+    if axisK < 0:
+        axisK += x.ndim
+    return np.moveaxis(x, (axisK, axisM), (-2, -1))
+
+
+
+def solvemdbi_gram_c(ah, rho, axisM, axisK, chunk=None):
+    r"""Compute cached component used by :func:`solvemdbi_gram`.
+
+    Parameters
+    ----------
+    ah : array_like
+      Linear system component :math:`\mathbf{a}^H`
+    rho : float or array_like
+      Linear system parameter :math:`\rho`
+    axisM : int
+      Axis in input corresponding to index m in linear system
+    axisK : int
+      Axis in input corresponding to index k in linear system
+    chunk : int or None, optional (default None)
+      Number of entries on axis `axisK` of `ah` processed together in
+      the construction of the :math:`M \times M` Gram matrices when
+      :math:`K > M`, so that no temporary array of the size of `ah` is
+      constructed (e.g. when `ah` is a :class:`numpy.memmap`). If
+      ``None``, all entries are processed together.
+
+    Returns
+    -------
+    c : ndarray
+      Argument :math:`\mathbf{c}` used by :func:`solvemdbi_gram`
+    """
+
+    return np.linalg.inv(_mdbi_gram(ah, rho, axisM, axisK, chunk))
+
+
+
+def _mdbi_gram(ah, rho, axisM, axisK, chunk=None):
+    """Construct the Gram matrices inverted by :func:`solvemdbi_gram_c`.
+    """
+
+    A = _mdbi_moveaxes(ah, axisM, axisK)
+    rho = _mdbi_moveaxes(rho, axisM, axisK)
+    K, M = A.shape[-2:]
+    if K <= M:
+        AH = np.conj(np.swapaxes(A, -2, -1))
+        return np.matmul(A, AH) + rho * np.identity(K, dtype=A.dtype)
+    else:
+        if chunk is None:
+            chunk = K
+        G = rho * np.identity(M, dtype=A.dtype)
+        for k in range(0, K, max(1, chunk)):
+            Ak = np.asarray(A[..., k:k+chunk, :])
+            G = G + np.matmul(np.conj(np.swapaxes(Ak, -2, -1)), Ak)
+        return G
+
+
+
+def solvemdbi_gram(ah, rho, b, axisM, axisK, c=None):
+    r"""Solve a multiple diagonal block linear system with a scaled
+    identity term by inversion of the Gram matrix of each block.
+
+    The solution is obtained by independently solving a set of linear
+    systems of the form
+
+    .. math::
+      (\rho I + \mathbf{a}_0 \mathbf{a}_0^H + \mathbf{a}_1
+       \mathbf{a}_1^H + \; \ldots \; + \mathbf{a}_{K-1}
+       \mathbf{a}_{K-1}^H) \; \mathbf{x} = \mathbf{b}
+
+    where each :math:`\mathbf{a}_k` is an :math:`M`-vector. Denoting
+    by :math:`A` the :math:`K \times M` matrix with rows
+    :math:`\mathbf{a}_k^H`, the system matrix is
+    :math:`\rho I + A^H A`. If :math:`K \leq M` the solution is
+    computed via the Woodbury identity as
+
+    .. math::
+      \mathbf{x} = \rho^{-1} \left( \mathbf{b} - A^H (\rho I + A A^H)^{-1}
+      A \mathbf{b} \right) \;,
+
+    otherwise it is computed as :math:`(\rho I + A^H A)^{-1} \mathbf{b}`,
+    so that the matrices that are inverted are :math:`\min(K, M) \times
+    \min(K, M)`. These inverses are computed, for all of the
+    independent systems at once, by :func:`solvemdbi_gram_c`, and may
+    be cached for re-use, so that the cost of a solution, given the
+    cached inverses, is :math:`O(KM)` per system. In contrast to
+    :func:`solvemdbi_ism`, no Python loop over :math:`K` is required.
+
+    The sums, inner products, and matrix products in this equation are
+    taken along the :math:`M` and :math:`K` axes of the corresponding
+    multi-dimensional arrays; the solutions are independent over the
+    other axes.
+
+    Parameters
+    ----------
+    ah : array_like
+      Linear system component :math:`\mathbf{a}^H`
+    rho : float or array_like
+      Linear system parameter :math:`\rho`
+    b : array_like
+      Linear system component :math:`\mathbf{b}`
+    axisM : int
+      Axis in input corresponding to index m in linear system
+    axisK : int
+      Axis in input corresponding to index k in linear system
+    c : array_like, optional (default None)
+      Solution component :math:`\mathbf{c}` that may be pre-computed using
+      :func:`solvemdbi_gram_c` and cached for re-use.
+
+    Returns
+    -------
+    x : ndarray
+      Linear system solution :math:`\mathbf{x}`
+    """
+
+    if axisM < 0:
+        axisM += ah.ndim
+    if axisK < 0:
+        axisK += ah.ndim
+
+    A = _mdbi_moveaxes(ah, axisM, axisK)
+    # Column vectors of length M on the last two axes
+    bv = np.swapaxes(_mdbi_moveaxes(b, axisM, axisK), -2, -1)
+    if c is None:
+        # Without a cached inverse, a direct solve is both cheaper and
+        # more accurate than explicit inversion
+        G = _mdbi_gram(ah, rho, axisM, axisK)
+        cmul = lambda v: np.linalg.solve(G, v)
+    else:
+        cmul = lambda v: np.matmul(c, v)
+    rho = _mdbi_moveaxes(rho, axisM, axisK)
+    K, M = A.shape[-2:]
+    if K <= M:
+        AH = np.conj(np.swapaxes(A, -2, -1))
+        x = (bv - np.matmul(AH, cmul(np.matmul(A, bv)))) / rho
+    else:
+        x = cmul(bv)
+    return np.moveaxis(np.swapaxes(x, -2, -1), (-2, -1), (axisK, axisM))
+
+
+
+class MDBISolver(object):
+    r"""Workspace for repeated solution of a multiple diagonal block
+    linear system with a scaled identity term.
+
+    Solve the linear systems solved by :func:`solvemdbi_gram` for a
+    fixed :math:`\mathbf{a}` and :math:`\rho`, and a sequence of
+    different :math:`\mathbf{b}`. The inverse Gram matrices computed
+    by :func:`solvemdbi_gram_c` are cached, so that, once they have
+    been computed, each solution has an :math:`O(KM)` cost per block,
+    compared with the :math:`O(K^2 M)` cost of each call to
+    :func:`solvemdbi_ism`. The cache is invalidated by :meth:`setop`
+    when :math:`\mathbf{a}` changes (e.g. when the dictionary of a CSC
+    solver or the coefficient maps of a dictionary update solver are
+    set) and by :meth:`setrho` when :math:`\rho` changes, and is
+    recomputed on the next call to :meth:`solve`.
+    """
+
+    def __init__(self, ah, rho, axisM, axisK, chunk=None):
+        r"""
+        Parameters
+        ----------
+        ah : array_like
+          Linear system component :math:`\mathbf{a}^H`
+        rho : float or array_like
+          Linear system parameter :math:`\rho`
+        axisM : int
+          Axis in input corresponding to index m in linear system
+        axisK : int
+          Axis in input corresponding to index k in linear system
+        chunk : int or None, optional (default None)
+          Number of entries on axis `axisK` processed together in the
+          construction of the Gram matrices (see
+          :func:`solvemdbi_gram_c`)
+        """
+
+        if axisM < 0:
+            axisM += ah.ndim
+        if axisK < 0:
+            axisK += ah.ndim
+        self.axisM = axisM
+        self.axisK = axisK
+        self.chunk = chunk
+        self.rho = rho
+        self.setop(ah)
+
+
+
+    def setop(self, ah, rho=None):
+        r"""Set linear system component :math:`\mathbf{a}^H`, and
+        optionally also :math:`\rho`.
+
+        Parameters
+        ----------
+        ah : array_like
+          Linear system component :math:`\mathbf{a}^H`
+        rho : float or array_like or None, optional (default None)
+          Linear system parameter :math:`\rho`. If None, the current
+          value is retained.
+        """
+
+        self.ah = ah
+        if rho is not None:
+            self.rho = rho
+        self.c = None
+
+
+
+    def setrho(self, rho):
+        r"""Set linear system parameter :math:`\rho`.
+
+        Parameters
+        ----------
+        rho : float or array_like
+          Linear system parameter :math:`\rho`
+        """
+
+        self.rho = rho
+        self.c = None
+
+
+
+    def solve(self, b, out=None):
+        r"""Solve the linear system.
+
+        Parameters
+        ----------
+        b : array_like
+          Linear system component :math:`\mathbf{b}`
+        out : ndarray or None, optional (default None)
+          Array into which the solution should be written
+
+        Returns
+        -------
+        x : ndarray
+          Linear system solution :math:`\mathbf{x}` (either `out`, if
+          specified, or a new array)
+        """
+
+        if self.c is None:
+            self.c = solvemdbi_gram_c(self.ah, self.rho, self.axisM,
+                                      self.axisK, self.chunk)
+        x = solvemdbi_gram(self.ah, self.rho, b, self.axisM, self.axisK,
+                           self.c)
+        if out is None:
+            return x
+        else:
+            out[:] = x
+            return out
+
+
+
 def solvemdbi_rsm(ah, rho, b, axisK, dimN=2):
     r"""Solve a multiple diagonal block linear system with a scaled
     identity term by repeated application of the Sherman-Morrison
@@ -753,8 +1933,9 @@ def solvemdbi_rsm(ah, rho, b, axisK, dimN=2):
     M = ah.shape[axisM]
     K = ah.shape[axisK]
     a = np.conj(ah)
-    Ainv = np.ones(ah.shape[0:dimN] + (1,)*4) * \
-        np.reshape(np.eye(M, M) / rho, (1,)*(dimN + 2) + (M, M))
+    Ainv = np.ones(ah.shape[0:dimN] + (1,)*4, dtype=ah.dtype) * \
+        np.reshape(np.eye(M, M, dtype=ah.dtype) / rho,
+                   (1,)*(dimN + 2) + (M, M))
 
     for k in range(0, K):
         slck = slcnc + (slice(k, k + 1),) + (slice(None), np.newaxis,)
@@ -844,6 +2025,245 @@ def solvemdbi_cg(ah, rho, b, axisM, axisK, tol=1e-5, mit=1000, isn=None):
 
 
 
+def solvemdbi_bcg(ah, rho, b, axisM, axisK, tol=1e-5, mit=1000, isn=None):
+    r"""Solve a multiple diagonal block linear system with a scaled
+    identity term using batched preconditioned CG.
+
+    Solve a multiple diagonal block linear system with a scaled
+    identity term using the Conjugate Gradient (CG) method with a
+    Jacobi (diagonal) preconditioner, applied independently, but in a
+    vectorised computation, to each of the independent systems of
+    the form
+
+     .. math::
+      (\rho I + \mathbf{a}_0 \mathbf{a}_0^H + \mathbf{a}_1
+       \mathbf{a}_1^H + \; \ldots \; + \mathbf{a}_{K-1}
+       \mathbf{a}_{K-1}^H) \; \mathbf{x} = \mathbf{b}
+
+    where each :math:`\mathbf{a}_k` is an :math:`M`-vector. The inner
+    products and matrix products in this equation are taken along the
+    :math:`M` and :math:`K` axes of the corresponding multi-dimensional
+    arrays; the solutions are independent over the other axes. In
+    contrast to :func:`solvemdbi_cg`, which applies CG to the single
+    system obtained by combining all of the independent systems, the
+    stopping criterion is applied to each system, so that updates to
+    systems that have converged are halted, and no system is
+    iterated beyond convergence as a result of slower convergence of
+    the others. The working arrays are periodically compacted to the
+    systems that have not converged, so that the cost of an
+    iteration is proportional to the number of these systems.
+
+    Parameters
+    ----------
+    ah : array_like
+      Linear system component :math:`\mathbf{a}^H`
+    rho : float or array_like
+      Linear system parameter :math:`\rho`
+    b : array_like
+      Linear system component :math:`\mathbf{b}`
+    axisM : int
+      Axis in input corresponding to index m in linear system
+    axisK : int
+      Axis in input corresponding to index k in linear system
+    tol : float, optional (default 1e-5)
+      CG relative residual tolerance for each system
+    mit : int, optional (default 1000)
+      CG maximum iterations
+    isn : array_like or None, optional (default None)
+      CG initial solution
+
+    Returns
+    -------
+    x : ndarray
+      Linear system solution :math:`\mathbf{x}`
+    cgit : ndarray
+      Number of CG iterations for each system, as an integer array
+      with the shape of `x` with the `axisM` and `axisK` axes of unit
+      size
+    """
+
+    if axisM < 0:
+        axisM += ah.ndim
+    if axisK < 0:
+        axisK += ah.ndim
+
+    A = _mdbi_moveaxes(ah, axisM, axisK)
+    rho = _mdbi_moveaxes(rho, axisM, axisK)
+    # Column vectors of length M on the last two axes
+    bv = np.swapaxes(_mdbi_moveaxes(b, axisM, axisK), -2, -1)
+    dtype = np.result_type(A.dtype, bv.dtype)
+
+    # Flatten the axes indexing the independent systems so that the
+    # working arrays can be restricted to the systems that have not
+    # yet converged
+    bshp = np.broadcast(A[..., 0:1, 0:1], bv[..., 0:1, :],
+                        np.asarray(rho)[..., 0:1, 0:1] if np.ndim(rho) > 0
+                        else 0.0).shape[0:-2]
+    nsys = int(np.prod(bshp))
+    M = bv.shape[-2]
+    A = np.broadcast_to(A, bshp + A.shape[-2:]).reshape((nsys,) +
+                                                        A.shape[-2:])
+    bv = np.broadcast_to(bv, bshp + (M, 1)).reshape((nsys, M, 1))
+    rho = np.broadcast_to(rho, bshp + (1, 1)).reshape((nsys, 1, 1))
+
+    vdot = lambda u, v: np.sum(np.conj(u) * v, axis=-2, keepdims=True)
+    Aop = lambda A, AH, rho, v: rho * v + np.matmul(AH, np.matmul(A, v))
+
+    bb = np.real(vdot(bv, bv))
+    # Systems with b = 0 have the solution x = 0, and the threshold
+    # has an absolute floor relative to the largest b so that systems
+    # with a very small b are not iterated to a negligible residual
+    rthr = (tol**2) * np.maximum(bb, np.finfo(bb.dtype).eps * np.max(bb))
+    if isn is None:
+        x = np.zeros(bv.shape, dtype=dtype)
+        r = bv.astype(dtype, copy=True)
+    else:
+        x = np.array(np.broadcast_to(np.swapaxes(_mdbi_moveaxes(
+            isn, axisM, axisK), -2, -1), bshp + (M, 1)).reshape(
+                (nsys, M, 1)), dtype=dtype)
+        x[bb[:, 0, 0] == 0] = 0
+        r = bv - Aop(A, np.conj(np.swapaxes(A, -2, -1)), rho, x)
+    cgit = np.zeros((nsys,), dtype=np.int64)
+
+    # Indices of the systems in the working arrays, which are
+    # compacted when a substantial fraction of them have converged
+    idx = np.flatnonzero(np.real(vdot(r, r))[:, 0, 0] > rthr[:, 0, 0])
+    Aw, rhow, rthrw = A[idx], rho[idx], rthr[idx]
+    AHw = np.conj(np.swapaxes(Aw, -2, -1))
+    xw, rw = x[idx], r[idx]
+    # Inverse of the diagonal of the system matrix
+    dinv = 1.0 / (rhow + np.swapaxes(np.sum(np.abs(Aw)**2, axis=-2,
+                                            keepdims=True), -2, -1))
+    zw = dinv * rw
+    pw = zw.copy()
+    rz = vdot(rw, zw)
+    active = np.ones(idx.shape, dtype=bool)
+
+    for it in range(mit):
+        if not np.any(active):
+            break
+        if np.count_nonzero(active) <= 0.75 * active.size:
+            x[idx] = xw
+            idx, Aw, AHw, rhow, rthrw, dinv = idx[active], Aw[active], \
+                AHw[active], rhow[active], rthrw[active], dinv[active]
+            xw, rw, pw, rz = xw[active], rw[active], pw[active], \
+                rz[active]
+            active = np.ones(idx.shape, dtype=bool)
+        act = active[:, np.newaxis, np.newaxis]
+        Ap = Aop(Aw, AHw, rhow, pw)
+        pAp = vdot(pw, Ap)
+        alpha = np.where(act, rz / np.where(act, pAp, 1.0), 0.0)
+        xw += alpha * pw
+        rw -= alpha * Ap
+        cgit[idx] += active
+        active = np.logical_and(active, np.real(vdot(rw, rw))[:, 0, 0] >
+                                rthrw[:, 0, 0])
+        act = active[:, np.newaxis, np.newaxis]
+        zw = dinv * rw
+        rzn = vdot(rw, zw)
+        beta = np.where(act, rzn / np.where(act, rz, 1.0), 0.0)
+        pw = zw + beta * pw
+        rz = rzn
+    x[idx] = xw
+
+    x = np.moveaxis(np.swapaxes(x.reshape(bshp + (M, 1)), -2, -1),
+                    (-2, -1), (axisK, axisM))
+    cgit = np.moveaxis(cgit.reshape(bshp + (1, 1)), (-2, -1),
+                       (axisK, axisM))
+    return x, cgit
+
+
+
+def mdb_opnorm2(a, axisM, axisK, gmax=16, tol=1e-7, mit=500):
+    r"""Compute the maximum, over all blocks, of the squared spectral
+    norm of the blocks of a multiple diagonal block operator.
+
+    The operator is defined as for :func:`solvemdbi_ism`, i.e. array
+    `a` represents a set of :math:`K \times M` matrices, with indices
+    :math:`k` and :math:`m` on axes `axisK` and `axisM` respectively,
+    indexed by all of the other axes. For a convolutional operator in
+    the DFT domain, each block corresponds to a single frequency, and
+    the value computed is the Lipschitz constant of the gradient of
+    the corresponding least squares data fidelity term. If
+    :math:`\min(K, M) = 1` the squared norms are computed directly,
+    if :math:`\min(K, M) \leq` `gmax` they are computed as the largest
+    eigenvalues of the smaller of the Gram matrices of the blocks, and
+    otherwise they are estimated by a batched power iteration in which
+    blocks that can not have the maximum norm, as determined by their
+    Frobenius norms, are dropped as the iterations proceed. Since the
+    Rayleigh quotient of the power iteration is a lower bound on the
+    squared norm, the estimate for each block is the Rayleigh quotient
+    :math:`\theta` increased by the norm of the eigenvector residual
+    :math:`\|A^H A \mathbf{v} - \theta \mathbf{v} \|_2`, and capped by
+    the squared Frobenius norm of the block.
+
+    Parameters
+    ----------
+    a : array_like
+      Multiple diagonal block operator :math:`\mathbf{a}`
+    axisM : int
+      Axis in input corresponding to index m
+    axisK : int
+      Axis in input corresponding to index k
+    gmax : int, optional (default 16)
+      Maximum Gram matrix size for computation by eigenvalue
+      decomposition
+    tol : float, optional (default 1e-7)
+      Relative tolerance for convergence of the power iteration,
+      applied to the eigenvector residual norm
+    mit : int, optional (default 500)
+      Maximum number of power iterations
+
+    Returns
+    -------
+    nrm2 : float
+      Maximum squared spectral norm of the blocks. When computed by
+      power iteration, this is an upper bound, exceeding the exact
+      value by a relative amount of at most `tol` when the iterations
+      converge. (Strictly, the bound requires the power iteration to
+      converge to the principal eigenvector of each block, which is
+      the case for almost all initialisations.) It may be a larger
+      overestimate if `mit` iterations are not sufficient for
+      convergence.
+    """
+
+    A = _mdbi_moveaxes(np.asarray(a), axisM, axisK)
+    K, M = A.shape[-2:]
+    A = A.reshape((-1, K, M))
+    if min(K, M) == 1:
+        return float(np.max(np.sum(np.abs(A)**2, axis=(1, 2))))
+    if min(K, M) <= gmax:
+        AH = np.conj(np.swapaxes(A, -2, -1))
+        G = np.matmul(A, AH) if K <= M else np.matmul(AH, A)
+        return float(np.max(np.linalg.eigvalsh(G)))
+
+    # Upper bounds on the squared spectral norms of the blocks
+    fro2 = np.sum(np.abs(A)**2, axis=(1, 2))
+    rs = np.random.RandomState(12345)
+    v = rs.randn(A.shape[0], M, 1).astype(A.dtype)
+    v /= np.sqrt(np.sum(np.abs(v)**2, axis=1, keepdims=True))
+    nrm2 = np.zeros(A.shape[0])
+    idx = np.arange(A.shape[0])
+    for it in range(mit):
+        Av = np.matmul(A[idx], v[idx])
+        w = np.matmul(np.conj(np.swapaxes(A[idx], -2, -1)), Av)
+        # Rayleigh quotient for unit norm v
+        rq = np.sum(np.abs(Av)**2, axis=(1, 2))
+        # Norm of eigenvector residual
+        rn = np.sqrt(np.sum(np.abs(w - rq[:, np.newaxis, np.newaxis] *
+                                   v[idx])**2, axis=(1, 2)))
+        wn = np.sqrt(np.sum(np.abs(w)**2, axis=1, keepdims=True))
+        v[idx] = w / np.where(wn > 0, wn, 1.0)
+        nrm2[idx] = np.minimum(rq + rn, fro2[idx])
+        cnv = rn <= tol * rq
+        idx = idx[np.logical_and(~cnv, fro2[idx] > nrm2.max())]
+        if idx.size == 0:
+            break
+
+    return float(nrm2.max())
+
+
+
 def lu_factor(A, rho, check_finite=True):
     r"""Compute LU factorisation of either :math:`A^T A + \rho I` or
     :math:`A A^T + \rho I`, depending on which matrix is smaller.
@@ -1152,8 +2572,12 @@ def GradientFilters(ndim, axes, axshp, dtype=None):
       Axes on which gradients are to be computed
     axshp : tuple of integers
       Shape of axes on which gradients are to be computed
-    dtype : dtype
-      Data type of output arrays
+    dtype : dtype, optional (default np.float32)
+      Real data type corresponding to the output arrays. The returned
+      `Gf` has the corresponding complex type, and `GHGf` has type
+      `dtype`, irrespective of the FFT backend in use, so that filters
+      constructed for a single precision solver do not promote its
+      working arrays to double precision
 
     Returns
     -------
@@ -1165,13 +2589,14 @@ def GradientFilters(ndim, axes, axshp, dtype=None):
 
     if dtype is None:
         dtype = np.float32
+    dtype = np.dtype(dtype)
     g = np.zeros([2 if k in axes else 1 for k in range(ndim)] +
                  [len(axes),], dtype)
     for k in axes:
         g[(0,) * k + (slice(None),) + (0,) * (g.ndim - 2 - k) + (k,)] = \
-            np.array([1, -1])
-    Gf = rfftn(g, axshp, axes=axes)
-    GHGf = np.sum(np.conj(Gf) * Gf, axis=-1).real
+            np.array([1, -1], dtype=dtype)
+    Gf = np.asarray(rfftn(g, axshp, axes=axes), dtype=complex_dtype(dtype))
+    GHGf = np.asarray(np.sum(np.conj(Gf) * Gf, axis=-1).real, dtype=dtype)
     return Gf, GHGf
 
 
@@ -1364,6 +2789,71 @@ def blockcirculant(A):
 
 
 
+def _is_single_precision(x):
+    """Determine whether an array has a floating point or complex dtype
+    of lower than double precision."""
+
+    dt = x.dtype
+    return (dt.kind == 'f' and dt.itemsize < 8) or \
+        (dt.kind == 'c' and dt.itemsize < 16)
+
+
+
+def l2norm(x):
+    r"""Compute the :math:`\ell_2` norm of an array.
+
+    Compute the :math:`\ell_2` (Frobenius) norm of an array of any
+    shape. If the array has single (or lower) precision, the sum of
+    squares is accumulated in double precision so that the norms used
+    for functional values and residuals are not degraded by the
+    reduced precision of the array, which may have a very large number
+    of entries.
+
+    Parameters
+    ----------
+    x : array_like
+      Input array
+
+    Returns
+    -------
+    nrm : float
+      :math:`\|\mathbf{x}\|_2`
+    """
+
+    x = np.asarray(x)
+    if _is_single_precision(x):
+        if np.iscomplexobj(x):
+            s = np.sum(np.square(x.real), dtype=np.float64) + \
+                np.sum(np.square(x.imag), dtype=np.float64)
+        else:
+            s = np.sum(np.square(x), dtype=np.float64)
+        return np.sqrt(s)
+    else:
+        return np.linalg.norm(x)
+
+
+
+def l1norm(x):
+    r"""Compute the :math:`\ell_1` norm of an array.
+
+    Compute the :math:`\ell_1` norm of an array of any shape,
+    accumulating the sum in double precision.
+
+    Parameters
+    ----------
+    x : array_like
+      Input array
+
+    Returns
+    -------
+    nrm : float
+      :math:`\|\mathbf{x}\|_1`
+    """
+
+    return np.sum(np.abs(x), dtype=np.float64)
+
+
+
 def fl2norm2(xf, axis=(0, 1)):
     r"""Compute the squared :math:`\ell_2` norm in the DFT domain.
 
@@ -1388,7 +2878,7 @@ def fl2norm2(xf, axis=(0, 1)):
     """
 
     xfs = xf.shape
-    return (np.linalg.norm(xf)**2) / np.prod(np.array([xfs[k] for k in axis]))
+    return (l2norm(xf)**2) / np.prod(np.array([xfs[k] for k in axis]))
 
 
 
@@ -1420,11 +2910,11 @@ def rfl2norm2(xf, xs, axis=(0, 1)):
 
     scl = 1.0 / np.prod(np.array([xs[k] for k in axis]))
     slc0 = (slice(None),) * axis[-1]
-    nrm0 = np.linalg.norm(xf[slc0 + (0,)])
+    nrm0 = l2norm(xf[slc0 + (0,)])
     idx1 = (xs[axis[-1]] + 1) // 2
-    nrm1 = np.linalg.norm(xf[slc0 + (slice(1, idx1),)])
+    nrm1 = l2norm(xf[slc0 + (slice(1, idx1),)])
     if xs[axis[-1]] % 2 == 0:
-        nrm2 = np.linalg.norm(xf[slc0 + (slice(-1, None),)])
+        nrm2 = l2norm(xf[slc0 + (slice(-1, None),)])
     else:
         nrm2 = 0.0
     return scl*(nrm0**2 + 2.0*nrm1**2 + nrm2**2)
@@ -1451,8 +2941,8 @@ def rrs(ax, b):
       Relative residual
     """
 
-    nrm = np.linalg.norm(b.ravel())
+    nrm = l2norm(b)
     if nrm == 0.0:
         return 1.0
     else:
-        return np.linalg.norm((ax - b).ravel()) / nrm
+        return l2norm(ax - b) / nrm
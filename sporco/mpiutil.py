@@ -14,9 +14,14 @@ from __future__ import print_function
 from builtins import range
 
 from mpi4py import MPI
+import collections
 import itertools
+import warnings
 import numpy as np
 
+import sporco.linalg as sl
+from sporco import util
+
 
 __author__ = """\n""".join(['Cristina Garcia-Cardona <cgarciac@lanl.gov>',
                             'Brendt Wohlberg <brendt@ieee.org>'])
@@ -25,46 +30,125 @@ __author__ = """\n""".join(['Cristina Garcia-Cardona <cgarciac@lanl.gov>',
 __all__ = ['grid_search']
 
 
-def _get_rank_limits(comm, arrlen):
-    """Determine the chunk of the grid that has to be computed per
-    process. The grid has been 'flattened' and has arrlen length. The
-    chunk assigned to each process depends on its rank in the MPI
-    communicator.
+# Message tags for the master-worker grid search
+_TAG_WORK = 1
+_TAG_STOP = 2
+_TAG_RESULT = 3
+_TAG_ERROR = 4
+
+
+
+def _grid_search_master(fn, fprm, idxs, comm, record):
+    """Master process of the dynamically scheduled grid search. Grid
+    points are sent to the worker processes one at a time, a new grid
+    point being sent to a worker process as soon as it returns the
+    function value for the previous one. When no function value is
+    waiting to be received, the master process evaluates the function
+    at the next grid point itself.
 
     Parameters
     ----------
+    fn : function
+      Function to be evaluated
+    fprm : list of tuples
+      Parameter values at all grid points
+    idxs : list of int
+      Flat indices of grid points at which the function is to be
+      evaluated
     comm : MPI communicator object
-      Describes topology of network: number of processes, rank
-    arrlen : int
-      Number of points in grid search.
+      Communicator of master and worker processes
+    record : function
+      Function called with the flat index of a grid point and the
+      corresponding function value as each value is received
 
-    Returns
-    -------
-    begin : int
-      Index, with respect to 'flattened' grid, where the chunk
-      for this process starts.
-    end : int
-      Index, with respect to 'flattened' grid, where the chunk
-      for this process ends.
+    If an exception is raised, either by the master process or by one
+    of the worker processes (which return it as an error record), the
+    outstanding function values are received and discarded, and all
+    worker processes are stopped, before the exception is propagated.
     """
 
-    rank = comm.Get_rank()  # Id of this process
-    size = comm.Get_size()  # Total number of processes in communicator
-    end = 0
-    # The scan should be done with ints, not floats
-    ranklen = int(arrlen / size)
-    if rank < arrlen % size:
-        ranklen += 1
-    # Compute upper limit based on the sizes covered by the processes
-    # with less rank
-    end = comm.scan(sendobj=ranklen, op=MPI.SUM)
-    begin = end - ranklen
+    size = comm.Get_size()
+    pending = collections.deque(idxs)
+    busy = set()
+    stopped = set()
+    try:
+        for rank in range(1, size):
+            if pending:
+                comm.send(pending.popleft(), dest=rank, tag=_TAG_WORK)
+                busy.add(rank)
+            else:
+                comm.send(None, dest=rank, tag=_TAG_STOP)
+                stopped.add(rank)
+        status = MPI.Status()
+        while busy or pending:
+            if busy and (not pending or comm.Iprobe(source=MPI.ANY_SOURCE,
+                                                    tag=MPI.ANY_TAG)):
+                idx, val = comm.recv(source=MPI.ANY_SOURCE,
+                                     tag=MPI.ANY_TAG, status=status)
+                rank = status.Get_source()
+                busy.discard(rank)
+                if status.Get_tag() == _TAG_ERROR:
+                    raise val
+                if pending:
+                    comm.send(pending.popleft(), dest=rank, tag=_TAG_WORK)
+                    busy.add(rank)
+                else:
+                    comm.send(None, dest=rank, tag=_TAG_STOP)
+                    stopped.add(rank)
+            else:
+                idx = pending.popleft()
+                val = fn(fprm[idx])
+            record(idx, val)
+    except BaseException:
+        # Collect the outstanding results and stop the workers that are
+        # still active, so that no unmatched messages are left on the
+        # communicator to interfere with its subsequent use
+        for rank in busy:
+            comm.recv(source=rank, tag=MPI.ANY_TAG)
+        for rank in range(1, size):
+            if rank not in stopped:
+                comm.send(None, dest=rank, tag=_TAG_STOP)
+        raise
 
-    return (begin, end)
 
 
+def _grid_search_worker(fn, fprm, comm):
+    """Worker process of the dynamically scheduled grid search. An
+    exception raised in the evaluation of the function is returned to
+    the master process as an error record, after which the worker
+    process waits to be stopped.
 
-def grid_search(fn, grid, comm=None, mpidtype=None, fmin=True):
+    Parameters
+    ----------
+    fn : function
+      Function to be evaluated
+    fprm : list of tuples
+      Parameter values at all grid points
+    comm : MPI communicator object
+      Communicator of master and worker processes
+    """
+
+    status = MPI.Status()
+    while True:
+        idx = comm.recv(source=0, tag=MPI.ANY_TAG, status=status)
+        if status.Get_tag() == _TAG_STOP:
+            break
+        try:
+            val = fn(fprm[idx])
+        except Exception as exc:
+            try:
+                comm.send((idx, exc), dest=0, tag=_TAG_ERROR)
+            except Exception:
+                # The exception could not be pickled
+                comm.send((idx, RuntimeError(repr(exc))), dest=0,
+                          tag=_TAG_ERROR)
+        else:
+            comm.send((idx, val), dest=0, tag=_TAG_RESULT)
+
+
+
+def grid_search(fn, grid, comm=None, mpidtype=None, fmin=True, chkpt=None,
+                callback=None):
     """
     Grid search for optimal parameters of a specified function.
 
@@ -79,6 +163,28 @@ def grid_search(fn, grid, comm=None, mpidtype=None, fmin=True):
     to :func:`.util.grid_search`, which uses :mod:`multiprocessing`
     for parallelisation.
 
+    The rank 0 process acts as a master that sends grid points, one
+    at a time, to the other (worker) processes as they become idle, so
+    that the variation of the function computation time over the grid
+    does not result in idle processes. The master process also
+    evaluates the function at a grid point whenever no function value
+    is waiting to be received from a worker process, so that all
+    processes contribute to the computation (and a single process
+    evaluates the function at all grid points). The cost of this is
+    that a worker process that completes an evaluation while the
+    master process is itself evaluating the function waits until that
+    evaluation is complete for its next grid point. If the function
+    raises an exception on any process, all worker processes are
+    stopped, and the exception is raised on the rank 0 process, while
+    :exc:`RuntimeError` is raised on the other processes. If a
+    checkpoint file is specified, the master process records the
+    function value at each grid point in the file as soon as it has
+    been received, and the grid points with values already recorded in
+    the file are not evaluated, so that an interrupted search may be
+    resumed by calling this function again with the same checkpoint
+    file. The file format is the same as that of
+    :func:`.util.grid_search`.
+
     The `mpi4py <https://mpi4py.readthedocs.io>`__ package is
     required for use of the ``mpiutil.grid_search`` function. It is also
     necessary to run Python with the ``mpiexec`` command; for example,
@@ -102,11 +208,22 @@ def grid_search(fn, grid, comm=None, mpidtype=None, fmin=True):
       Topology of network (number of processes and rank). If None,
       ``MPI.COMM_WORLD`` is used.
     mpidtype : MPI data type, optional (default None)
-      Desired data type for consolidation operations. If None,
-      ``MPI.DOUBLE`` is used
+      Deprecated and ignored: the function values are always
+      distributed as ``MPI.DOUBLE``, matching their representation as
+      a float64 array
     fmin : bool, optional (default True)
       Determine whether optimal function values are selected as minima
       or maxima. If `fmin` is True then minima are selected.
+    chkpt : string or None, optional (default None)
+      Path of checkpoint file in which computed function values are
+      recorded. If the file exists, the values recorded in it are
+      used instead of being recomputed. The file must have been
+      written for the same search grid. The file is only accessed by
+      the rank 0 process.
+    callback : function or None, optional (default None)
+      Function called by the rank 0 process, with the parameter values
+      and the function value as arguments, as each function value is
+      received (in order of completion rather than grid order)
 
     Returns
     -------
@@ -124,54 +241,56 @@ def grid_search(fn, grid, comm=None, mpidtype=None, fmin=True):
 
     if comm is None:
         comm = MPI.COMM_WORLD
-    if mpidtype is None:
-        mpidtype = MPI.DOUBLE
-    fprm = itertools.product(*grid)
-
-    # Distribute computation among processes in MPI communicator
-    afprm = np.asarray(list(fprm))  # Faster to communicate array data
-    iterlen = afprm.shape[0]
-    begin, end = _get_rank_limits(comm, iterlen)
-    rankgrid = (afprm[begin:end, :])
-    rankfval = np.asarray(list(map(fn, rankgrid)))
-
-    if rankfval.ndim == 1:  # Function with a scalar return value
-        fval = np.empty(afprm.shape[0])
-        comm.Allgatherv([rankfval, mpidtype], [fval, mpidtype])
-    else:  # Function with a vector return value
-        # Vector for gathering all the results
-        fval = np.empty([afprm.shape[0], rankfval.shape[1]])
-        # Size of values to collect locally
-        sizeL = np.array(np.prod(np.array(rankfval.shape)))
-        # Number of processes to collect from
-        sizeW = comm.Get_size()
-        # Vector to collect the sizes from each process
-        sizes = np.zeros(sizeW, dtype=np.int)
-        comm.Allgather([sizeL, MPI.INT], [sizes, MPI.INT])
-        # Vector to collect the offsets for each process
-        offsets = np.zeros(sizeW, dtype=np.int)
-        offsets[1:] = np.cumsum(sizes)[:-1]
-        # Collecting variable size of vector return values
-        comm.Allgatherv(rankfval, [fval, sizes, offsets, mpidtype])
-
-
-    # Proceed as regular grid_search (all processes execute this)
-    if fmin:
-        slct = np.argmin
-    else:
-        slct = np.argmax
-
-    if isinstance(fval[0], (tuple, list, np.ndarray)):
-        nfnv = len(fval[0])
-        fvmx = np.reshape(fval, [a.size for a in grid] + [nfnv,])
-        sidx = np.unravel_index(slct(fvmx.reshape((-1, nfnv)), axis=0),
-                                fvmx.shape[0:-1]) + (np.array((range(nfnv))),)
-        sprm = np.array([grid[k][sidx[k]] for k in range(len(grid))])
-        sfvl = tuple(fvmx[sidx])
+    if mpidtype is not None:
+        warnings.warn('Parameter mpidtype of mpiutil.grid_search is '
+                      'deprecated and ignored', DeprecationWarning)
+    fprm = list(itertools.product(*grid))
+    rank = comm.Get_rank()
+
+    # Share FFTW wisdom of the root process so that each rank does not
+    # repeat planning for the same transform shapes
+    sl.import_fftw_wisdom(comm.bcast(sl.export_fftw_wisdom(), root=0))
+
+    if rank == 0:
+        fval, fh = {}, None
+        started = False
+        try:
+            if chkpt is not None:
+                fval, fh = util._grid_search_chkpt(chkpt, grid)
+            idxs = [idx for idx in range(len(fprm)) if idx not in fval]
+
+            def record(idx, val):
+                fval[idx] = val
+                if fh is not None:
+                    util._grid_search_record(fh, idx, val)
+                if callback is not None:
+                    callback(fprm[idx], val)
+
+            started = True
+            _grid_search_master(fn, fprm, idxs, comm, record)
+        except BaseException:
+            # Release the worker processes before propagating the
+            # exception so that they are not left waiting for work. If
+            # the master loop was started, it has already stopped them.
+            if not started:
+                for wrank in range(1, comm.Get_size()):
+                    comm.send(None, dest=wrank, tag=_TAG_STOP)
+            comm.bcast(None, root=0)
+            raise
+        finally:
+            if fh is not None:
+                fh.close()
+        fval = np.asarray([fval[idx] for idx in range(len(fprm))],
+                          dtype=np.float64)
+        shape = comm.bcast(fval.shape, root=0)
     else:
-        fvmx = np.reshape(fval, [a.size for a in grid])
-        sidx = np.unravel_index(slct(fvmx), fvmx.shape)
-        sprm = np.array([grid[k][sidx[k]] for k in range(len(grid))])
-        sfvl = fvmx[sidx]
+        _grid_search_worker(fn, fprm, comm)
+        shape = comm.bcast(None, root=0)
+        if shape is None:
+            raise RuntimeError('Grid search failed on rank 0 process')
+        fval = np.empty(shape, dtype=np.float64)
+
+    # Distribute the function values from the master to all processes
+    comm.Bcast([fval, MPI.DOUBLE], root=0)
 
-    return sprm, sfvl, fvmx, sidx
+    return util._grid_search_result(fval, grid, fmin)
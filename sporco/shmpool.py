@@ -0,0 +1,613 @@
+# -*- coding: utf-8 -*-
+# Copyright (C) 2019 by Brendt Wohlberg <brendt@ieee.org>
+# All rights reserved. BSD 3-clause License.
+# This file is part of the SPORCO package. Details of the copyright
+# and user license can be found in the 'LICENSE.txt' file distributed
+# with the package.
+
+"""Persistent process and thread pools for the parallel solvers"""
+
+from __future__ import absolute_import
+from builtins import object
+
+import platform
+if platform.system() == 'Windows':
+    raise RuntimeError('Module %s is not supported under Windows' % __name__)
+import os
+import sys
+import itertools
+import importlib
+import weakref
+import multiprocessing as mp
+from concurrent.futures import ThreadPoolExecutor
+try:
+    from multiprocessing import shared_memory
+except ImportError:
+    shared_memory = None
+import numpy as np
+
+import sporco.linalg as sl
+
+
+__author__ = """Brendt Wohlberg <brendt@ieee.org>"""
+
+
+__all__ = ['SharedNamespace', 'SharedMemoryPool', 'ThreadPool']
+
+
+# Counter used to order the construction of namespaces and pools
+_serial = itertools.count()
+
+# Namespace attached in a worker process for each module, as a tuple
+# consisting of the namespace key and the names of its arrays
+_worker_ns = {}
+
+
+
+class _ShmArrayBase(object):
+    """Array interface exposing the content of a shared memory block.
+
+    Arrays constructed from an instance of this class hold a
+    reference to it, and therefore to the
+    :class:`multiprocessing.shared_memory.SharedMemory` object, so
+    that the block remains mapped for as long as any array referring
+    to it exists. Since the array data pointer is obtained without
+    holding an export of the block buffer, the block may be closed
+    without error once the last such array has been destroyed.
+    """
+
+    def __init__(self, shm, shape, dtype):
+        self.shm = shm
+        dtype = np.dtype(dtype)
+        ptr = np.frombuffer(shm.buf, dtype=np.uint8, count=1).ctypes.data
+        self.__array_interface__ = {'shape': tuple(shape),
+                                    'typestr': dtype.str,
+                                    'data': (ptr, False), 'version': 3}
+
+
+
+def _shm_array(shape, dtype, name=None):
+    """Construct a numpy array in a shared memory block, either
+    creating a new block or attaching to an existing one.
+
+    Parameters
+    ----------
+    shape : tuple
+      Shape of numpy array
+    dtype : data-type
+      Data type of array
+    name : string or None, optional (default None)
+      Name of existing shared memory block. If None, a new block is
+      created.
+
+    Returns
+    -------
+    arr : ndarray
+      Numpy array
+    shm : :class:`multiprocessing.shared_memory.SharedMemory`
+      Shared memory block
+    """
+
+    if name is None:
+        sz = max(int(np.prod(shape)) * np.dtype(dtype).itemsize, 1)
+        shm = shared_memory.SharedMemory(create=True, size=sz)
+    else:
+        shm = shared_memory.SharedMemory(name=name)
+    return np.asarray(_ShmArrayBase(shm, shape, dtype)), shm
+
+
+
+def _raw_array(shape, dtype):
+    """Construct a numpy array of the specified shape and dtype for
+    which the underlying storage is a multiprocessing RawArray in
+    shared memory. This is the fallback when module
+    :mod:`multiprocessing.shared_memory` is not available.
+    """
+
+    sz = int(np.prod(shape))
+    raw = mp.RawArray('c', max(sz * np.dtype(dtype).itemsize, 1))
+    return np.frombuffer(raw, dtype=dtype, count=sz).reshape(shape)
+
+
+
+def _unlink(shms):
+    """Unlink the shared memory blocks in a list. The blocks are
+    unmapped when the last of the arrays referring to them is
+    destroyed.
+    """
+
+    for shm in shms:
+        try:
+            shm.unlink()
+        except FileNotFoundError:
+            pass
+    del shms[:]
+
+
+
+class SharedNamespace(object):
+    """Set of module global variables shared with worker processes.
+
+    The parallel solvers in SPORCO compute the steps of each iteration
+    in worker processes via functions defined at the module level,
+    which access the problem data and working variables via global
+    variables of that module. An instance of this class holds the
+    values of these variables for a single solver object: arrays
+    constructed in shared memory (see :meth:`empty` and :meth:`array`),
+    picklable parameter values that are copied to the worker processes
+    (see :meth:`__setitem__`), and values that are only required in
+    the calling process (see :meth:`setlocal`). The values are
+    assigned to the global variables of the module, in the calling
+    process, by :meth:`activate`, and, in a worker process of a
+    :class:`SharedMemoryPool`, on receipt of a task referring to the
+    namespace. Since the values are held by the namespace rather than
+    by the module, any number of solver objects may use the same
+    module, and the same pool, within a process.
+
+    The shared memory blocks are created via
+    :mod:`multiprocessing.shared_memory`, and are released when the
+    namespace is destroyed or :meth:`close` is called. When this
+    module is not available (Python versions prior to 3.8), arrays
+    are constructed as :func:`multiprocessing.RawArray` buffers, which
+    are only accessible to worker processes of a pool constructed
+    after the namespace has been activated. If the namespace is only
+    to be used with a :class:`ThreadPool`, arrays may be constructed in
+    ordinary process memory by setting parameter `shared` to ``False``.
+    """
+
+    def __init__(self, module, shared=True):
+        """
+        Parameters
+        ----------
+        module : string
+          Name of module with global variables set from the namespace
+        shared : bool, optional (default True)
+          Flag indicating whether arrays should be constructed in shared
+          memory
+        """
+
+        self.module = module
+        self.shared = shared
+        self.arrays = {}
+        self.params = {}
+        self.local = {}
+        self._refs = {}
+        self._shm = []
+        self.key = (os.getpid(), next(_serial))
+        self.version = 0
+        self._finalizer = weakref.finalize(self, _unlink, self._shm)
+
+
+
+    def _new_array(self, shape, dtype):
+        """Construct a shared array and record the reference to its
+        shared memory block, if any."""
+
+        if not self.shared:
+            return np.zeros(shape, dtype=dtype), None
+        if shared_memory is None:
+            return _raw_array(shape, dtype), None
+        arr, shm = _shm_array(shape, dtype)
+        self._shm.append(shm)
+        return arr, (shm.name, arr.shape, arr.dtype.str)
+
+
+
+    def empty(self, name, shape, dtype):
+        """Construct a shared array with uninitialised content.
+
+        Parameters
+        ----------
+        name : string
+          Name of global variable
+        shape : tuple
+          Shape of array
+        dtype : data-type
+          Data type of array
+
+        Returns
+        -------
+        arr : ndarray
+          Shared array
+        """
+
+        arr, ref = self._new_array(tuple(shape), dtype)
+        self.arrays[name] = arr
+        self._refs[name] = ref
+        self.version += 1
+        return arr
+
+
+
+    def array(self, name, value):
+        """Construct a shared array initialised to the specified value.
+        If `value` is a list, a list of shared arrays is constructed,
+        with ``None`` entries in the list left unchanged.
+
+        Parameters
+        ----------
+        name : string
+          Name of global variable
+        value : array_like or list
+          Initial value of the array
+
+        Returns
+        -------
+        arr : ndarray or list
+          Shared array
+        """
+
+        if isinstance(value, list):
+            arrs, refs = [], []
+            for v in value:
+                if v is None:
+                    arr, ref = None, None
+                else:
+                    v = np.asarray(v)
+                    arr, ref = self._new_array(v.shape, v.dtype)
+                    arr[:] = v
+                arrs.append(arr)
+                refs.append(ref)
+            self.arrays[name] = arrs
+            self._refs[name] = refs
+            self.version += 1
+            return arrs
+        else:
+            value = np.asarray(value)
+            arr = self.empty(name, value.shape, value.dtype)
+            arr[:] = value
+            return arr
+
+
+
+    def __setitem__(self, name, value):
+        """Set a parameter value, which is copied to the worker
+        processes on each call of :meth:`SharedMemoryPool.map` referring
+        to this namespace. The value must therefore be picklable.
+        """
+
+        self.params[name] = value
+
+
+
+    def setlocal(self, name, value):
+        """Set a value that is only available in the calling process,
+        such as a function that is not picklable.
+        """
+
+        self.local[name] = value
+
+
+
+    def __getitem__(self, name):
+        """Get an array, parameter, or local value."""
+
+        for dct in (self.arrays, self.params, self.local):
+            if name in dct:
+                return dct[name]
+        raise KeyError(name)
+
+
+
+    def activate(self):
+        """Assign the namespace values to the global variables of the
+        corresponding module in the calling process.
+        """
+
+        dct = vars(sys.modules[self.module])
+        dct.update(self.arrays)
+        dct.update(self.params)
+        dct.update(self.local)
+
+
+
+    def descriptor(self):
+        """Get a picklable description of the namespace, from which the
+        values are reconstructed in a worker process.
+
+        Returns
+        -------
+        dsc : tuple or None
+          Namespace description, or ``None`` if the arrays are not in
+          :mod:`multiprocessing.shared_memory` blocks
+        """
+
+        if not self.shared or shared_memory is None:
+            return None
+        return (self.module, self.key + (self.version,), self._refs,
+                self.params)
+
+
+
+    def close(self):
+        """Release the shared memory blocks. Arrays constructed by the
+        namespace remain valid in the calling process, but are no
+        longer accessible to worker processes.
+        """
+
+        self._finalizer()
+
+
+
+    def __getstate__(self):
+        """Support pickling by copying the shared array content, which
+        is restored into new shared memory blocks on unpickling.
+        """
+
+        arrays = {}
+        for name, arr in self.arrays.items():
+            if isinstance(arr, list):
+                arrays[name] = [None if a is None else np.array(a)
+                                for a in arr]
+            else:
+                arrays[name] = np.array(arr)
+        return {'module': self.module, 'shared': self.shared,
+                'arrays': arrays, 'params': self.params,
+                'local': self.local}
+
+
+
+    def __setstate__(self, state):
+        """Reconstruct shared arrays on unpickling."""
+
+        self.__init__(state['module'], state['shared'])
+        for name, arr in state['arrays'].items():
+            self.array(name, arr)
+        self.params = state['params']
+        self.local = state['local']
+
+
+
+
+
+def _attach(ref):
+    """Attach to the shared memory block(s) of a shared array
+    reference, or a list of them, in a worker process."""
+
+    if ref is None:
+        return None
+    elif isinstance(ref, list):
+        return [_attach(r) for r in ref]
+    else:
+        return _shm_array(ref[1], ref[2], name=ref[0])[0]
+
+
+
+def _worker_init(wisdom):
+    """Initialise a worker process.
+
+    Parameters
+    ----------
+    wisdom : tuple or None
+      FFTW wisdom exported by the parent process
+    """
+
+    # Required due to pyFFTW bug #135 - see "Notes" section of SPORCO docs.
+    sl.pyfftw_threads = 1
+    sl.import_fftw_wisdom(wisdom)
+
+
+
+def _worker_task(args):
+    """Set the module global variables from a namespace description,
+    if required, and then evaluate a function in a worker process.
+
+    Parameters
+    ----------
+    args : tuple
+      Tuple consisting of the function, its argument, and the
+      namespace description (see :meth:`SharedNamespace.descriptor`)
+
+    Returns
+    -------
+    val : object
+      Function return value
+    """
+
+    func, i, dsc = args
+    if dsc is not None:
+        module, key, refs, params = dsc
+        dct = vars(importlib.import_module(module))
+        cur = _worker_ns.get(module)
+        # Shared memory blocks are only attached when the namespace
+        # differs from that used by the previous task for this module
+        if cur is None or cur[0] != key:
+            if cur is not None:
+                for name in cur[1]:
+                    dct[name] = None
+            dct.update({name: _attach(ref) for name, ref in refs.items()})
+            _worker_ns[module] = (key, tuple(refs))
+        dct.update(params)
+    return func(i)
+
+
+
+
+
+class SharedMemoryPool(object):
+    """Persistent pool of worker processes for the parallel solvers.
+
+    A pool may be constructed once and passed to any number of
+    :class:`.admm.parcbpdn.ParConvBPDN`,
+    :class:`.dictlrn.prlcnscdl.ConvBPDNDictLearn_Consensus`, and
+    :class:`.dictlrn.prlcnscdl.ConvBPDNMaskDcplDictLearn_Consensus`
+    objects, avoiding the cost of starting a new pool for each call
+    of their ``solve`` methods. The data required by the worker
+    processes is communicated via the shared memory blocks of a
+    :class:`SharedNamespace`, which are attached by each worker
+    process when it first receives a task referring to that
+    namespace, and are reused by subsequent tasks. Not supported under
+    Windows.
+
+    The pool may be used as a context manager, in which case it is
+    closed on exit from the context.
+    """
+
+    shared = True
+    """Flag indicating that namespaces used with the pool must be
+    constructed in shared memory"""
+
+
+    def __init__(self, nproc=None):
+        """
+        Parameters
+        ----------
+        nproc : int or None, optional (default None)
+          Number of worker processes. If ``None``, the number of CPUs
+          is used.
+        """
+
+        if nproc is None:
+            nproc = mp.cpu_count()
+        self.nproc = nproc
+        self.serial = next(_serial)
+        self.pool = mp.get_context('fork').Pool(
+            processes=nproc, initializer=_worker_init,
+            initargs=(sl.export_fftw_wisdom(),))
+
+
+
+    def map(self, func, iterable, ns=None):
+        """Evaluate a function for each entry of an iterable in the
+        worker processes.
+
+        Parameters
+        ----------
+        func : function
+          Function, defined at module level, to be evaluated
+        iterable : iterable
+          Arguments for which the function is evaluated
+        ns : :class:`SharedNamespace` or None, optional (default None)
+          Namespace from which the module global variables accessed
+          by `func` are set in the worker processes
+
+        Returns
+        -------
+        vals : list
+          List of function return values
+        """
+
+        if self.pool is None:
+            raise RuntimeError('Pool has been closed')
+        dsc = None
+        if ns is not None:
+            dsc = ns.descriptor()
+            if dsc is None and ns.key[1] > self.serial:
+                raise RuntimeError('Arrays of a namespace constructed after '
+                                   'the pool are not accessible to its '
+                                   'worker processes unless module '
+                                   'multiprocessing.shared_memory is '
+                                   'available')
+        return self.pool.map(_worker_task, [(func, i, dsc) for i in iterable])
+
+
+
+    def close(self):
+        """Shut down the worker processes."""
+
+        if self.pool is not None:
+            self.pool.close()
+            self.pool.join()
+            self.pool = None
+
+
+
+    def __enter__(self):
+        return self
+
+
+
+    def __exit__(self, *args):
+        self.close()
+
+
+
+
+
+class ThreadPool(object):
+    """Pool of worker threads for the parallel solvers.
+
+    An alternative to :class:`SharedMemoryPool`, with the same
+    interface, in which the functions are evaluated by the threads of
+    a :class:`concurrent.futures.ThreadPoolExecutor` within the
+    calling process. Since the worker threads have direct access to
+    the module global variables of the calling process, there is no
+    pickling of the function arguments, no shared memory, and no
+    process startup cost. Parallel speedup depends on the computations
+    in the functions releasing the GIL, which is the case for the
+    bulk of the NumPy and pyFFTW computations in the parallel solvers.
+    (The FFT functions of :mod:`.linalg` may safely be called
+    concurrently by the worker threads; see
+    :func:`.linalg.set_fft_backend`.) Note, however, that since the worker threads share the module
+    global variables, multiple solvers using the same module must not
+    be run concurrently in different threads of the calling process.
+
+    The pool may be used as a context manager, in which case it is
+    closed on exit from the context.
+    """
+
+    shared = False
+    """Flag indicating that namespaces used with the pool need not be
+    constructed in shared memory"""
+
+
+    def __init__(self, nproc=None):
+        """
+        Parameters
+        ----------
+        nproc : int or None, optional (default None)
+          Number of worker threads. If ``None``, the number of CPUs
+          is used.
+        """
+
+        if nproc is None:
+            nproc = mp.cpu_count()
+        self.nproc = nproc
+        self.pool = ThreadPoolExecutor(max_workers=nproc)
+
+
+
+    def map(self, func, iterable, ns=None):
+        """Evaluate a function for each entry of an iterable in the
+        worker threads.
+
+        Parameters
+        ----------
+        func : function
+          Function, defined at module level, to be evaluated
+        iterable : iterable
+          Arguments for which the function is evaluated
+        ns : :class:`SharedNamespace` or None, optional (default None)
+          Namespace from which the module global variables accessed
+          by `func` are set
+
+        Returns
+        -------
+        vals : list
+          List of function return values
+        """
+
+        if self.pool is None:
+            raise RuntimeError('Pool has been closed')
+        if ns is not None:
+            ns.activate()
+        return list(self.pool.map(func, iterable))
+
+
+
+    def close(self):
+        """Shut down the worker threads."""
+
+        if self.pool is not None:
+            self.pool.shutdown(wait=True)
+            self.pool = None
+
+
+
+    def __enter__(self):
+        return self
+
+
+
+    def __exit__(self, *args):
+        self.close()
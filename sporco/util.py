@@ -18,9 +18,11 @@ from timeit import default_timer as timer
 import os
 import imghdr
 import io
+import json
 import platform
 import warnings
 import multiprocessing as mp
+from multiprocessing.pool import ThreadPool
 import itertools
 from future.moves.itertools import zip_longest
 import collections
@@ -781,8 +783,12 @@ def tikhonov_filter(s, lmbda, npd=16):
       Highpass image or array of images.
     """
 
-    grv = np.array([-1.0, 1.0]).reshape([2, 1])
-    gcv = np.array([-1.0, 1.0]).reshape([1, 2])
+    if np.issubdtype(s.dtype, np.floating):
+        dtype = s.dtype
+    else:
+        dtype = np.float64
+    grv = np.array([-1.0, 1.0], dtype=dtype).reshape([2, 1])
+    gcv = np.array([-1.0, 1.0], dtype=dtype).reshape([1, 2])
     Gr = sla.rfftn(grv, (s.shape[0] + 2*npd, s.shape[1] + 2*npd), (0, 1))
     Gc = sla.rfftn(gcv, (s.shape[0] + 2*npd, s.shape[1] + 2*npd), (0, 1))
     A = 1.0 + lmbda*np.conj(Gr)*Gr + lmbda*np.conj(Gc)*Gc
@@ -911,7 +917,163 @@ def idle_cpu_count(mincpu=1):
 
 
 
-def grid_search(fn, grd, fmin=True, nproc=None):
+def _grid_search_eval(args):
+    """Evaluate the function of a grid search at a single grid point.
+
+    Parameters
+    ----------
+    args : tuple
+      Tuple consisting of the function, the flat index of the grid
+      point, and the parameter values at the grid point
+
+    Returns
+    -------
+    idx : int
+      Flat index of the grid point
+    val : float or tuple of floats
+      Function value
+    """
+
+    fn, idx, prm = args
+    return idx, fn(prm)
+
+
+
+def _grid_search_chkpt(chkpt, grd):
+    """Load the function values recorded in a grid search checkpoint
+    file, and open the file for recording of further values.
+
+    The file is a text file in which each line is a JSON encoded
+    record. The first record is the search grid, and each of the rest
+    is a list consisting of the flat index of a grid point and the
+    corresponding function value. JSON is used rather than pickle so
+    that loading a checkpoint file cannot execute arbitrary code. If
+    the file exists, it is rewritten with the records that could be
+    loaded, discarding a possible incomplete record at the end of the
+    file.
+
+    Parameters
+    ----------
+    chkpt : string
+      Checkpoint file path
+    grd : tuple of array_like
+      Search grid
+
+    Returns
+    -------
+    fval : dict
+      Dictionary mapping flat grid point indices to function values
+    fh : file object
+      Checkpoint file opened for appending
+
+    Raises
+    ------
+    ValueError
+      If the checkpoint file was written for a different search grid
+      or is not a valid checkpoint file
+    """
+
+    grd = [np.asarray(a) for a in grd]
+    fval = {}
+    if os.path.exists(chkpt):
+        with open(chkpt, 'r') as f:
+            try:
+                cgrd = json.loads(f.readline())
+            except ValueError:
+                cgrd = None
+            if cgrd is not None:
+                if not isinstance(cgrd, list):
+                    raise ValueError('File %s is not a valid grid search '
+                                     'checkpoint file' % chkpt)
+                cgrd = [np.asarray(a) for a in cgrd]
+                if len(cgrd) != len(grd) or not all(
+                        a.shape == b.shape and np.all(a == b)
+                        for a, b in zip(cgrd, grd)):
+                    raise ValueError('Checkpoint file %s was written for a '
+                                     'different search grid' % chkpt)
+                for line in f:
+                    try:
+                        idx, val = _grid_search_decode(line)
+                    except ValueError:
+                        break
+                    fval[idx] = val
+    tmp = chkpt + '.tmp'
+    with open(tmp, 'w') as f:
+        f.write(json.dumps([a.tolist() for a in grd]) + '\n')
+        for idx, val in fval.items():
+            _grid_search_record(f, idx, val)
+    os.replace(tmp, chkpt)
+    return fval, open(chkpt, 'a')
+
+
+
+def _grid_search_decode(line):
+    """Decode a function value record of a grid search checkpoint file,
+    raising ValueError if it is incomplete or invalid."""
+
+    rec = json.loads(line)
+    if not isinstance(rec, list) or len(rec) != 2 or \
+       not isinstance(rec[0], int) or isinstance(rec[0], bool):
+        raise ValueError('Invalid checkpoint record')
+    val = np.asarray(rec[1], dtype=np.float64)
+    if val.ndim == 0:
+        val = float(val)
+    return rec[0], val
+
+
+
+def _grid_search_record(fh, idx, val):
+    """Record a function value in a grid search checkpoint file."""
+
+    val = np.asarray(val, dtype=np.float64).tolist()
+    fh.write(json.dumps([int(idx), val]) + '\n')
+    fh.flush()
+
+
+
+def _grid_search_result(fval, grd, fmin):
+    """Identify the optimal parameters of a grid search from the
+    function values at all grid points.
+
+    Parameters
+    ----------
+    fval : list
+      Function values at the grid points, in the order of
+      :func:`itertools.product` of the grid axes
+    grd : tuple of array_like
+      Search grid
+    fmin : bool
+      Determine whether optimal function values are selected as minima
+      or maxima
+
+    Returns
+    -------
+    sprm, sfvl, fvmx, sidx : tuple
+      As for :func:`grid_search`
+    """
+
+    if fmin:
+        slct = np.argmin
+    else:
+        slct = np.argmax
+    if isinstance(fval[0], (tuple, list, np.ndarray)):
+        nfnv = len(fval[0])
+        fvmx = np.reshape(fval, [a.size for a in grd] + [nfnv,])
+        sidx = np.unravel_index(slct(fvmx.reshape((-1, nfnv)), axis=0),
+                                fvmx.shape[0:-1]) + (np.array((range(nfnv))),)
+        sprm = np.array([grd[k][sidx[k]] for k in range(len(grd))])
+        sfvl = tuple(fvmx[sidx])
+    else:
+        fvmx = np.reshape(fval, [a.size for a in grd])
+        sidx = np.unravel_index(slct(fvmx), fvmx.shape)
+        sprm = np.array([grd[k][sidx[k]] for k in range(len(grd))])
+        sfvl = fvmx[sidx]
+
+    return sprm, sfvl, fvmx, sidx
+
+
+
+def grid_search(fn, grd, fmin=True, nproc=None, chkpt=None, callback=None):
     """Grid search for optimal parameters of a specified function.
 
     Perform a grid search for optimal parameters of a specified
@@ -922,17 +1084,27 @@ def grid_search(fn, grd, fmin=True, nproc=None):
     with optimum function values and corresponding parameter values
     being identified for each of them. On all platforms except Windows
     (where ``mp.Pool`` usage has some limitations), the computation
-    of the function at the grid points is computed in parallel.
+    of the function at the grid points is computed in parallel. Grid
+    points are dynamically scheduled, one at a time, to the worker
+    processes, so that the variation of the function computation time
+    over the grid does not result in idle workers.
+
+    If a checkpoint file is specified, the function value at each grid
+    point is recorded in the file as soon as it has been computed, and
+    the grid points with values already recorded in the file are not
+    evaluated, so that an interrupted search may be resumed by calling
+    this function again with the same checkpoint file.
 
     **Warning:** This function will hang if `fn` makes use of
     :mod:`pyfftw` with multi-threading enabled (the
     `bug <https://github.com/pyFFTW/pyFFTW/issues/135>`_ has been
     reported).
     When using the FFT functions in :mod:`sporco.linalg`,
-    multi-threading can be disabled by including the following code::
+    multi-threading can be disabled, or a different FFT backend
+    selected, by including the following code::
 
       import sporco.linalg
-      sporco.linalg.pyfftw_threads = 1
+      sporco.linalg.set_fft_backend(threads=1)  # or e.g. 'scipy'
 
 
     Parameters
@@ -950,6 +1122,15 @@ def grid_search(fn, grd, fmin=True, nproc=None):
     nproc : int or None, optional (default None)
       Number of processes to run in parallel. If None, the number of
       CPUs of the system is used.
+    chkpt : string or None, optional (default None)
+      Path of checkpoint file in which computed function values are
+      recorded. If the file exists, the values recorded in it are
+      used instead of being recomputed. The file must have been
+      written for the same search grid.
+    callback : function or None, optional (default None)
+      Function called, with the parameter values and the function
+      value as arguments, as each function value is computed (in order
+      of completion rather than grid order)
 
     Returns
     -------
@@ -965,32 +1146,198 @@ def grid_search(fn, grd, fmin=True, nproc=None):
       Indices of optimal values on parameter grid
     """
 
-    if fmin:
-        slct = np.argmin
-    else:
-        slct = np.argmax
-    fprm = itertools.product(*grd)
-    if platform.system() == 'Windows':
-        fval = list(map(fn, fprm))
-    else:
-        if nproc is None:
-            nproc = mp.cpu_count()
-        pool = mp.Pool(processes=nproc)
-        fval = pool.map(fn, fprm)
-        pool.close()
-        pool.join()
-    if isinstance(fval[0], (tuple, list, np.ndarray)):
-        nfnv = len(fval[0])
-        fvmx = np.reshape(fval, [a.size for a in grd] + [nfnv,])
-        sidx = np.unravel_index(slct(fvmx.reshape((-1, nfnv)), axis=0),
-                                fvmx.shape[0:-1]) + (np.array((range(nfnv))),)
-        sprm = np.array([grd[k][sidx[k]] for k in range(len(grd))])
-        sfvl = tuple(fvmx[sidx])
+    fprm = list(itertools.product(*grd))
+    if chkpt is None:
+        fval, fh = {}, None
     else:
-        fvmx = np.reshape(fval, [a.size for a in grd])
-        sidx = np.unravel_index(slct(fvmx), fvmx.shape)
-        sprm = np.array([grd[k][sidx[k]] for k in range(len(grd))])
-        sfvl = fvmx[sidx]
+        fval, fh = _grid_search_chkpt(chkpt, grd)
+    args = [(fn, idx, prm) for idx, prm in enumerate(fprm)
+            if idx not in fval]
+    pool = None
+    try:
+        if platform.system() == 'Windows' or not args:
+            results = map(_grid_search_eval, args)
+        else:
+            if nproc is None:
+                nproc = mp.cpu_count()
+            pool = mp.Pool(processes=nproc,
+                           initializer=sla.import_fftw_wisdom,
+                           initargs=(sla.export_fftw_wisdom(),))
+            results = pool.imap_unordered(_grid_search_eval, args)
+        for idx, val in results:
+            fval[idx] = val
+            if fh is not None:
+                _grid_search_record(fh, idx, val)
+            if callback is not None:
+                callback(fprm[idx], val)
+    except BaseException:
+        # Do not wait for the evaluation of the remaining grid points
+        if pool is not None:
+            pool.terminate()
+            pool = None
+        raise
+    finally:
+        if pool is not None:
+            pool.close()
+            pool.join()
+        if fh is not None:
+            fh.close()
+
+    return _grid_search_result([fval[idx] for idx in range(len(fprm))],
+                               grd, fmin)
+
+
+
+def halving_search(fn, grd, evl, fmin=True, niter=10, keep=0.5, nrefine=0,
+                   nproc=1, callback=None):
+    """Successive halving search for optimal parameters of an
+    iterative solver.
+
+    Perform a search for optimal parameters of an iterative solver,
+    such as those derived from :class:`.admm.ADMM` or
+    :class:`.fista.FISTA`, on a parameter grid. Instead of solving to
+    completion at every grid point, as would be the case if
+    :func:`grid_search` were used, a solver object is constructed for
+    every grid point and run for a small number of iterations, after
+    which only the best fraction of the grid points is retained. The
+    solvers for the retained grid points are then continued (via a
+    further call of their ``solve`` method, which resumes from the
+    final state of the previous call) for an increased number of
+    iterations, and the process is repeated until a single grid point
+    remains. Optionally, the search may then be repeated on a finer
+    grid around the selected grid point.
+
+    The solvers of the grid points retained at each stage may be run
+    in parallel. Since the solver objects retain their state from one
+    stage to the next, they are run in threads of the calling process
+    rather than in separate processes, so that the speedup obtained
+    depends on the extent to which the solver computations release the
+    Python global interpreter lock, as do the FFT and linear algebra
+    functions on which most of the solvers are based. In this case,
+    `evl` and the ``solve`` method of the solver objects must be
+    thread-safe. This is the case for the solvers in this package with
+    any of the default FFT backends, the FFT functions of which may be
+    called concurrently from multiple threads (see
+    :func:`.linalg.set_fft_backend`), provided that distinct solver
+    objects do not share working arrays or :class:`.linalg.RFFTPlan`
+    objects.
+
+    Parameters
+    ----------
+    fn : function
+      Function taking a tuple of parameter values as an argument, and
+      returning a solver object with a ``solve`` method and an
+      ``opt`` attribute with a ``MaxMainIter`` entry
+    grd : tuple of array_like
+      A tuple providing an array of sample points for each axis of the
+      grid on which the search is to be performed.
+    evl : function
+      Function taking a solver object as an argument, and returning a
+      float value quantifying the quality of its current solution (e.g.
+      a reconstruction error or a validation score)
+    fmin : bool, optional (default True)
+      Determine whether optimal function values are selected as minima
+      or maxima. If `fmin` is True then minima are selected.
+    niter : int, optional (default 10)
+      Number of iterations of each solver in the first stage. The
+      number of iterations in each subsequent stage is increased by a
+      factor of 1/`keep`, so that the total number of iterations of
+      each stage is approximately constant.
+    keep : float, optional (default 0.5)
+      Fraction of the grid points retained at each stage
+    nrefine : int, optional (default 0)
+      Number of grid refinements. At each refinement each axis of the
+      grid is replaced by the same number of evenly spaced points
+      between the neighbours of the selected grid point on that
+      axis, and the search is repeated on the new grid.
+    nproc : int, optional (default 1)
+      Number of threads in which the solvers of each stage are run in
+      parallel. If 1, they are run serially in the calling thread.
+    callback : function or None, optional (default None)
+      Function called, with the parameter values, the function value,
+      and the total number of iterations as arguments, as each
+      function value is computed (in grid order, at the end of each
+      stage, if `nproc` is greater than 1)
+
+    Returns
+    -------
+    sprm : ndarray
+      Optimal parameter values on each axis
+    sfvl : float
+      Function value of the selected grid point
+    fvmx : ndarray
+      Function values on search grid, at the final stage in which each
+      grid point was retained. If `nrefine` is non-zero, these values
+      (and `sidx`) are for the final refined grid.
+    sidx : tuple of int
+      Indices of optimal values on parameter grid
+    """
+
+    if not 0.0 < keep < 1.0:
+        raise ValueError('Parameter keep must be in the interval (0, 1)')
+
+    def stage_eval(args):
+        slv, mxit = args
+        slv.opt['MaxMainIter'] = mxit
+        slv.solve()
+        return evl(slv)
+
+    grd = [np.asarray(a) for a in grd]
+    pool = ThreadPool(processes=nproc) if nproc > 1 else None
+    try:
+        for r in range(nrefine + 1):
+            if r > 0:
+                # Refine each axis around the selected grid point
+                ngrd = []
+                for a, i in zip(grd, sidx):
+                    lo, hi = a[max(i - 1, 0)], a[min(i + 1, a.size - 1)]
+                    ngrd.append(np.linspace(lo, hi, a.size) if hi != lo
+                                else a)
+                grd = ngrd
+
+            fprm = list(itertools.product(*grd))
+            fval = np.zeros(len(fprm))
+            slvs = [fn(prm) for prm in fprm]
+            cand = list(range(len(fprm)))
+            stage = 0
+            nitr = 0
+            while True:
+                mxit = int(np.ceil(niter / keep**stage))
+                nitr += mxit
+                args = [(slvs[idx], mxit) for idx in cand]
+                if pool is None:
+                    vals = map(stage_eval, args)
+                else:
+                    vals = pool.map(stage_eval, args)
+                for idx, val in zip(cand, vals):
+                    fval[idx] = val
+                    if callback is not None:
+                        callback(fprm[idx], fval[idx], nitr)
+                if len(cand) == 1:
+                    break
+                # Retain the best fraction of the candidate grid points,
+                # always discarding at least one of them so that the
+                # search terminates
+                ordr = np.argsort(fval[cand])
+                if not fmin:
+                    ordr = ordr[::-1]
+                nkeep = min(max(int(np.ceil(keep * len(cand))), 1),
+                            len(cand) - 1)
+                cand = [cand[i] for i in ordr[0:nkeep]]
+                # Release the solvers of discarded grid points
+                for idx in set(range(len(slvs))) - set(cand):
+                    slvs[idx] = None
+                stage += 1
+
+            fvmx = np.reshape(fval, [a.size for a in grd])
+            sidx = np.unravel_index(cand[0], fvmx.shape)
+    finally:
+        if pool is not None:
+            pool.close()
+            pool.join()
+
+    sprm = np.array([grd[k][sidx[k]] for k in range(len(grd))])
+    sfvl = fvmx[sidx]
 
     return sprm, sfvl, fvmx, sidx
 
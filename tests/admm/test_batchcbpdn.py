@@ -0,0 +1,115 @@
+from __future__ import division
+from builtins import object
+
+import pytest
+import numpy as np
+
+from sporco.admm import cbpdn
+from sporco.admm import batchcbpdn
+
+
+class TestSet01(object):
+
+    def setup_method(self, method):
+        np.random.seed(12345)
+
+
+    def test_01(self):
+        N = 16
+        Nd = 5
+        M = 4
+        P = 3
+        D = np.random.randn(Nd, Nd, M)
+        s = np.random.randn(N, N, P)
+        b = batchcbpdn.BatchConvBPDN(D, s, 1e-1)
+        assert b.lmbda.shape == (1, 1, 1, P, 1)
+        assert b.rho.shape == (1, 1, 1, P, 1)
+        Y = b.solve()
+        assert Y.shape == (N, N, 1, P, M)
+
+
+    def test_02(self):
+        N = 16
+        Nd = 5
+        M = 4
+        P = 4
+        D = np.random.randn(Nd, Nd, M)
+        s = np.random.randn(N, N, P)
+        lmbda = np.array([1e-2, 5e-2, 1e-1, 2e-1])
+        opt = batchcbpdn.BatchConvBPDN.Options(
+            {'MaxMainIter': 200, 'RelStopTol': 1e-3, 'rho': 2.0,
+             'AutoRho': {'Enabled': False}})
+        b = batchcbpdn.BatchConvBPDN(D, s, lmbda, opt)
+        Y = b.solve()
+        for p in range(P):
+            copt = cbpdn.ConvBPDN.Options(
+                {'MaxMainIter': 200, 'RelStopTol': 1e-3, 'rho': 2.0,
+                 'AutoRho': {'Enabled': False}})
+            c = cbpdn.ConvBPDN(D, s[..., p], lmbda[p], copt)
+            Yc = c.solve()
+            assert b.niter[p] == c.k
+            assert np.allclose(Y[..., p, :].squeeze(), Yc.squeeze())
+
+
+    def test_03(self):
+        N = 16
+        Nd = 5
+        Cs = 3
+        M = 4
+        P = 2
+        D = np.random.randn(Nd, Nd, M)
+        s = np.random.randn(N, N, Cs, P)
+        lmbda = 1e-1
+        opt = batchcbpdn.BatchConvBPDN.Options({'MaxMainIter': 50})
+        b = batchcbpdn.BatchConvBPDN(D, s, lmbda, opt)
+        Y = b.solve()
+        copt = cbpdn.ConvBPDN.Options({'MaxMainIter': 50})
+        c = cbpdn.ConvBPDN(D, s[..., 1], lmbda, copt, dimK=0)
+        Yc = c.solve()
+        assert Y.shape == (N, N, Cs, P, M)
+        assert np.allclose(Y[..., 1:2, :], Yc, atol=1e-6)
+
+
+    def test_04(self):
+        N = 16
+        Nd = 5
+        M = 4
+        P = 6
+        D = np.random.randn(Nd, Nd, M)
+        s = np.random.randn(N, N, P)
+        s[..., 0] *= 1e-2
+        opt = batchcbpdn.BatchConvBPDN.Options(
+            {'MaxMainIter': 500, 'RelStopTol': 5e-3})
+        b = batchcbpdn.BatchConvBPDN(D, s, 1e-1, opt)
+        b.solve()
+        nact = [itst.NumActive for itst in b.itstat]
+        assert nact[0] == P
+        assert all(n0 >= n1 for n0, n1 in zip(nact[:-1], nact[1:]))
+        assert b.niter.min() < b.niter.max()
+        assert b.X.shape == b.cri.shpX
+        assert b.rho.shape == (1, 1, 1, P, 1)
+
+
+    def test_05(self):
+        N = 16
+        Nd = 5
+        M = 4
+        P = 3
+        D = np.random.randn(Nd, Nd, M).astype(np.float32)
+        s = np.random.randn(N, N, P).astype(np.float32)
+        opt = batchcbpdn.BatchConvBPDN.Options(
+            {'MaxMainIter': 20, 'FastSolve': True, 'Verbose': False})
+        b = batchcbpdn.BatchConvBPDN(D, s, 1e-1, opt)
+        Y = b.solve()
+        assert Y.dtype == np.float32
+        assert len(b.itstat) == 0
+
+
+    def test_06(self):
+        N = 16
+        Nd = 5
+        M = 4
+        D = np.random.randn(Nd, Nd, 3, M)
+        s = np.random.randn(N, N, 3, 2)
+        with pytest.raises(ValueError):
+            b = batchcbpdn.BatchConvBPDN(D, s, 1e-1)
@@ -364,3 +364,93 @@ class TestSet01(object):
         assert b.var_x() is not None
         assert b.var_y() is not None
         assert b.var_u() is not None
+
+
+    def test_23(self):
+        N = 64
+        M = 128
+        D = np.random.randn(N, M)
+        x0 = np.random.randn(M, 1) * (np.random.rand(M, 1) < 0.1)
+        s = D.dot(x0) + 1e-2 * np.random.randn(N, 1)
+        lmbda = 1e-1
+        opt = bpdn.BPDN.Options({'Verbose': False, 'MaxMainIter': 2000,
+                                 'RelStopTol': 1e-7, 'rho': 1.0,
+                                 'AutoRho': {'Enabled': False}})
+        b = bpdn.BPDN(D, s, lmbda, opt)
+        b.solve()
+        for acc in ('Nesterov', 'Anderson'):
+            opt = bpdn.BPDN.Options({'Verbose': False, 'MaxMainIter': 2000,
+                                     'RelStopTol': 1e-7, 'rho': 1.0,
+                                     'AutoRho': {'Enabled': False},
+                                     'Acceleration': {'Type': acc}})
+            c = bpdn.BPDN(D, s, lmbda, opt)
+            c.solve()
+            assert c.k < 2000
+            assert np.isclose(c.itstat[-1].ObjFun, b.itstat[-1].ObjFun,
+                              rtol=1e-6)
+
+
+    def test_24(self):
+        N = 8
+        M = 16
+        D = np.random.randn(N, M).astype(np.float32)
+        s = np.random.randn(N, 1).astype(np.float32)
+        opt = bpdn.BPDN.Options({'Verbose': False, 'MaxMainIter': 50,
+                                 'AutoRho': {'Enabled': True, 'Period': 1},
+                                 'Acceleration': {'Type': 'Anderson',
+                                                  'Memory': 3}})
+        b = bpdn.BPDN(D, s, 1e-1, opt)
+        b.solve()
+        assert b.X.dtype == np.float32
+        assert b.Y.dtype == np.float32
+        assert b.U.dtype == np.float32
+        assert len(b.acc_dF) <= 3
+
+
+    def test_25(self):
+        D = np.random.randn(8, 16)
+        s = np.random.randn(8, 1)
+        opt = bpdn.BPDN.Options({'Acceleration': {'Type': 'Fast'}})
+        with pytest.raises(ValueError):
+            b = bpdn.BPDN(D, s, 1e-1, opt)
+
+
+    def test_26(self):
+        N = 20
+        M = 10
+        D = np.random.randn(N, M)
+        s = np.random.randn(N, 1)
+        mu = 3.0
+        opt = bpdn.ElasticNet.Options({'Verbose': False, 'MaxMainIter': 25,
+                                       'RelStopTol': 0.0, 'rho': 1.0,
+                                       'AutoRho': {'Enabled': True,
+                                                   'Spectral': True,
+                                                   'Period': 5}})
+        b = bpdn.ElasticNet(D, s, 0.0, mu, opt)
+        b.solve()
+        ev = np.linalg.eigvalsh(D.T.dot(D))
+        assert b.rho != 1.0
+        assert b.rho >= ev[0] + mu and b.rho <= ev[-1] + mu
+
+
+    def test_27(self):
+        N = 100
+        M = 300
+        D = np.random.randn(N, M)
+        x0 = np.random.randn(M, 1) * (np.random.rand(M, 1) < 0.05)
+        s = D.dot(x0) + 1e-2 * np.random.randn(N, 1)
+        lmbda = 1e-1
+        opt = bpdn.BPDN.Options({'Verbose': False, 'MaxMainIter': 3000,
+                                 'RelStopTol': 1e-5, 'rho': 1.0,
+                                 'AutoRho': {'Enabled': True}})
+        b = bpdn.BPDN(D, s, lmbda, opt)
+        b.solve()
+        opt['AutoRho', 'Spectral'] = True
+        c = bpdn.BPDN(D, s, lmbda, opt)
+        c.solve()
+        assert c.k < b.k
+        assert np.isclose(c.itstat[-1].ObjFun, b.itstat[-1].ObjFun,
+                          rtol=1e-5)
+        nrc = np.sum(np.diff(c.getitstat().Rho) != 0)
+        nrb = np.sum(np.diff(b.getitstat().Rho) != 0)
+        assert nrc < nrb
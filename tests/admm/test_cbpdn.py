@@ -631,3 +631,245 @@ class TestSet01(object):
         assert opt['fEvalX'] is False and opt['gEvalY'] is True
         opt['AuxVarObj'] = False
         assert opt['fEvalX'] is True and opt['gEvalY'] is False
+
+
+    def test_37(self):
+        N = 16
+        Nd = 5
+        Cs = 3
+        K = 5
+        M = 4
+        D = np.random.randn(Nd, Nd, M)
+        s = np.random.randn(N, N, Cs, K)
+        lmbda = 1e-1
+        opt = cbpdn.ConvBPDN.Options({'Verbose': False, 'MaxMainIter': 20,
+                                      'LinSolveCheck': True})
+        b = cbpdn.ConvBPDN(D, s, lmbda, opt)
+        Xb = b.solve()
+        opt['MemMap'] = {'Enabled': True, 'ChunkSize': 2}
+        c = cbpdn.ConvBPDN(D, s, lmbda, opt)
+        Xc = c.solve()
+        assert isinstance(c.Y, np.memmap)
+        assert isinstance(c.Xf, np.memmap)
+        assert np.allclose(Xb, Xc)
+        assert np.allclose(b.itstat[-1].ObjFun, c.itstat[-1].ObjFun)
+        assert np.allclose(b.itstat[-1].XSlvRelRes, c.itstat[-1].XSlvRelRes)
+        assert np.allclose(b.reconstruct(), c.reconstruct())
+
+
+    def test_38(self):
+        N = 16
+        Nd = 5
+        M = 4
+        D = np.random.randn(Nd, Nd, M)
+        s = np.random.randn(N, N)
+        opt = cbpdn.ConvElasticNet.Options({'MemMap': {'Enabled': True}})
+        try:
+            cbpdn.ConvElasticNet(D, s, 1e-1, 1e-2, opt)
+        except ValueError:
+            pass
+        else:
+            assert 0
+
+
+    def test_39(self):
+        N = 16
+        Nd = 5
+        Cs = 3
+        M = 4
+        D = np.random.randn(Nd, Nd, M)
+        s0 = np.random.randn(N, N, Cs)
+        s1 = np.random.randn(N, N, Cs)
+        lmbda = 1e-1
+        opt = cbpdn.ConvBPDN.Options({'Verbose': False, 'MaxMainIter': 20})
+        b = cbpdn.ConvBPDN(D, s0, lmbda, opt)
+        b.solve()
+        Df = b.Df
+        b.setsignal(s1)
+        assert b.Df is Df
+        assert b.k == 0 and len(b.itstat) == 0
+        X1 = b.solve()
+        c = cbpdn.ConvBPDN(D, s1, lmbda, opt)
+        X2 = c.solve()
+        assert np.allclose(X1, X2)
+        assert np.allclose(b.itstat[-1].ObjFun, c.itstat[-1].ObjFun)
+
+
+    def test_40(self):
+        N = 16
+        Nd = 5
+        K = 3
+        M = 4
+        D = np.random.randn(Nd, Nd, M)
+        s0 = np.random.randn(N, N, K)
+        s1 = s0 + 1e-3 * np.random.randn(N, N, K)
+        lmbda = 1e-1
+        opt = cbpdn.ConvBPDN.Options({'Verbose': False, 'MaxMainIter': 500,
+                                      'RelStopTol': 5e-3})
+        b = cbpdn.ConvBPDN(D, s0, lmbda, opt)
+        b.solve()
+        b.setsignal(s1, warmstart=True)
+        b.solve()
+        c = cbpdn.ConvBPDN(D, s1, lmbda, opt)
+        c.solve()
+        assert b.k < c.k
+        opt['MemMap'] = {'Enabled': True, 'ChunkSize': 2}
+        d = cbpdn.ConvBPDN(D, s0, lmbda, opt)
+        d.solve()
+        d.setsignal(s1)
+        d.solve()
+        assert np.allclose(c.getcoef(), d.getcoef(), atol=1e-6)
+        try:
+            d.setsignal(s1[..., 0])
+        except ValueError:
+            pass
+        else:
+            assert 0
+
+
+    def test_41(self):
+        N = 16
+        Nd = 5
+        K = 2
+        M = 4
+        D = np.random.randn(Nd, Nd, M)
+        D /= np.sqrt(np.sum(D**2, axis=(0, 1)))
+        s = np.random.randn(N, N, K)
+        opt = cbpdn.ConvBPDN.Options({'Verbose': False, 'MaxMainIter': 2000,
+                                      'RelStopTol': 1e-3,
+                                      'AutoRho': {'Enabled': False}})
+        b = cbpdn.ConvBPDN(D, s, 1.0, opt)
+        lmax = b.lambda_max()
+        c = cbpdn.ConvBPDN(D, s, 1.01 * lmax, opt)
+        c.solve()
+        assert np.abs(c.Y).max() == 0.0
+        c = cbpdn.ConvBPDN(D, s, 0.9 * lmax, opt)
+        c.solve()
+        assert np.abs(c.Y).max() > 0.0
+        lmbda, X, niter = b.solve_path(nlmbda=6, lmin=1e-1)
+        assert np.allclose(lmbda[0], lmax)
+        assert X.shape == (6,) + b.cri.shpX
+        assert niter[0] == 0
+        assert np.abs(X[0]).max() == 0.0
+        nc = 0
+        for n in range(1, 6):
+            c = cbpdn.ConvBPDN(D, s, lmbda[n], opt)
+            c.solve()
+            nc += c.k
+        assert np.allclose(X[-1], c.getcoef(), atol=1e-1)
+        assert niter.sum() < nc
+
+
+    def test_42(self):
+        N = 16
+        Nd = 5
+        K = 3
+        M = 4
+        D = np.random.randn(Nd, Nd, M)
+        s = np.random.randn(N, N, K)
+        wl1 = np.linspace(0.5, 2, M).reshape((1, 1, 1, 1, M))
+        opt = cbpdn.ConvBPDN.Options({'Verbose': False, 'MaxMainIter': 50,
+                                      'L1Weight': wl1})
+        c = cbpdn.ConvBPDN(D, s, 1.0, opt)
+        opt = cbpdn.ConvBPDN.Options({'Verbose': False, 'MaxMainIter': 50,
+                                      'L1Weight': wl1,
+                                      'MemMap': {'Enabled': True,
+                                                 'ChunkSize': 2}})
+        b = cbpdn.ConvBPDN(D, s, 1.0, opt)
+        assert np.allclose(b.lambda_max(), c.lambda_max())
+        lb, Xb, nb = b.solve_path(lmbda=[0.5, 0.2])
+        lc, Xc, nc = c.solve_path(lmbda=[0.5, 0.2])
+        assert np.allclose(Xb, Xc, atol=1e-6)
+
+
+    def test_43(self):
+        N = 16
+        Nd = 5
+        Cs = 3
+        M = 4
+        D = np.random.randn(Nd, Nd, Cs, M).astype(np.float32)
+        s = np.random.randn(N, N, Cs).astype(np.float32)
+        w = np.random.rand(N, N, Cs).astype(np.float32)
+        lmbda = 1e-1
+        mu = 1e-2
+        opt = {'Verbose': False, 'MaxMainIter': 20, 'DataType': np.float32}
+        for b in (cbpdn.ConvBPDN(D, s, lmbda,
+                                 cbpdn.ConvBPDN.Options(opt)),
+                  cbpdn.ConvBPDNGradReg(D, s, lmbda, mu,
+                                        cbpdn.ConvBPDNGradReg.Options(opt)),
+                  cbpdn.ConvBPDNMaskDcpl(D, s, lmbda, w,
+                                         cbpdn.ConvBPDNMaskDcpl.Options(
+                                             opt))):
+            b.solve()
+            assert np.isfinite(b.itstat[-1].ObjFun)
+            # Every working array remains in single precision
+            for k, v in vars(b).items():
+                if isinstance(v, np.ndarray) and v.size > 0 and \
+                   v.dtype.kind in 'fc':
+                    assert v.dtype in (np.float32, np.complex64), k
+
+
+    def test_44(self):
+        N = 16
+        Nd = 5
+        K = 3
+        M = 4
+        D = np.random.randn(Nd, Nd, M)
+        s0 = np.random.randn(N, N, K)
+        s1 = s0 + 1e-3 * np.random.randn(N, N, K)
+        lmbda = 1e-1
+        opt = cbpdn.ConvBPDN.Options({'Verbose': False, 'MaxMainIter': 50,
+                                      'RelStopTol': 0.0})
+        b = cbpdn.ConvBPDN(D, s0, lmbda, opt)
+        b.solve()
+        opt['MemMap'] = {'Enabled': True, 'ChunkSize': 2}
+        c = cbpdn.ConvBPDN(D, s0, lmbda, opt)
+        c.solve()
+        assert b.rho != b.rho0
+        b.setsignal(s1, warmstart=True)
+        c.setsignal(s1, warmstart=True)
+        assert isinstance(c.U, np.memmap)
+        assert np.allclose(b.U, c.U)
+        b.solve()
+        c.solve()
+        assert np.allclose(b.getcoef(), c.getcoef(), atol=1e-6)
+
+
+    def test_45(self):
+        N = 16
+        Nd = 5
+        M = 4
+        D = np.random.randn(Nd, Nd, M)
+        s = np.random.randn(N, N)
+        opt = cbpdn.ConvBPDN.Options({'MemMap': {'Enabled': True},
+                                      'Acceleration': {'Type': 'Nesterov'}})
+        try:
+            b = cbpdn.ConvBPDN(D, s, 1e-1, opt)
+        except ValueError:
+            pass
+        else:
+            assert 0
+
+
+    def test_46(self):
+        N = 16
+        Nd = 5
+        M = 4
+        D = np.random.randn(Nd, Nd, M)
+        s = np.random.randn(N, N)
+        opt = cbpdn.ConvBPDN.Options({'Verbose': False, 'MaxMainIter': 20,
+                                      'RelStopTol': 0.0, 'AutoRho':
+                                      {'Enabled': True, 'Period': 5,
+                                       'Spectral': True}})
+        b = cbpdn.ConvBPDN(D, s, 1e-1, opt)
+        b.solve()
+        # No state is recorded on iterations at which rho is not updated
+        spcstate = b.spcstate
+        assert b.spectral_rho_factor(b.k + 1) == 1.0
+        assert b.spcstate is spcstate
+        b.reset()
+        assert b.spcstate is None
+        b.solve()
+        assert b.spcstate is not None
+        b.setlmbda(5e-2)
+        assert b.spcstate is None
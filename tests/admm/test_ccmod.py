@@ -276,3 +276,62 @@ class TestSet01(object):
         assert opt['fEvalX'] is False and opt['gEvalY'] is True
         opt['AuxVarObj'] = False
         assert opt['fEvalX'] is True and opt['gEvalY'] is False
+
+
+    def test_16(self):
+        N = 16
+        M = 4
+        Nc = 3
+        K = 5
+        Nd = 8
+        X = np.random.randn(N, N, Nc, K, M)
+        S = np.random.randn(N, N, Nc, K)
+        opt = ccmod.ConvCnstrMOD_IterSM.Options({'Verbose': False,
+                        'MaxMainIter': 20, 'LinSolveCheck': True})
+        b = ccmod.ConvCnstrMOD_IterSM(X, S, (Nd, Nd, M), opt=opt)
+        Db = b.solve()
+        opt['MemMap'] = {'Enabled': True, 'ChunkSize': 4}
+        c = ccmod.ConvCnstrMOD_IterSM(X, S, (Nd, Nd, M), opt=opt)
+        Dc = c.solve()
+        assert isinstance(c.Zf, np.memmap)
+        assert np.allclose(Db, Dc)
+        assert np.allclose(b.itstat[-1].DFid, c.itstat[-1].DFid)
+        assert np.allclose(b.itstat[-1].XSlvRelRes, c.itstat[-1].XSlvRelRes)
+        assert np.allclose(b.reconstruct(), c.reconstruct())
+
+
+    def test_17(self):
+        N = 16
+        M = 4
+        K = 5
+        Nd = 8
+        X = np.random.randn(N, N, 1, K, M)
+        S = np.random.randn(N, N, K)
+        opt = ccmod.ConvCnstrMOD_CG.Options({'Verbose': False,
+                        'MaxMainIter': 5, 'MemMap': {'Enabled': True}})
+        try:
+            b = ccmod.ConvCnstrMOD_CG(X, S, (Nd, Nd, M), opt=opt)
+        except ValueError:
+            pass
+        else:
+            assert 0
+
+
+    def test_18(self):
+        N = 16
+        M = 4
+        K = 5
+        Nd = 8
+        X = np.random.randn(N, N, 1, K, M)
+        S = np.random.randn(N, N, K)
+        for acc in ('Nesterov', 'Anderson'):
+            for mit in range(2, 12):
+                opt = ccmod.ConvCnstrMOD_IterSM.Options(
+                    {'Verbose': False, 'MaxMainIter': mit,
+                     'RelStopTol': 0.0, 'AutoRho': {'Enabled': False},
+                     'Acceleration': {'Type': acc}})
+                b = ccmod.ConvCnstrMOD_IterSM(X, S, (Nd, Nd, M), opt=opt)
+                D = b.solve()
+                # The final Y is a projection onto the constraint set
+                nrm = np.sqrt(np.sum(D**2, axis=(0, 1)))
+                assert np.all(nrm <= 1.0 + 1e-6)
@@ -5,6 +5,7 @@ import pickle
 import numpy as np
 
 from sporco.admm import parcbpdn
+from sporco import shmpool
 import sporco.linalg as sl
 
 
@@ -336,3 +337,48 @@ class TestSet01(object):
         Xb = b.solve()
         Xc = c.solve()
         assert np.linalg.norm(Xb - Xc) == 0.0
+
+
+    def test_20(self):
+        N = 16
+        Nd = 5
+        M = 4
+        D = np.random.randn(Nd, Nd, M)
+        s0 = np.random.randn(N, N)
+        s1 = np.random.randn(N, N)
+        lmbda = 1e-1
+        opt = parcbpdn.ParConvBPDN.Options({'Verbose': False,
+                                            'MaxMainIter': 20})
+        X0 = parcbpdn.ParConvBPDN(D, s0, lmbda, opt=opt, nproc=2).solve()
+        X1 = parcbpdn.ParConvBPDN(D, s1, lmbda, opt=opt, nproc=2).solve()
+        opt['MaxMainIter'] = 10
+        with shmpool.SharedMemoryPool(2) as pool:
+            b0 = parcbpdn.ParConvBPDN(D, s0, lmbda, opt=opt, pool=pool)
+            b1 = parcbpdn.ParConvBPDN(D, s1, lmbda, opt=opt, pool=pool)
+            b0.solve()
+            b1.solve()
+            Xb0 = b0.solve()
+            Xb1 = b1.solve()
+            assert b0.pool is pool
+        assert np.linalg.norm(Xb0 - X0) < 1e-10
+        assert np.linalg.norm(Xb1 - X1) < 1e-10
+
+
+    def test_21(self):
+        N = 16
+        Nd = 5
+        M = 4
+        D = np.random.randn(Nd, Nd, M)
+        s = np.random.randn(N, N)
+        lmbda = 1e-1
+        opt = parcbpdn.ParConvBPDN.Options({'Verbose': False,
+                                            'MaxMainIter': 20})
+        X0 = parcbpdn.ParConvBPDN(D, s, lmbda, opt=opt, nproc=M).solve()
+        # Repeated, with more threads than work items, since concurrent
+        # FFT computations in the worker threads must not interfere
+        with shmpool.ThreadPool(2 * M) as pool:
+            for n in range(20):
+                b = parcbpdn.ParConvBPDN(D, s, lmbda, opt=opt, pool=pool)
+                X1 = b.solve()
+                assert not b.mpns.shared
+                assert np.linalg.norm(X1 - X0) < 1e-10
@@ -0,0 +1,101 @@
+from __future__ import division
+from builtins import object
+
+import numpy as np
+
+from sporco.admm import cbpdn
+from sporco.admm import tiledcbpdn
+
+
+class TestSet01(object):
+
+    def setup_method(self, method):
+        np.random.seed(12345)
+
+
+    def test_01(self):
+        N = 32
+        Nd = 5
+        M = 4
+        D = np.random.randn(Nd, Nd, M)
+        s = np.random.randn(N, N)
+        opt = tiledcbpdn.TiledConvBPDN.Options({'TileSize': 12})
+        b = tiledcbpdn.TiledConvBPDN(D, s, 1e-1, opt)
+        assert b.margin == (2*Nd, 2*Nd)
+        assert len(b.tiles) == 9
+        assert b.tiles[-1] == ((24, 32), (24, 32))
+
+
+    def test_02(self):
+        N = 16
+        Nd = 5
+        Cs = 3
+        M = 4
+        D = np.random.randn(Nd, Nd, M)
+        s = np.random.randn(N, N, Cs)
+        lmbda = 1e-1
+        opt = cbpdn.ConvBPDN.Options({'MaxMainIter': 50,
+                                      'RelStopTol': 1e-10})
+        Xc = cbpdn.ConvBPDN(D, s, lmbda, opt=opt).solve()
+        topt = tiledcbpdn.TiledConvBPDN.Options({
+            'TileSize': N, 'Margin': 0, 'CBPDN': opt})
+        b = tiledcbpdn.TiledConvBPDN(D, s, lmbda, topt)
+        X = b.solve()
+        assert X.shape == b.cri.shpX
+        assert np.allclose(X, Xc)
+
+
+    def test_03(self):
+        N = 32
+        Nd = 5
+        M = 4
+        D = np.random.randn(Nd, Nd, M)
+        s = np.random.randn(N, N)
+        lmbda = 1e0
+        opt = cbpdn.ConvBPDN.Options({'MaxMainIter': 200,
+                                      'RelStopTol': 1e-10})
+        Xc = cbpdn.ConvBPDN(D, s, lmbda, opt=opt).solve()
+        err = []
+        for mrg in (2, 8):
+            topt = tiledcbpdn.TiledConvBPDN.Options({
+                'TileSize': 16, 'Margin': mrg, 'CBPDN': opt})
+            b = tiledcbpdn.TiledConvBPDN(D, s, lmbda, topt)
+            X = b.solve()
+            err.append(np.linalg.norm(X - Xc) / np.linalg.norm(Xc))
+        assert err[1] < err[0]
+        assert err[1] < 2e-1
+
+
+    def test_04(self):
+        N = 24
+        Nd = 5
+        M = 4
+        D = np.random.randn(Nd, Nd, M)
+        s = np.random.randn(N, N)
+        lmbda = 1e-1
+        opt = tiledcbpdn.TiledConvBPDN.Options({
+            'TileSize': 12, 'Margin': 4, 'NumProcesses': 2,
+            'CBPDN': {'MaxMainIter': 10}})
+        b = tiledcbpdn.TiledConvBPDN(D, s, lmbda, opt)
+        X = b.solve()
+        opt['NumProcesses'] = 1
+        c = tiledcbpdn.TiledConvBPDN(D, s, lmbda, opt)
+        assert np.allclose(X, c.solve())
+        assert len(c.itstat) == 4
+        Sr = cbpdn.ConvBPDN(D, s, lmbda).reconstruct(X).squeeze()
+        assert np.allclose(c.reconstruct(), Sr)
+
+
+    def test_05(self):
+        N = 16
+        Nd = 5
+        M = 4
+        D = np.random.randn(Nd, Nd, M)
+        s = np.random.randn(N, N).astype(np.float32)
+        opt = tiledcbpdn.TiledConvBPDN.Options({
+            'TileSize': 8, 'Margin': 12, 'CBPDN': {'MaxMainIter': 5}})
+        b = tiledcbpdn.TiledConvBPDN(D, s, 1e-1, opt)
+        X = b.solve()
+        assert X.dtype == np.float32
+        Sr = cbpdn.ConvBPDN(D, s, 1e-1).reconstruct(X).squeeze()
+        assert np.allclose(b.reconstruct(), Sr, atol=1e-5)
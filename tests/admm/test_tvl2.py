@@ -193,3 +193,17 @@ class TestSet04(object):
         X = b.solve()
         assert np.abs(b.itstat[-1].ObjFun - 567.72425227) < 1e-3
         assert sm.mse(self.U, X) < 1e-3
+
+
+    def test_03(self):
+        lmbda = 1e-1
+        opt = tvl2.TVL2Denoise.Options({'Verbose': False, 'gEvalY': False,
+                                        'MaxMainIter': 250, 'rho': 10*lmbda,
+                                        'RelStopTol': 1e-4})
+        b = tvl2.TVL2Denoise(self.D, lmbda, opt, axes=(0, 1, 2))
+        b.solve()
+        opt['Acceleration', 'Type'] = 'Anderson'
+        c = tvl2.TVL2Denoise(self.D, lmbda, opt, axes=(0, 1, 2))
+        c.solve()
+        assert c.k < b.k
+        assert np.abs(c.itstat[-1].ObjFun - b.itstat[-1].ObjFun) < 1e-2
@@ -3,6 +3,7 @@ from builtins import object
 
 import numpy as np
 
+from sporco.dictlrn import dictlrn
 from sporco.dictlrn import cbpdndl
 
 
@@ -137,3 +138,73 @@ class TestSet01(object):
         except Exception as e:
             print(e)
             assert 0
+
+
+
+    def test_10(self):
+        lmbda = 1e-1
+        for xmethod in ('admm', 'fista'):
+            for wstrt in ('Full', 'ResetRho', 'Primal', None):
+                opt = cbpdndl.ConvBPDNDictLearn.Options(
+                    {'MaxMainIter': 5, 'WarmStart': wstrt,
+                     'CBPDN': {'MaxMainIter': 10}}, xmethod=xmethod)
+                b = cbpdndl.ConvBPDNDictLearn(self.D0, self.S, lmbda,
+                                              opt=opt, xmethod=xmethod)
+                b.solve()
+                its = b.getitstat()
+                assert np.all(np.array(its.ObjFun) > 0)
+                if xmethod == 'admm':
+                    assert np.all(np.array(its.XPrRsdl) > 0)
+                    assert np.all(np.array(its.XRho) > 0)
+        opt = cbpdndl.ConvBPDNDictLearn.Options({'WarmStart': 'Dual'})
+        try:
+            b = cbpdndl.ConvBPDNDictLearn(self.D0, self.S, lmbda, opt=opt)
+        except ValueError:
+            pass
+        else:
+            assert 0
+
+
+
+    def test_11(self):
+        lmbda = 1e-1
+        sched = dictlrn.InnerIterScheduler(xiter0=2, diter0=3, factor=2.0,
+                                           plateau=1.0)
+        opt = cbpdndl.ConvBPDNDictLearn.Options(
+            {'MaxMainIter': 4, 'InnerSchedule': sched,
+             'CBPDN': {'MaxMainIter': 6, 'RelStopTol': 1e-3},
+             'CCMOD': {'MaxMainIter': 20}})
+        b = cbpdndl.ConvBPDNDictLearn(self.D0, self.S, lmbda, opt=opt)
+        b.solve()
+        its = b.getitstat()
+        assert list(its.XMaxIter) == [2, 2, 4, 6]
+        assert list(its.DMaxIter) == [3, 3, 6, 12]
+        assert its.XRelStopTol[-1] < its.XRelStopTol[0]
+        assert opt['CBPDN', 'MaxMainIter'] == 6
+        assert opt['CBPDN', 'RelStopTol'] == 1e-3
+
+
+
+    def test_12(self):
+        lmbda = 1e-1
+        sched = dictlrn.InnerIterScheduler(xiter0=2, diter0=3)
+
+        def callback(d):
+            raise RuntimeError('callback failure')
+
+        opt = cbpdndl.ConvBPDNDictLearn.Options(
+            {'MaxMainIter': 4, 'InnerSchedule': sched, 'Callback': callback,
+             'CBPDN': {'MaxMainIter': 6, 'RelStopTol': 1e-3},
+             'CCMOD': {'MaxMainIter': 20, 'RelStopTol': 1e-3}})
+        b = cbpdndl.ConvBPDNDictLearn(self.D0, self.S, lmbda, opt=opt)
+        try:
+            b.solve()
+        except RuntimeError:
+            pass
+        else:
+            assert 0
+        # Options modified by the schedule are restored on exception
+        assert b.xstep.opt['MaxMainIter'] == 6
+        assert b.xstep.opt['RelStopTol'] == 1e-3
+        assert b.dstep.opt['MaxMainIter'] == 20
+        assert b.dstep.opt['RelStopTol'] == 1e-3
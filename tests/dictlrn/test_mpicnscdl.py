@@ -0,0 +1,75 @@
+from __future__ import division
+from builtins import object
+
+import pytest
+try:
+    from mpi4py import MPI
+except:
+    pytest.skip("mpi4py not installed", allow_module_level=True)
+import numpy as np
+
+from sporco.dictlrn import prlcnscdl
+from sporco.dictlrn import mpicnscdl
+
+
+# These tests may be run with multiple MPI processes, e.g.
+#   mpirun -np 4 python -m pytest tests/dictlrn/test_mpicnscdl.py
+
+class TestSet01(object):
+
+    def setup_method(self, method):
+        np.random.seed(12345)
+        N = 16
+        Nd = 5
+        M = 4
+        K = 8
+        self.D0 = np.random.randn(Nd, Nd, M)
+        self.S = np.random.randn(N, N, K)
+        self.comm = MPI.COMM_WORLD
+        self.Sr = self.S[..., self.comm.Get_rank()::self.comm.Get_size()]
+
+
+    def test_01(self):
+        lmbda = 1e-1
+        opt = mpicnscdl.MPIConvBPDNDictLearn_Consensus.Options(
+            {'MaxMainIter': 10})
+        try:
+            b = mpicnscdl.MPIConvBPDNDictLearn_Consensus(
+                self.D0, self.Sr, lmbda, opt=opt)
+            b.solve()
+        except Exception as e:
+            print(e)
+            assert 0
+
+
+    def test_02(self):
+        lmbda = 1e-1
+        Nit = 10
+        opts = prlcnscdl.ConvBPDNDictLearn_Consensus.Options(
+            {'MaxMainIter': Nit})
+        bs = prlcnscdl.ConvBPDNDictLearn_Consensus(self.D0, self.S, lmbda,
+                                                   opt=opts, nproc=0)
+        Ds = bs.solve()
+        optm = mpicnscdl.MPIConvBPDNDictLearn_Consensus.Options(
+            {'MaxMainIter': Nit})
+        bm = mpicnscdl.MPIConvBPDNDictLearn_Consensus(self.D0, self.Sr,
+                                                      lmbda, opt=optm)
+        Dm = bm.solve()
+        assert np.linalg.norm(Ds - Dm) < 1e-10
+        assert np.abs(bs.getitstat().ObjFun[-1] -
+                      bm.getitstat().ObjFun[-1]) < 1e-8
+        assert bm.getcoef().shape[-2] == self.Sr.shape[-1]
+
+
+    def test_03(self):
+        Nit = 5
+        opts = prlcnscdl.ConvBPDNDictLearn_Consensus.Options(
+            {'MaxMainIter': Nit})
+        bs = prlcnscdl.ConvBPDNDictLearn_Consensus(self.D0, self.S,
+                                                   opt=opts, nproc=0)
+        optm = mpicnscdl.MPIConvBPDNDictLearn_Consensus.Options(
+            {'MaxMainIter': Nit})
+        bm = mpicnscdl.MPIConvBPDNDictLearn_Consensus(self.D0, self.Sr,
+                                                      opt=optm)
+        assert bm.xstep.lmbda == bs.xstep.lmbda
+        assert bm.Kg == self.S.shape[-1]
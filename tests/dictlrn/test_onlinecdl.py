@@ -112,3 +112,47 @@ class TestSet02(object):
         except Exception as e:
             print(e)
             assert 0
+
+
+    def test_04(self):
+        lmbda = 1e-1
+        opt = onlinecdl.OnlineConvBPDNDictLearn.Options(
+            {'WarmStart': {'Enabled': True, 'CacheSize': 2},
+             'CBPDN': {'MaxMainIter': 100, 'RelStopTol': 1e-3}})
+        b = onlinecdl.OnlineConvBPDNDictLearn(self.D0, lmbda, opt=opt)
+        for it in range(6):
+            b.solve(self.S[..., it % 2], sid=it % 2)
+        assert len(b.xcache) == 2
+        b.solve(self.S[..., 2], sid=2)
+        assert len(b.xcache) == 2
+        assert 0 not in b.xcache
+        opt['WarmStart', 'Enabled'] = False
+        c = onlinecdl.OnlineConvBPDNDictLearn(self.D0, lmbda, opt=opt)
+        for it in range(6):
+            c.solve(self.S[..., it % 2], sid=it % 2)
+        assert len(c.xcache) == 0
+        assert b.itstat[5].PrimalRsdl != c.itstat[5].PrimalRsdl
+
+
+
+    def test_05(self):
+        lmbda = 1e-1
+        opt = onlinecdl.OnlineConvBPDNDictLearn.Options(
+            {'WarmStart': {'Enabled': True},
+             'CBPDN': {'MaxMainIter': 10}})
+        xsteps = []
+
+        class OnlineCDL(onlinecdl.OnlineConvBPDNDictLearn):
+            def xstep_store(self, xstep, sid):
+                super(OnlineCDL, self).xstep_store(xstep, sid)
+                xsteps.append(xstep)
+
+        b = OnlineCDL(self.D0, lmbda, opt=opt)
+        b.solve(self.S[..., 0], sid=0)
+        Y, rhoU = b.xcache[0]
+        # The cached variables do not alias the solver working arrays
+        assert not np.shares_memory(Y, xsteps[0].Y)
+        assert not np.shares_memory(rhoU, xsteps[0].U)
+        Y0 = Y.copy()
+        xsteps[0].Y[:] = 0
+        assert np.array_equal(b.xcache[0][0], Y0)
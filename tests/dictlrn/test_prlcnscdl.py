@@ -6,6 +6,7 @@ import numpy as np
 from sporco.dictlrn import prlcnscdl
 from sporco.dictlrn import cbpdndl
 from sporco.dictlrn import cbpdndlmd
+from sporco import shmpool
 
 
 class TestSet01(object):
@@ -346,3 +347,46 @@ class TestSet01(object):
         assert np.linalg.norm(Ds - Dp) < 1e-7
         assert np.abs(
             bs.getitstat().ObjFun[-1] - bp.getitstat().ObjFun[-1] < 1e-7)
+
+
+    def test_19(self):
+        lmbda = 1e-1
+        W = np.ones(self.S.shape[0:2] + (1, self.S.shape[2], 1))
+        opt = prlcnscdl.ConvBPDNDictLearn_Consensus.Options(
+            {'MaxMainIter': 10})
+        b = prlcnscdl.ConvBPDNDictLearn_Consensus(
+            self.D0, self.S, lmbda, opt=opt, nproc=2)
+        D0 = b.solve()
+        optmd = prlcnscdl.ConvBPDNMaskDcplDictLearn_Consensus.Options(
+            {'MaxMainIter': 10})
+        bmd = prlcnscdl.ConvBPDNMaskDcplDictLearn_Consensus(
+            self.D0, self.S, lmbda, W, opt=optmd, nproc=2)
+        D1 = bmd.solve()
+        opt['MaxMainIter'] = 5
+        optmd['MaxMainIter'] = 5
+        with shmpool.SharedMemoryPool(2) as pool:
+            c = prlcnscdl.ConvBPDNDictLearn_Consensus(
+                self.D0, self.S, lmbda, opt=opt, pool=pool)
+            cmd = prlcnscdl.ConvBPDNMaskDcplDictLearn_Consensus(
+                self.D0, self.S, lmbda, W, opt=optmd, pool=pool)
+            c.solve()
+            cmd.solve()
+            Dc0 = c.solve()
+            Dc1 = cmd.solve()
+        assert np.linalg.norm(Dc0 - D0) < 1e-10
+        assert np.linalg.norm(Dc1 - D1) < 1e-10
+
+
+    def test_20(self):
+        lmbda = 1e-1
+        W = np.ones(self.S.shape[0:2] + (1, self.S.shape[2], 1))
+        opt = prlcnscdl.ConvBPDNMaskDcplDictLearn_Consensus.Options(
+            {'MaxMainIter': 10})
+        b = prlcnscdl.ConvBPDNMaskDcplDictLearn_Consensus(
+            self.D0, self.S, lmbda, W, opt=opt, nproc=2)
+        D0 = b.solve()
+        with shmpool.ThreadPool(2) as pool:
+            c = prlcnscdl.ConvBPDNMaskDcplDictLearn_Consensus(
+                self.D0, self.S, lmbda, W, opt=opt, pool=pool)
+            D1 = c.solve()
+        assert np.linalg.norm(D1 - D0) < 1e-10
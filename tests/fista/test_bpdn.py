@@ -177,3 +177,43 @@ class TestSet01(object):
         Xb = b.solve()
         Xc = c.solve()
         assert np.linalg.norm(Xb - Xc) == 0.0
+
+
+    def test_11(self):
+        U, _ = np.linalg.qr(np.random.randn(200, 50))
+        V, _ = np.linalg.qr(np.random.randn(50, 50))
+        D = U.dot(np.diag(np.logspace(0, -2, 50))).dot(V.T)
+        s = np.random.randn(200, 1)
+        lmbda = 1e-3
+        L = np.linalg.norm(D, 2)**2
+        opt = bpdn.BPDN.Options({'Verbose': False, 'MaxMainIter': 5000,
+                                 'RelStopTol': 1e-7, 'L': L})
+        b = bpdn.BPDN(D, s, lmbda, opt)
+        b.solve()
+        for mopt in ({'Restart': {'Enabled': True}},
+                     {'Restart': {'Enabled': True, 'Criterion': 'Function'}},
+                     {'Momentum': {'Type': 'Lazy'},
+                      'Restart': {'Enabled': True}},
+                     {'Momentum': {'Type': 'Greedy'}}):
+            opt = bpdn.BPDN.Options({'Verbose': False, 'MaxMainIter': 5000,
+                                     'RelStopTol': 1e-7, 'L': L})
+            opt.update(mopt)
+            c = bpdn.BPDN(D, s, lmbda, opt)
+            c.solve()
+            assert c.k < b.k
+            assert np.isclose(c.itstat[-1].ObjFun, b.itstat[-1].ObjFun,
+                              rtol=1e-6)
+
+
+    def test_12(self):
+        D = np.random.randn(8, 16)
+        s = np.random.randn(8, 1)
+        for mopt in ({'Momentum': {'Type': 'Nesterov'}},
+                     {'Restart': {'Criterion': 'Speed'}}):
+            opt = bpdn.BPDN.Options(mopt)
+            try:
+                b = bpdn.BPDN(D, s, 1e-1, opt)
+            except ValueError:
+                pass
+            else:
+                assert 0
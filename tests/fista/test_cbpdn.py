@@ -4,6 +4,7 @@ from builtins import object
 import numpy as np
 
 from sporco.fista import cbpdn
+from sporco.fista import fista
 import sporco.linalg as sl
 
 
@@ -261,3 +262,157 @@ class TestSet01(object):
         except Exception as e:
             print(e)
             assert 0
+
+
+    def test_16(self):
+        N = 16
+        Nd = 5
+        M = 4
+        D = np.random.randn(Nd, Nd, M)
+        s0 = np.random.randn(N, N)
+        s1 = np.random.randn(N, N)
+        lmbda = 1e-1
+        opt = cbpdn.ConvBPDN.Options({'Verbose': False, 'MaxMainIter': 20,
+                                      'BackTrack': {'Enabled': True}})
+        b = cbpdn.ConvBPDN(D, s0, lmbda, opt)
+        b.solve()
+        b.setsignal(s1)
+        assert b.k == 0 and len(b.itstat) == 0
+        X1 = b.solve()
+        c = cbpdn.ConvBPDN(D, s1, lmbda, opt)
+        X2 = c.solve()
+        assert np.allclose(X1, X2)
+        b.setsignal(s1, warmstart=True)
+        b.solve()
+        assert b.itstat[-1].ObjFun <= c.itstat[-1].ObjFun
+
+
+    def test_17(self):
+        N = 16
+        Nd = 5
+        Cs = 3
+        M = 4
+        D = np.random.randn(Nd, Nd, Cs, M)
+        s = np.random.randn(N, N, Cs)
+        w = np.random.rand(N, N, Cs)
+        lmbda = 1e-1
+        opt = cbpdn.ConvBPDN.Options({'Verbose': False, 'MaxMainIter': 5})
+        for b in (cbpdn.ConvBPDN(D, s, lmbda, opt),
+                  cbpdn.ConvBPDNMask(D, s, lmbda, w, opt)):
+            b.solve()
+            gradf, fval = b.eval_grad_fval()
+            assert np.allclose(gradf, b.eval_grad())
+            assert np.allclose(fval, b.obfn_f(b.Yf))
+
+
+    def test_18(self):
+        N = 16
+        Nd = 5
+        Cs = 3
+        M = 4
+        D = np.random.randn(Nd, Nd, Cs, M)
+        s = np.random.randn(N, N, Cs)
+        w = np.random.rand(N, N, Cs)
+        lmbda = 1e-1
+        opt = cbpdn.ConvBPDN.Options({'Verbose': False, 'MaxMainIter': 500,
+                                      'RelStopTol': 1e-5, 'AutoL': True})
+        b = cbpdn.ConvBPDN(D, s, lmbda, opt)
+        Df = sl.rfftn(D, (N, N), (0, 1))
+        L = np.max([np.linalg.norm(Df[i, j], 2)**2
+                    for i in range(N) for j in range(N // 2 + 1)])
+        assert np.isclose(b.L, L, rtol=1e-6)
+        b.solve()
+        assert b.itstat[-1].Rsdl < 1e-5
+        c = cbpdn.ConvBPDNMask(D, s, lmbda, w, opt)
+        assert np.isclose(c.L, np.max(w)**2 * L, rtol=1e-6)
+        c.solve()
+        b.setdict(2.0 * b.D)
+        assert np.isclose(b.L, 4.0 * L, rtol=1e-6)
+        assert b.L0 == b.L
+
+
+    def test_19(self):
+        N = 16
+        Nd = 5
+        M = 4
+        D = np.random.randn(Nd, Nd, M)
+        s = np.random.randn(N, N)
+        w = np.random.rand(N, N)
+        lmbda = 1e-1
+        opt = cbpdn.ConvBPDN.Options({'Verbose': False, 'MaxMainIter': 1000,
+                                      'RelStopTol': 0.0, 'AutoL': True})
+        c = cbpdn.ConvBPDNMask(D, s, lmbda, w, opt)
+        c.solve()
+        for mopt in ({'Restart': {'Enabled': True}},
+                     {'Momentum': {'Type': 'Greedy'}},
+                     {'Momentum': {'Type': 'FISTA'},
+                      'BackTrack': {'Enabled': True}}):
+            opt = cbpdn.ConvBPDN.Options(
+                {'Verbose': False, 'MaxMainIter': 1000, 'RelStopTol': 0.0,
+                 'AutoL': True, 'Restart': {'Enabled': True}})
+            opt.update(mopt)
+            b = cbpdn.ConvBPDNMask(D, s, lmbda, w, opt)
+            b.solve()
+            assert np.isclose(b.itstat[-1].ObjFun, c.itstat[-1].ObjFun,
+                              rtol=5e-3)
+            b.reset()
+            assert b.kr == 0 and b.t == 1.0
+
+
+    def test_20(self):
+        N = 16
+        Nd = 5
+        Cs = 3
+        M = 4
+        D = np.random.randn(Nd, Nd, Cs, M).astype(np.float32)
+        s = np.random.randn(N, N, Cs).astype(np.float32)
+        w = np.random.rand(N, N, Cs).astype(np.float32)
+        lmbda = 1e-1
+        opt = cbpdn.ConvBPDN.Options({'Verbose': False, 'MaxMainIter': 20,
+                                      'L': 1e2, 'DataType': np.float32})
+        for b in (cbpdn.ConvBPDN(D, s, lmbda, opt),
+                  cbpdn.ConvBPDNMask(D, s, lmbda, w, opt)):
+            b.solve()
+            assert np.isfinite(b.itstat[-1].ObjFun)
+            # Every working array remains in single precision
+            for k, v in vars(b).items():
+                if isinstance(v, np.ndarray) and v.size > 0 and \
+                   v.dtype.kind in 'fc':
+                    assert v.dtype in (np.float32, np.complex64), k
+
+
+    def test_21(self):
+        N = 32
+        Nd = 8
+        M = 16
+        D = np.random.randn(Nd, Nd, M)
+        s = np.random.randn(N, N)
+        lmbda = 1e-1
+        X = []
+        for L in (1.0, 1e6):
+            opt = cbpdn.ConvBPDN.Options({'Verbose': False,
+                                          'MaxMainIter': 20, 'L': L,
+                                          'BackTrack': {'Enabled': True}})
+            b = cbpdn.ConvBPDN(D, s, lmbda, opt)
+            assert np.isclose(b.Lmax, b.lipschitz_constant())
+            b.solve()
+            # Backtracking never increases L beyond the Lipschitz
+            # constant bound, and the initial value is limited to it
+            assert b.L <= b.Lmax
+            assert b.itstat[0].IterBTrack <= 40
+            # The DFT domain quadratic expansion of f is exact
+            gradY, fY = b.eval_grad_fval()
+            Dxy = b.eval_Dxy()
+            flin = fY + b.eval_linear_approx(Dxy, gradY)
+            assert np.isclose(b.eval_fval_x(Dxy, flin), b.obfn_f(b.Xf),
+                              rtol=1e-10)
+            X.append(b.X.copy())
+        # Backtracking with the incremental gradient step of FISTADFT
+        # gives the same result as the generic FISTA backtracking
+        opt = cbpdn.ConvBPDN.Options({'Verbose': False, 'MaxMainIter': 20,
+                                      'L': 1.0,
+                                      'BackTrack': {'Enabled': True}})
+        b = cbpdn.ConvBPDN(D, s, lmbda, opt)
+        b.backtracking = lambda: fista.FISTA.standard_backtrack(b)
+        b.solve()
+        assert np.allclose(b.X, X[0], rtol=1e-8, atol=1e-10)
@@ -474,3 +474,73 @@ class TestSet01(object):
             print(e)
             assert 0
         assert np.array(c.getitstat().Rsdl)[-1] < 5e-3
+
+
+    def test_25(self):
+        N = 16
+        M = 4
+        Nc = 3
+        Nd = 8
+        X = np.random.randn(N, N, Nc, 1, M)
+        S = np.random.randn(N, N, Nc)
+        W = np.random.rand(N, N, Nc)
+        opt = ccmod.ConvCnstrMODMask.Options({'Verbose': False,
+                                              'MaxMainIter': 5, 'L': 5e1})
+        for c in (ccmod.ConvCnstrMOD(X, S, (Nd, Nd, 1, M), opt=opt, dimK=0),
+                  ccmod.ConvCnstrMODMask(X, S, W, (Nd, Nd, 1, M), opt=opt,
+                                         dimK=0)):
+            c.solve()
+            gradf, fval = c.eval_grad_fval()
+            assert np.allclose(gradf, c.eval_grad())
+            assert np.allclose(fval, c.obfn_f(c.Yf))
+
+
+    def test_26(self):
+        N = 16
+        M = 4
+        K = 6
+        Nd = 8
+        X = np.random.randn(N, N, 1, K, M)
+        S = np.random.randn(N, N, K)
+        W = np.random.rand(N, N, 1, K, 1)
+        opt = ccmod.ConvCnstrMODMask.Options({'Verbose': False,
+                                              'MaxMainIter': 500,
+                                              'RelStopTol': 1e-5,
+                                              'AutoL': True})
+        c = ccmod.ConvCnstrMOD(X, S, (Nd, Nd, M), opt=opt)
+        Xf = sl.rfftn(X, None, (0, 1))
+        L = np.max([np.linalg.norm(Xf[i, j, 0], 2)**2
+                    for i in range(N) for j in range(N // 2 + 1)])
+        assert np.isclose(c.L, L, rtol=1e-6)
+        c.solve()
+        assert c.itstat[-1].Rsdl < 1e-5
+        c = ccmod.ConvCnstrMODMask(X, S, W, (Nd, Nd, M), opt=opt)
+        assert np.isclose(c.L, np.max(W)**2 * L, rtol=1e-6)
+        c.setcoef(2.0 * X)
+        assert np.isclose(c.L, 4.0 * np.max(W)**2 * L, rtol=1e-6)
+
+
+    def test_27(self):
+        N = 16
+        M = 4
+        K = 6
+        Nd = 8
+        X = np.random.randn(N, N, 1, K, M)
+        S = np.random.randn(N, N, K)
+        opt = ccmod.ConvCnstrMOD.Options({'Verbose': False,
+                                          'MaxMainIter': 20, 'L': 1.0,
+                                          'BackTrack': {'Enabled': True}})
+        c = ccmod.ConvCnstrMOD(X, S, (Nd, Nd, M), opt=opt)
+        assert np.isclose(c.Lmax, c.lipschitz_constant())
+        c.solve()
+        assert c.L <= c.Lmax
+        gradY, fY = c.eval_grad_fval()
+        Dxy = c.eval_Dxy()
+        flin = fY + c.eval_linear_approx(Dxy, gradY)
+        assert np.isclose(c.eval_fval_x(Dxy, flin), c.obfn_f(c.Xf),
+                          rtol=1e-10)
+        W = np.random.rand(N, N, 1, K, 1)
+        c = ccmod.ConvCnstrMODMask(X, S, W, (Nd, Nd, M), opt=opt)
+        assert np.isclose(c.Lmax, c.lipschitz_constant())
+        c.solve()
+        assert c.L <= c.Lmax
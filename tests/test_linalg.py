@@ -1,6 +1,7 @@
 from __future__ import division
 from builtins import object
 
+import os
 import numpy as np
 from scipy.ndimage import convolve
 from sporco import linalg
@@ -388,3 +389,283 @@ class TestSet01(object):
         xy0 = convolve(y, x)
         xy1 = linalg.fftconv(x, y, axes=(0,), origin=(2,))
         assert np.allclose(xy0, xy1)
+
+
+
+    def test_28(self):
+        x = np.random.randn(16, 12, 1, 1, 3)
+        dftp = linalg.RFFTPlan(x.shape, (0, 1), x.dtype)
+        xf0 = linalg.rfftn(x, None, (0, 1))
+        xf1 = dftp.rfftn(x).copy()
+        assert np.allclose(xf0, xf1)
+        y = np.zeros(x.shape)
+        dftp.irfftn(xf1, out=y)
+        assert np.allclose(x, y)
+
+
+
+    def test_29(self):
+        x = np.random.randn(16, 12, 3)
+        xf0 = linalg.rfftn(x, None, (0, 1))
+        y0 = linalg.dctii(x, axes=(0, 1))
+        bknd = linalg.get_fft_backend()
+        for name in ('scipy', 'numpy'):
+            with linalg.fft_backend(name, threads=1):
+                assert linalg.get_fft_backend() == name
+                xf1 = linalg.rfftn(x, None, (0, 1))
+                y1 = linalg.dctii(x, axes=(0, 1))
+                dftp = linalg.RFFTPlan(x.shape, (0, 1), x.dtype)
+                xf2 = dftp.rfftn(x).copy()
+                x2 = dftp.irfftn(xf2)
+            assert linalg.get_fft_backend() == bknd
+            assert np.allclose(xf0, xf1)
+            assert np.allclose(xf0, xf2)
+            assert np.allclose(x, x2)
+            assert np.allclose(y0, y1)
+            assert np.allclose(x, linalg.idctii(y1, axes=(0, 1)))
+
+
+
+    def test_30(self, tmp_path):
+        pth = str(tmp_path / 'wisdom.npz')
+        assert not linalg.load_fftw_wisdom(pth)
+        x = np.random.randn(16, 12, 3)
+        dftp = linalg.RFFTPlan(x.shape, (0, 1), x.dtype)
+        assert np.allclose(dftp.irfftn(dftp.rfftn(x)), x)
+        linalg.import_fftw_wisdom(linalg.export_fftw_wisdom())
+        if linalg.have_pyfftw:
+            assert linalg.save_fftw_wisdom(pth) == pth
+            assert linalg.load_fftw_wisdom(pth)
+            # Files that are not valid wisdom files are ignored
+            np.savez(pth, wisdom0=np.zeros((4,)))
+            assert not linalg.load_fftw_wisdom(pth)
+            with open(pth, 'wb') as f:
+                f.write(b'invalid')
+            assert not linalg.load_fftw_wisdom(pth)
+        else:
+            assert linalg.save_fftw_wisdom(pth) is None
+        assert os.path.basename(linalg.fftw_wisdom_path()).startswith(
+            'fftw_wisdom_')
+
+
+
+    def test_31(self):
+        rho = 1e-1
+        N = 32
+        M = 16
+        K = 8
+        D = util.complex_randn(N, N, 1, 1, M)
+        X = util.complex_randn(N, N, 1, K, M)
+        S = np.sum(D*X, axis=4, keepdims=True)
+        Z = (D.conj()*np.sum(D*X, axis=4, keepdims=True) + rho*X -
+             D.conj()*S) / rho
+        slv = linalg.SMSolver(D, rho, axis=4)
+        Xslv = slv.solve(D.conj()*S + rho*Z)
+        assert linalg.rrs(D.conj()*np.sum(D*Xslv, axis=4, keepdims=True) +
+                          rho*Xslv, D.conj()*S + rho*Z) < 1e-11
+        slv = linalg.SMSolver(D, 2*rho, axis=4, cache=True)
+        slv.setrho(rho)
+        b = D.conj()*S + rho*Z
+        slv.solve(b, out=b)
+        assert np.allclose(b, Xslv)
+        have_numexpr = linalg.have_numexpr
+        linalg.have_numexpr = False
+        try:
+            Xnne = np.zeros(Xslv.shape, dtype=Xslv.dtype)
+            slv.solve(D.conj()*S + rho*Z, out=Xnne)
+        finally:
+            linalg.have_numexpr = have_numexpr
+        assert np.allclose(Xnne, Xslv)
+
+
+
+    def test_32(self):
+        rho = 1e-1
+        N = 32
+        M = 16
+        for K in (8, 24):
+            D = util.complex_randn(N, N, 1, 1, M)
+            X = util.complex_randn(N, N, 1, K, M)
+            S = np.sum(D*X, axis=4, keepdims=True)
+
+            Xop = lambda x: np.sum(X * x, axis=4, keepdims=True)
+            XHop = lambda x: np.sum(np.conj(X) * x, axis=3, keepdims=True)
+            Z = (XHop(Xop(D)) + rho*D - XHop(S)) / rho
+            Dslv = linalg.solvemdbi_gram(X, rho, XHop(S) + rho*Z, 4, 3)
+            assert linalg.rrs(XHop(Xop(Dslv)) + rho*Dslv,
+                              XHop(S) + rho*Z) < 1e-11
+            c = linalg.solvemdbi_gram_c(X, rho, 4, 3)
+            Dslc = linalg.solvemdbi_gram(X, rho, XHop(S) + rho*Z, 4, 3, c)
+            assert np.allclose(Dslc, Dslv)
+
+
+
+    def test_33(self):
+        N = 32
+        M = 16
+        K = 8
+        D = util.complex_randn(N, N, 1, 1, M)
+        X = util.complex_randn(N, N, 1, K, M)
+        S = np.sum(D*X, axis=4, keepdims=True)
+        XHop = lambda x: np.sum(np.conj(X) * x, axis=3, keepdims=True)
+        slv = linalg.MDBISolver(X, 1e-1, 4, 3)
+        for rho in (1e-1, 1e0):
+            slv.setrho(rho)
+            b = XHop(S) + rho*D
+            Dslv = np.zeros(b.shape, dtype=b.dtype)
+            slv.solve(b, out=Dslv)
+            assert np.allclose(Dslv, linalg.solvemdbi_ism(X, rho, b, 4, 3))
+
+
+
+    def test_34(self):
+        rho = 1e-1
+        N = 32
+        M = 16
+        K = 8
+        D = util.complex_randn(N, N, 1, 1, M)
+        X = util.complex_randn(N, N, 1, K, M)
+        S = np.sum(D*X, axis=4, keepdims=True)
+
+        Xop = lambda x: np.sum(X * x, axis=4, keepdims=True)
+        XHop = lambda x: np.sum(np.conj(X) * x, axis=3, keepdims=True)
+        Z = (XHop(Xop(D)) + rho*D - XHop(S)) / rho
+        Dslv, cgit = linalg.solvemdbi_bcg(X, rho, XHop(S) + rho*Z, 4, 3,
+                                          tol=1e-12)
+        assert cgit.shape == (N, N, 1, 1, 1)
+        assert linalg.rrs(XHop(Xop(Dslv)) + rho*Dslv, XHop(S) + rho*Z) < 1e-11
+        Dslv, cgit = linalg.solvemdbi_bcg(X, rho, XHop(S) + rho*Z, 4, 3,
+                                          tol=1e-12, isn=Dslv)
+        assert np.max(cgit) <= 1
+
+
+
+    def test_35(self):
+        np.random.seed(12345)
+        x = np.random.randn(64, 64, 4).astype(np.float32)
+        x64 = x.astype(np.float64)
+        assert np.isclose(linalg.l2norm(x), np.linalg.norm(x64), rtol=1e-7)
+        assert np.isclose(linalg.l1norm(x), np.sum(np.abs(x64)), rtol=1e-7)
+        xf = np.fft.rfftn(x64, axes=(0, 1))
+        assert np.isclose(linalg.l2norm(xf.astype(np.complex64)),
+                          np.linalg.norm(xf), rtol=1e-6)
+        assert np.isclose(linalg.rfl2norm2(xf.astype(np.complex64),
+                                           x.shape),
+                          np.linalg.norm(x64)**2, rtol=1e-6)
+        ah = util.complex_randn(8, 8, 1, 4, 6).astype(np.complex64)
+        b = util.complex_randn(8, 8, 1, 1, 6).astype(np.complex64)
+        assert linalg.solvemdbi_rsm(ah, 1e-1, b, 3).dtype == np.complex64
+
+
+
+    def test_36(self):
+        np.random.seed(12345)
+        for K, M in ((1, 6), (5, 1), (3, 6), (24, 20)):
+            a = util.complex_randn(6, 4, 1, K, M)
+            nrm2 = np.max([np.linalg.norm(a[i, j, 0], 2)**2
+                           for i in range(6) for j in range(4)])
+            assert np.isclose(linalg.mdb_opnorm2(a, 4, 3), nrm2, rtol=1e-6)
+            # The power iteration estimate is an upper bound
+            est = linalg.mdb_opnorm2(a, 4, 3, gmax=0)
+            assert nrm2 * (1 - 1e-12) <= est <= nrm2 * (1 + 1e-6)
+            est = linalg.mdb_opnorm2(a, 4, 3, gmax=0, tol=1e-2)
+            assert nrm2 * (1 - 1e-12) <= est <= nrm2 * (1 + 1e-2)
+
+
+
+    def test_37(self):
+        rho = 1e-1
+        N = 16
+        M = 8
+        K = 4
+        X = util.complex_randn(N, N, 1, K, M)
+        b = util.complex_randn(N, N, 1, 1, M)
+        # Systems with b = 0 are not iterated, even with a non-zero
+        # initial solution
+        b[0:4] = 0
+        b[4:8] *= 1e-3
+        x0 = util.complex_randn(N, N, 1, 1, M)
+        x, cgit = linalg.solvemdbi_bcg(X, rho, b, 4, 3, tol=1e-10, isn=x0)
+        assert np.all(cgit[0:4] == 0)
+        assert np.all(x[0:4] == 0)
+        assert np.all(cgit[4:] > 0)
+        xs = linalg.solvemdbi_ism(X, rho, b, 4, 3)
+        assert np.allclose(x, xs, atol=1e-10)
+
+
+
+    def test_38(self):
+        for dtype, cdtype in ((None, np.complex64),
+                              (np.float32, np.complex64),
+                              (np.float64, np.complex128)):
+            Gf, GHGf = linalg.GradientFilters(4, (0, 1), (8, 8), dtype=dtype)
+            assert Gf.dtype == cdtype
+            assert GHGf.dtype == np.real(Gf).dtype
+            assert np.allclose(GHGf, np.sum(np.abs(Gf)**2, axis=-1))
+
+
+
+    def test_39(self):
+        rho = 1e-1
+        N = 8
+        M = 4
+        K = 7
+        X = util.complex_randn(N, N, 1, K, M)
+        b = util.complex_randn(N, N, 1, 1, M)
+        c0 = linalg.solvemdbi_gram_c(X, rho, 4, 3)
+        c1 = linalg.solvemdbi_gram_c(X, rho, 4, 3, chunk=3)
+        assert np.allclose(c0, c1)
+        slv = linalg.MDBISolver(X, rho, 4, 3, chunk=2)
+        xs = linalg.solvemdbi_ism(X, rho, b, 4, 3)
+        assert np.allclose(slv.solve(b), xs)
+
+
+
+    def test_40(self):
+        from concurrent.futures import ThreadPoolExecutor
+        x = np.random.randn(32, 32, 4).astype(np.float32)
+
+        def fn(k):
+            y = (k + 1) * x
+            for n in range(20):
+                yf = linalg.rfftn(y, None, (0, 1))
+                if not np.allclose(yf, np.fft.rfftn(y, axes=(0, 1)),
+                                   rtol=1e-4, atol=1e-3):
+                    return False
+                if not np.allclose(linalg.irfftn(yf, (32, 32), (0, 1)), y,
+                                   atol=1e-4 * (k + 1)):
+                    return False
+            return True
+
+        # Concurrent FFTs of arrays of the same shape in multiple threads
+        for backend in ('pyfftw', 'scipy', 'numpy'):
+            if backend == 'pyfftw' and not linalg.have_pyfftw:
+                continue
+            with linalg.fft_backend(backend):
+                with ThreadPoolExecutor(max_workers=8) as pool:
+                    assert all(pool.map(fn, range(16)))
+
+
+
+    def test_41(self):
+        x = np.random.randn(16, 12, 3)
+        for backend in ('pyfftw', 'numpy'):
+            if backend == 'pyfftw' and not linalg.have_pyfftw:
+                continue
+            with linalg.fft_backend(backend):
+                dftp = linalg.RFFTPlan(x.shape, (0, 1), x.dtype)
+                np.copyto(dftp.a, x)
+                xf = dftp.rfftn().copy()
+                assert np.allclose(xf, np.fft.rfftn(x, axes=(0, 1)))
+                # Inverse DFT computed directly into an aligned array
+                y = linalg.pyfftw_empty_aligned(x.shape, x.dtype)
+                dftp.a[:] = 0
+                assert dftp.irfftn(xf, out=y) is y
+                assert np.allclose(x, y)
+                # Inverse DFT copied into a non-contiguous array
+                z = np.zeros(x.shape + (2,))[..., 0]
+                dftp.irfftn(xf, out=z)
+                assert np.allclose(x, z)
+                # The plan arrays remain usable
+                assert np.allclose(dftp.irfftn(xf), x)
+                assert np.allclose(dftp.rfftn(x), xf)
@@ -1,6 +1,7 @@
 from __future__ import division
 from builtins import object
 
+import time
 import pytest
 try:
     from mpi4py import MPI
@@ -21,6 +22,19 @@ def fnv(prm):
     return ((x - 0.1)**2, (x - 0.5)**2)
 
 
+def fnr(prm):
+    x = prm[0]
+    time.sleep(1e-2)
+    return ((x - 0.1)**2, MPI.COMM_WORLD.Get_rank())
+
+
+def fne(prm):
+    x = prm[0]
+    if x > 0.5 or MPI.COMM_WORLD.Get_rank() > 0:
+        raise ValueError('function failure')
+    return (x - 0.1)**2
+
+
 
 class TestSet01(object):
 
@@ -42,3 +56,71 @@ class TestSet01(object):
         assert np.abs(sprm[0][1] - 0.5) < 1e-14
         assert sidx[0][0] == 11
         assert sidx[0][1] == 15
+
+
+    def test_03(self, tmp_path):
+        x = np.linspace(-1, 1, 21)
+        # All ranks must use the same checkpoint file path
+        chkpt = self.comm.bcast(str(tmp_path / 'grid.chk'), root=0)
+        prm = []
+        sprm0, sfvl0, fvmx0, sidx0 = mpiutil.grid_search(
+            fn, (x,), self.comm, chkpt=chkpt,
+            callback=lambda p, v: prm.append(p))
+        if self.comm.Get_rank() == 0:
+            assert len(prm) == x.size
+        else:
+            assert len(prm) == 0
+        prm = []
+        sprm1, sfvl1, fvmx1, sidx1 = mpiutil.grid_search(
+            fn, (x,), self.comm, chkpt=chkpt,
+            callback=lambda p, v: prm.append(p))
+        assert len(prm) == 0
+        assert np.array_equal(fvmx0, fvmx1)
+        assert sidx1[0] == 11
+
+
+    def test_04(self):
+        x = np.linspace(-1, 1, 21)
+
+        def callback(prm, val):
+            raise ValueError('callback failure')
+
+        if self.comm.Get_rank() == 0:
+            with pytest.raises(ValueError):
+                mpiutil.grid_search(fn, (x,), self.comm, callback=callback)
+        else:
+            with pytest.raises(RuntimeError):
+                mpiutil.grid_search(fn, (x,), self.comm, callback=callback)
+        # No messages from the failed search are left on the communicator
+        sprm, sfvl, fvmx, sidx = mpiutil.grid_search(fn, (x,), self.comm)
+        assert fvmx.shape == x.shape
+        assert np.allclose(fvmx, (x - 0.1)**2)
+        with pytest.warns(DeprecationWarning):
+            sprm, sfvl, fvmx, sidx = mpiutil.grid_search(
+                fn, (x,), self.comm, mpidtype=MPI.FLOAT)
+        assert np.allclose(fvmx, (x - 0.1)**2)
+
+
+    def test_05(self):
+        x = np.linspace(-1, 1, 21)
+        for n in range(2):
+            if self.comm.Get_rank() == 0:
+                with pytest.raises(ValueError):
+                    mpiutil.grid_search(fne, (x,), self.comm)
+            else:
+                with pytest.raises(RuntimeError):
+                    mpiutil.grid_search(fne, (x,), self.comm)
+        # No messages from the failed searches are left on the
+        # communicator
+        sprm, sfvl, fvmx, sidx = mpiutil.grid_search(fn, (x,), self.comm)
+        assert np.allclose(fvmx, (x - 0.1)**2)
+
+
+    def test_06(self):
+        x = np.linspace(-1, 1, 21)
+        sprm, sfvl, fvmx, sidx = mpiutil.grid_search(fnr, (x,), self.comm)
+        assert np.allclose(fvmx[..., 0], (x - 0.1)**2)
+        # The master process also evaluates the function
+        assert np.sum(fvmx[..., 1] == 0) > 0
+        if self.comm.Get_size() > 1:
+            assert np.sum(fvmx[..., 1] > 0) > 0
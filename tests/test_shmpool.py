@@ -0,0 +1,71 @@
+from __future__ import division
+from builtins import object
+
+import pickle
+import numpy as np
+
+from sporco import shmpool
+
+
+mp_a = None
+mp_c = None
+
+
+def fn(i):
+    mp_a[i] = mp_c * i
+    return float(mp_a[i].sum())
+
+
+
+class TestSet01(object):
+
+    def setup_method(self, method):
+        np.random.seed(12345)
+
+
+    def test_01(self):
+        ns = shmpool.SharedNamespace(__name__)
+        a = ns.array('mp_a', np.zeros((4, 3)))
+        ns['mp_c'] = 2.0
+        with shmpool.SharedMemoryPool(2) as pool:
+            v = pool.map(fn, range(4), ns)
+        assert v == [0.0, 6.0, 12.0, 18.0]
+        assert np.all(a[:, 0] == np.array([0.0, 2.0, 4.0, 6.0]))
+
+
+    def test_02(self):
+        ns0 = shmpool.SharedNamespace(__name__)
+        a0 = ns0.array('mp_a', np.zeros((4, 3)))
+        ns0['mp_c'] = 2.0
+        ns1 = shmpool.SharedNamespace(__name__)
+        a1 = ns1.array('mp_a', np.zeros((4, 2)))
+        ns1['mp_c'] = 3.0
+        with shmpool.SharedMemoryPool(2) as pool:
+            pool.map(fn, range(4), ns0)
+            pool.map(fn, range(4), ns1)
+            pool.map(fn, range(2), ns0)
+        assert np.all(a0[:, 0] == np.array([0.0, 2.0, 4.0, 6.0]))
+        assert np.all(a1[:, 0] == np.array([0.0, 3.0, 6.0, 9.0]))
+
+
+    def test_03(self):
+        ns = shmpool.SharedNamespace(__name__)
+        a = ns.array('mp_a', np.random.randn(4, 3))
+        ns['mp_c'] = 2.0
+        nsp = pickle.loads(pickle.dumps(ns))
+        assert nsp['mp_a'] is not a
+        assert np.all(nsp['mp_a'] == a)
+        assert nsp['mp_c'] == 2.0
+        ns.activate()
+        assert mp_a is a
+
+
+    def test_04(self):
+        ns = shmpool.SharedNamespace(__name__, shared=False)
+        a = ns.array('mp_a', np.zeros((4, 3)))
+        ns['mp_c'] = 2.0
+        assert ns.descriptor() is None
+        with shmpool.ThreadPool(2) as pool:
+            v = pool.map(fn, range(4), ns)
+        assert v == [0.0, 6.0, 12.0, 18.0]
+        assert np.all(a[:, 0] == np.array([0.0, 2.0, 4.0, 6.0]))
@@ -5,6 +5,7 @@ import pytest
 
 import numpy as np
 import os
+import json
 import platform
 import collections
 
@@ -324,3 +325,180 @@ class TestSet01(object):
         S, B, C = util.kpsvd(A0, B0.shape[0:2], C0.shape[0:2])
         A = kronsum(S, B[..., 0:2], C[..., 0:2])
         assert(metric.mse(A0, A) < 1e-12)
+
+
+    def test_41(self, tmp_path):
+        x = np.linspace(-1, 1, 21)
+        chkpt = str(tmp_path / 'grid.chk')
+        sprm0, sfvl0, fvmx0, sidx0 = util.grid_search(fn, (x,), nproc=2,
+                                                      chkpt=chkpt)
+        # Values recorded in the checkpoint file are not recomputed
+        fval, fh = util._grid_search_chkpt(chkpt, (x,))
+        fh.close()
+        assert len(fval) == x.size
+        prm = []
+        sprm1, sfvl1, fvmx1, sidx1 = util.grid_search(
+            fn, (x,), nproc=2, chkpt=chkpt,
+            callback=lambda p, v: prm.append(p))
+        assert len(prm) == 0
+        assert np.array_equal(fvmx0, fvmx1)
+        assert sidx1[0] == 11
+
+
+    def test_42(self, tmp_path):
+        x = np.linspace(-1, 1, 21)
+        chkpt = str(tmp_path / 'grid.chk')
+        fh = util._grid_search_chkpt(chkpt, (x,))[1]
+        util._grid_search_record(fh, 11, -1.0)
+        util._grid_search_record(fh, 3, -2.0)
+        fh.close()
+        prm = []
+        sprm, sfvl, fvmx, sidx = util.grid_search(
+            fn, (x,), nproc=2, chkpt=chkpt,
+            callback=lambda p, v: prm.append(p[0]))
+        assert len(prm) == x.size - 2
+        assert x[3] not in prm and x[11] not in prm
+        assert sidx[0] == 3
+        assert sfvl == -2.0
+
+
+    def test_43(self, tmp_path):
+        chkpt = str(tmp_path / 'grid.chk')
+        util.grid_search(fn, (np.linspace(-1, 1, 5),), nproc=1,
+                         chkpt=chkpt)
+        with pytest.raises(ValueError):
+            util.grid_search(fn, (np.linspace(-1, 1, 7),), nproc=1,
+                             chkpt=chkpt)
+
+
+    def test_44(self):
+        class Slv(object):
+            def __init__(self, prm):
+                self.prm = prm
+                self.opt = {'MaxMainIter': 1}
+                self.k = 0
+            def solve(self):
+                self.k += self.opt['MaxMainIter']
+
+        def evl(slv):
+            return (slv.prm[0] - 0.25)**2 + (slv.prm[1] + 0.2)**2 + 1.0/slv.k
+
+        x = np.linspace(-1, 1, 11)
+        y = np.linspace(-1, 1, 6)
+        itr = []
+        sprm, sfvl, fvmx, sidx = util.halving_search(
+            Slv, (x, y), evl, niter=2, callback=lambda p, v, k: itr.append(k))
+        assert np.allclose(sprm, (0.2, -0.2))
+        assert sidx == (6, 2)
+        assert fvmx.shape == (11, 6)
+        assert sfvl == fvmx[sidx]
+        # Each retained solver is continued rather than restarted
+        assert itr.count(2) == 66
+        assert max(itr) == sum([2**n for n in range(1, 9)])
+        sprm, sfvl, fvmx, sidx = util.halving_search(
+            Slv, (x, y), evl, niter=2, nrefine=2)
+        assert np.abs(sprm[0] - 0.25) < 0.05
+
+
+    def test_45(self):
+        from sporco.admm import cbpdn
+        N = 16
+        Nd = 5
+        M = 4
+        D = np.random.randn(Nd, Nd, M)
+        x0 = np.zeros((N, N, M))
+        x0[np.random.randn(N, N, M) > 2.0] = 1.0
+        s0 = np.sum(np.real(np.fft.ifft2(np.fft.fft2(D, s=(N, N), axes=(0, 1))
+                   * np.fft.fft2(x0, axes=(0, 1)), axes=(0, 1))), axis=2)
+        s = s0 + 0.1 * np.random.randn(N, N)
+
+        def slv(prm):
+            opt = cbpdn.ConvBPDN.Options({'Verbose': False})
+            return cbpdn.ConvBPDN(D, s, prm[0], opt)
+
+        def evl(b):
+            return np.sum((b.reconstruct().squeeze() - s0)**2)
+
+        lmbda = np.logspace(-2, 0, 8)
+        sprm, sfvl, fvmx, sidx = util.halving_search(slv, (lmbda,), evl,
+                                                     niter=10)
+        assert sprm[0] == lmbda[sidx[0]]
+        assert np.isfinite(fvmx).all()
+        with pytest.raises(ValueError):
+            util.halving_search(slv, (lmbda,), evl, keep=1.0)
+
+
+    def test_46(self, tmp_path):
+        x = np.linspace(-1, 1, 5)
+        chkpt = str(tmp_path / 'grid.chk')
+        util.grid_search(fn, (x,), nproc=1, chkpt=chkpt)
+        with open(chkpt) as f:
+            lines = f.read().splitlines()
+        assert len(lines) == x.size + 1
+        assert np.allclose(json.loads(lines[0]), [x])
+        with open(chkpt, 'a') as f:
+            f.write('[2, ')
+        fval, fh = util._grid_search_chkpt(chkpt, (x,))
+        fh.close()
+        assert len(fval) == x.size
+        with open(chkpt, 'w') as f:
+            f.write('{"a": 1}\n')
+        with pytest.raises(ValueError):
+            util._grid_search_chkpt(chkpt, (x,))
+
+
+    def test_47(self):
+        from sporco.admm import cbpdn
+        N = 16
+        Nd = 5
+        M = 4
+        D = np.random.randn(Nd, Nd, M)
+        s = np.random.randn(N, N)
+
+        def slv(prm):
+            opt = cbpdn.ConvBPDN.Options({'Verbose': False})
+            return cbpdn.ConvBPDN(D, s, prm[0], opt)
+
+        def evl(b):
+            return b.itstat[-1].ObjFun
+
+        lmbda = np.logspace(-2, 0, 5)
+        # The number of candidates is reduced at every stage even when
+        # ceil(keep * n) == n
+        itr = []
+        sprm0, sfvl0, fvmx0, sidx0 = util.halving_search(
+            slv, (lmbda,), evl, niter=2, keep=0.9,
+            callback=lambda p, v, k: itr.append(k))
+        assert len(itr) == sum(range(1, 6))
+        sprm1, sfvl1, fvmx1, sidx1 = util.halving_search(
+            slv, (lmbda,), evl, niter=2, keep=0.9, nproc=2)
+        assert sidx0 == sidx1
+        assert np.allclose(fvmx0, fvmx1)
+
+
+    def test_48(self):
+        from sporco.admm import cbpdn
+        N = 32
+        Nd = 8
+        M = 8
+        D = np.random.randn(Nd, Nd, M)
+        s = np.random.randn(N, N)
+
+        def slv(prm):
+            opt = cbpdn.ConvBPDN.Options({'Verbose': False,
+                                          'RelStopTol': 0.0})
+            return cbpdn.ConvBPDN(D, s, prm[0], opt)
+
+        def evl(b):
+            return np.sum((b.reconstruct().squeeze() - s)**2)
+
+        lmbda = np.logspace(-2, 0, 16)
+        sprm0, sfvl0, fvmx0, sidx0 = util.halving_search(
+            slv, (lmbda,), evl, niter=5)
+        # Solvers run concurrently in worker threads give the same
+        # results as those run serially
+        for n in range(6):
+            sprm1, sfvl1, fvmx1, sidx1 = util.halving_search(
+                slv, (lmbda,), evl, niter=5, nproc=8)
+            assert sidx0 == sidx1
+            assert np.allclose(fvmx0, fvmx1, rtol=1e-10)